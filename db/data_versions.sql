@@ -0,0 +1,23 @@
+-- db/data_versions.sql
+--
+-- One row per loaded or derived table, bumped by the ETL publish stage
+-- (etl/publish.py) whenever a run actually changed it: a monotonically
+-- increasing `version`, the seasons the run touched, how many rows it wrote,
+-- which job wrote it and when. Tables a run left unchanged keep their row as-is.
+--
+-- Downstream caches poll it instead of re-querying data tables, e.g.
+--   SELECT MAX(updated_at) FROM data_versions;                        -- anything changed?
+--   SELECT version FROM data_versions WHERE table_name = 'season_leaders';
+-- Both are single index/heap reads on a table of a few dozen rows.
+--
+-- etl/publish.py applies this file itself (CREATE ... IF NOT EXISTS), so
+-- there is no separate build step.
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    seasons INT[],                  -- seasons touched by the last change; NULL for non-seasonal tables
+    rows_written BIGINT,            -- rows inserted/updated by the last change (NULL for refreshed views)
+    source TEXT NOT NULL,           -- job that made the change: savant_daily, lahman_load, ...
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,69 @@
+-- db/fangraphs_rollups.sql
+--
+-- One-time rollups of the frozen FanGraphs archive (fangraphs_batting_advanced /
+-- fangraphs_pitching_advanced) down to one row per (idfg, season), with the
+-- traded-player 'TOT' row already resolved. The source tables can never change
+-- (FanGraphs ETL access is gone for good), so there is nothing to refresh --
+-- these are plain tables built once by scripts/build_fangraphs_rollups.py, not
+-- materialized views, and nothing in etl/ ever touches them.
+--
+-- Per-season values follow the same rule every career/leaderboard query used to
+-- apply inline: take the 'TOT' row when one exists, otherwise the player's only
+-- stint row, ignoring '---' placeholder rows. WAR is additive, so a traded player
+-- with no 'TOT' row gets the SUM of their stints; the rate metrics (wOBA, wRC+,
+-- FIP, xFIP) can't be re-weighted without playing time FanGraphs never gave us,
+-- so those keep the old MAX() fallback.
+--
+-- Must exist before db/player_season_views.sql is applied (the views read WAR /
+-- wRC+ / FIP from here).
+
+
+-- FANGRAPHS BATTING BY SEASON
+DROP TABLE IF EXISTS fangraphs_batting_by_season;
+CREATE TABLE fangraphs_batting_by_season (
+    idfg INT,
+    season INT,
+    playername TEXT,
+    war NUMERIC,
+    wrc_plus NUMERIC,
+    woba NUMERIC,
+    PRIMARY KEY (idfg, season)
+);
+
+INSERT INTO fangraphs_batting_by_season (idfg, season, playername, war, wrc_plus, woba)
+SELECT idfg, season,
+       MAX(playername) AS playername,
+       COALESCE(MAX(war) FILTER (WHERE team = 'TOT'), SUM(war) FILTER (WHERE team != 'TOT')) AS war,
+       COALESCE(MAX(wrc_plus) FILTER (WHERE team = 'TOT'), MAX(wrc_plus)) AS wrc_plus,
+       COALESCE(MAX(woba) FILTER (WHERE team = 'TOT'), MAX(woba)) AS woba
+FROM fangraphs_batting_advanced
+WHERE team != '---'
+GROUP BY idfg, season;
+
+
+-- FANGRAPHS PITCHING BY SEASON
+DROP TABLE IF EXISTS fangraphs_pitching_by_season;
+CREATE TABLE fangraphs_pitching_by_season (
+    idfg INT,
+    season INT,
+    playername TEXT,
+    fip NUMERIC,
+    xfip NUMERIC,
+    war NUMERIC,
+    PRIMARY KEY (idfg, season)
+);
+
+INSERT INTO fangraphs_pitching_by_season (idfg, season, playername, fip, xfip, war)
+SELECT idfg, season,
+       MAX(playername) AS playername,
+       COALESCE(MAX(fip) FILTER (WHERE team = 'TOT'), MAX(fip)) AS fip,
+       COALESCE(MAX(xfip) FILTER (WHERE team = 'TOT'), MAX(xfip)) AS xfip,
+       COALESCE(MAX(war) FILTER (WHERE team = 'TOT'), SUM(war) FILTER (WHERE team != 'TOT')) AS war
+FROM fangraphs_pitching_advanced
+WHERE team != '---'
+GROUP BY idfg, season;
+
+-- Leaderboards filter on season and sort on the metric; idfg lookups are
+-- already covered by the primary key.
+CREATE INDEX fangraphs_batting_by_season_season_idx ON fangraphs_batting_by_season (season);
+CREATE INDEX fangraphs_pitching_by_season_season_idx ON fangraphs_pitching_by_season (season);
@@ -0,0 +1,79 @@
+-- db/game_logs.sql
+--
+-- Batting game logs and their precomputed rolling windows / hitting streaks,
+-- derived from pitch-level Statcast (db/statcast_pitches.sql) by
+-- etl/game_logs.py inside each statcast_pitches load transaction. Like the
+-- split cube they outlive pitch retention (STATCAST_KEEP_SEASONS): the
+-- seasons ever loaded stay here.
+--
+-- batting_game_logs: one row per batter per game, PA outcomes only -- pitch
+--   data carries no runs, RBI or stolen bases. The loaded days are replaced.
+-- batting_rolling: one row per (season, window_days, player) -- totals over the
+--   window_days calendar days ending at as_of, the season's last loaded game
+--   date (7 / 15 / 30). Recomputed from the last 30 days of logs after a load.
+-- batting_streaks: every hitting streak (consecutive games with a hit) per
+--   player-season. A game whose PAs were all walks / HBP / sacrifice bunts /
+--   interference neither extends nor breaks a streak (a sacrifice fly with no
+--   hit does break it). active = the streak includes the player's latest game.
+--   Recomputed for the players who appear on the loaded days.
+
+CREATE TABLE IF NOT EXISTS batting_game_logs (
+    player_id INT NOT NULL,
+    game_date DATE NOT NULL,
+    game_pk INT NOT NULL,
+    season SMALLINT NOT NULL,
+    team TEXT,
+    opponent TEXT,
+    home BOOLEAN,
+    pa SMALLINT NOT NULL,
+    ab SMALLINT NOT NULL,
+    h SMALLINT NOT NULL,
+    doubles SMALLINT NOT NULL,
+    triples SMALLINT NOT NULL,
+    hr SMALLINT NOT NULL,
+    bb SMALLINT NOT NULL,                    -- includes intentional walks
+    ibb SMALLINT NOT NULL,
+    hbp SMALLINT NOT NULL,
+    sf SMALLINT NOT NULL,
+    so SMALLINT NOT NULL,
+    PRIMARY KEY (player_id, game_date, game_pk)
+);
+
+CREATE INDEX IF NOT EXISTS batting_game_logs_date_idx ON batting_game_logs (game_date);
+CREATE INDEX IF NOT EXISTS batting_game_logs_season_idx ON batting_game_logs (season, player_id);
+
+CREATE TABLE IF NOT EXISTS batting_rolling (
+    season SMALLINT NOT NULL,
+    window_days SMALLINT NOT NULL,
+    player_id INT NOT NULL,
+    as_of DATE NOT NULL,
+    games SMALLINT NOT NULL,
+    pa SMALLINT NOT NULL,
+    ab SMALLINT NOT NULL,
+    h SMALLINT NOT NULL,
+    doubles SMALLINT NOT NULL,
+    triples SMALLINT NOT NULL,
+    hr SMALLINT NOT NULL,
+    bb SMALLINT NOT NULL,
+    hbp SMALLINT NOT NULL,
+    sf SMALLINT NOT NULL,
+    so SMALLINT NOT NULL,
+    avg NUMERIC,
+    obp NUMERIC,
+    slg NUMERIC,
+    ops NUMERIC,
+    PRIMARY KEY (season, window_days, player_id)
+);
+
+CREATE TABLE IF NOT EXISTS batting_streaks (
+    player_id INT NOT NULL,
+    season SMALLINT NOT NULL,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    games SMALLINT NOT NULL,
+    active BOOLEAN NOT NULL,
+    PRIMARY KEY (player_id, season, start_date)
+);
+
+-- "Longest hitting streak in <season>" is an index scan in games order
+CREATE INDEX IF NOT EXISTS batting_streaks_season_games_idx ON batting_streaks (season, games DESC);
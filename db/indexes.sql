@@ -0,0 +1,73 @@
+-- db/indexes.sql
+--
+-- Managed secondary-index set for the Lahman, Savant, bridge and FanGraphs
+-- tables. The AWS RDS copies of the Lahman tables have no primary keys at all
+-- (see DEVELOPMENT.md "Known schema quirks"), and the wide savant_*_season
+-- tables (the savant_* names are views over them) only get the (player_id, year)
+-- primary key from create_table_if_not_exists -- yet
+-- nearly every generated query filters on a season (yearid/year/season) or
+-- joins on a player key (playerid/key_mlbam/idfg).
+--
+-- Every statement is CONCURRENTLY + IF NOT EXISTS, so this file is safe to
+-- re-apply against the live database at any time. CONCURRENTLY can't run in a
+-- transaction block -- apply it with scripts/apply_indexes.py, which runs one
+-- statement at a time in autocommit mode, not with psql -1 or a single
+-- cursor.execute(). Index names are the contract: scripts/index_advisor.py
+-- reads pg_indexes to decide what's missing, and new entries belong here
+-- rather than being created by hand.
+
+
+-- PEOPLE
+-- Expression index for the "First Last" lookup every career/comparison query
+-- uses: LOWER(peo.namefirst || ' ' || peo.namelast) = LOWER(%(player_name)s).
+-- The expression must match the query text exactly for the planner to use it.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS people_playerid_idx ON people (playerid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS people_full_name_lower_idx ON people (LOWER(namefirst || ' ' || namelast));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS people_namelast_lower_idx ON people (LOWER(namelast));
+
+-- LAHMAN SEASON TABLES (player + season)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS batting_playerid_yearid_idx ON batting (playerid, yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS batting_yearid_idx ON batting (yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS pitching_playerid_yearid_idx ON pitching (playerid, yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS pitching_yearid_idx ON pitching (yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS fielding_playerid_yearid_idx ON fielding (playerid, yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS fielding_yearid_idx ON fielding (yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS appearances_playerid_yearid_idx ON appearances (playerid, yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS appearances_yearid_idx ON appearances (yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS battingpost_playerid_yearid_idx ON battingpost (playerid, yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS pitchingpost_playerid_yearid_idx ON pitchingpost (playerid, yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS salaries_playerid_yearid_idx ON salaries (playerid, yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS salaries_yearid_idx ON salaries (yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS allstarfull_yearid_idx ON allstarfull (yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS managers_yearid_idx ON managers (yearid);
+
+-- LAHMAN AWARDS / HOF (looked up by award + season far more than by player)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS awardsplayers_awardid_yearid_idx ON awardsplayers (awardid, yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS awardsplayers_playerid_idx ON awardsplayers (playerid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS awardsmanagers_awardid_yearid_idx ON awardsmanagers (awardid, yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS awardsshareplayers_awardid_yearid_idx ON awardsshareplayers (awardid, yearid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS halloffame_playerid_idx ON halloffame (playerid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS halloffame_yearid_idx ON halloffame (yearid);
+
+-- LAHMAN TEAMS
+CREATE INDEX CONCURRENTLY IF NOT EXISTS teams_yearid_teamid_idx ON teams (yearid, teamid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS seriespost_yearid_idx ON seriespost (yearid);
+
+-- SAVANT (primary key already covers player_id lookups; add the season filter)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS savant_batting_season_year_idx ON savant_batting_season (year);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS savant_pitching_season_year_idx ON savant_pitching_season (year);
+
+-- BRIDGES (lahman_savant_bridge's (playerid, key_mlbam) key covers playerid
+-- lookups, but every Savant -> Lahman join probes by key_mlbam)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS lahman_savant_bridge_key_mlbam_idx ON lahman_savant_bridge (key_mlbam);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS lahman_fangraphs_bridge_playerid_idx ON lahman_fangraphs_bridge (playerid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS lahman_fangraphs_bridge_idfg_idx ON lahman_fangraphs_bridge (idfg);
+
+-- FANGRAPHS (frozen; only for the rare per-team split that bypasses fbs/fps)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS fangraphs_batting_advanced_idfg_season_idx ON fangraphs_batting_advanced (idfg, season);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS fangraphs_pitching_advanced_idfg_season_idx ON fangraphs_pitching_advanced (idfg, season);
+
+-- SAVANT NAME LOOKUPS (name_key = folded "first last", written by the ETL; see
+-- nlp/names.py and scripts/backfill_savant_display_names.py)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS savant_batting_season_name_key_idx ON savant_batting_season (name_key);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS savant_pitching_season_name_key_idx ON savant_pitching_season (name_key);
@@ -0,0 +1,290 @@
+# db/local_engine.py
+#
+# Optional in-process DuckDB backend over the Parquet export written by
+# etl/export_parquet.py. Historical questions (Lahman, the frozen FanGraphs
+# archive, completed Savant seasons) can be answered locally instead of making
+# a round trip to AWS RDS; anything that needs the current season, a table that
+# wasn't exported, or syntax we don't transpile still goes to Postgres.
+#
+# Off unless DBBALL_LOCAL_ENGINE is set ("1" for data/parquet/, or a directory
+# path) AND duckdb is installed (`pip install duckdb` -- deliberately not in
+# requirements.txt; the deployed app doesn't ship the Parquet files). When off,
+# get_engine() returns None and callers run everything on Postgres as before.
+#
+# Transpiling is deliberately small. DuckDB already speaks most of the
+# Postgres dialect our templates/LLM use -- FILTER (WHERE ...), DISTINCT ON,
+# string_agg(... ORDER BY ...), split_part, position(x IN y), NULLS LAST,
+# quoted "2b"/"3b" -- so those pass through untouched. What does get rewritten:
+#   %(name)s params        -> $name (DuckDB named parameters)
+#   ::numeric / NUMERIC(p,s) -> DOUBLE (DuckDB's NUMERIC is a fixed DECIMAL(18,3))
+#   FETCH FIRST n ROWS ONLY -> LIMIT n
+#   ORDER BY ... FETCH FIRST n ROWS WITH TIES -> RANK() <= n wrapper
+# and integer_division is switched on so int/int truncates like Postgres.
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+try:
+    import duckdb
+except ImportError:  # optional dependency -- the backend simply stays off
+    duckdb = None
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_PARQUET_DIR = ROOT / "data" / "parquet"
+
+# Tables exported for completed seasons only (see EXPORT_TABLES in etl/export_parquet.py).
+_LIVE_TABLE_RE = re.compile(r"(?i)\b(?:savant_\w+|player_season_\w+|season_leaders)\b")
+
+# Postgres-only constructs we don't transpile, plus anything whose answer depends
+# on "today" -- those always run on Postgres.
+_UNSUPPORTED_RE = re.compile(
+    r"(?i)\bpg_\w+|\binformation_schema\b|::\s*regclass|\bILIKE\s+ANY\b|\s~\*?\s|\bto_char\s*\("
+    r"|\bnow\s*\(\s*\)|\bcurrent_date\b|\bcurrent_timestamp\b|\bage\s*\("
+)
+
+_TABLE_REF_RE = re.compile(r'(?i)\b(?:FROM|JOIN)\s+"?([a-z_][a-z0-9_]*)"?')
+_CTE_NAME_RE = re.compile(r'(?i)(?:\bWITH(?:\s+RECURSIVE)?|,)\s*"?([a-z_][a-z0-9_]*)"?\s+AS\s*(?:NOT\s+)?(?:MATERIALIZED\s+)?\(')
+# Season predicates: <season col> <op> <4-digit year | %(param)s>, BETWEEN's two
+# values, or an IN list of them. Only these count -- a bare 2000 elsewhere is as
+# likely to be a PA threshold as a year.
+_SEASON_VALUE = r"(?:\d{4}\b|%\(\w+\)s)"
+_SEASON_PRED_RE = re.compile(
+    r"(?i)\b(?:year|yearid|season)\s*(?:"
+    r"(?P<op>=|<=|>=|<|>)\s*(?P<value>" + _SEASON_VALUE + r")"
+    r"|BETWEEN\s+" + _SEASON_VALUE + r"\s+AND\s+(?P<upper>" + _SEASON_VALUE + r")"
+    r"|IN\s*(?:\((?P<in_list>[^()]*)\)|(?P<in_param>%\(\w+\)s)))"
+)
+_SET_OP_RE = re.compile(r"(?i)\b(?:UNION(?:\s+ALL)?|INTERSECT|EXCEPT)\b")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"%\((\w+)\)s")
+
+_WITH_TIES_RE = re.compile(
+    r"(?is)^(?P<body>.*)\bORDER\s+BY\s+(?P<keys>(?:(?!\bORDER\s+BY\b).)*?)"
+    r"\s+FETCH\s+FIRST\s+(?P<n>\$?\w+)\s+ROWS?\s+WITH\s+TIES\s*;?\s*$"
+)
+_FETCH_ONLY_RE = re.compile(r"(?i)\bFETCH\s+FIRST\s+(\$?\w+)\s+ROWS?\s+ONLY\b")
+_NUMERIC_CAST_RE = re.compile(r"(?i)::\s*numeric(?:\s*\(\s*\d+\s*(?:,\s*\d+\s*)?\))?")
+_NUMERIC_AS_RE = re.compile(r"(?i)\bAS\s+numeric(?:\s*\(\s*\d+\s*(?:,\s*\d+\s*)?\))?(?=\s*\))")
+
+
+def referenced_tables(sql: str) -> set:
+    """Base tables a statement reads from (FROM/JOIN targets minus its own CTE names)."""
+    ctes = {m.lower() for m in _CTE_NAME_RE.findall(sql)}
+    return {t.lower() for t in _TABLE_REF_RE.findall(sql)} - ctes - {"lateral", "unnest"}
+
+
+def query_scopes(sql: str):
+    """Text of every SELECT scope in a statement -- the top level, each CTE body and
+    each parenthesised subquery -- with the subqueries nested inside it blanked out,
+    so a predicate is only credited to the scope it is written in. None when the
+    parentheses don't balance."""
+    text = _STRING_RE.sub(lambda m: "'" + " " * (len(m.group()) - 2) + "'", sql)
+    stack, groups = [], []
+    for i, ch in enumerate(text):
+        if ch == "(":
+            stack.append(i)
+        elif ch == ")":
+            if not stack:
+                return None
+            start = stack.pop()
+            if re.match(r"(?is)\s*(?:WITH|SELECT)\b", text[start + 1:i]):
+                groups.append((start + 1, i))
+    if stack:
+        return None
+    scopes = []
+    for start, end in [(0, len(text))] + groups:
+        scope = list(text[start:end])
+        for inner_start, inner_end in groups:
+            if start < inner_start and inner_end <= end and (inner_start, inner_end) != (start, end):
+                scope[inner_start - start:inner_end - start] = " " * (inner_end - inner_start)
+        scopes.append("".join(scope))
+    return scopes
+
+
+def _season_values(raw, params):
+    """Years named by one predicate value ('2024' or '%(season)s', a param may hold a
+    list); None if any of them isn't a plain year."""
+    raw = raw.strip()
+    m = _PARAM_RE.fullmatch(raw)
+    if m:
+        value = (params or {}).get(m.group(1))
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+    elif re.fullmatch(r"\d{4}", raw):
+        values = [raw]
+    else:
+        return None
+    try:
+        return [int(v) for v in values]
+    except (TypeError, ValueError):
+        return None
+
+
+def season_upper_bound(branch: str, params: dict | None = None):
+    """Latest season one SELECT branch can read, from its own season predicates:
+    (year, None), or (None, reason) when no predicate closes the range."""
+    uppers = []
+    for m in _SEASON_PRED_RE.finditer(branch):
+        if m.group("op") in (">", ">="):
+            continue  # a lower bound; something else has to close the range
+        if m.group("in_list") is not None:
+            items = m.group("in_list").split(",")
+        else:
+            items = [m.group("value") or m.group("upper") or m.group("in_param")]
+        years = []
+        for item in items:
+            values = _season_values(item, params)
+            if values is None:
+                return None, "non-numeric season value"
+            years.extend(values)
+        if years:
+            uppers.append(max(years))
+    if not uppers:
+        return None, "unbounded read of a live table"
+    # Conservative: every bound the branch states has to be historical, not just the tightest
+    return max(uppers), None
+
+
+def route_statement(sql: str, params: dict | None, exported: set, current_season: int):
+    """(True, reason) if this statement can run on the export, else (False, reason).
+    A live table is only safe locally if every branch that reads it -- each UNION
+    arm, CTE body and subquery -- bounds its season below the current one."""
+    if not sql or not re.match(r"(?is)^\s*(WITH|SELECT)\b", sql):
+        return False, "not a read query"
+    if _UNSUPPORTED_RE.search(sql):
+        return False, "postgres-only syntax"
+    tables = referenced_tables(sql)
+    missing = tables - exported
+    if not tables or missing:
+        return False, f"not exported: {', '.join(sorted(missing)) or '(no tables)'}"
+
+    if not _LIVE_TABLE_RE.search(sql):
+        return True, "historical"  # Lahman/FanGraphs only: the export is complete
+
+    scopes = query_scopes(sql)
+    if scopes is None:
+        return False, "unbalanced parentheses"
+    for scope in scopes:
+        for branch in _SET_OP_RE.split(scope):
+            if not any(_LIVE_TABLE_RE.fullmatch(t) for t in _TABLE_REF_RE.findall(branch)):
+                continue
+            # One OR can reopen a range the other predicates close
+            if re.search(r"(?i)\bOR\b", branch):
+                return False, "OR in a live-table read"
+            upper, reason = season_upper_bound(branch, params)
+            if upper is None:
+                return False, reason
+            if upper >= current_season:
+                return False, "current season"
+    return True, "historical"
+
+
+def transpile(sql: str, params: dict | None = None):
+    """Postgres (psycopg2-style) SQL -> (DuckDB SQL, DuckDB named params)."""
+    params = params or {}
+    used = []
+
+    def _param(m):
+        used.append(m.group(1))
+        return f"${m.group(1)}"
+
+    out = _PARAM_RE.sub(_param, sql.strip())
+    if params:
+        out = out.replace("%%", "%")  # psycopg2 escape; only meaningful when params were bound
+    out = _NUMERIC_CAST_RE.sub("::DOUBLE", out)
+    out = _NUMERIC_AS_RE.sub("AS DOUBLE", out)
+    out = _FETCH_ONLY_RE.sub(r"LIMIT \1", out)
+
+    m = _WITH_TIES_RE.match(out)
+    if m:
+        body = m.group("body").rstrip()
+        # The outer query only sees output column names, not table aliases
+        keys = re.sub(r'(?i)\b[a-z_]\w*\.(?="?[a-z_])', "", m.group("keys").strip())
+        out = (
+            f"SELECT * EXCLUDE (__tie_rank) FROM ("
+            f"SELECT *, RANK() OVER (ORDER BY {keys}) AS __tie_rank FROM ({body}) __q"
+            f") __r WHERE __tie_rank <= {m.group('n')} ORDER BY {keys}"
+        )
+    out = out.rstrip().rstrip(";")
+    return out, {name: params[name] for name in dict.fromkeys(used) if name in params}
+
+
+class LocalEngine:
+    def __init__(self, parquet_dir: Path):
+        manifest = json.loads((parquet_dir / "manifest.json").read_text())
+        self.parquet_dir = parquet_dir
+        self.current_season = int(manifest["current_season"])
+        self.exported_at = manifest.get("exported_at")
+        self.tables = set()
+        self._con = duckdb.connect(":memory:")
+        self._con.execute("SET integer_division = true")
+        for table in manifest.get("tables", {}):
+            path = parquet_dir / f"{table}.parquet"
+            if path.exists():
+                # Views over the files: DuckDB scans the Parquet directly, nothing is copied in
+                self._con.execute(f"CREATE VIEW \"{table}\" AS SELECT * FROM read_parquet('{path.as_posix()}')")
+                self.tables.add(table)
+        self._lock = threading.Lock()
+
+    def route(self, sql: str, params: dict | None = None):
+        """(True, reason) if this statement can run locally, else (False, reason).
+        Career/"since 2015" reads of a live table would silently miss this year's
+        rows, so those go to Postgres (route_statement())."""
+        return route_statement(sql, params, self.tables, self.current_season)
+
+    def execute(self, sql: str, params: dict | None = None):
+        duck_sql, duck_params = transpile(sql, params)
+        with self._lock:
+            cur = self._con.cursor()
+            try:
+                cur.execute(duck_sql, duck_params) if duck_params else cur.execute(duck_sql)
+                colnames = [d[0] for d in cur.description] if cur.description else []
+                rows = cur.fetchall() if cur.description else []
+            finally:
+                cur.close()
+        return rows, colnames
+
+
+_ENGINE = None
+_ENGINE_LOADED = False
+
+
+def get_engine(setting: str | None = None):
+    """The shared LocalEngine, or None when the backend is off/unavailable.
+    `setting` overrides the DBBALL_LOCAL_ENGINE env var (e.g. from st.secrets);
+    only the first call's setting counts."""
+    global _ENGINE, _ENGINE_LOADED
+    if _ENGINE_LOADED:
+        return _ENGINE
+    _ENGINE_LOADED = True
+
+    setting = (setting if setting is not None else os.getenv("DBBALL_LOCAL_ENGINE", "")).strip()
+    if not setting or setting == "0" or duckdb is None:
+        return None
+    parquet_dir = DEFAULT_PARQUET_DIR if setting == "1" else Path(setting)
+    if not (parquet_dir / "manifest.json").exists():
+        return None
+    try:
+        _ENGINE = LocalEngine(parquet_dir)
+    except Exception as e:
+        print(f"[warn] local engine disabled: {type(e).__name__}: {e}")
+        _ENGINE = None
+    return _ENGINE
+
+
+def run_routed(sql: str, params: dict | None, pg_run):
+    """Run locally when route() allows it, else (or on any local error) via
+    pg_run(sql, params) -> (rows, colnames). Returns (rows, colnames, backend)."""
+    engine = get_engine()
+    if engine is not None:
+        ok, _reason = engine.route(sql, params)
+        if ok:
+            try:
+                rows, colnames = engine.execute(sql, params)
+                return rows, colnames, "local"
+            except Exception:
+                pass  # anything DuckDB can't run goes to Postgres
+    rows, colnames = pg_run(sql, params)
+    return rows, colnames, "postgres"
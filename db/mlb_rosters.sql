@@ -0,0 +1,30 @@
+-- db/mlb_rosters.sql
+--
+-- MLB Stats API roster snapshots, one row per (season, roster_type, player).
+-- Written by etl/roster_fetcher.py:write_rosters():
+--   'current' -- every player's current team for the season (sports/1/players),
+--                refreshed by the daily Savant ETL;
+--   '40Man'   -- the 30 teams' 40-man rosters, refreshed by
+--                scripts/scrape_2026_rosters.py (replaces the old
+--                rosters_2026_bridge.csv).
+-- A write replaces one (season, roster_type) snapshot in a single transaction,
+-- and is skipped when the fetched snapshot matches what's already stored.
+-- `team` uses the DB's abbreviations (ARI, TBR, WSN, ...; ABBR_MAP in
+-- etl/roster_fetcher.py), not the Stats API's.
+--
+-- etl/roster_fetcher.py applies this file itself (CREATE ... IF NOT EXISTS).
+
+CREATE TABLE IF NOT EXISTS mlb_rosters (
+    season INT NOT NULL,
+    roster_type TEXT NOT NULL,      -- 'current' | '40Man' | any other Stats API rosterType
+    player_id INT NOT NULL,         -- MLBAM id (= savant_* player_id)
+    name TEXT,
+    team TEXT,
+    team_id INT,
+    position TEXT,                  -- primary position abbreviation
+    status TEXT,                    -- roster status code (A, D60, ...) when the endpoint has one
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (season, roster_type, player_id)
+);
+
+CREATE INDEX IF NOT EXISTS mlb_rosters_team_idx ON mlb_rosters (season, team);
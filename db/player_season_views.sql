@@ -0,0 +1,168 @@
+-- db/player_season_views.sql
+--
+-- One row per player-season, consolidated across all three data tiers
+-- (Savant current season, Lahman everything else, frozen FanGraphs archive
+-- for WAR/wOBA/wRC+/FIP/xFIP). These are the same unions the career handlers
+-- in nlp/template_router.py used to rebuild on every request -- computing them
+-- once per ETL run turns a career lookup into an indexed read on playerid.
+--
+-- Conventions (same as the rest of the app, see AGENTS.md / DEVELOPMENT.md):
+--   - Keyed on the Lahman playerid. Savant rows are mapped through
+--     lahman_savant_bridge; a Savant player with no bridge entry is dropped,
+--     exactly like the old career query's inner join.
+--   - Savant wins for any season it has rows for; Lahman fills every season
+--     Savant doesn't (NOT EXISTS guard, no hardcoded cutover year).
+--   - Traded players are consolidated to one row per season: Lahman stints are
+--     summed, and `team` lists the stints chronologically as 'TM1 -> TM2'.
+--   - FanGraphs values come from the one-time per-season rollups in
+--     db/fangraphs_rollups.sql ('TOT' row already resolved), and are NULL for
+--     any season the frozen archive doesn't cover.
+--   - `name` is always "First Last" from people (never Savant's "Last, First").
+--
+-- Apply with scripts/create_player_season_views.py, after
+-- scripts/build_fangraphs_rollups.py has built the FanGraphs rollups. Refreshed at the end of
+-- every etl/update_savant_awsrds.py and etl/load_lahman.py --commit run. The
+-- unique (playerid, season) indexes are what REFRESH ... CONCURRENTLY needs,
+-- so readers never block on a refresh.
+
+
+-- PLAYER SEASON BATTING
+DROP MATERIALIZED VIEW IF EXISTS player_season_batting;
+CREATE MATERIALIZED VIEW player_season_batting AS
+WITH savant_bridge AS (
+    SELECT DISTINCT ON (key_mlbam) key_mlbam, playerid
+    FROM lahman_savant_bridge
+    ORDER BY key_mlbam, playerid
+),
+fangraphs_bridge AS (
+    SELECT DISTINCT ON (playerid) playerid, idfg
+    FROM lahman_fangraphs_bridge
+    ORDER BY playerid, idfg
+),
+savant_seasons AS (
+    SELECT sb.playerid, s.year AS season, s.team, 'savant' AS source,
+           s.b_game::int AS g, s.b_total_pa::int AS pa, s.b_ab::int AS ab, s.b_total_hits::int AS h,
+           s.b_double::int AS "2b", s.b_triple::int AS "3b", s.b_home_run::int AS hr,
+           s.b_rbi::int AS rbi, s.b_stolen_base::int AS sb, s.b_walk::int AS bb, s.b_strikeout::int AS so,
+           r.batting_avg::numeric AS avg, r.on_base_percent::numeric AS obp,
+           r.slg_percent::numeric AS slg, r.on_base_plus_slg::numeric AS ops
+    FROM savant_batting_traditional s
+    JOIN savant_bridge sb ON sb.key_mlbam = s.player_id
+    LEFT JOIN savant_batting_ratios r ON r.player_id = s.player_id AND r.year = s.year
+),
+lahman_teams AS (
+    SELECT playerid, yearid, string_agg(teamid, ' -> ' ORDER BY first_stint) AS team
+    FROM (SELECT playerid, yearid, teamid, MIN(stint) AS first_stint
+          FROM batting
+          GROUP BY playerid, yearid, teamid) t
+    GROUP BY playerid, yearid
+),
+lahman_totals AS (
+    SELECT bat.playerid, bat.yearid AS season,
+           SUM(bat.g) AS g, SUM(bat.ab) AS ab, SUM(bat.h) AS h,
+           SUM(bat."2b") AS "2b", SUM(bat."3b") AS "3b", SUM(bat.hr) AS hr,
+           SUM(bat.rbi) AS rbi, SUM(bat.sb) AS sb, SUM(bat.bb) AS bb, SUM(bat.so) AS so,
+           COALESCE(SUM(bat.hbp), 0) AS hbp, COALESCE(SUM(bat.sf), 0) AS sf, COALESCE(SUM(bat.sh), 0) AS sh
+    FROM batting bat
+    WHERE NOT EXISTS (SELECT 1 FROM savant_batting_traditional s2 WHERE s2.year = bat.yearid)
+    GROUP BY bat.playerid, bat.yearid
+),
+lahman_seasons AS (
+    SELECT lt.playerid, lt.season, tm.team, 'lahman' AS source,
+           lt.g::int AS g, (lt.ab + lt.bb + lt.hbp + lt.sf + lt.sh)::int AS pa, lt.ab::int AS ab, lt.h::int AS h,
+           lt."2b"::int AS "2b", lt."3b"::int AS "3b", lt.hr::int AS hr,
+           lt.rbi::int AS rbi, lt.sb::int AS sb, lt.bb::int AS bb, lt.so::int AS so,
+           lt.h::numeric / NULLIF(lt.ab, 0) AS avg,
+           (lt.h + lt.bb + lt.hbp)::numeric / NULLIF(lt.ab + lt.bb + lt.hbp + lt.sf, 0) AS obp,
+           (lt.h + lt."2b" + 2 * lt."3b" + 3 * lt.hr)::numeric / NULLIF(lt.ab, 0) AS slg
+    FROM lahman_totals lt
+    JOIN lahman_teams tm ON tm.playerid = lt.playerid AND tm.yearid = lt.season
+),
+combined AS (
+    SELECT playerid, season, team, source, g, pa, ab, h, "2b", "3b", hr, rbi, sb, bb, so,
+           avg, obp, slg, ops
+    FROM savant_seasons
+    UNION ALL
+    SELECT playerid, season, team, source, g, pa, ab, h, "2b", "3b", hr, rbi, sb, bb, so,
+           avg, obp, slg, obp + slg AS ops
+    FROM lahman_seasons
+)
+SELECT c.playerid, c.season,
+       peo.namefirst || ' ' || peo.namelast AS name,
+       c.team, c.source,
+       c.g, c.pa, c.ab, c.h, c."2b", c."3b", c.hr, c.rbi, c.sb, c.bb, c.so,
+       c.avg, c.obp, c.slg, c.ops,
+       fbs.war, fbs.wrc_plus, fbs.woba
+FROM combined c
+JOIN people peo ON peo.playerid = c.playerid
+LEFT JOIN fangraphs_bridge lfb ON lfb.playerid = c.playerid
+LEFT JOIN fangraphs_batting_by_season fbs ON fbs.idfg = lfb.idfg AND fbs.season = c.season;
+
+CREATE UNIQUE INDEX player_season_batting_pk ON player_season_batting (playerid, season);
+CREATE INDEX player_season_batting_season_idx ON player_season_batting (season);
+
+
+-- PLAYER SEASON PITCHING
+DROP MATERIALIZED VIEW IF EXISTS player_season_pitching;
+CREATE MATERIALIZED VIEW player_season_pitching AS
+WITH savant_bridge AS (
+    SELECT DISTINCT ON (key_mlbam) key_mlbam, playerid
+    FROM lahman_savant_bridge
+    ORDER BY key_mlbam, playerid
+),
+fangraphs_bridge AS (
+    SELECT DISTINCT ON (playerid) playerid, idfg
+    FROM lahman_fangraphs_bridge
+    ORDER BY playerid, idfg
+),
+savant_seasons AS (
+    -- savant_pitching_traditional has no innings/outs column; back innings out
+    -- of ERA and earned runs (IP = 9 * ER / ERA), NULL when ERA is 0 or missing.
+    SELECT sb.playerid, s.year AS season, s.team, 'savant' AS source,
+           s.p_game::int AS g, s.p_started::int AS gs, s.p_win::int AS w, s.p_loss::int AS l,
+           s.p_save::int AS sv, s.p_strikeout::int AS so, s.p_walk::int AS bb, s.p_hit::int AS h,
+           s.p_earned_run::int AS er, s.p_home_run::int AS hr,
+           (s.p_earned_run * 9.0)::numeric / NULLIF(r.p_era, 0)::numeric AS ip,
+           r.p_era::numeric AS era
+    FROM savant_pitching_traditional s
+    JOIN savant_bridge sb ON sb.key_mlbam = s.player_id
+    LEFT JOIN savant_pitching_ratios r ON r.player_id = s.player_id AND r.year = s.year
+),
+lahman_teams AS (
+    SELECT playerid, yearid, string_agg(teamid, ' -> ' ORDER BY first_stint) AS team
+    FROM (SELECT playerid, yearid, teamid, MIN(stint) AS first_stint
+          FROM pitching
+          GROUP BY playerid, yearid, teamid) t
+    GROUP BY playerid, yearid
+),
+lahman_seasons AS (
+    SELECT pit.playerid, pit.yearid AS season, tm.team, 'lahman' AS source,
+           SUM(pit.g)::int AS g, SUM(pit.gs)::int AS gs, SUM(pit.w)::int AS w, SUM(pit.l)::int AS l,
+           SUM(pit.sv)::int AS sv, SUM(pit.so)::int AS so, SUM(pit.bb)::int AS bb, SUM(pit.h)::int AS h,
+           SUM(pit.er)::int AS er, SUM(pit.hr)::int AS hr,
+           SUM(pit.ipouts) / 3.0 AS ip,
+           (SUM(pit.er)::numeric * 9) / NULLIF(SUM(pit.ipouts) / 3.0, 0) AS era
+    FROM pitching pit
+    JOIN lahman_teams tm ON tm.playerid = pit.playerid AND tm.yearid = pit.yearid
+    WHERE NOT EXISTS (SELECT 1 FROM savant_pitching_traditional s2 WHERE s2.year = pit.yearid)
+    GROUP BY pit.playerid, pit.yearid, tm.team
+),
+combined AS (
+    SELECT playerid, season, team, source, g, gs, w, l, sv, so, bb, h, er, hr, ip, era FROM savant_seasons
+    UNION ALL
+    SELECT playerid, season, team, source, g, gs, w, l, sv, so, bb, h, er, hr, ip, era FROM lahman_seasons
+)
+SELECT c.playerid, c.season,
+       peo.namefirst || ' ' || peo.namelast AS name,
+       c.team, c.source,
+       c.g, c.gs, c.w, c.l, c.sv, c.so, c.bb, c.h, c.er, c.hr,
+       c.ip, c.era,
+       (c.bb + c.h)::numeric / NULLIF(c.ip, 0) AS whip,
+       fps.fip, fps.xfip, fps.war
+FROM combined c
+JOIN people peo ON peo.playerid = c.playerid
+LEFT JOIN fangraphs_bridge lfb ON lfb.playerid = c.playerid
+LEFT JOIN fangraphs_pitching_by_season fps ON fps.idfg = lfb.idfg AND fps.season = c.season;
+
+CREATE UNIQUE INDEX player_season_pitching_pk ON player_season_pitching (playerid, season);
+CREATE INDEX player_season_pitching_season_idx ON player_season_pitching (season);
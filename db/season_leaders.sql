@@ -0,0 +1,30 @@
+-- db/season_leaders.sql
+--
+-- Precomputed per-season leaderboards for every stat in the fast-path catalog
+-- (nlp/stats_catalog.py, built from template_router.STAT_MAP_*). One row per
+-- (season, domain, stat, player) for the top SEASON_LEADERS_DEPTH ranks, with
+-- exactly the semantics of the leaders_batting_counting /
+-- leaders_pitching_counting templates: Savant for any season it has, Lahman
+-- otherwise (stints pre-summed per team), one row per team via DISTINCT ON,
+-- then the 'TOT' row or the sum of per-team rows per player. `rank` is RANK()
+-- (ties share a rank), so "rank <= N" returns the same rows as the templates'
+-- FETCH FIRST N ROWS WITH TIES.
+--
+-- This file only creates the (empty) table. The rows are written by
+-- etl/derived_tables.py:refresh_season_leaders() -- every season on the first
+-- build (scripts/build_season_leaders.py), the current season after each daily
+-- Savant ETL run, and every season after a Lahman load.
+
+CREATE TABLE IF NOT EXISTS season_leaders (
+    season INT NOT NULL,
+    domain TEXT NOT NULL,       -- 'batting' | 'pitching'
+    stat TEXT NOT NULL,         -- catalog short code: hr, rbi, sb, so, bb, h
+    rank INT NOT NULL,
+    player_id TEXT NOT NULL,    -- Savant player_id (as text) or Lahman playerid
+    player TEXT NOT NULL,       -- "First Last"
+    value NUMERIC NOT NULL,
+    PRIMARY KEY (season, domain, stat, player_id)
+);
+
+-- The fast-path read: WHERE season = ? AND domain = ? AND stat = ? AND rank <= ?
+CREATE INDEX IF NOT EXISTS season_leaders_lookup_idx ON season_leaders (domain, stat, season, rank);
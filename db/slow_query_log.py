@@ -0,0 +1,161 @@
+# db/slow_query_log.py
+#
+# Local slow-query log for streamlit/app.py's run_sql. Any execution slower than
+# DBBALL_SLOW_QUERY_MS (default 3000 ms), and every one that hits the 15 s
+# statement_timeout or errors out, however quickly, is written to a SQLite
+# file (logs/slow_queries.sqlite, override with DBBALL_SLOW_QUERY_DB) with its
+# SQL, bound params, route source (fastpath/template/model), backend, duration
+# and status.
+#
+# A sample of those (DBBALL_SLOW_EXPLAIN_RATE, default 0.25) also gets a plan,
+# captured on a background thread so the user isn't kept waiting:
+# EXPLAIN (ANALYZE, BUFFERS) for queries that finished, plain EXPLAIN for ones
+# that timed out (re-running those with ANALYZE would just time out again).
+#
+# scripts/slow_query_report.py groups the log by plan shape.
+
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DB_PATH = ROOT / "logs" / "slow_queries.sqlite"
+
+SLOW_QUERY_MS = float(os.getenv("DBBALL_SLOW_QUERY_MS", "3000"))
+EXPLAIN_SAMPLE_RATE = float(os.getenv("DBBALL_SLOW_EXPLAIN_RATE", "0.25"))
+EXPLAIN_TIMEOUT_MS = 30000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS slow_queries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    logged_at TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    status TEXT NOT NULL,          -- ok | timeout | error
+    route_source TEXT,             -- fastpath | template:<name> | model | cache
+    backend TEXT,                  -- postgres | local
+    sql TEXT NOT NULL,
+    params TEXT,                   -- JSON
+    sql_fingerprint TEXT NOT NULL, -- literals stripped, see fingerprint_sql()
+    plan_shape TEXT,               -- set once a sampled plan is captured
+    plan_json TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS slow_queries_shape_idx ON slow_queries (plan_shape);
+CREATE INDEX IF NOT EXISTS slow_queries_fingerprint_idx ON slow_queries (sql_fingerprint);
+"""
+
+_lock = threading.Lock()
+
+
+def db_path() -> Path:
+    return Path(os.getenv("DBBALL_SLOW_QUERY_DB") or DEFAULT_DB_PATH)
+
+
+def connect_store(path: Path | None = None):
+    path = path or db_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def fingerprint_sql(sql: str) -> str:
+    """Stable id for "the same query modulo literals": strings/numbers -> ?, whitespace collapsed."""
+    text = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    text = re.sub(r"\b\d+(?:\.\d+)?\b", "?", text)
+    text = re.sub(r"%\(\w+\)s", "?", text)
+    text = re.sub(r"\s+", " ", text).strip().lower()
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+def plan_shape(plan: dict) -> str:
+    """Node types + relations, ignoring costs, row counts and filter values, e.g.
+    'Limit(Sort(HashAggregate(Hash Join(Seq Scan[batting],Hash(Seq Scan[people])))))'."""
+    label = plan.get("Node Type", "?")
+    if plan.get("Relation Name"):
+        label += f"[{plan['Relation Name']}]"
+    if plan.get("Index Name"):
+        label += f"<{plan['Index Name']}>"
+    children = plan.get("Plans") or []
+    if children:
+        label += "(" + ",".join(plan_shape(c) for c in children) + ")"
+    return label
+
+
+def _json_params(params):
+    try:
+        return json.dumps(params or {}, default=str)
+    except Exception:
+        return json.dumps(str(params))
+
+
+def _capture_plan(row_id, sql, params, analyze, pg_connect):
+    """Background: EXPLAIN the statement and attach plan + shape to the logged row."""
+    try:
+        opts = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+        conn = pg_connect()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"SET statement_timeout = {EXPLAIN_TIMEOUT_MS}")
+                # Same params handling as run_sql, so the statement parses identically
+                cur.execute(f"EXPLAIN ({opts}) " + sql.rstrip().rstrip(";"), params or {})
+                doc = cur.fetchone()[0]
+            conn.rollback()  # EXPLAIN ANALYZE executes the statement; never keep anything
+        finally:
+            conn.close()
+        if isinstance(doc, str):
+            doc = json.loads(doc)
+        shape = plan_shape(doc[0]["Plan"])
+        with _lock:
+            store = connect_store()
+            try:
+                store.execute(
+                    "UPDATE slow_queries SET plan_shape = ?, plan_json = ? WHERE id = ?",
+                    (hashlib.sha1(shape.encode()).hexdigest()[:12] + " " + shape, json.dumps(doc), row_id),
+                )
+                store.commit()
+            finally:
+                store.close()
+    except Exception:
+        pass  # plan capture is best-effort; the timing row is already logged
+
+
+def record(sql, params, duration_ms, status="ok", route_source=None, backend=None,
+           error=None, pg_connect=None):
+    """Log one execution if it crossed the threshold or didn't finish (timeouts and
+    errors are always logged). `pg_connect()` -> psycopg2 connection enables plan sampling."""
+    if status == "ok" and duration_ms < SLOW_QUERY_MS:
+        return None
+    try:
+        with _lock:
+            store = connect_store()
+            try:
+                cur = store.execute(
+                    "INSERT INTO slow_queries (logged_at, duration_ms, status, route_source, backend, "
+                    "sql, params, sql_fingerprint, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        datetime.now(timezone.utc).isoformat(timespec="seconds"), round(duration_ms, 1),
+                        status, route_source, backend, sql, _json_params(params),
+                        fingerprint_sql(sql), error,
+                    ),
+                )
+                store.commit()
+                row_id = cur.lastrowid
+            finally:
+                store.close()
+    except Exception:
+        return None  # logging must never break the user's query
+
+    # Plans only come from Postgres; errors other than timeouts have no useful plan
+    if pg_connect is not None and backend != "local" and status in ("ok", "timeout") \
+            and random.random() < EXPLAIN_SAMPLE_RATE:
+        threading.Thread(
+            target=_capture_plan, args=(row_id, sql, params, status == "ok", pg_connect), daemon=True,
+        ).start()
+    return row_id
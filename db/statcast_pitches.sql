@@ -0,0 +1,65 @@
+-- db/statcast_pitches.sql
+--
+-- Pitch-level Statcast (one row per pitch, from pybaseball.statcast), loaded
+-- by etl/statcast_pitches.py. Declaratively partitioned by game_date, one
+-- partition per calendar month (statcast_pitches_YYYY_MM). The loader creates
+-- partitions as it needs them and applies this file itself, so there is no
+-- separate build step.
+--
+-- Indexes are declared on the parent, so every partition gets them:
+--   * BRIN on game_date -- rows arrive in date order, so a few pages of
+--     summary answer "between these dates" for a fraction of a btree's size;
+--   * btree (batter, game_date) and (pitcher, game_date) for one player's pitches.
+-- Date-range queries also prune to the months they cover.
+--
+-- Retention/compaction (etl/statcast_pitches.py, after each load):
+--   * partitions older than STATCAST_KEEP_SEASONS seasons (default 3) are
+--     detached and dropped -- the season aggregates stay in savant_*;
+--   * a month that is past the re-pull window is rewritten once with
+--     VACUUM (FULL, ANALYZE) to shed the dead tuples left by re-pulls, then
+--     marked with a 'compacted' table comment. Loading into it again clears the mark.
+
+CREATE TABLE IF NOT EXISTS statcast_pitches (
+    game_date DATE NOT NULL,
+    game_pk INT NOT NULL,
+    at_bat_number SMALLINT NOT NULL,
+    pitch_number SMALLINT NOT NULL,
+    game_year SMALLINT,
+    home_team TEXT,
+    away_team TEXT,
+    inning SMALLINT,
+    inning_topbot TEXT,
+    outs_when_up SMALLINT,
+    balls SMALLINT,
+    strikes SMALLINT,
+    batter INT NOT NULL,
+    pitcher INT NOT NULL,
+    stand TEXT,
+    p_throws TEXT,
+    pitch_type TEXT,
+    pitch_name TEXT,
+    release_speed REAL,
+    release_spin_rate REAL,
+    release_extension REAL,
+    pfx_x REAL,
+    pfx_z REAL,
+    plate_x REAL,
+    plate_z REAL,
+    zone SMALLINT,
+    type TEXT,                      -- B / S / X
+    description TEXT,
+    events TEXT,
+    bb_type TEXT,
+    launch_speed REAL,
+    launch_angle REAL,
+    hit_distance_sc REAL,
+    estimated_ba_using_speedangle REAL,
+    estimated_woba_using_speedangle REAL,
+    woba_value REAL,
+    delta_run_exp REAL,
+    PRIMARY KEY (game_date, game_pk, at_bat_number, pitch_number)
+) PARTITION BY RANGE (game_date);
+
+CREATE INDEX IF NOT EXISTS statcast_pitches_date_brin ON statcast_pitches USING brin (game_date);
+CREATE INDEX IF NOT EXISTS statcast_pitches_batter_idx ON statcast_pitches (batter, game_date);
+CREATE INDEX IF NOT EXISTS statcast_pitches_pitcher_idx ON statcast_pitches (pitcher, game_date);
@@ -0,0 +1,61 @@
+-- db/statcast_splits.sql
+--
+-- Split cube over pitch-level Statcast (db/statcast_pitches.sql): one row per
+-- player x season x role x batter side x pitcher hand x count x pitch type,
+-- holding additive counts and sums only, so any coarser split (vs LHP, in
+-- two-strike counts, on sliders, ...) is a SUM over its rows and the rate stats
+-- are computed from the sums at query time. nlp/template_router.py answers
+-- handedness / count / pitch-type split questions from here.
+--
+--   role       'batter' (player_id = the hitter) or 'pitcher' (player_id = the pitcher)
+--   stand      batter side for that pitch (L/R -- a switch-hitter has both)
+--   p_throws   pitcher hand (L/R)
+--   balls, strikes  the count the pitch was thrown in; PA outcomes land in the
+--              count of the pitch that ended the PA
+--   pitch_type Statcast pitch code (FF, SL, CH, ...), 'UN' when untagged
+--
+-- Maintained incrementally by etl/statcast_splits.py inside each statcast_pitches
+-- load transaction: the days being replaced are subtracted before their pitches
+-- are deleted and the new pitches are added after the COPY, so only the loaded
+-- days are ever scanned. Sums are NUMERIC so add/subtract is exact. The cube
+-- outlives statcast_pitches retention (STATCAST_KEEP_SEASONS) -- dropped
+-- partitions take nothing out of it.
+--
+-- wOBA / xwOBA denominator = ab + bb + sf + hbp (no IBB, no sacrifice bunts).
+
+CREATE TABLE IF NOT EXISTS statcast_splits (
+    role TEXT NOT NULL,
+    player_id INT NOT NULL,
+    season SMALLINT NOT NULL,
+    stand TEXT NOT NULL,
+    p_throws TEXT NOT NULL,
+    balls SMALLINT NOT NULL,
+    strikes SMALLINT NOT NULL,
+    pitch_type TEXT NOT NULL,
+    pitches INT NOT NULL DEFAULT 0,
+    swings INT NOT NULL DEFAULT 0,
+    whiffs INT NOT NULL DEFAULT 0,
+    called_strikes INT NOT NULL DEFAULT 0,
+    pa INT NOT NULL DEFAULT 0,
+    ab INT NOT NULL DEFAULT 0,
+    h INT NOT NULL DEFAULT 0,
+    doubles INT NOT NULL DEFAULT 0,
+    triples INT NOT NULL DEFAULT 0,
+    hr INT NOT NULL DEFAULT 0,
+    bb INT NOT NULL DEFAULT 0,               -- unintentional walks
+    ibb INT NOT NULL DEFAULT 0,
+    hbp INT NOT NULL DEFAULT 0,
+    sf INT NOT NULL DEFAULT 0,
+    so INT NOT NULL DEFAULT 0,
+    bip INT NOT NULL DEFAULT 0,              -- balls in play (type = 'X')
+    woba_sum NUMERIC NOT NULL DEFAULT 0,
+    xwoba_sum NUMERIC NOT NULL DEFAULT 0,
+    ev_sum NUMERIC NOT NULL DEFAULT 0,       -- launch_speed over tracked balls in play
+    ev_n INT NOT NULL DEFAULT 0,
+    velo_sum NUMERIC NOT NULL DEFAULT 0,     -- release_speed
+    velo_n INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (role, player_id, season, stand, p_throws, balls, strikes, pitch_type)
+);
+
+-- Season-wide split leaderboards ("best wOBA vs LHP in 2025")
+CREATE INDEX IF NOT EXISTS statcast_splits_season_idx ON statcast_splits (season, role);
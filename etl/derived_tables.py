@@ -0,0 +1,171 @@
+# etl/derived_tables.py
+#
+# Refresh logic for tables/views that are derived from the raw Savant, Lahman
+# and FanGraphs tables rather than loaded from a source file. Shared by the
+# daily Savant job (pg8000) and the Lahman loader (psycopg2), so everything
+# here takes a plain `run(sql) -> rows` callable instead of a connection --
+# pass `db.run` for pg8000.native, or `psycopg2_runner(conn)` for psycopg2.
+#
+# The DDL for each derived object lives under db/ and is applied once by hand
+# (see scripts/create_player_season_views.py, scripts/build_season_leaders.py). Refreshing an object that hasn't
+# been created yet is skipped with a note rather than failing the ETL run.
+
+# Materialized views built by db/player_season_views.sql. Each has a unique
+# (playerid, season) index, so they can be refreshed CONCURRENTLY without
+# blocking the app's reads.
+PLAYER_SEASON_VIEWS = ["player_season_batting", "player_season_pitching"]
+
+
+def psycopg2_runner(conn):
+    """Adapt a psycopg2 connection to the run(sql) -> rows interface used here.
+    Switches the connection to autocommit (committing anything pending first) to
+    match pg8000.native, so explicit BEGIN/COMMIT statements behave the same on both."""
+    if not conn.autocommit:
+        conn.commit()
+        conn.autocommit = True
+
+    def run(sql):
+        with conn.cursor() as cur:
+            cur.execute(sql)
+            return cur.fetchall() if cur.description else []
+    return run
+
+
+def run_sql_file(run, path):
+    """Runs a db/*.sql file one statement at a time (pg8000.native won't take several
+    in one call). Statements are split on ';' at the end of a line."""
+    for statement in path.read_text(encoding="utf-8").split(";\n"):
+        if any(line.strip() and not line.strip().startswith("--") for line in statement.splitlines()):
+            run(statement)
+
+
+def existing_matviews(run) -> set:
+    return {row[0] for row in run("SELECT matviewname FROM pg_matviews WHERE schemaname = 'public'")}
+
+
+def refresh_player_season_views(run):
+    existing = existing_matviews(run)
+    for view in PLAYER_SEASON_VIEWS:
+        if view not in existing:
+            print(f" Skipping {view} refresh: view not created yet (see db/player_season_views.sql).")
+            continue
+        print(f" Refreshing {view}...")
+        run(f'REFRESH MATERIALIZED VIEW CONCURRENTLY "{view}";')
+
+
+# ---------------------------------------------------------------------------
+# season_leaders (db/season_leaders.sql) -- precomputed fast-path leaderboards
+# ---------------------------------------------------------------------------
+
+# Ranks kept per (season, domain, stat). The fast-path asks for the top 10;
+# anything deeper than this falls back to the live leaders_* templates.
+SEASON_LEADERS_DEPTH = 50
+
+# Per-domain sources, mirroring leaders_batting_counting/leaders_pitching_counting
+# in nlp/templates/sql_templates.yml (qual/g are only used to pick one row per team).
+_LEADER_SOURCES = {
+    "batting": {
+        "savant_table": "savant_batting_traditional", "lahman_table": "batting",
+        "savant_qual": "b_total_pa", "savant_g": "b_game", "lahman_qual": "ab",
+    },
+    "pitching": {
+        "savant_table": "savant_pitching_traditional", "lahman_table": "pitching",
+        "savant_qual": "p_game", "savant_g": "p_game", "lahman_qual": "ipouts",
+    },
+}
+
+
+def _leader_stats(domain):
+    """[(stat, savant_col, lahman_col)] for the fast-path catalog's stats in this domain.
+    Imported lazily so the Lahman loader doesn't need the nlp package at import time."""
+    from nlp.template_router import STAT_MAP_BATTING, STAT_MAP_PITCHING
+    stat_map = STAT_MAP_PITCHING if domain == "pitching" else STAT_MAP_BATTING
+    return [(cols["lahman"], cols["savant"], cols["lahman"]) for cols in stat_map.values()]
+
+
+def season_leaders_insert_sql(domain, season=None):
+    """INSERT ... SELECT that ranks every catalog stat in `domain` for one season
+    (or every season when season is None). Each stat is unpivoted with a
+    LATERAL VALUES list so all of them come out of a single pass per source table."""
+    src = _LEADER_SOURCES[domain]
+    stats = _leader_stats(domain)
+    savant_values = ", ".join(f"('{stat}', s.{scol}::numeric)" for stat, scol, _ in stats)
+    lahman_sums = ", ".join(f"SUM(l.{lcol}) AS {lcol}" for _, _, lcol in stats)
+    lahman_values = ", ".join(f"('{stat}', l.{lcol}::numeric)" for stat, _, lcol in stats)
+    savant_where = f"WHERE s.year = {int(season)}" if season is not None else ""
+    lahman_where = f"WHERE l.yearid = {int(season)}" if season is not None else ""
+
+    return f"""
+INSERT INTO season_leaders (season, domain, stat, rank, player_id, player, value)
+WITH base AS (
+  SELECT DISTINCT ON (id, season, team, stat) id, season, team, name, stat, value
+  FROM (
+    SELECT s.player_id::text AS id, s.year AS season, s.team AS team,
+           s.display_name AS name,
+           v.stat, v.value, s.{src['savant_qual']} AS qual, s.{src['savant_g']} AS g
+    FROM {src['savant_table']} s
+    CROSS JOIN LATERAL (VALUES {savant_values}) v(stat, value)
+    {savant_where}
+
+    UNION ALL
+
+    SELECT l.playerid AS id, l.yearid AS season, l.teamid AS team,
+           peo.namefirst || ' ' || peo.namelast AS name,
+           v.stat, v.value, l.qual, l.g
+    FROM (
+      SELECT l.playerid, l.yearid, l.teamid, {lahman_sums},
+             SUM(l.{src['lahman_qual']}) AS qual, SUM(l.g) AS g
+      FROM {src['lahman_table']} l
+      {lahman_where}
+      GROUP BY l.playerid, l.yearid, l.teamid
+    ) l
+    JOIN people peo ON peo.playerid = l.playerid
+    CROSS JOIN LATERAL (VALUES {lahman_values}) v(stat, value)
+    WHERE NOT EXISTS (SELECT 1 FROM {src['savant_table']} s2 WHERE s2.year = l.yearid)
+  ) all_stats
+  ORDER BY id, season, team, stat, qual DESC, g DESC, value DESC
+),
+per_player AS (
+  SELECT season, stat, id,
+         MAX(name) AS name,
+         COALESCE(
+           MAX(value) FILTER (WHERE team = 'TOT'),
+           SUM(value) FILTER (WHERE team NOT IN ('TOT','---'))
+         ) AS value
+  FROM base
+  GROUP BY season, stat, id
+),
+ranked AS (
+  SELECT season, stat, id, name, value,
+         RANK() OVER (PARTITION BY season, stat ORDER BY value DESC) AS rank
+  FROM per_player
+  WHERE value IS NOT NULL AND name IS NOT NULL
+)
+SELECT season, '{domain}', stat, rank, id, name, value
+FROM ranked
+WHERE rank <= {SEASON_LEADERS_DEPTH};
+""".strip()
+
+
+def refresh_season_leaders(run, season=None):
+    """Rebuild season_leaders for one season (the daily Savant run) or for every
+    season (season=None; first build and after a Lahman load). The delete and the
+    inserts share one transaction, so the fast-path never sees a half-built season."""
+    exists = run("SELECT 1 FROM information_schema.tables WHERE table_schema = 'public' AND table_name = 'season_leaders'")
+    if not exists:
+        print(" Skipping season_leaders refresh: table not created yet (see db/season_leaders.sql).")
+        return
+
+    scope = f"season {int(season)}" if season is not None else "all seasons"
+    print(f" Refreshing season_leaders ({scope})...")
+    run("BEGIN;")
+    try:
+        run(f"DELETE FROM season_leaders WHERE season = {int(season)};" if season is not None
+            else "DELETE FROM season_leaders;")
+        for domain in _LEADER_SOURCES:
+            run(season_leaders_insert_sql(domain, season))
+        run("COMMIT;")
+    except Exception:
+        run("ROLLBACK;")
+        raise
+    run("ANALYZE season_leaders;")
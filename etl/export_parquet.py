@@ -0,0 +1,147 @@
+# etl/export_parquet.py
+#
+# Exports the core tables from AWS RDS to local Parquet files (data/parquet/)
+# for the optional in-process DuckDB backend (db/local_engine.py). Lahman and
+# the frozen FanGraphs archive are exported whole; tables that carry the live
+# current season (savant_*, the player-season views, season_leaders) are
+# exported for completed seasons only, so the local copy never goes stale
+# mid-season -- anything that needs the current season is routed to Postgres.
+#
+# Writes data/parquet/<table>.parquet plus manifest.json (export time, the
+# current season that was excluded, row counts). Re-run after every
+# etl/load_lahman.py --commit and once after each season's final Savant run.
+#
+# Usage:
+#   .venv/Scripts/python etl/export_parquet.py
+#   .venv/Scripts/python etl/export_parquet.py --only batting,people --out data/parquet
+
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pandas as pd
+import psycopg2
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+load_dotenv(ROOT / ".env.awsrds")
+
+DB_PARAMS = {
+    "dbname": os.environ["AWSDATABASE"],
+    "user": os.environ["AWSUSER"],
+    "password": os.environ["AWSPASSWORD"],
+    "host": os.environ["AWSHOST"],
+    "port": os.environ["AWSPORT"],
+}
+
+OUT_DIR = ROOT / "data" / "parquet"
+CHUNK_ROWS = 100_000
+
+# table -> season column to cut the current season from, or None to export everything
+EXPORT_TABLES = {
+    # Lahman (historical; changes once a year via etl/load_lahman.py)
+    "people": None, "teamsfranchises": None, "teams": None, "parks": None,
+    "batting": None, "pitching": None, "fielding": None, "fieldingof": None,
+    "fieldingofsplit": None, "appearances": None, "managers": None, "allstarfull": None,
+    "battingpost": None, "pitchingpost": None, "fieldingpost": None, "seriespost": None,
+    "homegames": None, "managershalf": None, "teamshalf": None, "awardsmanagers": None,
+    "awardsplayers": None, "awardssharemanagers": None, "awardsshareplayers": None,
+    "halloffame": None, "collegeplaying": None, "schools": None, "salaries": None,
+    # Frozen FanGraphs archive + bridges
+    "fangraphs_batting_advanced": None, "fangraphs_pitching_advanced": None,
+    "fangraphs_batting_by_season": None, "fangraphs_pitching_by_season": None,
+    "lahman_fangraphs_bridge": None, "lahman_savant_bridge": None,
+    # Live tables: completed seasons only (the savant_* group names are views over the two
+    # wide tables; exported under both so local queries can use either)
+    "savant_batting_season": "year", "savant_pitching_season": "year",
+    "savant_batting_traditional": "year", "savant_batting_ratios": "year",
+    "savant_batting_expected": "year", "savant_batting_physics": "year",
+    "savant_batting_discipline": "year", "savant_pitching_traditional": "year",
+    "savant_pitching_ratios": "year", "savant_pitching_expected": "year",
+    "savant_pitching_physics": "year", "savant_pitching_discipline": "year",
+    "player_season_batting": "season", "player_season_pitching": "season",
+    "season_leaders": "season",
+}
+
+
+def export_table(conn, table, season_col, current_season, out_dir):
+    """Streams one table to <out_dir>/<table>.parquet in CHUNK_ROWS batches. Returns row count."""
+    sql = f'SELECT * FROM "{table}"'
+    if season_col:
+        sql += f' WHERE "{season_col}" < {int(current_season)}'
+    tmp_path = out_dir / f"{table}.parquet.tmp"
+    writer, n = None, 0
+    try:
+        for chunk in pd.read_sql_query(sql, conn, chunksize=CHUNK_ROWS):
+            # NUMERIC comes back as Decimal objects; store them as DOUBLE so
+            # DuckDB does float math the way Postgres NUMERIC division would
+            for col in chunk.columns:
+                if chunk[col].dtype == object:
+                    sample = chunk[col].dropna()
+                    if not sample.empty and isinstance(sample.iloc[0], Decimal):
+                        chunk[col] = chunk[col].astype("float64")
+            tbl = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, tbl.schema, compression="zstd")
+            else:
+                tbl = tbl.cast(writer.schema, safe=False)
+            writer.write_table(tbl)
+            n += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        return 0  # empty table -- leave no file; the local engine then routes it to Postgres
+    tmp_path.replace(out_dir / f"{table}.parquet")
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export core tables to Parquet for the local DuckDB backend.")
+    parser.add_argument("--out", default=str(OUT_DIR), help="Output directory (default data/parquet)")
+    parser.add_argument("--only", help="Comma-separated table names to limit this export to (default: all).")
+    args = parser.parse_args()
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    only = set(args.only.split(",")) if args.only else None
+    current_season = date.today().year
+
+    manifest_path = out_dir / "manifest.json"
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {"tables": {}}
+
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        for table, season_col in EXPORT_TABLES.items():
+            if only and table not in only:
+                continue
+            t0 = time.time()
+            try:
+                n = export_table(conn, table, season_col, current_season, out_dir)
+            except Exception as e:
+                conn.rollback()
+                print(f"[skip] {table}: {type(e).__name__}: {e}")
+                manifest["tables"].pop(table, None)
+                continue
+            if n:
+                manifest["tables"][table] = {"rows": n, "season_col": season_col}
+            else:
+                manifest["tables"].pop(table, None)
+            print(f"[{table}] {n} rows ({time.time() - t0:.1f}s)")
+    finally:
+        conn.close()
+
+    manifest["exported_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    manifest["current_season"] = current_season
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    print(f"\nExported {len(manifest['tables'])} tables to {out_dir} (current season {current_season} excluded).")
+
+
+if __name__ == "__main__":
+    main()
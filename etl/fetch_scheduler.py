@@ -0,0 +1,101 @@
+# etl/fetch_scheduler.py
+#
+# Concurrent, rate-limited download scheduler for the Savant ETL. Jobs (e.g.
+# (year, player_type) pairs) run on a bounded thread pool; every HTTP attempt
+# first takes a token from a shared token bucket, so the request rate against
+# Savant stays capped no matter how many workers are running. Failed attempts
+# are retried with jittered exponential backoff. Results are yielded in
+# completion order, so the caller's writer stage (single DB connection, main
+# thread) starts on the first frame while the rest are still downloading.
+#
+# Pure standard library -- the fetch function is passed in, which is what lets
+# tests/run_fetch_scheduler_check.py drive it against a local HTTP stand-in.
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+
+class TokenBucket:
+    """`rate` tokens/sec refill, at most `burst` banked. acquire() blocks until one is available."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Exponential backoff with +/-50% jitter, so retrying workers don't line up."""
+    return min(cap, base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+
+@dataclass
+class FetchResult:
+    job: tuple
+    value: object = None
+    error: Exception = None
+    attempts: int = 0
+    seconds: float = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+@dataclass
+class FetchStats:
+    jobs: int = 0
+    failed: int = 0
+    retries: int = 0
+    wall_seconds: float = 0.0
+    per_job: list = field(default_factory=list)
+
+
+def _run_job(job, fetch, bucket, max_attempts, backoff_base):
+    t0 = time.perf_counter()
+    for attempt in range(1, max_attempts + 1):
+        bucket.acquire()
+        try:
+            return FetchResult(job, fetch(*job), None, attempt, time.perf_counter() - t0)
+        except Exception as e:
+            print(f"  [{'/'.join(map(str, job))}] attempt {attempt}/{max_attempts} failed: {type(e).__name__}: {e}")
+            if attempt == max_attempts:
+                return FetchResult(job, None, e, attempt, time.perf_counter() - t0)
+            time.sleep(backoff_delay(attempt, backoff_base))
+
+
+def run_fetch_jobs(jobs, fetch, workers=4, rate=1.0, burst=2, max_attempts=4, backoff_base=1.0, stats=None):
+    """Yields a FetchResult per job as each one completes. `fetch(*job)` must raise on
+    failure (including a malformed payload) so it gets retried. Fills `stats` if given."""
+    jobs = list(jobs)
+    bucket = TokenBucket(rate, burst)
+    stats = stats if stats is not None else FetchStats()
+    stats.jobs = len(jobs)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs) or 1))) as pool:
+        futures = [pool.submit(_run_job, job, fetch, bucket, max_attempts, backoff_base) for job in jobs]
+        for fut in as_completed(futures):
+            result = fut.result()
+            stats.retries += result.attempts - 1
+            stats.failed += 0 if result.ok else 1
+            stats.per_job.append((result.job, result.attempts, round(result.seconds, 2), result.ok))
+            stats.wall_seconds = time.perf_counter() - t0
+            yield result
+    stats.wall_seconds = time.perf_counter() - t0
@@ -0,0 +1,189 @@
+# etl/game_logs.py
+#
+# Maintains batting_game_logs, batting_rolling and batting_streaks
+# (db/game_logs.sql) from statcast_pitches. load_pitches() in
+# etl/statcast_pitches.py calls apply_days() inside its load transaction, after
+# the new pitches are COPYed in:
+#   - the loaded days' game logs are replaced (one GROUP BY over those days'
+#     pitches, with the same PA-outcome expressions as the split cube);
+#   - hitting streaks are recomputed for the players who appear on those days,
+#     over their season's logs (at most a few hundred rows each);
+#   - the 7/15/30-day rolling windows are recomputed for the touched seasons
+#     from the last 30 days of logs.
+#
+# rebuild_game_logs() recomputes whole seasons from statcast_pitches -- for
+# seasons loaded before the tables existed. Seasons whose partitions were
+# already dropped by retention are left alone.
+#
+# Usage (rebuild is also reachable as etl/statcast_pitches.py --rebuild-game-logs):
+#   .venv/Scripts/python etl/game_logs.py --seasons 2024 2025
+
+import argparse
+import socket
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import pg8000.native
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from etl.derived_tables import run_sql_file
+from etl.statcast_splits import MEASURES
+
+WINDOWS = (7, 15, 30)
+LOG_COUNTS = ["pa", "ab", "h", "doubles", "triples", "hr", "bb", "ibb", "hbp", "sf", "so"]
+ROLLING_COUNTS = ["pa", "ab", "h", "doubles", "triples", "hr", "bb", "hbp", "sf", "so"]
+
+
+def _insert_logs(db, where: str, **params) -> int:
+    """Game logs for the pitches matching `where` (already deleted by the caller)."""
+    exprs = dict(MEASURES)
+    exprs["bb"] = f"{MEASURES['bb']} + {MEASURES['ibb']}"
+    counts = ",\n       ".join(exprs[c] for c in LOG_COUNTS)
+    db.run(f"""
+INSERT INTO batting_game_logs (player_id, game_date, game_pk, season, team, opponent, home, {", ".join(LOG_COUNTS)})
+SELECT p.batter, p.game_date, p.game_pk, EXTRACT(YEAR FROM p.game_date)::smallint,
+       MIN(CASE WHEN p.inning_topbot = 'Top' THEN p.away_team ELSE p.home_team END),
+       MIN(CASE WHEN p.inning_topbot = 'Top' THEN p.home_team ELSE p.away_team END),
+       BOOL_AND(p.inning_topbot = 'Bot'),
+       {counts}
+FROM statcast_pitches p
+WHERE {where}
+GROUP BY p.batter, p.game_date, p.game_pk
+HAVING {MEASURES['pa']} > 0""", **params)
+    return db.row_count
+
+
+def refresh_streaks(db, seasons, players=None) -> int:
+    """Recomputes hitting streaks for `seasons` (all players, or only `players`). Returns streak rows."""
+    player_filter = "" if players is None else " AND player_id = ANY(CAST(:players AS int[]))"
+    params = {"seasons": sorted(seasons)}
+    if players is not None:
+        params["players"] = sorted(players)
+    db.run(f"DELETE FROM batting_streaks WHERE season = ANY(CAST(:seasons AS smallint[])){player_filter}", **params)
+    db.run(f"""
+INSERT INTO batting_streaks (player_id, season, start_date, end_date, games, active)
+WITH games AS (
+    -- Games with no official AB and no sacrifice fly don't count either way
+    SELECT player_id, season, game_date, game_pk, h > 0 AS hit
+    FROM batting_game_logs
+    WHERE season = ANY(CAST(:seasons AS smallint[])){player_filter} AND (ab > 0 OR sf > 0)
+),
+islands AS (
+    SELECT *,
+           ROW_NUMBER() OVER (PARTITION BY player_id, season ORDER BY game_date, game_pk)
+           - ROW_NUMBER() OVER (PARTITION BY player_id, season, hit ORDER BY game_date, game_pk) AS grp,
+           MAX(game_date) OVER (PARTITION BY player_id, season) AS last_game
+    FROM games
+)
+SELECT player_id, season, MIN(game_date), MAX(game_date), COUNT(*), MAX(game_date) = MAX(last_game)
+FROM islands
+WHERE hit
+GROUP BY player_id, season, grp""", **params)
+    return db.row_count
+
+
+def refresh_rolling(db, seasons) -> int:
+    """Recomputes the rolling windows of `seasons`, ending at each season's last logged game date."""
+    sums = ", ".join(f"SUM(g.{c})" for c in ROLLING_COUNTS)
+    touched = 0
+    for season in sorted(seasons):
+        db.run("DELETE FROM batting_rolling WHERE season = :season", season=season)
+        db.run(f"""
+INSERT INTO batting_rolling (season, window_days, player_id, as_of, games, {", ".join(ROLLING_COUNTS)},
+                             avg, obp, slg, ops)
+WITH bounds AS (
+    SELECT MAX(game_date) AS as_of FROM batting_game_logs WHERE season = :season
+),
+totals AS (
+    SELECT w.window_days, g.player_id, b.as_of, COUNT(*) AS games, {sums}
+    FROM bounds b
+    JOIN batting_game_logs g ON g.game_date > b.as_of - {max(WINDOWS)} AND g.game_date <= b.as_of
+    CROSS JOIN (VALUES {", ".join(f"({w})" for w in WINDOWS)}) AS w(window_days)
+    WHERE g.season = :season AND g.game_date > b.as_of - w.window_days
+    GROUP BY w.window_days, g.player_id, b.as_of
+),
+rates AS (
+    SELECT t.*,
+           ROUND(h::numeric / NULLIF(ab, 0), 3) AS avg,
+           ROUND((h + bb + hbp)::numeric / NULLIF(ab + bb + hbp + sf, 0), 3) AS obp,
+           ROUND((h + doubles + 2 * triples + 3 * hr)::numeric / NULLIF(ab, 0), 3) AS slg
+    FROM totals t
+)
+SELECT :season, window_days, player_id, as_of, games, {", ".join(ROLLING_COUNTS)}, avg, obp, slg, obp + slg
+FROM rates""", season=season)
+        touched += db.row_count
+    return touched
+
+
+def apply_days(db, days) -> dict:
+    """Replaces the game logs of `days` from the pitches now stored for them and refreshes
+    the streaks and rolling windows that depend on them. Runs inside the caller's transaction."""
+    if not days:
+        return {}
+    params = {"days": [d.isoformat() for d in sorted(days)]}
+    seasons = sorted({d.year for d in days})
+    # Players whose logs go away on a re-pull need their streaks recomputed too
+    players = {r[0] for r in db.run(
+        "SELECT DISTINCT player_id FROM batting_game_logs WHERE game_date = ANY(CAST(:days AS date[]))", **params)}
+    db.run("DELETE FROM batting_game_logs WHERE game_date = ANY(CAST(:days AS date[]))", **params)
+    logs = _insert_logs(db, "p.game_date = ANY(CAST(:days AS date[]))", **params)
+    players |= {r[0] for r in db.run(
+        "SELECT DISTINCT player_id FROM batting_game_logs WHERE game_date = ANY(CAST(:days AS date[]))", **params)}
+    return {"batting_game_logs": logs,
+            "batting_streaks": refresh_streaks(db, seasons, players) if players else 0,
+            "batting_rolling": refresh_rolling(db, seasons)}
+
+
+def rebuild_game_logs(db, seasons) -> dict:
+    """Recomputes each season from statcast_pitches in its own transaction.
+    Returns season -> game log rows; seasons with no stored pitches are skipped."""
+    run_sql_file(db.run, ROOT / "db" / "game_logs.sql")
+    out = {}
+    for season in sorted(seasons):
+        bounds = {"lo": date(season, 1, 1).isoformat(), "hi": date(season + 1, 1, 1).isoformat()}
+        if not db.run("SELECT 1 FROM statcast_pitches WHERE game_date >= CAST(:lo AS date) "
+                      "AND game_date < CAST(:hi AS date) LIMIT 1", **bounds):
+            print(f" batting_game_logs {season}: no pitches stored (never loaded, or dropped by retention); skipped.")
+            continue
+        t0 = time.perf_counter()
+        try:
+            db.run("BEGIN;")
+            db.run("DELETE FROM batting_game_logs WHERE season = :season", season=season)
+            out[season] = _insert_logs(db, "p.game_date >= CAST(:lo AS date) AND p.game_date < CAST(:hi AS date)",
+                                       **bounds)
+            streaks = refresh_streaks(db, [season])
+            refresh_rolling(db, [season])
+            db.run("COMMIT;")
+        except Exception:
+            db.run("ROLLBACK;")
+            raise
+        print(f" batting_game_logs {season}: rebuilt {out[season]:,} game logs, {streaks:,} streaks "
+              f"in {time.perf_counter() - t0:.1f}s.")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild batting game logs, streaks and rolling windows.")
+    parser.add_argument("--seasons", type=int, nargs="+", required=True)
+    args = parser.parse_args()
+
+    from etl.update_savant_awsrds import DB_CONFIG
+    cfg = dict(DB_CONFIG)
+    try:
+        cfg["host"] = socket.gethostbyname(cfg["host"])
+    except Exception as e:
+        print(f"Warning: could not resolve IPv4 for host: {e}")
+    db = pg8000.native.Connection(**cfg, timeout=60)
+    try:
+        rebuild_game_logs(db, args.seasons)
+        for table in ("batting_game_logs", "batting_rolling", "batting_streaks"):
+            db.run(f"ANALYZE {table}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,14 +7,28 @@
 # already present are inserted. Pure dimension tables with no season concept
 # (schools, parks, teamsfranchises) are intentionally not touched here.
 #
-# Defaults to --dry-run (report what WOULD be inserted, write nothing).
-# Pass --commit to actually write to the database.
+# CSVs are streamed, never held in memory: rows are filtered by season as
+# they're read and COPYed into a temp staging table, then inserted with one
+# INSERT ... SELECT (for `people`, an anti-join against existing playerids).
+# `people` loads first and is committed, since the other tables' playerid
+# foreign keys need the new players; the year-keyed tables then load in
+# parallel on separate connections (--workers), and the run ends with a
+# per-table throughput summary.
+#
+# Defaults to --dry-run (runs the same COPY/INSERT, then rolls back -- nothing
+# is written). A dry run loads everything on one connection, one table after
+# another inside a single transaction, so the year-keyed tables see the
+# uncommitted new players; each table rolls back to its own savepoint. Pass
+# --commit to actually write to the database.
 
 import argparse
 import csv
+import io
 import logging
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -24,6 +38,11 @@ from dotenv import load_dotenv
 ROOT = Path(__file__).resolve().parents[1]
 load_dotenv(ROOT / ".env.awsrds")
 
+sys.path.insert(0, str(ROOT))
+from etl.derived_tables import psycopg2_runner
+from etl.publish import publish
+from etl.run_metrics import RunMetrics
+
 DB_PARAMS = {
     "dbname": os.environ["AWSDATABASE"],
     "user": os.environ["AWSUSER"],
@@ -32,7 +51,7 @@ DB_PARAMS = {
     "port": os.environ["AWSPORT"],
 }
 
-CSV_DIR = ROOT / "data" / "lahman_raw"
+CSV_DIR = Path(os.getenv("LAHMAN_CSV_DIR") or ROOT / "data" / "lahman_raw")
 LOG_DIR = ROOT / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 
@@ -80,114 +99,214 @@ def get_table_columns(cur, table_name):
     return {r[0] for r in cur.fetchall()}
 
 
-def read_csv_rows(csv_path):
+def read_csv_header(csv_path):
     # utf-8-sig strips a BOM if present (Teams.csv/People.csv have one);
     # a no-op if absent (Batting.csv does not).
     with open(csv_path, newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        rows = [{k.strip().lower(): v for k, v in row.items()} for row in reader]
-    return rows
+        return [c.strip().lower() for c in next(csv.reader(f), [])]
 
 
-def insert_rows(cur, table_name, columns, rows, commit: bool):
-    if not rows:
-        return 0
+def iter_csv_rows(csv_path, keep=None):
+    """Streams the CSV's data rows as lists (header skipped), one at a time.
+    `keep(row) -> bool` filters on the fly."""
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if keep is None or keep(row):
+                yield row
+
+
+class CopyStream:
+    """File-like read() over selected columns of a row iterator, CSV-encoded for
+    COPY ... FROM STDIN, so rows go from the file to the server without ever
+    being held as a list. Counts rows as they're read."""
+
+    def __init__(self, rows, col_idx):
+        self.rows = rows
+        self.col_idx = col_idx
+        self.count = 0
+        self._buf = io.StringIO()
+        self._writer = csv.writer(self._buf, lineterminator="\n")
+        self._pending = ""
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self._writer.writerow([row[i] if i < len(row) else "" for i in self.col_idx])
+            self.count += 1
+            if self._buf.tell() >= 64 * 1024:
+                self._pending += self._buf.getvalue()
+                self._buf.seek(0)
+                self._buf.truncate()
+        self._pending += self._buf.getvalue()
+        self._buf.seek(0)
+        self._buf.truncate()
+        if size < 0:
+            out, self._pending = self._pending, ""
+        else:
+            out, self._pending = self._pending[:size], self._pending[size:]
+        return out
+
+
+def copy_into_stage(cur, table_name, columns, stream):
+    """COPYs the stream into a temp copy of table_name (same column types), dropped at commit/rollback.
+    Empty CSV fields load as NULL, same as the old `row.get(c) or None`."""
+    stage = f"_stage_{table_name}"
+    cur.execute(f'CREATE TEMP TABLE "{stage}" (LIKE {table_name}) ON COMMIT DROP')
     col_list = ", ".join(f'"{c}"' for c in columns)
-    placeholders = ", ".join(["%s"] * len(columns))
-    sql = f'INSERT INTO {table_name} ({col_list}) VALUES ({placeholders})'
-    values = [
-        tuple((row.get(c) or None) for c in columns)
-        for row in rows
-    ]
-    if commit:
-        cur.executemany(sql, values)
-    return len(values)
+    cur.copy_expert(f"""COPY "{stage}" ({col_list}) FROM STDIN WITH (FORMAT csv, NULL '')""", stream)
+    return stage
+
+
+SAVEPOINT = "lahman_table"
+
 
+def undo(conn, savepoint: bool):
+    """Rolls back this table's work: to its savepoint when the dry run's earlier rows
+    (the new people) must survive it, else the whole transaction."""
+    if savepoint:
+        with conn.cursor() as cur:
+            cur.execute(f"ROLLBACK TO SAVEPOINT {SAVEPOINT}")
+    else:
+        conn.rollback()
 
-def load_year_keyed_table(conn, table_name, csv_filename, year_col, commit: bool):
+
+def finish(conn, table_name, n, commit: bool, what="rows", savepoint=False, keep=False):
+    if commit:
+        conn.commit()
+        print(f"  -> inserted {n} {what} into {table_name}")
+    else:
+        # keep: left in the open transaction for the tables after it, rolled back at the end
+        if not keep:
+            undo(conn, savepoint)
+        print(f"  -> DRY RUN: would insert {n} {what} into {table_name} (nothing written)")
+
+
+def load_year_keyed_table(conn, table_name, csv_filename, year_col, commit: bool, savepoint=False):
+    """Streams the CSV, keeping rows for seasons past the table's MAX(year), COPYs
+    them into staging and inserts from there. Returns a per-table stats dict.
+    savepoint: run inside the caller's transaction and undo only this table's work."""
+    stats = {"table": table_name, "scanned": 0, "inserted": 0, "seconds": 0.0, "error": None, "seasons": set()}
     csv_path = CSV_DIR / csv_filename
     if not csv_path.exists():
         print(f"[skip] {table_name}: {csv_filename} not found")
-        return
+        return stats
 
+    t0 = time.perf_counter()
     with conn.cursor() as cur:
+        if savepoint:
+            cur.execute(f"SAVEPOINT {SAVEPOINT}")
         db_columns = get_table_columns(cur, table_name)
         cur.execute(f'SELECT COALESCE(MAX("{year_col}"), 0) FROM {table_name}')
         max_year_in_db = cur.fetchone()[0]
 
-    rows = read_csv_rows(csv_path)
-    if not rows:
+    header = read_csv_header(csv_path)
+    if not header:
         print(f"[skip] {table_name}: CSV is empty")
-        return
+        return stats
 
     # CSV column names -> only the ones that actually exist on the table
     # (drops stray columns like People.csv's leading "id" that don't map
     # to anything real, instead of assuming every CSV column is valid).
-    csv_columns = [c for c in rows[0].keys() if c in db_columns]
-    dropped = [c for c in rows[0].keys() if c not in db_columns]
-
-    new_rows = [r for r in rows if int(r.get(year_col) or -1) > max_year_in_db]
-
-    print(f"[{table_name}] DB max {year_col}={max_year_in_db} | CSV rows={len(rows)} | "
-          f"new rows to insert={len(new_rows)} | columns used={len(csv_columns)}"
-          + (f" | dropped unmatched CSV columns: {dropped}" if dropped else ""))
+    csv_columns = [c for c in header if c in db_columns]
+    dropped = [c for c in header if c not in db_columns]
+    col_idx = [header.index(c) for c in csv_columns]
+    year_idx = header.index(year_col)
+
+    def keep(row):
+        stats["scanned"] += 1
+        year = int((row[year_idx] if year_idx < len(row) else "") or -1)
+        if year > max_year_in_db:
+            stats["seasons"].add(year)
+            return True
+        return False
 
-    if not new_rows:
-        return
-
-    with conn.cursor() as cur:
-        try:
-            n = insert_rows(cur, table_name, csv_columns, new_rows, commit)
-            if commit:
-                conn.commit()
-                print(f"  -> inserted {n} rows into {table_name}")
-            else:
-                conn.rollback()
-                print(f"  -> DRY RUN: would insert {n} rows (nothing written)")
-        except Exception as e:
-            conn.rollback()
-            msg = f"{table_name}: insert failed: {e}"
-            print("  -> ERROR:", msg)
-            logging.error(msg)
-
-
-def load_people(conn, commit: bool):
+    try:
+        with conn.cursor() as cur:
+            stream = CopyStream(iter_csv_rows(csv_path, keep), col_idx)
+            stage = copy_into_stage(cur, table_name, csv_columns, stream)
+            col_list = ", ".join(f'"{c}"' for c in csv_columns)
+            cur.execute(f'INSERT INTO {table_name} ({col_list}) SELECT {col_list} FROM "{stage}"')
+            stats["inserted"] = cur.rowcount
+        print(f"[{table_name}] DB max {year_col}={max_year_in_db} | CSV rows={stats['scanned']} | "
+              f"new rows to insert={stream.count} | columns used={len(csv_columns)}"
+              + (f" | dropped unmatched CSV columns: {dropped}" if dropped else ""))
+        finish(conn, table_name, stats["inserted"], commit, savepoint=savepoint)
+    except Exception as e:
+        undo(conn, savepoint)
+        stats["error"] = msg = f"{table_name}: insert failed: {e}"
+        print("  -> ERROR:", msg)
+        logging.error(msg)
+    stats["seconds"] = time.perf_counter() - t0
+    return stats
+
+
+def load_people(conn, commit: bool, keep=False):
+    """COPYs all of People.csv into staging and inserts only playerids the table
+    doesn't have yet, as one anti-join in the database. keep: a dry run leaves the
+    rows in the open transaction so the year-keyed tables after it pass their FKs."""
+    stats = {"table": "people", "scanned": 0, "inserted": 0, "seconds": 0.0, "error": None}
     csv_path = CSV_DIR / "People.csv"
     if not csv_path.exists():
         print("[skip] people: People.csv not found")
-        return
+        return stats
 
+    t0 = time.perf_counter()
     with conn.cursor() as cur:
         db_columns = get_table_columns(cur, "people")
-        cur.execute("SELECT playerid FROM people")
-        existing_ids = {r[0] for r in cur.fetchall()}
+        cur.execute("SELECT COUNT(*) FROM people")
+        existing = cur.fetchone()[0]
 
-    rows = read_csv_rows(csv_path)
-    csv_columns = [c for c in rows[0].keys() if c in db_columns]
-    dropped = [c for c in rows[0].keys() if c not in db_columns]
-    new_rows = [r for r in rows if r.get("playerid") and r["playerid"] not in existing_ids]
+    header = read_csv_header(csv_path)
+    csv_columns = [c for c in header if c in db_columns]
+    dropped = [c for c in header if c not in db_columns]
+    col_idx = [header.index(c) for c in csv_columns]
 
-    print(f"[people] existing={len(existing_ids)} | CSV rows={len(rows)} | "
-          f"new players to insert={len(new_rows)} | columns used={len(csv_columns)}"
-          + (f" | dropped unmatched CSV columns: {dropped}" if dropped else ""))
+    try:
+        with conn.cursor() as cur:
+            stream = CopyStream(iter_csv_rows(csv_path), col_idx)
+            stage = copy_into_stage(cur, "people", csv_columns, stream)
+            col_list = ", ".join(f'"{c}"' for c in csv_columns)
+            cur.execute(
+                f'INSERT INTO people ({col_list}) SELECT DISTINCT ON (s.playerid) {col_list} FROM "{stage}" s '
+                f'WHERE s.playerid IS NOT NULL '
+                f'AND NOT EXISTS (SELECT 1 FROM people p WHERE p.playerid = s.playerid)'
+            )
+            stats["scanned"], stats["inserted"] = stream.count, cur.rowcount
+        print(f"[people] existing={existing} | CSV rows={stats['scanned']} | "
+              f"new players to insert={stats['inserted']} | columns used={len(csv_columns)}"
+              + (f" | dropped unmatched CSV columns: {dropped}" if dropped else ""))
+        finish(conn, "people", stats["inserted"], commit, what="new players", keep=keep)
+    except Exception as e:
+        conn.rollback()
+        stats["error"] = msg = f"people: insert failed: {e}"
+        print("  -> ERROR:", msg)
+        logging.error(msg)
+    stats["seconds"] = time.perf_counter() - t0
+    return stats
+
+
+def run_on_own_connection(load, *args):
+    """psycopg2 connections aren't safe to share across threads; each table gets its own."""
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        return load(conn, *args)
+    finally:
+        conn.close()
 
-    if not new_rows:
-        return
 
-    with conn.cursor() as cur:
-        try:
-            n = insert_rows(cur, "people", csv_columns, new_rows, commit)
-            if commit:
-                conn.commit()
-                print(f"  -> inserted {n} new players into people")
-            else:
-                conn.rollback()
-                print(f"  -> DRY RUN: would insert {n} new players (nothing written)")
-        except Exception as e:
-            conn.rollback()
-            msg = f"people: insert failed: {e}"
-            print("  -> ERROR:", msg)
-            logging.error(msg)
+def print_throughput(results, wall):
+    print(f"\n{'table':22s} {'scanned':>9s} {'inserted':>9s} {'secs':>7s} {'rows/s':>9s}")
+    for r in results:
+        rate = r["scanned"] / r["seconds"] if r["seconds"] else 0
+        print(f"{r['table']:22s} {r['scanned']:>9d} {r['inserted']:>9d} {r['seconds']:>7.2f} {rate:>9,.0f}"
+              + ("  ERROR" if r["error"] else ""))
+    total = sum(r["scanned"] for r in results)
+    print(f"{'total':22s} {total:>9d} {sum(r['inserted'] for r in results):>9d} {wall:>7.2f} "
+          f"{total / wall if wall else 0:>9,.0f}  (wall)")
 
 
 def main():
@@ -195,21 +314,63 @@ def main():
     parser.add_argument("--commit", action="store_true",
                          help="Actually write to the database. Without this flag, runs as a dry run (no writes).")
     parser.add_argument("--only", help="Comma-separated table names to limit this run to (default: all).")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Tables loaded in parallel, one connection each (default %(default)s).")
     args = parser.parse_args()
 
     commit = args.commit
     only = set(args.only.split(",")) if args.only else None
 
     print(f"Mode: {'COMMIT (writing to AWS RDS)' if commit else 'DRY RUN (no writes)'}")
-    conn = psycopg2.connect(**DB_PARAMS)
+    with_people = not only or "people" in only
+    tables = [(table_name, csv_filename, year_col)
+              for table_name, (csv_filename, year_col) in YEAR_KEYED_TABLES.items()
+              if not only or table_name in only]
+    metrics = RunMetrics("lahman_load")
+    status = "ok" if commit else "dry_run"
     try:
-        load_people(conn, commit)
-        for table_name, (csv_filename, year_col) in YEAR_KEYED_TABLES.items():
-            if only and table_name not in only:
-                continue
-            load_year_keyed_table(conn, table_name, csv_filename, year_col, commit)
+        t0 = time.perf_counter()
+        results = []
+        if commit or not with_people:
+            # people first and committed: the year-keyed tables' playerid FKs need the new players
+            if with_people:
+                results.append(run_on_own_connection(load_people, commit))
+            with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+                results += list(pool.map(lambda t: run_on_own_connection(load_year_keyed_table, *t, commit), tables))
+        else:
+            # Dry run: nothing is committed, so the new people are only visible in their own
+            # transaction -- load everything there, one table at a time, then roll it all back
+            conn = psycopg2.connect(**DB_PARAMS)
+            try:
+                results.append(load_people(conn, commit, keep=True))
+                for t in tables:
+                    results.append(load_year_keyed_table(conn, *t, commit, savepoint=True))
+                conn.rollback()
+            finally:
+                conn.close()
+        print_throughput(results, time.perf_counter() - t0)
+        for r in results:
+            # Scan and COPY are one pipelined pass, so the table's time covers both
+            metrics.table(r["table"], r["seconds"], inserted=r["inserted"])
+            metrics.count("csv_rows_scanned", r["scanned"])
+            if r["error"]:
+                metrics.count("table_errors")
+                status = "partial"
+
+        if commit:
+            # ANALYZE what was loaded, refresh what reads from it, bump data_versions
+            touched = {r["table"]: {"rows": r["inserted"], "seasons": r.get("seasons")}
+                       for r in results if not r["error"]}
+            conn = psycopg2.connect(**DB_PARAMS)
+            try:
+                publish(psycopg2_runner(conn), touched, "lahman_load", metrics)
+            finally:
+                conn.close()
+    except Exception:
+        status = "failed"
+        raise
     finally:
-        conn.close()
+        metrics.finish(status)
     print(f"\nDone. Log: {log_path}")
 
 
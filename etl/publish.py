@@ -0,0 +1,132 @@
+# etl/publish.py
+#
+# Post-load publish stage shared by the daily Savant job, the Savant history
+# backfill (scripts/backfill_savant_statcast_history.py) and the Lahman loader.
+# Given the tables a run touched (rows written, seasons), it:
+#   1. VACUUM ANALYZEs a touched table whose dead-tuple count crossed the bloat
+#      thresholds below, and plain ANALYZEs the rest, so the planner sees the
+#      new season's rows the same day instead of whenever autovacuum gets to it;
+#   2. refreshes the derived objects that read from them (the player-season
+#      materialized views CONCURRENTLY, season_leaders for the touched seasons)
+#      -- skipped entirely when the run wrote nothing;
+#   3. bumps one row per changed table in data_versions (db/data_versions.sql),
+#      which downstream caches poll instead of the data tables.
+#
+# Same run(sql) -> rows interface as etl/derived_tables.py: `db.run` for
+# pg8000.native, `psycopg2_runner(conn)` for psycopg2 (both autocommit, which
+# VACUUM requires).
+
+import os
+from pathlib import Path
+
+from etl.derived_tables import (
+    PLAYER_SEASON_VIEWS,
+    existing_matviews,
+    refresh_player_season_views,
+    refresh_season_leaders,
+)
+from etl.savant_season import COMPAT_VIEWS
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# VACUUM when dead tuples exceed both the absolute floor and this share of live ones
+VACUUM_MIN_DEAD = int(os.getenv("ETL_VACUUM_MIN_DEAD", "10000"))
+VACUUM_DEAD_RATIO = float(os.getenv("ETL_VACUUM_DEAD_RATIO", "0.2"))
+
+# Raw tables each derived object reads (db/player_season_views.sql, db/season_leaders.sql);
+# the savant_* names they use are views over the wide savant_*_season tables
+_VIEW_SOURCES = {
+    "savant_batting_season", "savant_pitching_season", "batting", "pitching", "people", "lahman_savant_bridge",
+}
+_LEADER_SOURCES = {"savant_batting_season", "savant_pitching_season", "batting", "pitching", "people"}
+
+
+def _sql_text_list(names):
+    return ", ".join("'" + n.replace("'", "''") + "'" for n in names)
+
+
+def dead_tuples(run, tables) -> dict:
+    """table -> (n_live_tup, n_dead_tup) from pg_stat_user_tables."""
+    if not tables:
+        return {}
+    rows = run(f"SELECT relname, n_live_tup, n_dead_tup FROM pg_stat_user_tables "
+               f"WHERE schemaname = 'public' AND relname IN ({_sql_text_list(tables)})")
+    return {r[0]: (r[1], r[2]) for r in rows}
+
+
+def analyze_or_vacuum(run, tables) -> dict:
+    """ANALYZE each table, or VACUUM (ANALYZE) it when bloat crosses the thresholds.
+    Returns table -> 'vacuum' | 'analyze'."""
+    done = {}
+    stats = dead_tuples(run, tables)
+    for table in tables:
+        live, dead = stats.get(table, (0, 0))
+        if dead >= VACUUM_MIN_DEAD and dead > VACUUM_DEAD_RATIO * max(live, 1):
+            print(f" VACUUM (ANALYZE) {table}: {dead} dead / {live} live tuples")
+            run(f'VACUUM (ANALYZE) "{table}";')
+            done[table] = "vacuum"
+        else:
+            run(f'ANALYZE "{table}";')
+            done[table] = "analyze"
+    return done
+
+
+def bump_versions(run, changes: dict, source: str):
+    """Upserts data_versions rows. changes: table -> {"seasons": [..] | None, "rows": int | None}."""
+    run((ROOT / "db" / "data_versions.sql").read_text(encoding="utf-8"))
+    for table, c in changes.items():
+        seasons = sorted({int(s) for s in c.get("seasons") or []})
+        seasons_sql = f"ARRAY[{', '.join(map(str, seasons))}]::int[]" if seasons else "NULL"
+        rows_sql = "NULL" if c.get("rows") is None else str(int(c["rows"]))
+        run(f"""
+            INSERT INTO data_versions (table_name, version, seasons, rows_written, source, updated_at)
+            VALUES ({_sql_text_list([table])}, 1, {seasons_sql}, {rows_sql}, {_sql_text_list([source])}, now())
+            ON CONFLICT (table_name) DO UPDATE SET
+                version = data_versions.version + 1,
+                seasons = EXCLUDED.seasons, rows_written = EXCLUDED.rows_written,
+                source = EXCLUDED.source, updated_at = EXCLUDED.updated_at;
+        """)
+
+
+def publish(run, touched: dict, source: str, metrics=None) -> dict:
+    """touched: table -> {"rows": rows written, "seasons": seasons written or None}.
+    Tables with rows == 0 were checked but unchanged: not analyzed, refreshed or versioned."""
+    changed = {t: c for t, c in touched.items() if c.get("rows")}
+    if not changed:
+        print(" Publish: no table changed; skipping ANALYZE, refreshes and version bump.")
+        return {}
+
+    def timed(name, fn, *args, **kwargs):
+        if metrics is None:
+            return fn(*args, **kwargs)
+        with metrics.stage(name):
+            return fn(*args, **kwargs)
+
+    maintenance = timed("publish_analyze", analyze_or_vacuum, run, list(changed))
+    if metrics is not None:
+        metrics.count("vacuumed_tables", sum(1 for v in maintenance.values() if v == "vacuum"))
+
+    seasons = sorted({s for c in changed.values() for s in (c.get("seasons") or [])})
+    versions = dict(changed)
+    # Caches keyed on the old savant_* table names see the wide table's version
+    for table in set(COMPAT_VIEWS) & set(changed):
+        for view in COMPAT_VIEWS[table]:
+            versions[view] = changed[table]
+    if _VIEW_SOURCES & set(changed):
+        timed("publish_refresh_views", refresh_player_season_views, run)
+        for view in set(PLAYER_SEASON_VIEWS) & existing_matviews(run):
+            run(f'ANALYZE "{view}";')
+            versions[view] = {"seasons": seasons, "rows": None}
+    if _LEADER_SOURCES & set(changed):
+        # One season -> rebuild just that season; several (a Lahman load) -> all seasons
+        leader_season = seasons[0] if len(seasons) == 1 else None
+        timed("publish_refresh_leaders", refresh_season_leaders, run, season=leader_season)
+        if run("SELECT 1 FROM information_schema.tables WHERE table_schema = 'public' AND table_name = 'season_leaders'"):
+            versions["season_leaders"] = {"seasons": seasons, "rows": None}
+
+    timed("publish_versions", bump_versions, run, versions, source)
+    print(f" Publish: {len(changed)} changed table(s) analyzed "
+          f"({sum(1 for v in maintenance.values() if v == 'vacuum')} vacuumed), "
+          f"{len(versions)} data_versions row(s) bumped.")
+    return versions
+
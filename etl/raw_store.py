@@ -0,0 +1,116 @@
+# etl/raw_store.py
+#
+# Local raw landing zone for downloaded source files (Savant leaderboard CSVs,
+# the Chadwick register). Every fetched payload is kept gzip-compressed under
+# data/raw/<source>/<key>/ with an entry in data/raw/<source>/manifest.jsonl
+# recording fetch time, URL, SHA-256 and size. A fetch whose content hash
+# matches the previous one for the same key is recorded in the manifest but
+# not written again, so a season that didn't change between daily runs costs
+# one manifest line.
+#
+# The transform/load stages can replay from here instead of the network
+# (update_savant_awsrds.py with SAVANT_REPLAY set, the backfill's --replay), so
+# a past day can be re-processed after a parsing fix without hitting Savant.
+#
+# The landing zone is a local directory. On the daily GitHub Actions runner
+# it only survives because the workflow restores/saves data/raw through the
+# Actions cache, which evicts entries unused for 7 days (so the off-season
+# gap loses it) and caps a repo at 10 GB. Treat it as durable only for local
+# runs; for a long-lived archive point RAW_LANDING_DIR at a mounted volume or
+# sync the directory to object storage.
+#
+# Pure standard library. RAW_LANDING_DIR overrides the location.
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+# Downloads land from the fetch scheduler's worker threads
+_LOCK = threading.Lock()
+
+
+def raw_dir() -> Path:
+    return Path(os.getenv("RAW_LANDING_DIR") or ROOT / "data" / "raw")
+
+
+@dataclass
+class LandedPayload:
+    source: str
+    key: str
+    url: str
+    fetched_at: str  # UTC ISO-8601
+    sha256: str
+    bytes: int
+    path: str  # relative to raw_dir()
+    new: bool  # False when the payload matched the previous fetch and wasn't rewritten
+
+
+def _manifest(source: str) -> Path:
+    return raw_dir() / source / "manifest.jsonl"
+
+
+def entries(source: str, key: str = None) -> list:
+    """Manifest entries (oldest first) for a source, optionally one key."""
+    path = _manifest(source)
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        rows = [LandedPayload(**json.loads(line)) for line in f if line.strip()]
+    return [r for r in rows if key is None or r.key == key]
+
+
+def land(source: str, key: str, url: str, payload) -> LandedPayload:
+    """Stores one fetched payload (bytes or str) and returns its manifest entry."""
+    data = payload.encode("utf-8") if isinstance(payload, str) else bytes(payload)
+    digest = hashlib.sha256(data).hexdigest()
+    now = datetime.now(timezone.utc)
+    with _LOCK:
+        previous = entries(source, key)
+        if previous and previous[-1].sha256 == digest:
+            rel, new = previous[-1].path, False
+        else:
+            rel = f"{source}/{key}/{now.strftime('%Y%m%dT%H%M%SZ')}_{digest[:12]}.gz"
+            target = raw_dir() / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(".tmp")
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp, target)
+            new = True
+        entry = LandedPayload(source, key, url, now.isoformat(timespec="seconds"), digest, len(data), rel, new)
+        _manifest(source).parent.mkdir(parents=True, exist_ok=True)
+        with open(_manifest(source), "a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(entry)) + "\n")
+    return entry
+
+
+def latest(source: str, key: str, as_of: str = None) -> LandedPayload:
+    """Most recent entry for a key, or the last one fetched on/before `as_of`
+    (a date or timestamp, UTC). None if nothing was landed."""
+    rows = entries(source, key)
+    if as_of:
+        rows = [r for r in rows if r.fetched_at[:len(as_of)] <= as_of]
+    return rows[-1] if rows else None
+
+
+def read(entry: LandedPayload) -> bytes:
+    """The payload's original bytes; raises ValueError if the file doesn't match its hash."""
+    with gzip.open(raw_dir() / entry.path, "rb") as f:
+        data = f.read()
+    if hashlib.sha256(data).hexdigest() != entry.sha256:
+        raise ValueError(f"{entry.path}: content hash mismatch")
+    return data
+
+
+def replay(source: str, key: str, as_of: str = None) -> bytes:
+    """Stored payload for a key (see latest()); raises FileNotFoundError if there is none."""
+    entry = latest(source, key, as_of)
+    if entry is None:
+        raise FileNotFoundError(f"no landed {source}/{key} payload" + (f" on or before {as_of}" if as_of else ""))
+    return read(entry)
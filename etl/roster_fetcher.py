@@ -0,0 +1,233 @@
+# etl/roster_fetcher.py
+#
+# Shared MLB Stats API client and roster fetch/write for the daily Savant ETL
+# (get_mlb_rosters in etl/update_savant_awsrds.py) and
+# scripts/scrape_2026_rosters.py.
+#
+# MlbApiClient:
+#   - one pooled requests.Session per worker thread (keep-alive, no new TCP/TLS
+#     handshake per call);
+#   - many GETs at once through etl/fetch_scheduler.py (bounded worker pool,
+#     shared requests/sec cap, jittered retries);
+#   - a conditional-request cache under data/cache/mlb_api/: the last body of
+#     each URL is kept with its ETag / Last-Modified, sent back as
+#     If-None-Match / If-Modified-Since, and a 304 is served from the cache;
+#   - optional raw landing (etl/raw_store.py) of every 200 body, and replay from
+#     the landing zone instead of the network.
+#
+# write_rosters() stores one (season, roster_type) snapshot in mlb_rosters
+# (db/mlb_rosters.sql) through the same run(sql) -> rows interface as
+# etl/derived_tables.py, so it works on pg8000 (`db.run`) and psycopg2
+# (`psycopg2_runner(conn)`).
+#
+# MLB_API_BASE_URL and MLB_API_CACHE_DIR override the API host and cache
+# location (tests/run_roster_fetch_check.py points them at a local stub).
+# The cache is a local directory: the daily workflow keeps data/cache/ between
+# runs only through the Actions cache (evicted after 7 unused days), so the
+# first run after a gap gets full 200s again.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from etl import raw_store
+from etl.derived_tables import run_sql_file
+from etl.fetch_scheduler import FetchStats, run_fetch_jobs
+
+ROOT = Path(__file__).resolve().parents[1]
+MLB_API_BASE_URL = os.getenv("MLB_API_BASE_URL", "https://statsapi.mlb.com")
+
+# Mapping MLB Stats API abbreviations to our DB standards
+ABBR_MAP = {
+    'AZ': 'ARI', 'TB': 'TBR', 'WSH': 'WSN', 'CWS': 'CHW',
+    'KC': 'KCR', 'SD': 'SDN', 'SF': 'SFG', 'OAK': 'ATH'
+}
+
+ROSTER_COLUMNS = ["player_id", "name", "team", "team_id", "position", "status"]
+
+
+def cache_dir() -> Path:
+    return Path(os.getenv("MLB_API_CACHE_DIR") or ROOT / "data" / "cache" / "mlb_api")
+
+
+class MlbApiClient:
+    """GETs JSON from the Stats API. `land_source` lands every fresh body in the raw
+    landing zone under that source; `replay_as_of` ('latest' or a UTC date) reads
+    landed bodies instead of the network (get_many keys are the landing keys)."""
+
+    def __init__(self, base_url: str = None, workers: int = 8, rate: float = 10.0, max_attempts: int = 3,
+                 timeout: float = 10, land_source: str = None, replay_as_of: str = None, use_cache: bool = True):
+        self.base_url = (base_url or MLB_API_BASE_URL).rstrip("/")
+        self.workers = workers
+        self.rate = rate
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.land_source = land_source
+        self.replay_as_of = replay_as_of
+        self.use_cache = use_cache
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.counts = {"requests": 0, "not_modified": 0, "bytes": 0}
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            self._local.session = session
+        return session
+
+    def _cache_path(self, url: str) -> Path:
+        return cache_dir() / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:20]}.json"
+
+    def _count(self, **numbers):
+        with self._lock:
+            for k, v in numbers.items():
+                self.counts[k] += v
+
+    def get_json(self, path: str, key: str = None):
+        """One attempt at GET base_url + path; raises on an HTTP error (so run_fetch_jobs retries)."""
+        if self.replay_as_of:
+            as_of = None if self.replay_as_of == "latest" else self.replay_as_of
+            return json.loads(raw_store.replay(self.land_source, key, as_of))
+
+        url = self.base_url + path
+        cache_file = self._cache_path(url)
+        cached = None
+        headers = {}
+        if self.use_cache and cache_file.exists():
+            cached = json.loads(cache_file.read_text(encoding="utf-8"))
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        resp = self._session().get(url, headers=headers, timeout=self.timeout)
+        self._count(requests=1)
+        if resp.status_code == 304 and cached is not None:
+            self._count(not_modified=1)
+            return json.loads(cached["body"])
+        resp.raise_for_status()
+        body = resp.text
+        data = json.loads(body)
+        self._count(bytes=len(resp.content))
+
+        if self.use_cache and (resp.headers.get("ETag") or resp.headers.get("Last-Modified")):
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps({"url": url, "etag": resp.headers.get("ETag"),
+                                       "last_modified": resp.headers.get("Last-Modified"), "body": body}),
+                           encoding="utf-8")
+            os.replace(tmp, cache_file)
+        if self.land_source and key:
+            raw_store.land(self.land_source, key, url, resp.content)
+        return data
+
+    def get_many(self, requests_by_key: dict, stats: FetchStats = None):
+        """key -> path, fetched concurrently with retries. Returns (key -> JSON, key -> error)."""
+        results, errors = {}, {}
+        jobs = [(key,) for key in requests_by_key]
+        for result in run_fetch_jobs(jobs, lambda key: self.get_json(requests_by_key[key], key), workers=self.workers,
+                                     rate=self.rate, max_attempts=self.max_attempts, backoff_base=0.5,
+                                     stats=stats):
+            key = result.job[0]
+            if result.ok:
+                results[key] = result.value
+            else:
+                errors[key] = result.error
+        return results, errors
+
+
+def fetch_teams(client: MlbApiClient, year: int) -> dict:
+    """team_id -> Stats API abbreviation for the season's MLB teams."""
+    data, errors = client.get_many({f"teams_{year}": f"/api/v1/teams?sportId=1&season={year}"})
+    if errors:
+        raise next(iter(errors.values()))
+    return {t["id"]: t["abbreviation"] for t in data[f"teams_{year}"].get("teams", [])}
+
+
+def fetch_current_teams(client: MlbApiClient, year: int):
+    """Every player's current team for the season, from the teams and sports/1/players
+    endpoints (fetched together). Returns (roster rows, player_id -> Stats API abbreviation)."""
+    data, errors = client.get_many({
+        f"teams_{year}": f"/api/v1/teams?sportId=1&season={year}",
+        f"players_{year}": f"/api/v1/sports/1/players?season={year}",
+    })
+    if errors:
+        raise next(iter(errors.values()))
+    teams = {t["id"]: t["abbreviation"] for t in data[f"teams_{year}"].get("teams", [])}
+    rows, mapping = [], {}
+    for p in data[f"players_{year}"].get("people", []):
+        team_id = (p.get("currentTeam") or {}).get("id")
+        if team_id not in teams:
+            continue
+        mapping[p["id"]] = teams[team_id]
+        rows.append({"player_id": p["id"], "name": p.get("fullName"), "team": ABBR_MAP.get(teams[team_id], teams[team_id]),
+                     "team_id": team_id, "position": (p.get("primaryPosition") or {}).get("abbreviation"),
+                     "status": None})
+    return rows, mapping
+
+
+def fetch_team_rosters(client: MlbApiClient, year: int, roster_type: str = "40Man"):
+    """All teams' rosters of one type, fetched concurrently. Returns (roster rows,
+    {team abbreviation: error} for teams whose roster couldn't be fetched)."""
+    teams = {team_id: ABBR_MAP.get(raw, raw) for team_id, raw in fetch_teams(client, year).items()}
+    keys = {f"roster_{roster_type}_{year}_{team_id}": team_id for team_id in teams}
+    data, errors = client.get_many({
+        key: f"/api/v1/teams/{team_id}/roster?rosterType={roster_type}&season={year}" for key, team_id in keys.items()
+    })
+    rows = []
+    for key, team_id in sorted(keys.items(), key=lambda kv: teams[kv[1]]):
+        for p in data.get(key, {}).get("roster", []):
+            rows.append({"player_id": p["person"]["id"], "name": p["person"].get("fullName"), "team": teams[team_id],
+                         "team_id": team_id, "position": (p.get("position") or {}).get("abbreviation"),
+                         "status": (p.get("status") or {}).get("code")})
+    return rows, {teams[keys[key]]: e for key, e in errors.items()}
+
+
+# ---------------- mlb_rosters writer ----------------
+def _sql_literal(value) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def write_rosters(run, rows: list, season: int, roster_type: str, batch: int = 500) -> int:
+    """Replaces the stored (season, roster_type) snapshot with `rows` in one transaction.
+    Skipped when the stored snapshot already matches. Returns the number of player
+    rows added, removed or changed (0 when skipped)."""
+    run_sql_file(run, ROOT / "db" / "mlb_rosters.sql")
+    # One row per player (a player can briefly show up on two teams' lists mid-trade)
+    new = {r["player_id"]: tuple(r.get(c) for c in ROSTER_COLUMNS) for r in rows}
+    cols = ", ".join(ROSTER_COLUMNS)
+    current = {r[0]: tuple(r) for r in run(
+        f"SELECT {cols} FROM mlb_rosters WHERE season = {int(season)} AND roster_type = {_sql_literal(roster_type)}")}
+    changed = len(new.keys() ^ current.keys()) + sum(1 for k in new.keys() & current.keys() if new[k] != current[k])
+    if not changed:
+        print(f"  mlb_rosters {season}/{roster_type}: {len(new)} players, unchanged.")
+        return 0
+
+    t0 = time.perf_counter()
+    run("BEGIN")
+    try:
+        run(f"DELETE FROM mlb_rosters WHERE season = {int(season)} AND roster_type = {_sql_literal(roster_type)}")
+        values = [f"({int(season)}, {_sql_literal(roster_type)}, " + ", ".join(_sql_literal(v) for v in row) + ")"
+                  for row in new.values()]
+        for i in range(0, len(values), batch):
+            run(f"INSERT INTO mlb_rosters (season, roster_type, {cols}) VALUES " + ", ".join(values[i:i + batch]))
+        run("COMMIT")
+    except Exception:
+        run("ROLLBACK")
+        raise
+    print(f"  mlb_rosters {season}/{roster_type}: {len(new)} players written "
+          f"({changed} added/removed/changed) in {time.perf_counter() - t0:.2f}s.")
+    return changed
@@ -0,0 +1,132 @@
+# etl/run_metrics.py
+#
+# Structured per-run metrics for the ETL jobs (etl/update_savant_awsrds.py,
+# etl/load_lahman.py, scripts/backfill_savant_statcast_history.py). A job
+# creates one RunMetrics, records fetches (time, bytes, parse time, attempts),
+# stage timings and per-table write results as it goes, and calls finish(),
+# which writes logs/etl_runs/<job>_<timestamp>.json and appends the same record
+# to logs/etl_runs/history.jsonl. scripts/etl_run_report.py compares the latest
+# run of a job against the trailing median of the ones before it. The daily
+# workflow carries history.jsonl between runs in the Actions cache (the runner
+# starts empty); entries unused for 7 days are evicted, so the first in-season
+# run after the winter starts a fresh baseline.
+#
+# Pure standard library and thread-safe (fetches land from the fetch
+# scheduler's workers, backfill writes from its writer pool). ETL_METRICS_DIR
+# overrides the location.
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def metrics_dir() -> Path:
+    return Path(os.getenv("ETL_METRICS_DIR") or ROOT / "logs" / "etl_runs")
+
+
+def history_path() -> Path:
+    return metrics_dir() / "history.jsonl"
+
+
+class RunMetrics:
+    def __init__(self, job: str):
+        self.job = job
+        self.started = datetime.now(timezone.utc)
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages = {}    # name -> {"seconds", "count", other summed numbers}
+        self.fetches = []   # one dict per download/read
+        self.tables = {}    # table -> {"inserted", "updated", "unchanged", "rows", "seconds"}
+        self.counters = {}  # free-form run totals (retries, failed, ...)
+
+    def add_stage(self, name: str, seconds: float, **numbers):
+        with self._lock:
+            st = self.stages.setdefault(name, {"seconds": 0.0, "count": 0})
+            st["seconds"] += seconds
+            st["count"] += 1
+            for k, v in numbers.items():
+                st[k] = st.get(k, 0) + v
+
+    @contextmanager
+    def stage(self, name: str, **numbers):
+        """Times the block as one occurrence of `name`."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - t0, **numbers)
+
+    def fetch(self, key: str, seconds: float, nbytes: int = 0, parse_seconds: float = 0.0,
+              attempts: int = 1, ok: bool = True):
+        with self._lock:
+            self.fetches.append({"key": key, "seconds": round(seconds, 3), "bytes": nbytes,
+                                 "parse_seconds": round(parse_seconds, 3), "attempts": attempts, "ok": ok})
+        self.add_stage("fetch", seconds, bytes=nbytes)
+        if parse_seconds:
+            self.add_stage("parse", parse_seconds)
+        self.count("retries", attempts - 1)
+        if not ok:
+            self.count("failed_fetches")
+
+    def table(self, table: str, seconds: float, inserted: int = 0, updated: int = 0, unchanged: int = 0):
+        """One write to `table`; repeated writes (e.g. one per season) accumulate."""
+        with self._lock:
+            t = self.tables.setdefault(table, {"inserted": 0, "updated": 0, "unchanged": 0, "rows": 0, "seconds": 0.0})
+            t["inserted"] += inserted
+            t["updated"] += updated
+            t["unchanged"] += unchanged
+            t["rows"] += inserted + updated
+            t["seconds"] += seconds
+        self.add_stage("write", seconds, rows=inserted + updated)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, status: str = "ok") -> dict:
+        with self._lock:
+            tables = {
+                name: {**t, "seconds": round(t["seconds"], 3),
+                       "rows_per_sec": round(t["rows"] / t["seconds"], 1) if t["seconds"] else None}
+                for name, t in self.tables.items()
+            }
+            return {
+                "job": self.job,
+                "started_at": self.started.isoformat(timespec="seconds"),
+                "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "status": status,
+                "wall_seconds": round(time.perf_counter() - self._t0, 3),
+                "stages": {k: {kk: round(vv, 3) if isinstance(vv, float) else vv for kk, vv in v.items()}
+                           for k, v in self.stages.items()},
+                "tables": tables,
+                "fetches": list(self.fetches),
+                "counters": dict(self.counters),
+            }
+
+    def finish(self, status: str = "ok") -> Path:
+        """Writes this run's JSON report and appends it to the history file. Returns the report path."""
+        rec = self.record(status)
+        out_dir = metrics_dir()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / f"{self.job}_{self.started.strftime('%Y%m%d_%H%M%S')}.json"
+        path.write_text(json.dumps(rec, indent=2), encoding="utf-8")
+        with open(history_path(), "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec) + "\n")
+        print(f" Run metrics: {path} ({rec['wall_seconds']:.1f}s wall, status {status})")
+        return path
+
+
+def load_history(job: str = None) -> list:
+    """All recorded runs, oldest first, optionally for one job."""
+    path = history_path()
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    return [r for r in runs if job is None or r["job"] == job]
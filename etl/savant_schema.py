@@ -0,0 +1,136 @@
+# etl/savant_schema.py
+#
+# Declared column schema for Savant's custom-leaderboard CSVs (the batter and
+# pitcher selections in etl/update_savant_awsrds.py, plus the b_* / p_* names
+# parse_savant_csv copies them to). Applied at parse time, so a season's frame
+# comes out with the same compact dtypes no matter what the day's file looked
+# like, and create_table_if_not_exists gets its SQL types from here instead of
+# from whatever pandas happened to infer (a count column with one blank used to
+# come out float64 -> FLOAT, and INT the next day).
+#
+#   id      -> Int32   / INT     (nullable)
+#   count   -> Int16   / INT     (nullable; season counting stats)
+#   rate    -> float32 / FLOAT   (averages, velocities, spin, ERA)
+#   percent -> float32 / FLOAT   (same, but may arrive as "12.5%")
+#   text    -> object  / TEXT
+#
+# Columns not listed here keep the parser's inferred dtype and map to SQL by
+# dtype. The parse uses the pyarrow engine when pyarrow is installed.
+
+import csv
+import io
+import re
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+# kind -> (pandas dtype, SQL type)
+KINDS = {
+    "id": ("Int32", "INT"),
+    "count": ("Int16", "INT"),
+    "rate": ("float32", "FLOAT"),
+    "percent": ("float32", "FLOAT"),
+    "text": (None, "TEXT"),
+}
+INT_KINDS = ("id", "count")
+
+_IDS = ["player_id", "year", "key_mlbam"]
+_COUNTS = [
+    # batter selections
+    "hit", "single", "double", "triple", "home_run", "strikeout", "walk", "b_rbi",
+    "b_total_bases", "b_game", "ab", "pa", "b_stolen_base",
+    # pitcher selections
+    "p_game", "p_started", "p_save", "p_win", "p_loss", "p_shutout", "p_complete_game",
+    "p_strikeout", "p_walk", "p_earned_run", "p_run", "p_home_run",
+    # parse_savant_csv's fuzzy copies
+    "b_total_hits", "b_single", "b_double", "b_triple", "b_home_run", "b_strikeout",
+    "b_walk", "b_ab", "b_total_pa", "p_hit",
+]
+_RATES = [
+    "batting_avg", "slg_percent", "on_base_percent", "on_base_plus_slg", "isolated_power",
+    "xba", "xslg", "xwoba", "xobp", "xiso", "wobacon_diff", "exit_velocity_avg",
+    "launch_angle_avg", "sprint_speed", "hp_to_first", "p_era", "fastball_avg_speed",
+    "fastball_avg_spin", "breaking_avg_spin", "release_extension", "bb_k",
+]
+_PERCENTS = [
+    "b_k_percent", "b_bb_percent", "sweet_spot_percent", "barrel_batted_rate",
+    "hard_hit_percent", "chase_percent", "whiff_percent", "zone_swing_percent",
+    "zone_contact_percent", "meatball_swing_percent", "meatball_percent", "zone_percent",
+    "putaway_percent",
+]
+_TEXT = ["last_name_first_name", "playername", "player_name", "display_name", "name_key", "team", "playerid"]
+
+COLUMNS = {
+    **{c: "id" for c in _IDS},
+    **{c: "count" for c in _COUNTS},
+    **{c: "rate" for c in _RATES},
+    **{c: "percent" for c in _PERCENTS},
+    **{c: "text" for c in _TEXT},
+}
+
+
+def normalize_column(name: str) -> str:
+    """Lowercase, spaces to underscores, drop anything else that isn't [a-z0-9_]."""
+    return re.sub(r'[^a-z0-9_]', '', name.lower().replace(' ', '_'))
+
+
+def read_savant_csv(text: str) -> pd.DataFrame:
+    """Parses one leaderboard CSV with the declared dtypes. Column names come back normalized."""
+    text = text.lstrip("\ufeff")
+    raw_cols = next(csv.reader([text.split("\n", 1)[0]]), [])
+    # Numeric kinds are cast by the reader; percents may carry "%", so apply_schema does those
+    dtype = {}
+    for raw in raw_cols:
+        kind = COLUMNS.get(normalize_column(raw))
+        if kind in ("id", "count", "rate"):
+            dtype[raw] = KINDS[kind][0]
+
+    buf = io.BytesIO(text.encode("utf-8"))
+    try:
+        df = pd.read_csv(buf, engine=CSV_ENGINE, dtype=dtype)
+    except (ValueError, TypeError):
+        # Something in a declared column didn't parse as a number; read it
+        # untyped and let apply_schema coerce the bad cells to NULL
+        buf.seek(0)
+        df = pd.read_csv(buf, engine=CSV_ENGINE)
+    df.columns = [normalize_column(c) for c in df.columns]
+    return apply_schema(df)
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Casts every declared column to its dtype in place (no-op for columns already there)."""
+    for col in df.columns:
+        kind = COLUMNS.get(col)
+        if kind is None or kind == "text":
+            continue
+        dtype = KINDS[kind][0]
+        s = df[col]
+        if str(s.dtype) == dtype:
+            continue
+        # Text columns are object on pandas 2 but the str dtype on pandas 3
+        if kind == "percent" and not pd.api.types.is_numeric_dtype(s):
+            s = s.str.rstrip("%").str.strip()
+        s = pd.to_numeric(s, errors="coerce")
+        if kind in INT_KINDS:
+            s = s.round()
+        df[col] = s.astype(dtype)
+    return df
+
+
+def sql_type(col: str, dtype) -> str:
+    """Declared SQL type for known columns; otherwise derived from the dtype."""
+    kind = COLUMNS.get(col)
+    if kind is not None:
+        return KINDS[kind][1]
+    if pd.api.types.is_bool_dtype(dtype):
+        return "BOOLEAN"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "INT"
+    if pd.api.types.is_float_dtype(dtype):
+        return "FLOAT"
+    return "TEXT"
@@ -0,0 +1,132 @@
+# etl/savant_season.py
+#
+# One wide row per (player_id, year) per domain: savant_batting_season and
+# savant_pitching_season hold every Savant column the loaders keep. Each
+# downloaded CSV is written once, as a single frame, instead of being cut into
+# five tables that each repeat player_id / year / the four name columns.
+#
+# The old table names stay as views for the prompt, the templates and
+# db/player_season_views.sql: savant_batting_traditional, ..._ratios,
+# ..._expected, ..._physics and ..._discipline each select their columns from
+# the wide table, WHERE the row carries that group (in_<group>). The flag keeps
+# each view's coverage what the table's was -- the backfill writes only the
+# expected / physics / discipline columns for 2015-2025, so those seasons must
+# not show up in savant_batting_traditional (player_season_batting and
+# season_leaders take a season from Lahman when Savant has no traditional rows
+# for it).
+#
+# Column groups are the loaders' schema maps. A group is written when at least
+# three of its columns are present in the frame -- the same rule the per-table
+# writes used. Columns missing from a frame keep their stored value (the upsert
+# only SETs the frame's columns), so the backfill never blanks the daily job's
+# traditional columns and vice versa.
+#
+# scripts/migrate_savant_season.py converts a database that still has the ten
+# tables: copies them into the wide tables, drops them and creates the views.
+#
+# Same run(sql) -> rows interface as etl/derived_tables.py.
+
+IDENTITY = ["player_id", "year", "playername", "player_name", "display_name", "name_key"]
+
+# Wide table -> {compat view -> its non-identity columns, in view column order}
+GROUPS = {
+    "savant_batting_season": {
+        "savant_batting_traditional": ["team", "b_game", "b_ab", "b_total_pa", "b_total_hits", "b_single",
+                                       "b_double", "b_triple", "b_home_run", "b_rbi", "b_walk", "b_strikeout",
+                                       "b_stolen_base"],
+        "savant_batting_ratios": ["batting_avg", "on_base_percent", "slg_percent", "on_base_plus_slg",
+                                  "isolated_power", "b_bb_percent", "b_k_percent", "bb_k"],
+        "savant_batting_expected": ["xwoba", "xba", "xslg", "xobp", "xiso", "wobacon_diff", "sweet_spot_percent",
+                                    "barrel_batted_rate", "hard_hit_percent"],
+        "savant_batting_physics": ["exit_velocity_avg", "launch_angle_avg", "sprint_speed", "hp_to_first"],
+        "savant_batting_discipline": ["zone_swing_percent", "zone_contact_percent", "chase_percent",
+                                      "whiff_percent", "meatball_swing_percent", "meatball_percent"],
+    },
+    "savant_pitching_season": {
+        "savant_pitching_traditional": ["team", "p_game", "p_started", "p_win", "p_loss", "p_save", "p_shutout",
+                                        "p_complete_game", "p_strikeout", "p_walk", "p_earned_run", "p_run",
+                                        "p_hit", "p_home_run"],
+        "savant_pitching_ratios": ["p_era", "batting_avg", "on_base_percent", "slg_percent", "bb_k"],
+        "savant_pitching_expected": ["xwoba", "xba", "xslg", "xobp", "xiso", "barrel_batted_rate",
+                                     "hard_hit_percent"],
+        "savant_pitching_physics": ["exit_velocity_avg", "launch_angle_avg", "fastball_avg_speed",
+                                    "fastball_avg_spin", "breaking_avg_spin", "release_extension"],
+        "savant_pitching_discipline": ["chase_percent", "whiff_percent", "zone_percent", "putaway_percent"],
+    },
+}
+SEASON_TABLES = {"batter": "savant_batting_season", "pitcher": "savant_pitching_season"}
+COMPAT_VIEWS = {table: list(groups) for table, groups in GROUPS.items()}
+
+
+def flag_col(view: str) -> str:
+    """savant_batting_ratios -> in_ratios"""
+    return "in_" + view.rsplit("_", 1)[1]
+
+
+def season_frame(df, table: str, views=None):
+    """The wide frame for `table` from one cleaned Savant CSV: identity columns, then
+    each written group's columns, then an in_<group> flag per written group.
+    `views` limits the groups (default: all). Returns (frame, written views)."""
+    ident = [c for c in IDENTITY if c in df.columns]
+    cols, written = list(ident), []
+    for view, group_cols in GROUPS[table].items():
+        if views is not None and view not in views:
+            continue
+        present = [c for c in group_cols if c in df.columns]
+        if present and len(ident) + len(present) >= 3:
+            cols += [c for c in present if c not in cols]
+            written.append(view)
+    out = df[cols].copy()
+    for view in written:
+        out[flag_col(view)] = True
+    return out, written
+
+
+def _relkinds(run, names) -> dict:
+    quoted = ", ".join(f"'{n}'" for n in names)
+    return {r[0]: r[1] for r in run(
+        f"SELECT relname, relkind FROM pg_class WHERE relnamespace = 'public'::regnamespace "
+        f"AND relname IN ({quoted})")}
+
+
+def unmigrated(run) -> list:
+    """Compat names that are still base tables (scripts/migrate_savant_season.py not run yet)."""
+    names = [v for views in COMPAT_VIEWS.values() for v in views]
+    return sorted(n for n, kind in _relkinds(run, names).items() if kind in ("r", "p"))
+
+
+def require_migrated(run):
+    tables = unmigrated(run)
+    if tables:
+        raise RuntimeError(f"{', '.join(tables)} still table(s): run scripts/migrate_savant_season.py --commit "
+                           f"before loading into the wide savant_*_season tables")
+
+
+def ensure_compat_views(run, table: str) -> list:
+    """Creates (or widens) the compat views over `table` that are missing columns the
+    wide table now has. A view's existing columns keep their order and new ones are
+    appended -- CREATE OR REPLACE VIEW can only add columns at the end, and the
+    player-season matviews depend on these views, so they can't be dropped and
+    recreated. Returns the views (re)created."""
+    existing = {r[0] for r in run(
+        f"SELECT column_name FROM information_schema.columns "
+        f"WHERE table_schema = 'public' AND table_name = '{table}'")}
+    if not existing:
+        return []
+    changed = []
+    for view, group_cols in GROUPS[table].items():
+        flag = flag_col(view)
+        if flag not in existing:
+            continue  # no row has carried this group yet
+        wanted = [c for c in IDENTITY + group_cols if c in existing]
+        current = [r[0] for r in run(
+            f"SELECT column_name FROM information_schema.columns "
+            f"WHERE table_schema = 'public' AND table_name = '{view}' ORDER BY ordinal_position")]
+        added = [c for c in wanted if c not in current]
+        if current and not added:
+            continue
+        cols = current + added
+        col_list = ", ".join(f'"{c}"' for c in cols)
+        run(f'CREATE OR REPLACE VIEW "{view}" AS SELECT {col_list} FROM "{table}" WHERE "{flag}"')
+        changed.append(view)
+    return changed
@@ -0,0 +1,351 @@
+# etl/statcast_pitches.py
+#
+# Loads pitch-level Statcast (pybaseball.statcast) into the statcast_pitches
+# table (db/statcast_pitches.sql: partitioned by game_date, one partition per
+# month). The daily run re-pulls the last STATCAST_REPULL_DAYS days (default 3,
+# so late corrections land) through yesterday; --start/--end backfill any range
+# in CHUNK_DAYS-day pulls (pybaseball splits each pull into concurrent
+# per-day requests).
+#
+# Each pull is written in one transaction: the game dates it returned are
+# deleted and the pitches COPYed in through the partitioned parent, so a re-run
+# of any range is idempotent and a date the pull didn't return is left alone.
+# The same transaction keeps the statcast_splits cube (etl/statcast_splits.py)
+# in step: the replaced days come out of it before the DELETE and the new
+# pitches go in after the COPY. A season that has pitches but no cube rows yet
+# (loaded before the cube existed) is rebuilt in full first; --rebuild-splits
+# forces that for the loaded range's seasons. After the COPY the batting game
+# logs, hitting streaks and 7/15/30-day rolling windows (etl/game_logs.py) are
+# refreshed for the loaded days the same way (--rebuild-game-logs).
+# Every pulled day is kept in the raw landing zone (etl/raw_store.py, source
+# "statcast"), and --replay re-loads from there without pybaseball.
+#
+# After loading: the touched partitions are ANALYZEd (etl/publish.py), the
+# statcast_pitches, statcast_splits and game-log rows in data_versions are bumped, and the retention/compaction
+# policy runs -- partitions older than STATCAST_KEEP_SEASONS seasons (default 3)
+# are dropped, and each month past the re-pull window is compacted once with
+# VACUUM (FULL, ANALYZE). Run metrics go to logs/etl_runs/ as job statcast_pitches.
+#
+# The split cube and game-log tables outlive that retention, so older seasons can
+# be backfilled: a --start before the retention window loads those seasons, keeps
+# their derived rows and lets this run's retention pass drop their pitches again.
+# Once a day's pitches are gone it can't be subtracted back out of the derived
+# tables, so such a season is cleared first (pitches and derived rows) and must be
+# loaded whole (--start on or before March 1, --end after November). Afterwards
+# set PITCH_LEVEL_FIRST_SEASON (nlp/coverage.py) so the app treats it as covered.
+#
+# Usage:
+#   .venv/Scripts/python etl/statcast_pitches.py                                      # daily re-pull window
+#   .venv/Scripts/python etl/statcast_pitches.py --start 2025-03-18 --end 2025-09-28  # a season
+#   .venv/Scripts/python etl/statcast_pitches.py --start 2025-07-01 --end 2025-07-31 --replay
+#   .venv/Scripts/python etl/statcast_pitches.py --start 2025-03-18 --end 2025-09-28 --replay --rebuild-splits
+#   .venv/Scripts/python etl/statcast_pitches.py --start 2015-03-01 --end 2023-12-31  # historical backfill
+#   .venv/Scripts/python etl/statcast_pitches.py --maintain-only                      # retention/compaction only
+
+import argparse
+import io
+import os
+import socket
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pg8000.native
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from etl import raw_store
+from etl.derived_tables import run_sql_file
+from etl.publish import analyze_or_vacuum, bump_versions
+from etl.run_metrics import RunMetrics
+from etl import game_logs, statcast_splits
+from etl.update_savant_awsrds import DB_CONFIG
+from nlp.coverage import PITCH_LEVEL_FIRST_SEASON
+
+TABLE = "statcast_pitches"
+REPULL_DAYS = int(os.getenv("STATCAST_REPULL_DAYS", "3"))
+KEEP_SEASONS = int(os.getenv("STATCAST_KEEP_SEASONS", "3"))
+CHUNK_DAYS = 7
+# A season before the retention window is only loaded whole: from (month, day) through November
+SEASON_BOUNDS = ((3, 1), (11, 30))
+DERIVED_TABLES = ["statcast_splits", "batting_game_logs", "batting_rolling", "batting_streaks"]
+KEY_COLS = ["game_date", "game_pk", "at_bat_number", "pitch_number"]
+
+# Column -> pandas dtype, in db/statcast_pitches.sql order (also the COPY column list).
+# Nullable ints so a blank doesn't turn a SMALLINT column into "3.0".
+PITCH_COLUMNS = {
+    "game_date": "date", "game_pk": "Int32", "at_bat_number": "Int16", "pitch_number": "Int16",
+    "game_year": "Int16", "home_team": "text", "away_team": "text", "inning": "Int16", "inning_topbot": "text",
+    "outs_when_up": "Int16", "balls": "Int16", "strikes": "Int16", "batter": "Int32", "pitcher": "Int32",
+    "stand": "text", "p_throws": "text", "pitch_type": "text", "pitch_name": "text",
+    "release_speed": "float32", "release_spin_rate": "float32", "release_extension": "float32",
+    "pfx_x": "float32", "pfx_z": "float32", "plate_x": "float32", "plate_z": "float32", "zone": "Int16",
+    "type": "text", "description": "text", "events": "text", "bb_type": "text",
+    "launch_speed": "float32", "launch_angle": "float32", "hit_distance_sc": "float32",
+    "estimated_ba_using_speedangle": "float32", "estimated_woba_using_speedangle": "float32",
+    "woba_value": "float32", "delta_run_exp": "float32",
+}
+
+
+def prepare_pitches(df: pd.DataFrame) -> pd.DataFrame:
+    """The declared columns, typed, one row per pitch. Columns pybaseball didn't return come out NULL."""
+    out = pd.DataFrame(index=df.index)
+    for col, dtype in PITCH_COLUMNS.items():
+        values = df[col] if col in df.columns else pd.Series(None, index=df.index, dtype="object")
+        if dtype == "date":
+            out[col] = pd.to_datetime(values, errors="coerce").dt.date
+        elif dtype == "text":
+            out[col] = values.astype("object").where(values.notna(), None)
+        elif dtype.startswith("Int"):
+            out[col] = pd.to_numeric(values, errors="coerce").round().astype(dtype)
+        else:
+            out[col] = pd.to_numeric(values, errors="coerce").astype(dtype)
+    out = out.dropna(subset=KEY_COLS + ["batter", "pitcher"])
+    return out.drop_duplicates(KEY_COLS, keep="last").reset_index(drop=True)
+
+
+# ---------------- Sources ----------------
+def fetch_pitches(start: date, end: date) -> pd.DataFrame:
+    """pybaseball.statcast for [start, end]; each game date returned is landed as its own payload."""
+    from pybaseball import statcast
+    raw = statcast(start_dt=start.isoformat(), end_dt=end.isoformat(), verbose=False, parallel=True)
+    if raw is None or raw.empty:
+        return prepare_pitches(pd.DataFrame(columns=list(PITCH_COLUMNS)))
+    df = prepare_pitches(raw)
+    for day, group in df.groupby("game_date"):
+        raw_store.land("statcast", f"pitches_{day}", f"pybaseball.statcast({day})", group.to_csv(index=False))
+    return df
+
+
+def replay_pitches(start: date, end: date, as_of: str = None) -> pd.DataFrame:
+    """Landed days in [start, end] (as of a UTC date, or the latest); days never landed are skipped."""
+    frames = []
+    day = start
+    while day <= end:
+        entry = raw_store.latest("statcast", f"pitches_{day}", as_of)
+        if entry is not None:
+            frames.append(pd.read_csv(io.BytesIO(raw_store.read(entry))))
+        day += timedelta(days=1)
+    return prepare_pitches(pd.concat(frames, ignore_index=True) if frames
+                           else pd.DataFrame(columns=list(PITCH_COLUMNS)))
+
+
+# ---------------- Partitions ----------------
+def partition_name(day: date) -> str:
+    return f"{TABLE}_{day.year}_{day.month:02d}"
+
+
+def _month_bounds(day: date):
+    first = day.replace(day=1)
+    return first, (first + timedelta(days=32)).replace(day=1)
+
+
+def ensure_partitions(db, days) -> list:
+    """Creates the monthly partitions covering `days` if missing. Returns their names."""
+    names = []
+    for first in sorted({d.replace(day=1) for d in days}):
+        lo, hi = _month_bounds(first)
+        name = partition_name(first)
+        db.run(f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {TABLE} '
+               f"FOR VALUES FROM ('{lo.isoformat()}') TO ('{hi.isoformat()}')")
+        names.append(name)
+    return names
+
+
+def list_partitions(db) -> dict:
+    """partition name -> (first day of its month, table comment)."""
+    rows = db.run(
+        "SELECT c.relname, obj_description(c.oid, 'pg_class') FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :parent", parent=TABLE)
+    out = {}
+    for name, comment in rows:
+        year, month = name[len(TABLE) + 1:].split("_")
+        out[name] = (date(int(year), int(month), 1), comment)
+    return out
+
+
+# ---------------- Load ----------------
+def load_pitches(db, df: pd.DataFrame) -> tuple:
+    """Replaces the game dates in `df` with its pitches in one transaction, moving the
+    statcast_splits cube from the old pitches to the new and refreshing the game logs.
+    Returns (rows written, partitions touched)."""
+    if df.empty:
+        return 0, []
+    days = sorted(set(df["game_date"]))
+    partitions = ensure_partitions(db, days)
+    col_list = ", ".join(f'"{c}"' for c in PITCH_COLUMNS)
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False, na_rep="\\N")
+    buf.seek(0)
+    try:
+        db.run("BEGIN;")
+        statcast_splits.apply_days(db, days, -1)
+        db.run(f"DELETE FROM {TABLE} WHERE game_date = ANY(CAST(:days AS date[]))",
+               days=[d.isoformat() for d in days])
+        db.run(f"""COPY {TABLE} ({col_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')""", stream=buf)
+        statcast_splits.apply_days(db, days, 1)
+        game_logs.apply_days(db, days)
+        for name in partitions:
+            # New rows in a compacted month: let the next maintenance pass compact it again
+            db.run(f'COMMENT ON TABLE "{name}" IS NULL')
+        db.run("COMMIT;")
+    except Exception:
+        db.run("ROLLBACK;")
+        raise
+    return len(df), partitions
+
+
+def clear_seasons(db, seasons) -> None:
+    """Deletes the seasons' stored pitches and derived rows in one transaction, so a
+    historical backfill starts them from nothing."""
+    try:
+        db.run("BEGIN;")
+        for season in sorted(seasons):
+            db.run(f"DELETE FROM {TABLE} WHERE game_date >= CAST(:lo AS date) AND game_date < CAST(:hi AS date)",
+                   lo=date(season, 1, 1).isoformat(), hi=date(season + 1, 1, 1).isoformat())
+            for derived in DERIVED_TABLES:
+                db.run(f"DELETE FROM {derived} WHERE season = :season", season=season)
+        db.run("COMMIT;")
+    except Exception:
+        db.run("ROLLBACK;")
+        raise
+    print(f" Cleared season(s) {', '.join(map(str, sorted(seasons)))} for a whole-season reload.")
+
+
+# ---------------- Retention / compaction ----------------
+def apply_retention(db, today: date, keep_seasons: int = KEEP_SEASONS) -> list:
+    """Detaches and drops partitions from seasons before the last `keep_seasons`."""
+    oldest_kept = today.year - keep_seasons + 1
+    dropped = []
+    for name, (month, _) in sorted(list_partitions(db).items()):
+        if month.year < oldest_kept:
+            db.run(f'ALTER TABLE {TABLE} DETACH PARTITION "{name}"')
+            db.run(f'DROP TABLE "{name}"')
+            dropped.append(name)
+    if dropped:
+        print(f" Retention: dropped {len(dropped)} partition(s) before {oldest_kept}: {', '.join(dropped)}")
+    return dropped
+
+
+def compact_closed_months(db, today: date, repull_days: int = REPULL_DAYS) -> list:
+    """VACUUM (FULL, ANALYZE)s each month that ends before the re-pull window and isn't
+    marked compacted yet, then marks it. Months still being re-pulled are left alone."""
+    cutoff = today - timedelta(days=repull_days)
+    compacted = []
+    for name, (month, comment) in sorted(list_partitions(db).items()):
+        if _month_bounds(month)[1] > cutoff or (comment or "").startswith("compacted"):
+            continue
+        t0 = time.perf_counter()
+        db.run(f'VACUUM (FULL, ANALYZE) "{name}"')
+        db.run(f"COMMENT ON TABLE \"{name}\" IS 'compacted {today.isoformat()}'")
+        print(f" Compacted {name} in {time.perf_counter() - t0:.1f}s.")
+        compacted.append(name)
+    return compacted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load pitch-level Statcast into statcast_pitches.")
+    parser.add_argument("--start", type=date.fromisoformat, help="First game date (default: re-pull window)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last game date (default: yesterday)")
+    parser.add_argument("--replay", nargs="?", const="latest", metavar="AS_OF",
+                        help="Load landed payloads instead of calling pybaseball (latest, or a UTC date)")
+    parser.add_argument("--maintain-only", action="store_true", help="Only run retention and compaction")
+    parser.add_argument("--no-maintain", action="store_true", help="Skip retention and compaction")
+    parser.add_argument("--rebuild-splits", action="store_true",
+                        help="Recompute statcast_splits in full for the seasons in --start..--end before loading")
+    parser.add_argument("--rebuild-game-logs", action="store_true",
+                        help="Recompute the batting game logs/streaks/rolling windows for those seasons first")
+    args = parser.parse_args()
+
+    today = date.today()
+    end = args.end or today - timedelta(days=1)
+    start = args.start or today - timedelta(days=REPULL_DAYS)
+    oldest_kept = today.year - KEEP_SEASONS + 1
+    historical = [] if args.maintain_only else [s for s in range(start.year, end.year + 1) if s < oldest_kept]
+    (first_m, first_d), (last_m, last_d) = SEASON_BOUNDS
+    if historical and (start > date(historical[0], first_m, first_d) or end < date(historical[-1], last_m, last_d)):
+        # Their days can't come back out of statcast_splits once retention drops the
+        # pitches, so those seasons are cleared and reloaded in full.
+        parser.error(f"seasons before the retention window ({oldest_kept}) are loaded whole: "
+                     f"--start on or before {first_m}/{first_d} and --end on or after {last_m}/{last_d}.")
+    as_of = None if args.replay in (None, "latest") else args.replay
+
+    cfg = dict(DB_CONFIG)
+    try:
+        # Force IPv4 resolution, same reasoning as the daily job.
+        cfg["host"] = socket.gethostbyname(cfg["host"])
+    except Exception as e:
+        print(f"Warning: could not resolve IPv4 for host: {e}")
+    db = pg8000.native.Connection(**cfg, timeout=60)
+    metrics = RunMetrics("statcast_pitches")
+    status = "ok"
+    try:
+        run_sql_file(db.run, ROOT / "db" / "statcast_pitches.sql")
+        run_sql_file(db.run, ROOT / "db" / "statcast_splits.sql")
+        run_sql_file(db.run, ROOT / "db" / "game_logs.sql")
+        if historical:
+            clear_seasons(db, historical)
+        if not args.maintain_only:
+            load_seasons = range(start.year, end.year + 1)
+            # Seasons loaded before the cube / game logs existed: build them once so the
+            # incremental updates below start from complete seasons.
+            for derived, forced, rebuild in (("statcast_splits", args.rebuild_splits, statcast_splits.rebuild_splits),
+                                             ("batting_game_logs", args.rebuild_game_logs,
+                                              game_logs.rebuild_game_logs)):
+                todo = [s for s in load_seasons if forced or not db.run(
+                    f"SELECT 1 FROM {derived} WHERE season = :season LIMIT 1", season=s)]
+                with metrics.stage(f"rebuild_{derived}"):
+                    metrics.count(f"{derived}_seasons_rebuilt", len(rebuild(db, todo)))
+        total, touched, seasons = 0, set(), set()
+        chunk_start = start
+        while not args.maintain_only and chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=CHUNK_DAYS - 1), end)
+            label = f"{chunk_start}..{chunk_end}"
+            t0 = time.perf_counter()
+            try:
+                df = replay_pitches(chunk_start, chunk_end, as_of) if args.replay else fetch_pitches(chunk_start, chunk_end)
+            except Exception as e:
+                print(f" {label}: pull failed ({type(e).__name__}: {e}); skipping.")
+                metrics.fetch(label, time.perf_counter() - t0, ok=False)
+                status = "partial"
+                chunk_start = chunk_end + timedelta(days=1)
+                continue
+            metrics.fetch(label, time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            rows, partitions = load_pitches(db, df)
+            elapsed = time.perf_counter() - t0
+            metrics.table(TABLE, elapsed, inserted=rows)
+            total += rows
+            touched.update(partitions)
+            seasons.update(d.year for d in set(df["game_date"]))
+            print(f" {label}: {rows:,} pitches over {df['game_date'].nunique() if rows else 0} game date(s) "
+                  f"in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:,.0f} rows/s).")
+            chunk_start = chunk_end + timedelta(days=1)
+
+        if total:
+            with metrics.stage("publish"):
+                analyze_or_vacuum(db.run, sorted(touched) + DERIVED_TABLES)
+                bump_versions(db.run, {t: {"rows": total, "seasons": sorted(seasons)} for t in [TABLE] + DERIVED_TABLES},
+                              "statcast_pitches")
+        if not args.no_maintain:
+            with metrics.stage("maintain"):
+                metrics.count("partitions_dropped", len(apply_retention(db, today)))
+                metrics.count("partitions_compacted", len(compact_closed_months(db, today)))
+        print(f" Loaded {total:,} pitches into {len(touched)} partition(s).")
+        if seasons and min(seasons) < PITCH_LEVEL_FIRST_SEASON:
+            print(f" Note: loaded seasons before PITCH_LEVEL_FIRST_SEASON={PITCH_LEVEL_FIRST_SEASON}; "
+                  f"set it to {min(seasons)} for the app so the linter and router treat them as covered.")
+    except Exception:
+        status = "failed"
+        raise
+    finally:
+        db.close()
+        metrics.finish(status)
+
+
+if __name__ == "__main__":
+    main()
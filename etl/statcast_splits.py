@@ -0,0 +1,156 @@
+# etl/statcast_splits.py
+#
+# Maintains the statcast_splits cube (db/statcast_splits.sql) from
+# statcast_pitches. load_pitches() in etl/statcast_pitches.py calls apply_days()
+# inside its load transaction: with sign=-1 for the days it is about to delete
+# (their current pitches come back out of the cube), then with sign=+1 once the
+# new pitches are COPYed in. Only the loaded days are scanned, and the partition
+# pruning on game_date keeps that to the months they fall in.
+#
+# rebuild_splits() recomputes whole seasons from statcast_pitches -- for seasons
+# loaded before the cube existed, or to check the incremental path. Seasons
+# whose partitions were already dropped by retention are left alone (the cube
+# is the only copy of them).
+#
+# Usage (rebuild is also reachable as etl/statcast_pitches.py --rebuild-splits):
+#   .venv/Scripts/python etl/statcast_splits.py --seasons 2024 2025
+
+import argparse
+import socket
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import pg8000.native
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from etl.derived_tables import run_sql_file
+
+TABLE = "statcast_splits"
+DIMENSIONS = ["role", "player_id", "season", "stand", "p_throws", "balls", "strikes", "pitch_type"]
+
+# Pitch-level predicates (statcast_pitches columns)
+_SWING = ("description IN ('swinging_strike', 'swinging_strike_blocked', 'foul', 'foul_tip', 'foul_bunt', "
+          "'missed_bunt', 'bunt_foul_tip', 'hit_into_play')")
+_WHIFF = "description IN ('swinging_strike', 'swinging_strike_blocked', 'foul_tip', 'missed_bunt')"
+# events is set on the pitch that ended the PA -- and on baserunning plays that ended an inning mid-PA
+_PA = ("events IS NOT NULL AND events NOT IN ('truncated_pa', 'wild_pitch', 'passed_ball', 'other_advance') "
+       "AND events NOT LIKE 'caught_stealing%' AND events NOT LIKE 'pickoff%' AND events NOT LIKE 'stolen_base%'")
+_NOT_AB = ("'walk', 'intent_walk', 'hit_by_pitch', 'sac_fly', 'sac_fly_double_play', 'sac_bunt', "
+           "'sac_bunt_double_play', 'catcher_interf'")
+_WOBA_DEN = f"{_PA} AND events NOT IN ('intent_walk', 'sac_bunt', 'sac_bunt_double_play', 'catcher_interf')"
+
+# Cube column -> aggregate over one group of pitches, in db/statcast_splits.sql order
+MEASURES = {
+    "pitches": "COUNT(*)",
+    "swings": f"COUNT(*) FILTER (WHERE {_SWING})",
+    "whiffs": f"COUNT(*) FILTER (WHERE {_WHIFF})",
+    "called_strikes": "COUNT(*) FILTER (WHERE description = 'called_strike')",
+    "pa": f"COUNT(*) FILTER (WHERE {_PA})",
+    "ab": f"COUNT(*) FILTER (WHERE {_PA} AND events NOT IN ({_NOT_AB}))",
+    "h": "COUNT(*) FILTER (WHERE events IN ('single', 'double', 'triple', 'home_run'))",
+    "doubles": "COUNT(*) FILTER (WHERE events = 'double')",
+    "triples": "COUNT(*) FILTER (WHERE events = 'triple')",
+    "hr": "COUNT(*) FILTER (WHERE events = 'home_run')",
+    "bb": "COUNT(*) FILTER (WHERE events = 'walk')",
+    "ibb": "COUNT(*) FILTER (WHERE events = 'intent_walk')",
+    "hbp": "COUNT(*) FILTER (WHERE events = 'hit_by_pitch')",
+    "sf": "COUNT(*) FILTER (WHERE events IN ('sac_fly', 'sac_fly_double_play'))",
+    "so": "COUNT(*) FILTER (WHERE events IN ('strikeout', 'strikeout_double_play'))",
+    "bip": "COUNT(*) FILTER (WHERE type = 'X')",
+    "woba_sum": f"COALESCE(SUM(woba_value::numeric) FILTER (WHERE {_WOBA_DEN}), 0)",
+    # Savant's xwOBA: the speed/angle estimate on tracked balls in play, actual wOBA value otherwise
+    "xwoba_sum": ("COALESCE(SUM(CASE WHEN type = 'X' AND estimated_woba_using_speedangle IS NOT NULL "
+                  "THEN estimated_woba_using_speedangle::numeric ELSE COALESCE(woba_value::numeric, 0) END) "
+                  f"FILTER (WHERE {_WOBA_DEN}), 0)"),
+    "ev_sum": "COALESCE(SUM(launch_speed::numeric) FILTER (WHERE type = 'X'), 0)",
+    "ev_n": "COUNT(launch_speed) FILTER (WHERE type = 'X')",
+    "velo_sum": "COALESCE(SUM(release_speed::numeric), 0)",
+    "velo_n": "COUNT(release_speed)",
+}
+
+
+def _apply(db, where: str, sign: int, **params) -> int:
+    """Adds (sign=1) or subtracts (sign=-1) the pitches matching `where` into the cube.
+    Returns the number of cube rows touched. Pitches without a count or a side are skipped."""
+    sign = 1 if sign > 0 else -1
+    select = ",\n       ".join(f"{sign} * {expr}" for expr in MEASURES.values())
+    update = ", ".join(f"{c} = {TABLE}.{c} + EXCLUDED.{c}" for c in MEASURES)
+    db.run(f"""
+INSERT INTO {TABLE} ({", ".join(DIMENSIONS + list(MEASURES))})
+SELECT r.role, r.player_id, EXTRACT(YEAR FROM p.game_date)::smallint, p.stand, p.p_throws, p.balls, p.strikes,
+       COALESCE(NULLIF(p.pitch_type, ''), 'UN'),
+       {select}
+FROM statcast_pitches p
+CROSS JOIN LATERAL (VALUES ('batter', p.batter), ('pitcher', p.pitcher)) AS r(role, player_id)
+WHERE {where}
+  AND p.balls BETWEEN 0 AND 3 AND p.strikes BETWEEN 0 AND 2
+  AND p.stand IN ('L', 'R') AND p.p_throws IN ('L', 'R')
+GROUP BY 1, 2, 3, 4, 5, 6, 7, 8
+ON CONFLICT ({", ".join(DIMENSIONS)}) DO UPDATE SET {update}""", **params)
+    return db.row_count
+
+
+def apply_days(db, days, sign: int) -> int:
+    """Adds or subtracts the pitches currently stored for `days` (dates). Meant to run
+    inside the caller's load transaction; see load_pitches() in etl/statcast_pitches.py."""
+    if not days:
+        return 0
+    touched = _apply(db, "p.game_date = ANY(CAST(:days AS date[]))", sign,
+                     days=[d.isoformat() for d in sorted(days)])
+    if sign < 0:
+        # Groups the re-pull no longer contains would otherwise linger as all-zero rows
+        db.run(f"DELETE FROM {TABLE} WHERE pitches = 0 AND season = ANY(CAST(:seasons AS smallint[]))",
+               seasons=sorted({d.year for d in days}))
+    return touched
+
+
+def rebuild_splits(db, seasons) -> dict:
+    """Recomputes each season from statcast_pitches in its own transaction.
+    Returns season -> cube rows; seasons with no stored pitches are skipped."""
+    run_sql_file(db.run, ROOT / "db" / "statcast_splits.sql")
+    out = {}
+    for season in sorted(seasons):
+        lo, hi = date(season, 1, 1), date(season + 1, 1, 1)
+        bounds = {"lo": lo.isoformat(), "hi": hi.isoformat()}
+        if not db.run("SELECT 1 FROM statcast_pitches WHERE game_date >= CAST(:lo AS date) "
+                      "AND game_date < CAST(:hi AS date) LIMIT 1", **bounds):
+            print(f" statcast_splits {season}: no pitches stored (never loaded, or dropped by retention); skipped.")
+            continue
+        t0 = time.perf_counter()
+        try:
+            db.run("BEGIN;")
+            db.run(f"DELETE FROM {TABLE} WHERE season = :season", season=season)
+            out[season] = _apply(db, "p.game_date >= CAST(:lo AS date) AND p.game_date < CAST(:hi AS date)", 1,
+                                 **bounds)
+            db.run("COMMIT;")
+        except Exception:
+            db.run("ROLLBACK;")
+            raise
+        print(f" statcast_splits {season}: rebuilt {out[season]:,} rows in {time.perf_counter() - t0:.1f}s.")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild statcast_splits seasons from statcast_pitches.")
+    parser.add_argument("--seasons", type=int, nargs="+", required=True)
+    args = parser.parse_args()
+
+    from etl.update_savant_awsrds import DB_CONFIG
+    cfg = dict(DB_CONFIG)
+    try:
+        cfg["host"] = socket.gethostbyname(cfg["host"])
+    except Exception as e:
+        print(f"Warning: could not resolve IPv4 for host: {e}")
+    db = pg8000.native.Connection(**cfg, timeout=60)
+    try:
+        rebuild_splits(db, args.seasons)
+        db.run(f"ANALYZE {TABLE}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
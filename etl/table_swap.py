@@ -0,0 +1,173 @@
+# etl/table_swap.py
+#
+# Blue/green loads for the daily Savant job (SAVANT_UPSERT_METHOD=swap). The
+# in-place upsert merges into the live table while the app reads it; the swap
+# path in upsert_table_pg8000() instead:
+#   1. create_shadow(): copies the live rows into <table>__shadow with no
+#      indexes, then builds the live table's indexes (primary key included) on it;
+#   2. merges the changed rows into the shadow (the same COPY + ON CONFLICT as the
+#      in-place path) and ANALYZEs it;
+#   3. swap_in(): renames live -> <table>__old and shadow -> live, indexes
+#      included, in one transaction that only touches the catalog. Readers wait
+#      for that rename (at most SWAP_LOCK_TIMEOUT, after which the swap gives up
+#      and the shadow is rebuilt next run), never for the load itself.
+#
+# Views and materialized views follow a renamed table by OID, so after the swap
+# they still read <table>__old -- consistently, as of the previous load.
+# finish_swaps() (called once every table of the run is swapped) rebuilds each
+# dependent against the new tables -- a view is CREATE OR REPLACEd, a
+# materialized view is built as <view>__shadow and swapped in the same way --
+# and then drops the __old relations. A run that dies between a swap and
+# finish_swaps() leaves __old relations behind; the next run picks them up first.
+#
+# Only the Savant job writes these tables: a write to the live table between
+# create_shadow() and swap_in() would be lost. GRANTs on the live objects are
+# not copied to their replacements.
+
+import os
+import re
+
+SHADOW = "__shadow"
+OLD = "__old"
+SWAP_LOCK_TIMEOUT = os.getenv("SAVANT_SWAP_LOCK_TIMEOUT", "5s")
+
+_KINDS = {"r": "TABLE", "m": "MATERIALIZED VIEW", "v": "VIEW"}
+_MAX_IDENT = 63  # longer names are silently truncated by Postgres
+
+
+def _indexes(db, relation: str) -> list:
+    """(name, unique, primary, 'USING ...' tail of the definition) for each index on relation."""
+    rows = db.run("""
+SELECT i.relname, x.indisunique, x.indisprimary, pg_get_indexdef(i.oid)
+FROM pg_index x
+JOIN pg_class i ON i.oid = x.indexrelid
+JOIN pg_class t ON t.oid = x.indrelid
+WHERE t.relname = :rel AND t.relnamespace = 'public'::regnamespace
+ORDER BY x.indisprimary DESC, i.relname""", rel=relation)
+    return [(name, unique, primary, ddl[ddl.index(" USING "):]) for name, unique, primary, ddl in rows]
+
+
+def _build_indexes(db, source: str, target: str):
+    """Recreates source's indexes on target, each named <source index>__shadow."""
+    for name, unique, primary, using in _indexes(db, source):
+        shadow_name = name + SHADOW
+        if len(shadow_name) > _MAX_IDENT:
+            raise ValueError(f"index name {shadow_name!r} is longer than {_MAX_IDENT} characters")
+        db.run(f'CREATE {"UNIQUE " if unique else ""}INDEX "{shadow_name}" ON "{target}"{using}')
+        if primary:
+            db.run(f'ALTER TABLE "{target}" ADD CONSTRAINT "{shadow_name}" PRIMARY KEY USING INDEX "{shadow_name}"')
+
+
+def create_shadow(db, table: str) -> str:
+    """Builds <table>__shadow: the live rows, then the live indexes. Returns its name.
+    A shadow left by a failed run is dropped first."""
+    shadow = table + SHADOW
+    db.run(f'DROP TABLE IF EXISTS "{shadow}"')
+    db.run(f'CREATE TABLE "{shadow}" (LIKE "{table}" INCLUDING DEFAULTS)')
+    db.run(f'INSERT INTO "{shadow}" SELECT * FROM "{table}"')
+    _build_indexes(db, table, shadow)
+    return shadow
+
+
+def swap_in(db, relation: str, kind: str = "TABLE"):
+    """Renames relation -> relation__old and relation__shadow -> relation, with their
+    indexes, in one short transaction."""
+    shadow, old = relation + SHADOW, relation + OLD
+    names = [row[0] for row in _indexes(db, relation)]
+    try:
+        db.run("BEGIN;")
+        db.run(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'")
+        db.run(f'ALTER {kind} "{relation}" RENAME TO "{old}"')
+        db.run(f'ALTER {kind} "{shadow}" RENAME TO "{relation}"')
+        for name in names:
+            # Renaming a primary key's index renames the constraint with it
+            db.run(f'ALTER INDEX "{name}" RENAME TO "{name}{OLD}"')
+            db.run(f'ALTER INDEX "{name}{SHADOW}" RENAME TO "{name}"')
+        db.run("COMMIT;")
+    except Exception:
+        db.run("ROLLBACK;")
+        raise
+
+
+def _old_relations(db) -> dict:
+    rows = db.run("""
+SELECT c.relname, c.relkind FROM pg_class c
+WHERE c.relnamespace = 'public'::regnamespace AND c.relkind IN ('r', 'm', 'v')
+  AND right(c.relname, :n) = :suffix""", n=len(OLD), suffix=OLD)
+    return {name: kind for name, kind in rows}
+
+
+def _dependents(db, relations) -> list:
+    """(name, relkind, definition) of the views / materialized views reading any of relations."""
+    return db.run("""
+SELECT DISTINCT v.relname, v.relkind, pg_get_viewdef(v.oid)
+FROM pg_depend d
+JOIN pg_rewrite r ON r.oid = d.objid
+JOIN pg_class v ON v.oid = r.ev_class
+JOIN pg_class t ON t.oid = d.refobjid
+WHERE d.classid = 'pg_rewrite'::regclass AND v.oid <> t.oid
+  AND t.relnamespace = 'public'::regnamespace AND t.relname = ANY(CAST(:rels AS text[]))""",
+                  rels=sorted(relations))
+
+
+def _repoint(definition: str, olds) -> str:
+    """pg_get_viewdef() names the renamed relations; point the definition back at the live names."""
+    for old in sorted(olds, key=len, reverse=True):
+        definition = re.sub(rf'(?<![\w$])"?{re.escape(old)}"?(?![\w$])', old[:-len(OLD)], definition)
+    return definition.rstrip().rstrip(";")
+
+
+def _drop_unread(db) -> int:
+    """Drops the __old relations nothing reads any more (repeatedly, so an __old view
+    goes before the __old table under it). Returns how many were dropped."""
+    dropped = 0
+    while True:
+        olds = _old_relations(db)
+        read = {t for t in olds if db.run(
+            "SELECT 1 FROM pg_depend d JOIN pg_rewrite r ON r.oid = d.objid "
+            "JOIN pg_class t ON t.oid = d.refobjid "
+            "WHERE d.classid = 'pg_rewrite'::regclass AND r.ev_class <> t.oid "
+            "AND t.relnamespace = 'public'::regnamespace AND t.relname = :rel LIMIT 1", rel=t)}
+        unread = [t for t in olds if t not in read]
+        if not unread:
+            return dropped
+        for old in unread:
+            db.run(f'DROP {_KINDS[olds[old]]} "{old}"')
+            dropped += 1
+
+
+def finish_swaps(db) -> list:
+    """Rebuilds the views / materialized views still reading swapped-out __old relations,
+    then drops those relations. Returns the rebuilt dependents' names."""
+    rebuilt = []
+    # A rebuilt materialized view is itself swapped, leaving <view>__old (and anything
+    # reading it) for the next pass
+    while olds := _old_relations(db):
+        progress = _drop_unread(db)
+        for name, kind, definition in _dependents(db, olds):
+            if name in olds:
+                continue  # an __old reading an __old; dropped once unread
+            definition = _repoint(definition, olds)
+            if kind == "v":
+                try:
+                    db.run("BEGIN;")
+                    db.run(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'")
+                    db.run(f'CREATE OR REPLACE VIEW "{name}" AS {definition}')
+                    db.run("COMMIT;")
+                except Exception:
+                    db.run("ROLLBACK;")
+                    raise
+            else:
+                shadow = name + SHADOW
+                db.run(f'DROP MATERIALIZED VIEW IF EXISTS "{shadow}"')
+                db.run(f'CREATE MATERIALIZED VIEW "{shadow}" AS {definition}')
+                _build_indexes(db, name, shadow)
+                db.run(f'ANALYZE "{shadow}"')
+                swap_in(db, name, "MATERIALIZED VIEW")
+            print(f" Swap: rebuilt {name} against the swapped-in tables.")
+            rebuilt.append(name)
+            progress += 1
+        progress += _drop_unread(db)
+        if not progress:
+            raise RuntimeError(f"could not retire {', '.join(sorted(olds))}: still read by other __old relations")
+    return rebuilt
@@ -1,8 +1,11 @@
 # etl/update_savant_awsrds.py
 import os
 import io
+import math
 import time
+from collections import Counter
 from datetime import date
+from functools import partial
 from pathlib import Path
 import pandas as pd
 import pg8000.native
@@ -10,9 +13,17 @@ import pybaseball
 from pybaseball import chadwick_register
 from curl_cffi import requests
 from dotenv import load_dotenv
-import re
 import sys
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.publish import publish
+from etl import raw_store, savant_season, table_swap
+from etl.fetch_scheduler import FetchStats, run_fetch_jobs
+from etl.roster_fetcher import MlbApiClient, fetch_current_teams, write_rosters
+from etl.run_metrics import RunMetrics
+from etl.savant_schema import apply_schema, read_savant_csv, sql_type
+from nlp.names import add_name_columns
+
 # Enable caching to speed up pybaseball
 pybaseball.cache.enable()
 
@@ -29,29 +40,36 @@ DB_CONFIG = {
 
 YEAR = date.today().year
 
+# Raw landing zone (etl/raw_store.py): every download is kept under data/raw/.
+# SAVANT_REPLAY=latest (or a UTC date, e.g. 2026-07-04) re-runs transform/load
+# from the stored payloads as of then, without touching the network.
+REPLAY_AS_OF = os.getenv("SAVANT_REPLAY", "")
+
+def _replay_as_of(value):
+    return None if value in (None, "", "latest") else value
+
 # ---------------- Fetcher Logic ----------------
-def get_mlb_rosters(year: int) -> dict:
-    import requests
+def get_mlb_rosters(year: int, db: pg8000.native.Connection = None, metrics: RunMetrics = None) -> dict:
+    """player_id -> current team (Stats API abbreviation). Teams and players are fetched
+    together through the shared roster client (etl/roster_fetcher.py: pooled sessions,
+    retries, conditional requests); with `db`, the snapshot is also stored in mlb_rosters."""
     print(f"  Fetching active team rosters from MLB API ({year})...")
     mapping = {}
     try:
-        # First get teams
-        teams_url = f"http://statsapi.mlb.com/api/v1/teams?sportId=1&season={year}"
-        teams_data = requests.get(teams_url, timeout=10).json()
-        teams = {t['id']: t['abbreviation'] for t in teams_data.get('teams', [])}
-        
-        # Then get players
-        players_url = f"http://statsapi.mlb.com/api/v1/sports/1/players?season={year}"
-        players_data = requests.get(players_url, timeout=10).json()
-        for p in players_data.get('people', []):
-            if 'currentTeam' in p and 'id' in p['currentTeam']:
-                team_id = p['currentTeam']['id']
-                if team_id in teams:
-                    mapping[p['id']] = teams[team_id]
-        print(f"  Mapped {len(mapping)} players to teams.")
+        client = MlbApiClient(land_source="mlb_rosters", replay_as_of=REPLAY_AS_OF or None)
+        rows, mapping = fetch_current_teams(client, year)
+        print(f"  Mapped {len(mapping)} players to teams "
+              f"({client.counts['requests']} requests, {client.counts['not_modified']} not modified).")
+        if db is not None:
+            t0 = time.perf_counter()
+            changed = write_rosters(db.run, rows, year, "current")
+            if metrics is not None:
+                metrics.table("mlb_rosters", time.perf_counter() - t0, updated=changed,
+                              unchanged=max(len(rows) - changed, 0))
     except Exception as e:
         print(f"  Warning: failed to fetch rosters: {e}")
     return mapping
+
 def get_chadwick_map() -> pd.DataFrame:
     print("  Loading Chadwick ID Map...")
     cw = chadwick_register()
@@ -74,76 +92,120 @@ def fetch_savant_traditional(year: int, id_map: pd.DataFrame) -> pd.DataFrame:
     # OR better yet: Just use MLB's official JSON API for traditional stats to avoid name mapping entirely!
     pass
 
+SAVANT_BASE_URL = os.getenv("SAVANT_BASE_URL", "https://baseballsavant.mlb.com")
+BATTER_SELECTIONS = "hit,single,double,triple,home_run,strikeout,walk,b_k_percent,b_bb_percent,batting_avg,slg_percent,on_base_percent,on_base_plus_slg,isolated_power,b_rbi,b_total_bases,b_game,ab,pa,xba,xslg,xwoba,xobp,xiso,wobacon_diff,sweet_spot_percent,barrel_batted_rate,hard_hit_percent,exit_velocity_avg,launch_angle_avg,sprint_speed,hp_to_first,chase_percent,whiff_percent,zone_swing_percent,zone_contact_percent,meatball_swing_percent,meatball_percent,team,b_stolen_base"
+PITCHER_SELECTIONS = "p_game,p_started,p_save,p_win,p_loss,p_shutout,p_complete_game,p_strikeout,p_walk,p_era,p_earned_run,p_run,hit,p_home_run,batting_avg,on_base_percent,slg_percent,on_base_plus_slg,xba,xslg,xwoba,xobp,xiso,barrel_batted_rate,hard_hit_percent,exit_velocity_avg,launch_angle_avg,chase_percent,whiff_percent,zone_percent,putaway_percent,fastball_avg_speed,fastball_avg_spin,breaking_avg_spin,release_extension,team,b_stolen_base"
+
+# Fetch scheduler knobs (etl/fetch_scheduler.py): concurrent downloads, capped request rate
+FETCH_WORKERS = int(os.getenv("SAVANT_FETCH_WORKERS", "4"))
+FETCH_RATE = float(os.getenv("SAVANT_FETCH_RATE", "0.5"))  # requests/sec across all workers
+FETCH_ATTEMPTS = 4
+
+def savant_raw_key(year: int, player_type: str) -> str:
+    return f"{player_type}_{year}"
+
+def savant_csv_url(year: int, player_type: str) -> str:
+    # Add a timestamp to bypass any caching on Savant's side
+    ts = int(time.time())
+    selections = BATTER_SELECTIONS if player_type == 'batter' else PITCHER_SELECTIONS
+    # Force game_type=R (Regular Season) to avoid Spring Training data
+    return f"{SAVANT_BASE_URL}/leaderboard/custom?year={year}&type={player_type}&filter=&sort=4&sortDir=desc&min=0&selections={selections}&chart=false&x=hit&y=hit&r=no&chartType=scatter&game_type=R&csv=true&_={ts}"
+
+def parse_savant_csv(text: str) -> pd.DataFrame:
+    # Declared dtypes (etl/savant_schema.py) applied while parsing; column names come back
+    # cleaned: lowercase, spaces to underscores, remove all non-alphanumeric/underscore
+    df = read_savant_csv(text)
+
+    # Standardize the name column for search tool compatibility
+    if 'last_name_first_name' in df.columns:
+        df.rename(columns={'last_name_first_name': 'playername'}, inplace=True)
+    elif 'player_name' in df.columns:
+        df.rename(columns={'player_name': 'playername'}, inplace=True)
+
+    # Ensure BOTH 'playername' and 'player_name' exist to avoid UndefinedColumn errors
+    if 'playername' in df.columns:
+        df['player_name'] = df['playername']
+
+    # Fuzzy match for common columns if the 'b_' or 'p_' versions are missing or NaN
+    fuzzy_map = {
+        'b_total_hits': ['hit', 'h', 'hits'],
+        'b_single': ['single', '1b'],
+        'b_double': ['double', '2b'],
+        'b_triple': ['triple', '3b'],
+        'b_home_run': ['home_run', 'hr', 'homeruns'],
+        'b_strikeout': ['strikeout', 'so', 'k'],
+        'b_walk': ['walk', 'bb'],
+        'b_ab': ['ab', 'at_bats'],
+        'b_total_pa': ['b_total_pa', 'pa'],
+        'b_stolen_base': ['b_stolen_base', 'sb'],
+        'p_hit': ['hit', 'h', 'hits'],
+        'team': ['team_name', 'team_abbreviation', 'tm']
+    }
+    for target, alternatives in fuzzy_map.items():
+        if target not in df.columns or df[target].isnull().all():
+            for alt in alternatives:
+                if alt in df.columns and not df[alt].isnull().all():
+                    df[target] = df[alt]
+                    break
+
+    if 'player_id' not in df.columns and 'id' in df.columns:
+        df.rename(columns={'id': 'player_id'}, inplace=True)
+    return df
+
 # We will use Savant's custom CSV generator with curl_cffi because it contains literally everything!
 # It perfectly matches our schema and guarantees MLBAM ID for every row without messy name joining.
-def fetch_savant_master_csv(year: int, player_type: str) -> pd.DataFrame:
+def download_savant_csv(year: int, player_type: str) -> pd.DataFrame:
     """
+    One download attempt; raises on an HTTP error or a payload that isn't the
+    leaderboard CSV (so the fetch scheduler retries it).
     player_type: 'batter' or 'pitcher'
     """
     print(f"  Downloading {player_type.title()} Master CSV from Savant ({year})...")
-    # Add a timestamp to bypass any caching on Savant's side
-    ts = int(time.time())
-    # Force game_type=R (Regular Season) to avoid Spring Training data
-    if player_type == 'batter':
-        selections = "hit,single,double,triple,home_run,strikeout,walk,b_k_percent,b_bb_percent,batting_avg,slg_percent,on_base_percent,on_base_plus_slg,isolated_power,b_rbi,b_total_bases,b_game,ab,pa,xba,xslg,xwoba,xobp,xiso,wobacon_diff,sweet_spot_percent,barrel_batted_rate,hard_hit_percent,exit_velocity_avg,launch_angle_avg,sprint_speed,hp_to_first,chase_percent,whiff_percent,zone_swing_percent,zone_contact_percent,meatball_swing_percent,meatball_percent,team,b_stolen_base"
-    else:
-        selections = "p_game,p_started,p_save,p_win,p_loss,p_shutout,p_complete_game,p_strikeout,p_walk,p_era,p_earned_run,p_run,hit,p_home_run,batting_avg,on_base_percent,slg_percent,on_base_plus_slg,xba,xslg,xwoba,xobp,xiso,barrel_batted_rate,hard_hit_percent,exit_velocity_avg,launch_angle_avg,chase_percent,whiff_percent,zone_percent,putaway_percent,fastball_avg_speed,fastball_avg_spin,breaking_avg_spin,release_extension,team,b_stolen_base"
-    
-    url = f"https://baseballsavant.mlb.com/leaderboard/custom?year={year}&type={player_type}&filter=&sort=4&sortDir=desc&min=0&selections={selections}&chart=false&x=hit&y=hit&r=no&chartType=scatter&game_type=R&csv=true&_={ts}"
+    # Impersonate to bypass any basic scraping protections
+    url = savant_csv_url(year, player_type)
+    resp = requests.get(url, impersonate="chrome120", timeout=30)
+    if resp.status_code >= 400:
+        raise RuntimeError(f"HTTP {resp.status_code}")
+    t_parse = time.perf_counter()
+    df = parse_savant_csv(resp.text)
+    df.attrs.update(source_bytes=len(resp.content), parse_seconds=time.perf_counter() - t_parse)
+    if 'player_id' not in df.columns:
+        raise ValueError(f"unexpected payload (columns: {df.columns.tolist()[:5]})")
+    # Only payloads that parsed are landed, so a replay never picks up an error page
+    landed = raw_store.land("savant", savant_raw_key(year, player_type), url, resp.content)
 
-    for attempt in range(3):
-        try:
-            # Impersonate to bypass any basic scraping protections
-            resp = requests.get(url, impersonate="chrome120", timeout=30)
-            df = pd.read_csv(io.StringIO(resp.text))
-            
-            # Robust column cleaning: lowercase, spaces to underscores, remove all non-alphanumeric/underscore
-            df.columns = [re.sub(r'[^a-z0-9_]', '', c.lower().replace(' ', '_')) for c in df.columns]
-            
-            # Standardize the name column for search tool compatibility
-            if 'last_name_first_name' in df.columns:
-                df.rename(columns={'last_name_first_name': 'playername'}, inplace=True)
-            elif 'player_name' in df.columns:
-                df.rename(columns={'player_name': 'playername'}, inplace=True)
-            
-            # Ensure BOTH 'playername' and 'player_name' exist to avoid UndefinedColumn errors
-            if 'playername' in df.columns:
-                df['player_name'] = df['playername']
-                
-            # Fuzzy match for common columns if the 'b_' or 'p_' versions are missing or NaN
-            fuzzy_map = {
-                'b_total_hits': ['hit', 'h', 'hits'],
-                'b_single': ['single', '1b'],
-                'b_double': ['double', '2b'],
-                'b_triple': ['triple', '3b'],
-                'b_home_run': ['home_run', 'hr', 'homeruns'],
-                'b_strikeout': ['strikeout', 'so', 'k'],
-                'b_walk': ['walk', 'bb'],
-                'b_ab': ['ab', 'at_bats'],
-                'b_total_pa': ['b_total_pa', 'pa'],
-                'b_stolen_base': ['b_stolen_base', 'sb'],
-                'p_hit': ['hit', 'h', 'hits'],
-                'team': ['team_name', 'team_abbreviation', 'tm']
-            }
-            for target, alternatives in fuzzy_map.items():
-                if target not in df.columns or df[target].isnull().all():
-                    for alt in alternatives:
-                        if alt in df.columns and not df[alt].isnull().all():
-                            df[target] = df[alt]
-                            break
-
-            if 'player_id' not in df.columns and 'id' in df.columns:
-                df.rename(columns={'id': 'player_id'}, inplace=True)
-                
-            print(f" Success! Fetched {len(df)} rows.")
-            print(f" Debug: CSV Columns: {df.columns.tolist()}")
-            if not df.empty:
-                print(f" Debug: First row team: {df.iloc[0].get('team')}")
-            return df
-        except Exception as e:
-            print(f" Attempt {attempt+1} failed to download CSV: {e}")
-            time.sleep(2)
-            
+    print(f" Success! Fetched {len(df)} {player_type} rows ({year}); "
+          f"{'landed ' + landed.path if landed.new else 'unchanged since last fetch'}.")
+    print(f" Debug: CSV Columns: {df.columns.tolist()}")
+    if not df.empty:
+        print(f" Debug: First row team: {df.iloc[0].get('team')}")
+    return df
+
+def replay_savant_csv(year: int, player_type: str, as_of: str = None) -> pd.DataFrame:
+    """Parses the landed payload for (year, player_type) instead of downloading it.
+    as_of: None/'latest' for the newest, or a UTC date/timestamp."""
+    entry = raw_store.latest("savant", savant_raw_key(year, player_type), _replay_as_of(as_of))
+    if entry is None:
+        raise FileNotFoundError(f"no landed {player_type} CSV for {year}" + (f" as of {as_of}" if as_of else ""))
+    data = raw_store.read(entry)
+    t_parse = time.perf_counter()
+    df = parse_savant_csv(data.decode("utf-8"))
+    df.attrs.update(source_bytes=len(data), parse_seconds=time.perf_counter() - t_parse)
+    print(f" Replayed {len(df)} {player_type} rows ({year}) fetched {entry.fetched_at}.")
+    return df
+
+def savant_fetcher(replay_as_of: str = None):
+    """(fetch function, requests/sec, attempts) for run_fetch_jobs: Savant, or the landing zone."""
+    if replay_as_of:
+        return partial(replay_savant_csv, as_of=replay_as_of), 1000.0, 1
+    return download_savant_csv, FETCH_RATE, FETCH_ATTEMPTS
+
+def fetch_savant_master_csv(year: int, player_type: str) -> pd.DataFrame:
+    """Single (year, player_type) download with retries; empty frame if every attempt fails."""
+    result = next(run_fetch_jobs([(year, player_type)], download_savant_csv, workers=1,
+                                 rate=FETCH_RATE, max_attempts=3))
+    if result.ok:
+        return result.value
     print(" All attempts to download CSV failed.")
     return pd.DataFrame()
 
@@ -151,132 +213,373 @@ def fetch_savant_master_csv(year: int, player_type: str) -> pd.DataFrame:
 # ---------------- Database Logic ----------------
 def clean_and_normalize(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty: return df
-    out = df.copy()
-    for col in out.columns:
-        if out[col].dtype == object:
-            col_str = out[col].astype(str)
-            if col_str.str.contains('%').any():
-                out[col] = col_str.str.replace('%', '', regex=False).str.strip()
-            try: out[col] = pd.to_numeric(out[col], errors='ignore')
-            except: pass
-            
-    # Replace NaN with None for database compatibility
-    return out.where(pd.notnull(out), None)
+    # Frames from parse_savant_csv are already typed; this only casts anything
+    # declared that isn't (e.g. a frame built elsewhere). NaN/NA stay as-is --
+    # COPY writes them as NULL and _upsert_rows converts them to None.
+    out = apply_schema(df)
+
+    # "First Last" display name + folded search key, so queries don't have to
+    # flip Savant's "Last, First" playername per row (see nlp/names.py)
+    return add_name_columns(out)
 
 def create_table_if_not_exists(db: pg8000.native.Connection, df: pd.DataFrame, table_name: str, key_cols: list):
     cols = []
     for col in df.columns:
-        if col == 'year' or col == 'player_id': 
-            cols.append(f'"{col}" INT')
-        elif df[col].dtype == 'int64': 
-            cols.append(f'"{col}" INT')
-        elif df[col].dtype == 'float64': 
-            cols.append(f'"{col}" FLOAT')
-        elif df[col].dtype == 'bool':
-            cols.append(f'"{col}" BOOLEAN')
-        else: 
-            cols.append(f'"{col}" TEXT')
+        if col == ROW_HASH_COL:
+            cols.append(f'"{col}" BIGINT')
+        else:
+            # Declared type for known Savant columns, dtype-derived otherwise
+            cols.append(f'"{col}" {sql_type(col, df[col].dtype)}')
     
     col_def = ", ".join(cols)
     pk_def = ", ".join([f'"{k}"' for k in key_cols])
     sql = f'CREATE TABLE IF NOT EXISTS "{table_name}" ({col_def}, PRIMARY KEY ({pk_def}));'
     db.run(sql)
-    
+
+    # The (player_id, year) key can't serve "WHERE year = ..." leaderboards.
+    # Same name as db/indexes.sql so a new savant_* table starts out indexed.
+    if "year" in key_cols:
+        db.run(f'CREATE INDEX IF NOT EXISTS "{table_name}_year_idx" ON "{table_name}" ("year");')
+
     # Schema Evolution: Add missing columns if table already exists
     existing_cols = [row[0] for row in db.run(f"SELECT column_name FROM information_schema.columns WHERE table_name = '{table_name}'")]
     for col in df.columns:
         if col not in existing_cols:
             print(f" Adding missing column '{col}' to table '{table_name}'...")
             # Determine type
-            if df[col].dtype == 'float64':
-                col_type = "FLOAT"
-            elif df[col].dtype == 'int64':
-                col_type = "INT"
-            elif df[col].dtype == 'bool':
-                col_type = "BOOLEAN"
-            else:
-                col_type = "TEXT"
+            col_type = "BIGINT" if col == ROW_HASH_COL else sql_type(col, df[col].dtype)
             db.run(f'ALTER TABLE "{table_name}" ADD COLUMN "{col}" {col_type};')
 
-def upsert_table_pg8000(db: pg8000.native.Connection, df: pd.DataFrame, table_name: str, batch_size: int = 500):
-    if df.empty: return
-    all_cols = list(df.columns)
-    
-    # Define primary keys based on table
+    # Name lookups filter on the folded key (same index name as db/indexes.sql)
+    if "name_key" in df.columns:
+        db.run(f'CREATE INDEX IF NOT EXISTS "{table_name}_name_key_idx" ON "{table_name}" ("name_key");')
+
+# "copy" (default): COPY into a temp staging table + one INSERT ... SELECT ... ON CONFLICT.
+# "row": the original one-statement-per-row loop, kept for before/after timing.
+# "swap": merge into a shadow copy of the table, index + ANALYZE it, rename it in
+#   (etl/table_swap.py) -- readers never wait on the load, only on the rename.
+UPSERT_METHOD = os.getenv("SAVANT_UPSERT_METHOD", "copy")
+# Change detection: each row carries a hash of its values; rows whose hash
+# matches what's stored are skipped. SAVANT_FORCE_UPSERT=1 re-sends everything.
+ROW_HASH_COL = "row_hash"
+SKIP_UNCHANGED = os.getenv("SAVANT_FORCE_UPSERT", "") not in ("1", "true")
+
+def _key_cols(table_name: str) -> list:
     if table_name == "lahman_savant_bridge":
-        key_cols = ["playerid", "key_mlbam"]
-    else:
-        key_cols = ["player_id", "year"]
-        
+        return ["playerid", "key_mlbam"]
+    return ["player_id", "year"]
+
+def _conflict_sql(table_name: str, all_cols: list, key_cols: list) -> str:
+    key_cols_escaped = ", ".join([f'"{k}"' for k in key_cols])
     non_key_cols = [c for c in all_cols if c not in key_cols]
-    
-    # Auto-create the table
-    create_table_if_not_exists(db, df, table_name, key_cols)
-    
-    col_list = ", ".join([f'"{c}"' for c in all_cols])
+    if not non_key_cols:
+        # If all columns are keys, we just DO NOTHING on conflict
+        return f"ON CONFLICT ({key_cols_escaped}) DO NOTHING"
     set_clause = ", ".join([f'"{c}" = EXCLUDED."{c}"' for c in non_key_cols])
-    
-    # pg8000.native doesn't have a direct executemany for UPSERTS with dictionaries easily,
-    # so we'll use a transaction block with individual runs, which is still MUCH faster than
-    # individual round-trips if we don't commit between every row. 
-    # But for real speed, we'll use a single statement with many VALUES if possible, 
-    # OR just wrap the loop in a single transaction.
-    
-    # Optimization: Use a single transaction for the whole dataframe
+    return f"ON CONFLICT ({key_cols_escaped}) DO UPDATE SET {set_clause}"
+
+def _upsert_rows(db: pg8000.native.Connection, df: pd.DataFrame, table_name: str, key_cols: list):
+    """One INSERT ... ON CONFLICT per row inside a single transaction (one round-trip per row)."""
+    all_cols = list(df.columns)
+    col_list = ", ".join([f'"{c}"' for c in all_cols])
+    # Use named placeholders (:col) which is most stable for pg8000.native
+    placeholders = ", ".join([f":{c}" for c in all_cols])
+    sql = f'INSERT INTO "{table_name}" ({col_list}) VALUES ({placeholders}) {_conflict_sql(table_name, all_cols, key_cols)}'
     try:
         db.run("BEGIN;")
-        key_cols_escaped = ", ".join([f'"{k}"' for k in key_cols])
-        # Use named placeholders (:col) which is most stable for pg8000.native 
-        placeholders = ", ".join([f":{c}" for c in all_cols])
-        
-        if not non_key_cols:
-            # If all columns are keys, we just DO NOTHING on conflict
-            sql = f'INSERT INTO "{table_name}" ({col_list}) VALUES ({placeholders}) ON CONFLICT ({key_cols_escaped}) DO NOTHING'
-        else:
-            set_clause = ", ".join([f'"{c}" = EXCLUDED."{c}"' for c in non_key_cols])
-            sql = f'INSERT INTO "{table_name}" ({col_list}) VALUES ({placeholders}) ON CONFLICT ({key_cols_escaped}) DO UPDATE SET {set_clause}'
-        
-        # Batching logic
-        records = df.to_dict('records')
-        for row in records:
+        # NaN / pd.NA -> None so pg8000 sends NULL
+        for row in df.astype(object).where(df.notna(), None).to_dict('records'):
             db.run(sql, **row)
         db.run("COMMIT;")
-    except Exception as e:
+    except Exception:
         db.run("ROLLBACK;")
-        print(f" Batch update failed for {table_name}: {e}")
-        raise e
+        raise
 
-def update_id_bridge(db: pg8000.native.Connection):
-    print("  Updating Lahman-Savant ID Bridge (this may take a moment on first run)...")
-    cache_path = "chadwick_register.csv"
+def _upsert_copy(db: pg8000.native.Connection, df: pd.DataFrame, table_name: str, key_cols: list):
+    """Streams the frame into a temp staging table with COPY FROM STDIN, then merges it
+    with a single INSERT ... SELECT ... ON CONFLICT DO UPDATE. Two round-trips total."""
+    all_cols = list(df.columns)
+    col_list = ", ".join([f'"{c}"' for c in all_cols])
+
+    # Stage with the target's column types, except integers: columns outside the
+    # declared schema can carry nullable ints as floats ("12.0"), which COPY won't read into INT. Staging
+    # them as NUMERIC lets the INSERT's assignment cast round them, the same
+    # float -> int conversion the per-row path got from its float8 parameters.
+    target_types = dict(db.run(
+        "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = :t",
+        t=table_name,
+    ))
+    stage_cols = []
+    for c in all_cols:
+        col_type = target_types.get(c, "text")
+        if col_type in ("integer", "bigint", "smallint"):
+            col_type = "numeric"
+        stage_cols.append(f'"{c}" {col_type}')
+    stage = f"_stage_{table_name}"
+
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False, na_rep="\\N")
+    buf.seek(0)
     try:
-        df_bridge = None
-        # Use local cache if it exists and is less than 7 days old
-        if os.path.exists(cache_path):
-            file_age = time.time() - os.path.getmtime(cache_path)
-            if file_age < 86400 * 7:
-                print(" Using cached player lookup table.")
-                df_bridge = pd.read_csv(cache_path)
-
-        if df_bridge is None:
-            print("Gathering player lookup table via pybaseball...")
-            # Use pybaseball's native register which handles split files automatically
-            df_bridge = chadwick_register()
-            df_bridge.to_csv(cache_path, index=False)
-            print(" Downloaded and cached new player lookup table.")
-
-        # Process and clean
-        bridge = df_bridge[['key_mlbam', 'key_bbref', 'name_first', 'name_last']].dropna(subset=['key_mlbam', 'key_bbref'])
-        bridge.rename(columns={'key_bbref': 'playerid'}, inplace=True)
-        bridge['key_mlbam'] = bridge['key_mlbam'].astype(int)
-        bridge['playername'] = bridge['name_first'] + ' ' + bridge['name_last']
-        
-        # Sync to DB
-        upsert_table_pg8000(db, bridge[['key_mlbam', 'playerid', 'playername']], "lahman_savant_bridge")
-        print(f" Bridge updated with {len(bridge)} mappings.")
+        db.run("BEGIN;")
+        db.run(f'CREATE TEMP TABLE "{stage}" ({", ".join(stage_cols)}) ON COMMIT DROP;')
+        db.run(f"""COPY "{stage}" ({col_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')""", stream=buf)
+        db.run(
+            f'INSERT INTO "{table_name}" ({col_list}) SELECT {col_list} FROM "{stage}" '
+            f'{_conflict_sql(table_name, all_cols, key_cols)}'
+        )
+        db.run("COMMIT;")
+    except Exception:
+        db.run("ROLLBACK;")
+        raise
+
+def _upsert_swap(db: pg8000.native.Connection, df: pd.DataFrame, table_name: str, key_cols: list):
+    """Blue/green: the COPY merge goes into a fresh shadow copy of the table, which is
+    ANALYZEd and renamed in. Views reading the table move over in table_swap.finish_swaps()."""
+    shadow = table_swap.create_shadow(db, table_name)
+    _upsert_copy(db, df, shadow, key_cols)
+    db.run(f'ANALYZE "{shadow}"')
+    table_swap.swap_in(db, table_name)
+
+def _canon_value(v) -> str:
+    """Stable text form for hashing: NULL/NaN -> '', 12.0 -> '12', floats to 6 places.
+    Keeps a value's hash the same whether pandas parsed it as int, float or object."""
+    if v is None or v is pd.NA or (isinstance(v, float) and math.isnan(v)):
+        return ""
+    if isinstance(v, float):
+        return str(int(v)) if v.is_integer() else repr(round(v, 6))
+    return str(v)
+
+def add_row_hash(df: pd.DataFrame, key_cols: list) -> pd.DataFrame:
+    """Adds ROW_HASH_COL: a 64-bit hash of each row's non-key values, in column order.
+    Adding or reordering columns in a schema_map re-sends every row once."""
+    value_cols = [c for c in df.columns if c not in key_cols and c != ROW_HASH_COL]
+    canon = df[value_cols].apply(lambda col: col.map(_canon_value))
+    canon.columns = range(len(value_cols))  # hash values only, so renames alone don't matter
+    out = df.copy()
+    out[ROW_HASH_COL] = pd.util.hash_pandas_object(canon, index=False).values.view("int64")
+    return out
+
+def _split_changed(db: pg8000.native.Connection, df: pd.DataFrame, table_name: str, key_cols: list):
+    """(new rows, changed rows, unchanged count) against the hashes already stored."""
+    where, params = "", {}
+    if "year" in key_cols:
+        # Only the seasons being loaded -- the daily job never reads back history
+        years = sorted({int(y) for y in df["year"].dropna()})
+        where, params = "WHERE year = ANY(:years)", {"years": years}
+    key_list = ", ".join(f'"{k}"' for k in key_cols)
+    stored = {
+        tuple(_canon_value(v) for v in row[:-1]): row[-1]
+        for row in db.run(f'SELECT {key_list}, "{ROW_HASH_COL}" FROM "{table_name}" {where}', **params)
+    }
+    keys = list(zip(*(df[k].map(_canon_value) for k in key_cols)))
+    existing = pd.Series([k in stored for k in keys], index=df.index)
+    same = pd.Series([stored.get(k) == h for k, h in zip(keys, df[ROW_HASH_COL])], index=df.index)
+    return df[~existing], df[existing & ~same], int((existing & same).sum())
+
+def upsert_table_pg8000(db: pg8000.native.Connection, df: pd.DataFrame, table_name: str, method: str = None,
+                        skip_unchanged: bool = None, metrics: RunMetrics = None):
+    """Upserts df into table_name on its key columns, creating/evolving the table first.
+    Rows whose content hash matches the stored ROW_HASH_COL are not sent at all.
+    Returns a Counter of inserted/updated/unchanged rows plus upsert seconds, and
+    prints rows/sec so the two methods can be compared. Also recorded on `metrics` if given."""
+    counts = Counter()
+    if df.empty: return counts
+    method = method or UPSERT_METHOD
+    skip_unchanged = SKIP_UNCHANGED if skip_unchanged is None else skip_unchanged
+    key_cols = _key_cols(table_name)
+
+    # ON CONFLICT can't touch the same key twice in one statement; last row wins,
+    # same as the per-row loop
+    df = df.drop_duplicates(subset=[k for k in key_cols if k in df.columns], keep="last")
+    df = add_row_hash(df, key_cols)
+
+    # Auto-create the table
+    create_table_if_not_exists(db, df, table_name, key_cols)
+
+    if skip_unchanged:
+        new, changed, counts["unchanged"] = _split_changed(db, df, table_name, key_cols)
+        counts["inserted"], counts["updated"] = len(new), len(changed)
+        df = pd.concat([new, changed])
+    else:
+        counts["updated"] = len(df)  # not compared; counted as written
+
+    t0 = time.perf_counter()
+    if not df.empty:
+        try:
+            if method == "row":
+                _upsert_rows(db, df, table_name, key_cols)
+            elif method == "swap":
+                _upsert_swap(db, df, table_name, key_cols)
+            else:
+                _upsert_copy(db, df, table_name, key_cols)
+        except Exception as e:
+            print(f" Batch update failed for {table_name}: {e}")
+            raise e
+    elapsed = time.perf_counter() - t0
+    counts["seconds"] = elapsed
+    print(f"  {table_name}: {counts['inserted']} inserted, {counts['updated']} updated, "
+          f"{counts['unchanged']} unchanged; {len(df)} rows in {elapsed:.2f}s "
+          f"({len(df) / max(elapsed, 1e-6):,.0f} rows/sec, {method})")
+    if metrics is not None:
+        metrics.table(table_name, elapsed, counts["inserted"], counts["updated"], counts["unchanged"])
+    return counts
+
+def print_upsert_summary(totals: Counter, label: str = "Upsert"):
+    written = totals["inserted"] + totals["updated"]
+    print(f" {label}: {totals['inserted']} inserted, {totals['updated']} updated, "
+          f"{totals['unchanged']} unchanged; {written} rows written in {totals['seconds']:.2f}s "
+          f"({written / max(totals['seconds'], 1e-6):,.0f} rows/sec, {UPSERT_METHOD}).")
+
+# Compact bridge-only slice of the Chadwick register: the ~25k rows with both a
+# MLBAM and a BBREF id, three columns, as Parquet. Rebuilt from the register
+# (which also lands in data/raw/) when older than 7 days. On the daily workflow
+# it survives between runs only through the Actions cache of data/cache/; a
+# cold runner rebuilds it from the register.
+BRIDGE_CACHE = Path(os.getenv("CHADWICK_BRIDGE_CACHE")
+                    or Path(__file__).resolve().parents[1] / "data" / "cache" / "chadwick_bridge.parquet")
+BRIDGE_CACHE_DAYS = 7
+BRIDGE_COLUMNS = ['key_mlbam', 'playerid', 'playername']
+
+def _compact_bridge(df_register: pd.DataFrame) -> pd.DataFrame:
+    bridge = df_register[['key_mlbam', 'key_bbref', 'name_first', 'name_last']].dropna(subset=['key_mlbam', 'key_bbref'])
+    bridge = bridge.rename(columns={'key_bbref': 'playerid'})
+    bridge['key_mlbam'] = bridge['key_mlbam'].astype('int32')
+    bridge['playername'] = bridge['name_first'] + ' ' + bridge['name_last']
+    return bridge[BRIDGE_COLUMNS].drop_duplicates(['playerid', 'key_mlbam'], keep='last').reset_index(drop=True)
+
+def load_bridge_mappings() -> pd.DataFrame:
+    """(key_mlbam, playerid, playername) from the Parquet cache, the landed register
+    when replaying, or a fresh chadwick_register() download."""
+    if REPLAY_AS_OF:
+        entry = raw_store.latest("chadwick", "register", _replay_as_of(REPLAY_AS_OF))
+        if entry is None:
+            raise FileNotFoundError("no landed Chadwick register to replay")
+        print(f" Using landed player lookup table ({entry.fetched_at}).")
+        return _compact_bridge(pd.read_csv(io.BytesIO(raw_store.read(entry)),
+                                           usecols=['key_mlbam', 'key_bbref', 'name_first', 'name_last']))
+
+    if BRIDGE_CACHE.exists() and time.time() - BRIDGE_CACHE.stat().st_mtime < 86400 * BRIDGE_CACHE_DAYS:
+        print(f" Using cached bridge mappings ({BRIDGE_CACHE.name}).")
+        return pd.read_parquet(BRIDGE_CACHE)
+
+    print("Gathering player lookup table via pybaseball...")
+    # Use pybaseball's native register which handles split files automatically
+    df_register = chadwick_register()
+    landed = raw_store.land("chadwick", "register", "pybaseball.chadwick_register()",
+                            df_register.to_csv(index=False))
+    bridge = _compact_bridge(df_register)
+    BRIDGE_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    bridge.to_parquet(BRIDGE_CACHE, index=False)
+    print(f" Downloaded new player lookup table ({'landed ' + landed.path if landed.new else 'unchanged'}); "
+          f"cached {len(bridge)} mappings.")
+    return bridge
+
+def update_id_bridge(db: pg8000.native.Connection, metrics: RunMetrics = None):
+    """Diffs the register's mappings against lahman_savant_bridge and COPY-upserts only
+    new (playerid, key_mlbam) pairs and changed names. Mappings that disappeared from
+    the register are reported, not deleted."""
+    print("  Updating Lahman-Savant ID Bridge...")
+    table = "lahman_savant_bridge"
+    try:
+        bridge = load_bridge_mappings()
+        key_cols = _key_cols(table)
+        create_table_if_not_exists(db, bridge, table, key_cols)
+
+        current = pd.DataFrame(db.run(f'SELECT playerid, key_mlbam, playername FROM "{table}"'),
+                               columns=['playerid', 'key_mlbam', 'playername']).astype({'key_mlbam': 'int64'})
+        diff = bridge.merge(current, on=key_cols, how='left', suffixes=('', '_db'), indicator=True)
+        is_new = diff['_merge'] == 'left_only'
+        is_changed = (diff['_merge'] == 'both') & (diff['playername'].fillna('') != diff['playername_db'].fillna(''))
+        delta = diff.loc[is_new | is_changed, BRIDGE_COLUMNS]
+        stale = len(current) - int((diff['_merge'] == 'both').sum())
+
+        t0 = time.perf_counter()
+        if not delta.empty:
+            _upsert_copy(db, delta, table, key_cols)
+        elapsed = time.perf_counter() - t0
+        if metrics is not None:
+            metrics.table(table, elapsed, inserted=int(is_new.sum()), updated=int(is_changed.sum()),
+                          unchanged=len(bridge) - len(delta))
+        print(f" Bridge: {int(is_new.sum())} new, {int(is_changed.sum())} renamed, "
+              f"{len(bridge) - len(delta)} unchanged of {len(bridge)} mappings in {elapsed:.2f}s"
+              + (f"; {stale} mappings in the table are no longer in the register (left as-is)" if stale else "") + ".")
     except Exception as e:
         print(f" Could not update ID bridge: {e}")
 
+# ---------------- Writer stage ----------------
+def write_batting(db: pg8000.native.Connection, df_bat: pd.DataFrame, player_team_map: dict,
+                  metrics: RunMetrics = None):
+    """Clean one season's batter CSV and upsert it into savant_batting_season.
+    Returns a Counter of inserted/updated/unchanged rows and upsert seconds."""
+    totals = Counter()
+    if df_bat.empty:
+        return totals
+    df_bat = clean_and_normalize(df_bat)
+
+    # Apply accurate team map
+    if player_team_map:
+        if 'team' not in df_bat.columns:
+            df_bat['team'] = None
+        df_bat['team'] = df_bat['player_id'].map(player_team_map).fillna(df_bat['team']).fillna('FA')
+
+    # Map the exact Savant columns to our schema
+    if 'b_home_run' not in df_bat.columns or df_bat['b_home_run'].isnull().all():
+        print(f"  Debug: Raw CSV Headers: {list(df_bat.columns)[:20]}")
+        if not df_bat.empty:
+            print(f"  Debug: First row values: {df_bat.iloc[0].to_dict()}")
+
+    # DEBUG: Print Top 5 HR leaders to verify data freshness
+    if 'b_home_run' in df_bat.columns:
+        # Fill NaNs with 0 for sorting
+        df_bat['b_home_run'] = pd.to_numeric(df_bat['b_home_run'], errors='coerce').fillna(0)
+        top_hr = df_bat.sort_values('b_home_run', ascending=False).head(5)
+        print(f" Verification: Top 5 HR Leaders in fetched {YEAR} Regular Season data:")
+        for _, row in top_hr.iterrows():
+            print(f"   - {row.get('playername', 'Unknown')} ({row.get('team', '???')}): {row['b_home_run']} HR (PA: {row.get('b_total_pa', 0)})")
+    else:
+        print(" Warning: 'b_home_run' column not found in fetched data!")
+        print(f"   Available columns: {list(df_bat.columns)[:10]}...")
+
+    # Calculate BB/K
+    if 'b_walk' in df_bat.columns and 'b_strikeout' in df_bat.columns:
+        df_bat['bb_k'] = df_bat['b_walk'] / df_bat['b_strikeout'].replace(0, 1) # prevent div by 0
+
+    # One wide row per player; the savant_batting_* names are views over it (etl/savant_season.py)
+    table = savant_season.SEASON_TABLES['batter']
+    frame, groups = savant_season.season_frame(df_bat, table)
+    if groups:
+        print(f" Updating {table} ({', '.join(g.rsplit('_', 1)[1] for g in groups)})...")
+        totals.update(upsert_table_pg8000(db, frame, table, metrics=metrics))
+        savant_season.ensure_compat_views(db.run, table)
+    return totals
+
+def write_pitching(db: pg8000.native.Connection, df_pit: pd.DataFrame, player_team_map: dict,
+                  metrics: RunMetrics = None):
+    """Clean one season's pitcher CSV and upsert it into savant_pitching_season.
+    Returns a Counter of inserted/updated/unchanged rows and upsert seconds."""
+    totals = Counter()
+    if df_pit.empty:
+        return totals
+    df_pit = clean_and_normalize(df_pit)
+
+    # Apply accurate team map
+    if player_team_map:
+        if 'team' not in df_pit.columns:
+            df_pit['team'] = None
+        df_pit['team'] = df_pit['player_id'].map(player_team_map).fillna(df_pit['team']).fillna('FA')
+
+    if 'p_walk' in df_pit.columns and 'p_strikeout' in df_pit.columns:
+        df_pit['bb_k'] = df_pit['p_walk'] / df_pit['p_strikeout'].replace(0, 1)
+
+    table = savant_season.SEASON_TABLES['pitcher']
+    frame, groups = savant_season.season_frame(df_pit, table)
+    if groups:
+        print(f" Updating {table} ({', '.join(g.rsplit('_', 1)[1] for g in groups)})...")
+        totals.update(upsert_table_pg8000(db, frame, table, metrics=metrics))
+        savant_season.ensure_compat_views(db.run, table)
+    return totals
+
 # ---------------- MAIN ----------------
 def main():
     print(f" Connecting to AWS RDS at {DB_CONFIG['host'][:4]}***:{DB_CONFIG['port']}...")
@@ -288,6 +591,8 @@ def main():
     except Exception as e:
         print(f" Warning: Could not resolve IPv4 for host: {e}")
 
+    metrics = RunMetrics("savant_daily")
+    status = "ok"
     db = None
     # Retry connection in case SG hasn't propagated yet
     for i in range(10):
@@ -301,93 +606,63 @@ def main():
             time.sleep(10)
     
     try:
-        # Update the ID bridge once per run to keep joins working
-        # update_id_bridge(db)
+        savant_season.require_migrated(db.run)
+        if UPSERT_METHOD == "swap":
+            # Finish whatever a previous swap run left half done before swapping again
+            with metrics.stage("swap_dependents"):
+                table_swap.finish_swaps(db)
+
+        # Update the ID bridge once per run to keep joins working (a diff, so cheap)
+        with metrics.stage("id_bridge"):
+            update_id_bridge(db, metrics=metrics)
         
         # Fetch Live Rosters for accurate teams
-        player_team_map = get_mlb_rosters(YEAR)
+        with metrics.stage("rosters"):
+            player_team_map = get_mlb_rosters(YEAR, db, metrics)
+        upsert_totals = Counter()
         
-        # ---- BATTING ----
-        df_bat = fetch_savant_master_csv(YEAR, 'batter')
-        if not df_bat.empty:
-            df_bat = clean_and_normalize(df_bat)
-            
-            # Apply accurate team map
-            if player_team_map:
-                if 'team' not in df_bat.columns:
-                    df_bat['team'] = None
-                df_bat['team'] = df_bat['player_id'].map(player_team_map).fillna(df_bat['team']).fillna('FA')
-
-            # Map the exact Savant columns to our schema
-            if 'b_home_run' not in df_bat.columns or df_bat['b_home_run'].isnull().all():
-                print(f"  Debug: Raw CSV Headers: {list(df_bat.columns)[:20]}")
-                if not df_bat.empty:
-                    print(f"  Debug: First row values: {df_bat.iloc[0].to_dict()}")
-
-            # DEBUG: Print Top 5 HR leaders to verify data freshness
-            if 'b_home_run' in df_bat.columns:
-                # Fill NaNs with 0 for sorting
-                df_bat['b_home_run'] = pd.to_numeric(df_bat['b_home_run'], errors='coerce').fillna(0)
-                top_hr = df_bat.sort_values('b_home_run', ascending=False).head(5)
-                print(f" Verification: Top 5 HR Leaders in fetched {YEAR} Regular Season data:")
-                for _, row in top_hr.iterrows():
-                    print(f"   - {row.get('playername', 'Unknown')} ({row.get('team', '???')}): {row['b_home_run']} HR (PA: {row.get('b_total_pa', 0)})")
-            else:
-                print(" Warning: 'b_home_run' column not found in fetched data!")
-                print(f"   Available columns: {list(df_bat.columns)[:10]}...")
-            
-            # Map the exact Savant columns to our schema
-            schema_map = {
-                "savant_batting_traditional": ['player_id','year','playername','player_name','team','b_game','b_ab','b_total_pa','b_total_hits','b_single','b_double','b_triple','b_home_run','b_rbi','b_walk','b_strikeout','b_stolen_base'],
-                "savant_batting_ratios": ['player_id','year','playername','player_name','batting_avg','on_base_percent','slg_percent','on_base_plus_slg','isolated_power','b_bb_percent','b_k_percent'],
-                "savant_batting_expected": ['player_id','year','playername','player_name','xwoba','xba','xslg','xobp','xiso','wobacon_diff','sweet_spot_percent','barrel_batted_rate','hard_hit_percent'],
-                "savant_batting_physics": ['player_id','year','playername','player_name','exit_velocity_avg','launch_angle_avg','sprint_speed','hp_to_first'],
-                "savant_batting_discipline": ['player_id','year','playername','player_name','zone_swing_percent','zone_contact_percent','chase_percent','whiff_percent','meatball_swing_percent','meatball_percent']
-            }
-            
-            # Calculate BB/K
-            if 'b_walk' in df_bat.columns and 'b_strikeout' in df_bat.columns:
-                df_bat['bb_k'] = df_bat['b_walk'] / df_bat['b_strikeout'].replace(0, 1) # prevent div by 0
-                schema_map["savant_batting_ratios"].append('bb_k')
-
-            for table, cols in schema_map.items():
-                valid = [col for col in cols if col in df_bat.columns]
-                if len(valid) >= 3:
-                    print(f" Updating {table}...")
-                    upsert_table_pg8000(db, df_bat[valid], table)
-                    
-        # ---- PITCHING ----
-        df_pit = fetch_savant_master_csv(YEAR, 'pitcher')
-        if not df_pit.empty:
-            df_pit = clean_and_normalize(df_pit)
-            
-            # Apply accurate team map
-            if player_team_map:
-                if 'team' not in df_pit.columns:
-                    df_pit['team'] = None
-                df_pit['team'] = df_pit['player_id'].map(player_team_map).fillna(df_pit['team']).fillna('FA')
-            
-            schema_map = {
-                "savant_pitching_traditional": ['player_id','year','playername','player_name','team','p_game','p_started','p_win','p_loss','p_save','p_shutout','p_complete_game','p_strikeout','p_walk','p_earned_run','p_run','p_hit','p_home_run'],
-                "savant_pitching_ratios": ['player_id','year','playername','player_name','p_era','batting_avg','on_base_percent','slg_percent'],
-                "savant_pitching_expected": ['player_id','year','playername','player_name','xwoba','xba','xslg','xobp','xiso','barrel_batted_rate','hard_hit_percent'],
-                "savant_pitching_physics": ['player_id','year','playername','player_name','exit_velocity_avg','launch_angle_avg','fastball_avg_speed','fastball_avg_spin','breaking_avg_spin','release_extension'],
-                "savant_pitching_discipline": ['player_id','year','playername','player_name','chase_percent','whiff_percent','zone_percent','putaway_percent']
-            }
-            
-            if 'p_walk' in df_pit.columns and 'p_strikeout' in df_pit.columns:
-                df_pit['bb_k'] = df_pit['p_walk'] / df_pit['p_strikeout'].replace(0, 1)
-                schema_map["savant_pitching_ratios"].append('bb_k')
-                
-            for table, cols in schema_map.items():
-                valid = [col for col in cols if col in df_pit.columns]
-                if len(valid) >= 3:
-                    print(f" Updating {table}...")
-                    upsert_table_pg8000(db, df_pit[valid], table)
-                    
-        print(" Finished.")
+        # Both CSVs download concurrently (rate-limited, retried); each one is
+        # written as soon as it arrives instead of waiting for the other
+        t_start = time.perf_counter()
+        fetch_stats = FetchStats()
+        writers = {'batter': write_batting, 'pitcher': write_pitching}
+        fetch, rate, attempts = savant_fetcher(REPLAY_AS_OF)
+        if REPLAY_AS_OF:
+            print(f" Replaying landed payloads ({REPLAY_AS_OF}) instead of downloading.")
+        for result in run_fetch_jobs([(YEAR, 'batter'), (YEAR, 'pitcher')], fetch,
+                                     workers=FETCH_WORKERS, rate=rate,
+                                     max_attempts=attempts, stats=fetch_stats):
+            year, player_type = result.job
+            attrs = result.value.attrs if result.ok else {}
+            metrics.fetch(f"{player_type}/{year}", result.seconds, attrs.get("source_bytes", 0),
+                          attrs.get("parse_seconds", 0.0), result.attempts, result.ok)
+            if not result.ok:
+                print(f" All attempts to download the {player_type} CSV failed.")
+                status = "partial"
+                continue
+            upsert_totals.update(writers[player_type](db, result.value, player_team_map, metrics=metrics))
+
+        print_upsert_summary(upsert_totals, label="Run summary")
+        if UPSERT_METHOD == "swap":
+            # The player-season views still read the swapped-out tables until rebuilt
+            with metrics.stage("swap_dependents"):
+                table_swap.finish_swaps(db)
+
+        # ANALYZE the tables this run changed, refresh the views/leaders that read
+        # them and bump data_versions; a run that changed nothing skips all of it.
+        # Only the current season's Savant rows change; older seasons are stable.
+        touched = {table: {"rows": t["rows"], "seasons": None if table == "lahman_savant_bridge" else [YEAR]}
+                   for table, t in metrics.tables.items()}
+        publish(db.run, touched, "savant_daily", metrics)
+
+        print(f" Finished in {time.perf_counter() - t_start:.1f}s wall "
+              f"({fetch_stats.jobs} downloads, {fetch_stats.retries} retries, {fetch_stats.failed} failed).")
+    except Exception:
+        status = "failed"
+        raise
     finally:
         db.close()
+        metrics.finish(status)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,23 @@
+# nlp/coverage.py
+#
+# Which seasons the pitch-level tables cover, shared by the loader
+# (etl/statcast_pitches.py) and the query side (linter, template router,
+# prompt, How to Use page). statcast_splits and batting_game_logs /
+# batting_rolling / batting_streaks keep every season etl/statcast_pitches.py
+# has loaded -- retention (STATCAST_KEEP_SEASONS) drops only the raw pitches --
+# so coverage runs from the first season loaded through the current one.
+# PITCH_LEVEL_FIRST_SEASON is that first season; set it when a historical
+# backfill (etl/statcast_pitches.py --start before the retention window) adds
+# older seasons. The template router narrows this to what the tables actually
+# hold once it has a connection (template_router.init_coverage()).
+# Pure standard library, like nlp/names.py.
+
+import os
+from datetime import date
+
+PITCH_LEVEL_FIRST_SEASON = int(os.getenv("PITCH_LEVEL_FIRST_SEASON", "2024"))
+
+
+def pitch_level_seasons(current_year: int | None = None) -> range:
+    """Seasons statcast_splits and the batting game-log tables can hold."""
+    return range(PITCH_LEVEL_FIRST_SEASON, int(current_year or date.today().year) + 1)
@@ -0,0 +1,315 @@
+# nlp/decorrelate.py
+#
+# Rewrites correlated scalar subqueries in model-generated SQL into
+# pre-aggregated CTEs joined on the correlation key. Postgres runs a correlated
+# scalar subquery as a SubPlan once per outer row; the two shapes the model
+# keeps producing (see TODO.md / WORKLOG.md 2026-07-05) are
+#
+#   qualification threshold:  WHERE pa >= (SELECT 3.1 * MAX(g) FROM batting WHERE yearid = b.yearid)
+#   `->` team display:        (SELECT string_agg(teamid, ' -> ' ORDER BY min_stint)
+#                              FROM (SELECT teamid, MIN(stint) AS min_stint FROM batting
+#                                    WHERE playerid = peo.playerid AND yearid = b.yearid
+#                                    GROUP BY teamid) t)
+#
+# and on a multi-season leaderboard both re-run thousands of times and hit the
+# 15 s statement_timeout. The rewrite computes each subquery once per key:
+#
+#   WITH _dc1 AS (SELECT 3.1 * MAX(g) AS _v, yearid AS _k1 FROM batting GROUP BY yearid)
+#   ... LEFT JOIN _dc1 ON _dc1._k1 = b.yearid ... WHERE pa >= _dc1._v
+#
+# It's a parse-tree rewrite (sqlglot), deliberately narrow: only aggregate
+# subqueries over batting / pitching / savant_* whose correlation is a set of
+# top-level `inner_col = outer_expr` equalities, which is exactly the case
+# where the join is provably equivalent (one CTE row per key; an unmatched key
+# gives NULL, as the empty aggregate did). Anything else -- and any parse
+# failure, or sqlglot not being installed -- returns the SQL unchanged.
+#
+# tests/run_decorrelate_check.py replays the corpus of previously failing
+# regression questions through this and compares rows/timings live.
+
+import re
+
+try:
+    import sqlglot
+    from sqlglot import exp
+except ImportError:  # optional -- without it model SQL runs as generated
+    sqlglot = None
+    exp = None
+
+TARGET_TABLE_RE = re.compile(r"^(?:batting|pitching|savant_\w+)$", re.I)
+CTE_PREFIX = "_dc"
+MAX_REWRITES = 10
+
+
+def _arg_key(node_cls, name):
+    """sqlglot renamed some arg keys across versions ("from" -> "from_", "with" -> "with_")."""
+    return f"{name}_" if f"{name}_" in node_cls.arg_types else name
+
+
+def _from_of(select):
+    return select.args.get(_arg_key(exp.Select, "from"))
+
+
+def _conjuncts(cond):
+    if isinstance(cond, exp.Paren):
+        return _conjuncts(cond.this)
+    if isinstance(cond, exp.And):
+        return _conjuncts(cond.left) + _conjuncts(cond.right)
+    return [cond]
+
+
+def _and_all(parts):
+    out = None
+    for p in parts:
+        out = p if out is None else exp.and_(out, p)
+    return out
+
+
+def _single_table(select):
+    """The select's only FROM source (no joins), or None."""
+    frm = _from_of(select)
+    if frm is None or select.args.get("joins"):
+        return None
+    return frm.this
+
+
+def _is_aggregate_scalar(select):
+    """One projection, aggregated, every column inside an aggregate -> exactly one row per run."""
+    if len(select.expressions) != 1:
+        return False
+    for key in ("group", "having", "limit", "offset", "order", "distinct", "qualify"):
+        if select.args.get(key):
+            return False
+    proj = select.expressions[0]
+    proj = proj.this if isinstance(proj, exp.Alias) else proj
+    if not proj.find(exp.AggFunc) or proj.find(exp.Window):
+        return False
+    return all(col.find_ancestor(exp.AggFunc) is not None for col in proj.find_all(exp.Column))
+
+
+def _null_on_empty(node):
+    """True if the projection evaluates to NULL when its aggregates see zero rows."""
+    if isinstance(node, exp.Alias):
+        return _null_on_empty(node.this)
+    if isinstance(node, exp.Count):
+        return False
+    if isinstance(node, exp.AggFunc):
+        return True
+    if isinstance(node, (exp.Paren, exp.Cast, exp.Round)):
+        return _null_on_empty(node.this)
+    if isinstance(node, (exp.Mul, exp.Div, exp.Add, exp.Sub)):
+        sides = [node.left, node.right]
+        return any(_null_on_empty(s) for s in sides) and all(
+            isinstance(s, exp.Literal) or _null_on_empty(s) for s in sides
+        )
+    return False
+
+
+def _source_names(source):
+    names = set()
+    if isinstance(source, exp.Table):
+        names.add(source.name.lower())
+    if source.alias:
+        names.add(source.alias.lower())
+    return names
+
+
+def _is_outer(col, inner_names):
+    # Unqualified columns resolve to the nearest scope first -- inner, for these tables
+    return bool(col.table) and col.table.lower() not in inner_names
+
+
+def _match(sub):
+    """Return a rewrite plan for a correlated scalar subquery, or None if it doesn't qualify."""
+    inner = sub.this
+    if not isinstance(inner, exp.Select) or not _is_aggregate_scalar(inner):
+        return None
+    if isinstance(sub.parent, (exp.From, exp.Join, exp.In, exp.Exists)):
+        return None
+
+    source = _single_table(inner)
+    if isinstance(source, exp.Table):
+        if not TARGET_TABLE_RE.match(source.name) or source.args.get("db"):
+            return None
+        filtered, derived = inner, None
+        if len(list(inner.find_all(exp.Select))) != 1:
+            return None
+    elif isinstance(source, exp.Subquery) and isinstance(source.this, exp.Select):
+        filtered, derived = source.this, source
+        base = _single_table(filtered)
+        if not isinstance(base, exp.Table) or not TARGET_TABLE_RE.match(base.name):
+            return None
+        for key in ("limit", "offset", "distinct", "qualify"):
+            if filtered.args.get(key):
+                return None
+        if len(list(inner.find_all(exp.Select))) != 2:
+            return None
+    else:
+        return None
+
+    inner_names = _source_names(source) | (_source_names(_single_table(filtered)) if derived else set())
+
+    # Every outer reference must sit in a top-level `inner = outer` conjunct of the filtered select
+    where = filtered.args.get("where")
+    conjuncts = _conjuncts(where.this) if where else []
+    keys, rest = [], []
+    for c in conjuncts:
+        outer_cols = [col for col in c.find_all(exp.Column) if _is_outer(col, inner_names)]
+        if isinstance(c, exp.EQ) and all(isinstance(x, exp.Column) and not x.table for x in (c.left, c.right)):
+            return None  # `yearid = year`: one side may be an outer column -- can't tell without a schema
+        if not outer_cols:
+            rest.append(c)
+            continue
+        if not isinstance(c, exp.EQ):
+            return None
+        left_outer = any(_is_outer(col, inner_names) for col in c.left.find_all(exp.Column))
+        right_outer = any(_is_outer(col, inner_names) for col in c.right.find_all(exp.Column))
+        inner_side, outer_side = (c.right, c.left) if left_outer else (c.left, c.right)
+        if left_outer == right_outer or not isinstance(inner_side, exp.Column):
+            return None
+        if outer_side.find(exp.Subquery) or outer_side.find(exp.AggFunc):
+            return None
+        keys.append((inner_side, outer_side))
+    if not keys:
+        return None
+    n_outer = sum(1 for col in inner.find_all(exp.Column) if _is_outer(col, inner_names))
+    if n_outer != sum(len(list(o.find_all(exp.Column))) for _, o in keys):
+        return None  # correlated somewhere other than the key equalities
+
+    proj = inner.expressions[0]
+    if not _null_on_empty(proj) and not isinstance(proj.unalias(), exp.Count):
+        return None
+
+    # The scope that owns the subquery, reached without passing through a FROM/JOIN
+    outer = sub.parent
+    in_aggregate = False
+    node = sub
+    while outer is not None and not isinstance(outer, exp.Select):
+        if isinstance(outer, (exp.From, exp.Join, exp.Subquery)):
+            return None
+        if isinstance(outer, exp.AggFunc):
+            in_aggregate = True
+        node, outer = outer, outer.parent
+    if outer is None or _from_of(outer) is None:
+        return None
+    if any(isinstance(p, exp.Star) for p in outer.expressions):
+        return None  # SELECT * would pick up the CTE's columns
+    clause = node.arg_key
+    for join in outer.args.get("joins") or []:
+        if not join.args.get("on") and not join.args.get("using") and not join.args.get("kind"):
+            return None  # comma join -- an appended JOIN's ON couldn't see the earlier FROM items
+    if clause not in ("expressions", "where", "having", "order"):
+        return None
+    grouped = outer.args.get("group") is not None
+    if not grouped and any(
+        agg.find_ancestor(exp.Select) is outer and not agg.find_ancestor(exp.Window)
+        for agg in outer.find_all(exp.AggFunc)
+    ):
+        return None  # whole-table aggregate without GROUP BY; leave it alone
+    needs_group = grouped and clause in ("expressions", "having", "order") and not in_aggregate
+
+    return {
+        "inner": inner, "filtered": filtered, "derived": derived, "keys": keys, "rest": rest,
+        "outer": outer, "needs_group": needs_group, "count": isinstance(proj.unalias(), exp.Count),
+    }
+
+
+def _add_cte(tree, name, select):
+    """Prepend a CTE so it's visible to every existing CTE (they may contain the rewritten scope)."""
+    key = _arg_key(type(tree), "with")
+    cte = exp.CTE(this=select, alias=exp.TableAlias(this=exp.to_identifier(name)))
+    with_ = tree.args.get(key)
+    if with_ is None:
+        tree.set(key, exp.With(expressions=[cte]))
+    else:
+        with_.set("expressions", [cte] + list(with_.expressions))
+
+
+def _apply(tree, sub, plan, name):
+    inner, filtered, derived = plan["inner"], plan["filtered"], plan["derived"]
+    keys = plan["keys"]
+
+    # 1. Drop the correlation from the filtered select and expose the keys instead
+    filtered.set("where", exp.Where(this=_and_all(plan["rest"])) if plan["rest"] else None)
+    key_names = [f"_k{i}" for i in range(1, len(keys) + 1)]
+    key_exprs = [inner_col.copy() for inner_col, _ in keys]
+    if derived is None:
+        cte = inner.copy()
+        cte.set("expressions", [exp.alias_(cte.expressions[0].unalias(), "_v")]
+                + [exp.alias_(k, n) for k, n in zip(key_exprs, key_names)])
+        cte.set("group", exp.Group(expressions=[k.copy() for k in key_exprs]))
+    else:
+        for k, n in zip(key_exprs, key_names):
+            filtered.append("expressions", exp.alias_(k.copy(), n))
+        had_group = filtered.args.get("group") is not None
+        has_agg = any(p.find(exp.AggFunc) for p in filtered.expressions)
+        if had_group:
+            for k in key_exprs:
+                filtered.args["group"].append("expressions", k.copy())
+        elif has_agg:
+            filtered.set("group", exp.Group(expressions=[k.copy() for k in key_exprs]))
+        if not derived.alias:
+            derived.set("alias", exp.TableAlias(this=exp.to_identifier("_dt")))
+        dt = derived.alias
+        cte = inner.copy()
+        cte.set("expressions", [exp.alias_(cte.expressions[0].unalias(), "_v")]
+                + [exp.alias_(exp.column(n, table=dt), n) for n in key_names])
+        cte.set("group", exp.Group(expressions=[exp.column(n, table=dt) for n in key_names]))
+
+    _add_cte(tree, name, cte)
+
+    # 2. Join the CTE into the owning scope and swap the subquery for its value
+    outer = plan["outer"]
+    on = _and_all([
+        exp.EQ(this=exp.column(n, table=name), expression=outer_expr.copy())
+        for n, (_, outer_expr) in zip(key_names, keys)
+    ])
+    outer.append("joins", exp.Join(this=exp.to_table(name), side="LEFT", on=on))
+    value = exp.column("_v", table=name)
+    if plan["count"]:
+        value = exp.func("COALESCE", value, exp.Literal.number(0))
+    sub.replace(value)
+    if plan["needs_group"]:
+        outer.args["group"].append("expressions", exp.column("_v", table=name))
+
+
+def rewrite(sql: str):
+    """Returns (sql, notes). `sql` is the input unchanged when nothing was rewritten."""
+    if sqlglot is None or not sql or len(re.findall(r"(?i)\bselect\b", sql)) < 2:
+        return sql, []
+    try:
+        tree = sqlglot.parse_one(sql, read="postgres")
+    except Exception:
+        return sql, []
+    if not isinstance(tree, (exp.Select, exp.Union)):
+        return sql, []
+
+    taken = {m.lower() for m in re.findall(r"(?i)\b" + CTE_PREFIX + r"\d+\b", sql)}
+    notes = []
+    try:
+        for _ in range(MAX_REWRITES):
+            plan = None
+            for sub in tree.find_all(exp.Subquery):
+                plan = _match(sub)
+                if plan:
+                    break
+            if not plan:
+                break
+            n = len(notes) + 1
+            while f"{CTE_PREFIX}{n}" in taken:
+                n += 1
+            name = f"{CTE_PREFIX}{n}"
+            taken.add(name)
+            table = (_single_table(plan["filtered"]).name or "?").lower()
+            notes.append(f"{name}: correlated subquery on {table} "
+                         f"({', '.join(o.sql('postgres') for _, o in plan['keys'])}) -> CTE join")
+            _apply(tree, sub, plan, name)
+    except Exception:
+        return sql, []
+    if not notes:
+        return sql, []
+    return tree.sql(dialect="postgres"), notes
+
+
+def decorrelate_sql(sql: str) -> str:
+    return rewrite(sql)[0]
@@ -14,8 +14,10 @@ from dotenv import load_dotenv
 
 import yaml
 
+from .coverage import PITCH_LEVEL_FIRST_SEASON
 from .template_router import build_sql_from_templates
 from .sql_render import lint_sql, enforce_leaders_invariants
+from .decorrelate import decorrelate_sql
 
 
 # ---------- Constants & basic helpers ----------
@@ -70,6 +72,7 @@ def build_prompt(nl_query, schema_str, prompt_template, season, current_year=CUR
         "query": nl_query.strip(),
         "CURRENT_YEAR": current_year,
         "REQUESTED_SEASON": season,
+        "PITCH_LEVEL_FIRST_SEASON": PITCH_LEVEL_FIRST_SEASON,
         "preset_sql": "",
     }
 
@@ -220,7 +223,7 @@ def get_sql_and_params(
         current_year=current_year,
     )
     model_sql = get_sql_from_gemini(base_prompt)
-    model_sql = lint_sql(model_sql)
+    model_sql = lint_sql(decorrelate_sql(model_sql))
     return model_sql, {}, "model"
 
 
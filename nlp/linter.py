@@ -3,6 +3,8 @@ import re
 from dataclasses import dataclass
 from datetime import date
 
+from nlp.coverage import pitch_level_seasons
+
 # Simple counting stats that should not have PA/IP qualifiers on single-season leaderboards
 COUNTING_STATS = {"hr", "rbi", "sb", "r", "h", "doubles", "triples", "bb", "so", "cs", "ibb", "hbp"}
 
@@ -12,13 +14,29 @@ CAREER_WORDS = re.compile(r"\b(career|all[-\s]?time|since\s+\d{4}|over\s+\d+\s+s
 
 # Triggers that indicate unavailable data for this database (game logs, etc.)
 UNAVAILABLE_TRIG = re.compile(
-    r"\b(handedness|left[-\s]?handed|right[-\s]?handed|pitch[-\s]?by[-\s]?pitch|game\s*(log|by\s*game))\b", re.I
+    r"\b(pitch[-\s]?by[-\s]?pitch)\b", re.I
+)
+
+# Handedness / count splits: answerable from the statcast_splits cube, pitch-level seasons only.
+# Split phrasing only -- "which lefty had the most strikeouts" is a people.throws question.
+SPLIT_TRIG = re.compile(
+    r"\b((against|vs\.?|versus|facing)\s+((a|the)\s+)?(lefties|righties|lefty|righty|southpaws?|[lr]h[pb]s?|"
+    r"(left|right)[-\s]?hand(ed|ers?))|platoon|(handedness|l/r)\s+splits?|"
+    r"(in|on|with)\s+(a\s+)?([0-3]-[0-2]|full|two[-\s]strike|three[-\s]ball)\s+counts?|with\s+two\s+strikes|"
+    r"(ahead|behind)\s+in\s+the\s+count)\b",
+    re.I,
 )
 
-# Any Savant "advanced" table usage (restricted to 2015+)
+# Game-level questions: answerable from the batting game-log tables, pitch-level seasons only
+GAME_LOG_TRIG = re.compile(
+    r"\b(game\s*(logs?|by\s*game)|hitting\s+streaks?|(last|past)\s+(\d+\s+days|week|two\s+weeks|month))\b", re.I
+)
+GAME_LOG_TABLE_RE = re.compile(r"\bbatting_(?:game_logs|rolling|streaks)\b", re.I)
+
+# Any Savant "advanced" table usage, or the wide tables that hold them (restricted to 2015+)
 ADVANCED_TABLE_RE = re.compile(
     r"\bfrom\s+savant_(?:batting_expected|batting_physics|batting_discipline|"
-    r"pitching_expected|pitching_physics|pitching_discipline)\b",
+    r"pitching_expected|pitching_physics|pitching_discipline|batting_season|pitching_season)\b",
     re.I,
 )
 
@@ -60,7 +78,16 @@ def lint_sql(user_q: str, sql: str, current_year: int | None = None) -> LintResu
 
     # Query-level refuses (question asks for unavailable data)
     if UNAVAILABLE_TRIG.search(q):
-        reasons.append("Question requests unavailable data (handedness/Statcast/game-by-game/etc.).")
+        reasons.append("Question requests unavailable data (individual pitch-by-pitch sequences).")
+
+    # Split questions must come from the split cube
+    if SPLIT_TRIG.search(q):
+        if "statcast_splits" not in s:
+            reasons.append("Handedness/count split questions must use statcast_splits.")
+
+    # Game logs, streaks and last-N-days windows come from the game-log tables
+    if GAME_LOG_TRIG.search(q) and not GAME_LOG_TABLE_RE.search(s):
+        reasons.append("Game-log/streak/rolling-window questions must use batting_game_logs/batting_rolling/batting_streaks.")
 
     # Single-season leaders: enforce constraints
     if is_single_season_leaderboard(q):
@@ -92,6 +119,13 @@ def lint_sql(user_q: str, sql: str, current_year: int | None = None) -> LintResu
     # Advanced Savant tables: only allowed for 2015+
     if year < 2015 and ADVANCED_TABLE_RE.search(s):
         reasons.append("Advanced Statcast metrics are unavailable before 2015 for this database.")
+    pitch_seasons = pitch_level_seasons(current_year_int)
+    if SPLIT_TRIG.search(q) and year not in pitch_seasons:
+        reasons.append(f"Handedness/count splits are only available for {pitch_seasons[0]}-{pitch_seasons[-1]} "
+                       f"in this database.")
+    if GAME_LOG_TRIG.search(q) and year not in pitch_seasons:
+        reasons.append(f"Game logs and streaks are only available for {pitch_seasons[0]}-{pitch_seasons[-1]} "
+                       f"in this database.")
 
     # quick table usage hints
     meta["uses_lahman"] = bool(re.search(r"\bfrom\s+(batting|pitching|teams|people)\b", s))
@@ -0,0 +1,45 @@
+# nlp/names.py
+#
+# Player-name normalization shared by the Savant ETL (which writes the
+# display_name / name_key columns on every savant_* table) and the query side
+# (which folds a user-typed name the same way before comparing to name_key).
+# Pure standard library so the ETL can import it without the rest of nlp/.
+
+import re
+import unicodedata
+
+_APOSTROPHES_RE = re.compile(r"[.'’`]")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def display_name(playername):
+    """Savant's "Last, First" -> "First Last" ("Acuña Jr., Ronald" -> "Ronald Acuña Jr.").
+    Names without ", " pass through unchanged, same as the old SQL CASE expression."""
+    if playername is None:
+        return None
+    name = str(playername).strip()
+    if not name:
+        return None
+    last, sep, first = name.partition(", ")
+    return f"{first} {last}".strip() if sep else name
+
+
+def name_key(name):
+    """Folded search key: accents stripped, lower-cased, periods/apostrophes dropped,
+    any other punctuation collapsed to single spaces ("Ronald Acuña Jr." -> "ronald acuna jr",
+    "Ke'Bryan Hayes" -> "kebryan hayes", "Pete Crow-Armstrong" -> "pete crow armstrong")."""
+    if name is None:
+        return None
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = _APOSTROPHES_RE.sub("", text)
+    text = _NON_ALNUM_RE.sub(" ", text).strip()
+    return text or None
+
+
+def add_name_columns(df):
+    """Adds display_name / name_key to a Savant DataFrame that has `playername`."""
+    if "playername" in df.columns:
+        df["display_name"] = df["playername"].map(display_name)
+        df["name_key"] = df["display_name"].map(name_key)
+    return df
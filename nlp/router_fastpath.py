@@ -44,11 +44,37 @@ def _mentions_non_catalog_stat(question: str) -> bool:
     return bool(_NON_CATALOG_STAT_RE.search(question))
 
 
+# Deepest rank etl/derived_tables.py keeps in season_leaders (SEASON_LEADERS_DEPTH).
+# A larger top_n can't be served from the table and uses the live templates.
+_PRECOMPUTED_MAX_TOP_N = 50
+
+
+def _precomputed_stats(conn) -> set:
+    """(domain, stat) pairs season_leaders has rows for; empty if the table
+    doesn't exist yet or the DB is unreachable (fast-path then uses live SQL)."""
+    if conn is None:
+        return set()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT DISTINCT domain, stat FROM season_leaders")
+            return {(d, s) for d, s in cur.fetchall()}
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return set()
+
+
 def init_fastpath(conn):
     # Build once at startup; keep in memory. The catalog is derived from static
-    # stat definitions (see nlp/stats_catalog.py), not live DB introspection,
-    # but conn is kept for interface compatibility with callers.
-    return build_stat_catalog(conn)
+    # stat definitions (see nlp/stats_catalog.py), not live DB introspection;
+    # conn is only used to see which stats the season_leaders table can serve.
+    catalog = build_stat_catalog(conn)
+    available = _precomputed_stats(conn)
+    for meta in catalog.values():
+        meta["precomputed"] = (meta["domain"], meta["stat_label"]) in available
+    return catalog
 
 
 def try_fastpath(question: str, season: int, conn, stat_catalog, top_n: int = 10, qualified: bool = False):
@@ -81,6 +107,14 @@ def try_fastpath(question: str, season: int, conn, stat_catalog, top_n: int = 10
     # no "qualified" branch here. A rate-stat "qualified" question (e.g. "best
     # OBP among qualified hitters") won't resolve against this catalog at all
     # and correctly falls through to templates/LLM instead.
+    # Precomputed season_leaders rows are ranked high-to-low only, and only
+    # SEASON_LEADERS_DEPTH deep -- anything else renders the live template.
+    if meta.get("precomputed") and meta["direction"] == "DESC" and top_n <= _PRECOMPUTED_MAX_TOP_N:
+        return render_sql(
+            "leaders_precomputed", domain=meta["domain"], stat=meta["stat_label"],
+            stat_label=meta["stat_label"],
+        )
+
     tmpl = "leaders_pitching_counting" if meta["domain"] == "pitching" else "leaders_batting_counting"
 
     sql = render_sql(
@@ -1,9 +1,12 @@
 # nlp/template_router.py
 import re
+from datetime import date
 from typing import Tuple, Dict, Optional, Any
 from jinja2 import Environment, StrictUndefined
 
+from nlp.coverage import pitch_level_seasons
 from nlp.linter import CAREER_WORDS
+from nlp.names import name_key
 
 # ------- Natural language → whitelisted stat columns -------
 # Stats that mean something different (or don't exist) for pitchers vs batters —
@@ -112,68 +115,36 @@ def _is_single_season_question(full_text: str) -> bool:
     return bool(_SINGLE_SEASON_HINT_RE.search(full_text)) and not _CAREER_HINT_RE.search(full_text)
 
 
-def _player_pitching_career_sql(m: re.Match) -> Tuple[Optional[str], Optional[Dict]]:
-    raw = m.group("player_name")
-    player_name = _extract_player_name(raw)
-    if not player_name or len(player_name.split()) < 2:
-        return None, None
-    if _is_single_season_question(m.string):
-        return None, None
-    sql = """
+# Both career handlers read from the player_season_batting/player_season_pitching
+# materialized views (db/player_season_views.sql), which already hold one row per
+# player-season with the Savant-first/Lahman-fallback union, traded-player stints
+# consolidated, and the frozen FanGraphs WAR/wRC+/FIP columns joined on. The ETL
+# refreshes them after every load, so a career lookup is one indexed read here.
+_CAREER_PLAYER_CTE = """
 WITH player AS (
     SELECT peo.playerid
     FROM people peo
     WHERE LOWER(peo.namefirst || ' ' || peo.namelast) = LOWER(%(player_name)s)
     ORDER BY peo.debut DESC
     LIMIT 1
-),
-fpa_by_season AS (
-    -- Frozen FanGraphs archive -- only source for FIP/xFIP/WAR (see Rule 4).
-    -- Pre-aggregate to one row per (idfg, season), preferring the TOT row.
-    SELECT idfg, season,
-           COALESCE(MAX(fip) FILTER (WHERE team = 'TOT'), MAX(fip)) AS fip,
-           COALESCE(MAX(xfip) FILTER (WHERE team = 'TOT'), MAX(xfip)) AS xfip,
-           COALESCE(MAX(war) FILTER (WHERE team = 'TOT'), MAX(war)) AS war
-    FROM fangraphs_pitching_advanced
-    WHERE team != '---'
-    GROUP BY idfg, season
-),
-savant_seasons AS (
-    SELECT s.year AS season, s.team, p.playerid,
-           CASE WHEN position(', ' in s.playername) > 0
-                THEN split_part(s.playername, ', ', 2) || ' ' || split_part(s.playername, ', ', 1)
-                ELSE s.playername END AS name,
-           s.p_game AS g, s.p_win AS w, s.p_loss AS l,
-           r.p_era AS era, (s.p_earned_run * 27.0) / NULLIF(s.p_game, 0) / 9.0 AS ip_est
-    FROM savant_pitching_traditional s
-    JOIN lahman_savant_bridge lsb ON lsb.key_mlbam = s.player_id
-    JOIN player p ON p.playerid = lsb.playerid
-    LEFT JOIN savant_pitching_ratios r ON r.player_id = s.player_id AND r.year = s.year
-),
-lahman_seasons AS (
-    SELECT pit.yearid AS season, pit.teamid AS team, p.playerid,
-           peo.namefirst || ' ' || peo.namelast AS name,
-           SUM(pit.g) AS g, SUM(pit.w) AS w, SUM(pit.l) AS l,
-           (SUM(pit.er)::numeric * 9) / NULLIF(SUM(pit.ipouts) / 3.0, 0) AS era,
-           SUM(pit.ipouts) / 3.0 AS ip_est
-    FROM pitching pit
-    JOIN player p ON p.playerid = pit.playerid
-    JOIN people peo ON peo.playerid = pit.playerid
-    WHERE NOT EXISTS (SELECT 1 FROM savant_pitching_traditional s2 WHERE s2.year = pit.yearid)
-    GROUP BY pit.yearid, pit.teamid, p.playerid, peo.namefirst, peo.namelast
-),
-combined AS (
-    SELECT season, team, playerid, name, g, w, l, era, ip_est FROM savant_seasons
-    UNION ALL
-    SELECT season, team, playerid, name, g, w, l, era, ip_est FROM lahman_seasons
 )
-SELECT c.season, c.name, c.team, c.g, c.w, c.l,
-       ROUND(c.era::numeric, 2) AS era, ROUND(c.ip_est::numeric, 1) AS ip,
-       fpa.fip, fpa.xfip, fpa.war
-FROM combined c
-LEFT JOIN lahman_fangraphs_bridge lfb ON lfb.playerid = c.playerid
-LEFT JOIN fpa_by_season fpa ON fpa.idfg = lfb.idfg AND fpa.season = c.season
-ORDER BY c.season ASC;
+""".strip()
+
+
+def _player_pitching_career_sql(m: re.Match) -> Tuple[Optional[str], Optional[Dict]]:
+    raw = m.group("player_name")
+    player_name = _extract_player_name(raw)
+    if not player_name or len(player_name.split()) < 2:
+        return None, None
+    if _is_single_season_question(m.string):
+        return None, None
+    sql = _CAREER_PLAYER_CTE + "\n" + """
+SELECT psp.season, psp.name, psp.team, psp.g, psp.w, psp.l,
+       ROUND(psp.era::numeric, 2) AS era, ROUND(psp.ip::numeric, 1) AS ip,
+       psp.fip, psp.xfip, psp.war
+FROM player_season_pitching psp
+JOIN player p ON p.playerid = psp.playerid
+ORDER BY psp.season ASC;
 """.strip()
     return sql, {"player_name": player_name}
 
@@ -185,67 +156,507 @@ def _player_batting_career_sql(m: re.Match) -> Tuple[Optional[str], Optional[Dic
         return None, None
     if _is_single_season_question(m.string):
         return None, None
-    sql = """
+    sql = _CAREER_PLAYER_CTE + "\n" + """
+SELECT psb.season, psb.name, psb.team, psb.g, psb.pa, psb.hr, psb.rbi, psb.sb,
+       ROUND(psb.avg::numeric, 3) AS avg, ROUND(psb.obp::numeric, 3) AS obp,
+       ROUND(psb.slg::numeric, 3) AS slg, ROUND(psb.ops::numeric, 3) AS ops,
+       psb.war, psb.wrc_plus, psb.woba
+FROM player_season_batting psb
+JOIN player p ON p.playerid = psb.playerid
+ORDER BY psb.season ASC;
+""".strip()
+    return sql, {"player_name": player_name}
+
+
+# ------- Player named anywhere in a question (Savant name_key) -------
+# Capitalized words in a row, case-sensitive so "How did" / "vs" end the run
+_QUESTION_PLAYER_RE = re.compile(r"\b(?P<player_name>[A-Z][\w'’.\-]*(?:\s+[A-Z][\w'’.\-]*){1,3})")
+_QUESTION_LEAD_RE = re.compile(r"(?i)^(?:who|which|what|when|where|how|whose)\b\s*")
+
+
+def _question_player_key(q: str) -> Optional[str]:
+    """Folded name_key of the first multi-word capitalized name in the question, if any."""
+    name_m = _QUESTION_PLAYER_RE.search(_QUESTION_LEAD_RE.sub("", _PREFIXES.sub("", q.strip())))
+    if not name_m:
+        return None
+    # End the name at a possessive ("Juan Soto's OPS") and drop trailing acronyms ("Juan Soto OPS")
+    words = re.split(r"['’]s\b|s['’](?=\s|$)", name_m.group("player_name"))[0].split()
+    while words and len(words[-1]) > 1 and words[-1].isupper():
+        words.pop()
+    key = name_key(" ".join(words))
+    return key if key and len(key.split()) >= 2 else None
+
+
+_SEASON_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+_THIS_SEASON_RE = re.compile(r"(?i)\bthis\s+(?:season|year)\b")
+
+
+def _question_season(q: str) -> Tuple[bool, Optional[int]]:
+    """(ok, season): one explicit year or "this season" -> that season; none -> None;
+    several years -> not ok (ranges are left to the LLM)."""
+    years = set(_SEASON_RE.findall(q))
+    if len(years) > 1:
+        return False, None
+    if years:
+        return True, int(years.pop())
+    if _THIS_SEASON_RE.search(q):
+        return True, date.today().year
+    return True, None
+
+
+# season -> name_keys with batting_game_logs / statcast_splits rows, set by
+# init_coverage(); None until then (no DB at startup), when the game-log and split
+# handlers check the season range only
+_GAME_LOG_PLAYERS: Optional[Dict[int, set]] = None
+_SPLIT_PLAYERS: Optional[Dict[int, set]] = None
+
+# A capitalized run ending in a club nickname is a team, never a split player
+_TEAM_NICKNAME_RE = re.compile(
+    r"(?i)\b(?:yankees|red sox|dodgers|giants|cubs|cardinals|braves|mets|phillies|nationals|marlins|reds"
+    r"|pirates|brewers|padres|rockies|diamondbacks|angels|astros|athletics|rangers|mariners|blue jays"
+    r"|orioles|rays|tigers|indians|guardians|white sox|royals|twins)$"
+)
+
+
+def _player_seasons(conn, sql: str) -> Optional[Dict[int, set]]:
+    """season -> name_keys from a (season, name_key) query; None if it fails."""
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql)
+            rows = cur.fetchall()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return None
+    coverage = {}
+    for season, key in rows:
+        coverage.setdefault(int(season), set()).add(key)
+    return coverage
+
+
+def init_coverage(conn) -> Optional[Dict[int, set]]:
+    """Loads which players have batting_game_logs and statcast_splits rows in which
+    season; returns the game-log coverage. Called once at startup, like
+    router_fastpath.init_fastpath(); leaves the range-only checks in place if the
+    tables don't exist yet or the DB is unreachable."""
+    global _GAME_LOG_PLAYERS, _SPLIT_PLAYERS
+    if conn is None:
+        return None
+    _GAME_LOG_PLAYERS = _player_seasons(conn, """
+SELECT g.season, e.name_key
+FROM (SELECT DISTINCT player_id, season FROM batting_game_logs) g
+JOIN (SELECT DISTINCT player_id, name_key FROM savant_batting_expected) e ON e.player_id = g.player_id""")
+    _SPLIT_PLAYERS = _player_seasons(conn, """
+SELECT s.season, e.name_key
+FROM (SELECT DISTINCT player_id, season FROM statcast_splits) s
+JOIN (SELECT player_id, name_key FROM savant_batting_expected
+      UNION
+      SELECT player_id, name_key FROM savant_pitching_expected) e ON e.player_id = s.player_id""")
+    return _GAME_LOG_PLAYERS
+
+
+def _pitch_level_covers(season: Optional[int]) -> bool:
+    """Whether statcast_splits / the game-log tables can hold `season` (None: no season
+    asked, the handler reads whatever is loaded). Outside that range the handlers return
+    None, so the LLM refuses instead of the template returning an empty answer."""
+    return season is None or season in pitch_level_seasons()
+
+
+def _game_log_covers(season: Optional[int], key: Optional[str]) -> bool:
+    """Whether batting_game_logs has `season` (None: any season) and, for a named player,
+    rows for that player in it."""
+    if not _pitch_level_covers(season):
+        return False
+    if _GAME_LOG_PLAYERS is None:
+        return True
+    seasons = [season] if season is not None else list(_GAME_LOG_PLAYERS)
+    return any(s in _GAME_LOG_PLAYERS and (key is None or key in _GAME_LOG_PLAYERS[s]) for s in seasons)
+
+
+def _split_covers(season: Optional[int], key: str) -> bool:
+    """Whether statcast_splits has rows for the named player (in `season`, if given).
+    Anything else -- a team name, a player outside the cube -- is left to the LLM."""
+    if not _pitch_level_covers(season) or _TEAM_NICKNAME_RE.search(key):
+        return False
+    if _SPLIT_PLAYERS is None:
+        return True
+    seasons = [season] if season is not None else list(_SPLIT_PLAYERS)
+    return any(key in _SPLIT_PLAYERS.get(s, ()) for s in seasons)
+
+
+def _latest_game_log_season() -> int:
+    return max(_GAME_LOG_PLAYERS) if _GAME_LOG_PLAYERS else date.today().year
+
+
+# ------- Handedness / count / pitch-type splits -------
+# Answered from the statcast_splits cube (db/statcast_splits.sql, maintained by
+# etl/statcast_splits.py): one row per player x season x role x batter side x
+# pitcher hand x count x pitch type with additive counts, so a split is a SUM
+# over a few hundred rows of one player and the rates are computed here. The
+# cube only covers the pitch-level seasons (nlp/coverage.py); a question about
+# any other season is left to the LLM, which refuses it.
+_SPLIT_HAND_RE = re.compile(
+    r"(?i)\b(?:against|vs\.?|versus|facing|off(?:\s+of)?)\s+(?:(?:a|the)\s+)?"
+    r"(?P<hand>(?:lefty|righty|lefties|righties|southpaws?|[lr]h[pb]s?)\b|(?:left|right)(?=[-\s]?hand))"
+    r"(?:[-\s]?hand(?:ed|ers?))?"
+    r"(?:\s+(?P<opp>pitch(?:ers?|ing)|starters?|relievers?|batters?|hitters?))?"
+)
+_SPLIT_PLATOON_RE = re.compile(
+    r"(?i)\b(?:platoon|handedness|lefty[-/\s]righty|l/r)\s+splits?\b"
+    r"|\b(?:lefties|lhp|left[-\s]?handers?)\s+and\s+(?:righties|rhp|right[-\s]?handers?)\b"
+)
+_SPLIT_COUNT_RE = re.compile(
+    r"(?i)\b(?:(?P<balls>[0-3])[-–](?P<strikes>[0-2])\s+counts?|(?P<full>full)\s+counts?"
+    r"|(?P<two>two|2)[-\s]strikes?(?:\s+counts?)?|(?P<three>three|3)[-\s]ball\s+counts?"
+    r"|(?P<first>first)[-\s]pitch|(?P<lead>ahead|behind)\s+in\s+the\s+count)\b"
+)
+# Checked in order, so the specific fastball kinds win over "fastball". Sliders
+# include sweepers (ST) -- Statcast tagged sweepers SL before 2023.
+_PITCH_GROUPS = [
+    (r"four[-\s]?seam(?:ers?|\s+fastballs?)?", ("FF",)),
+    (r"sinkers?|two[-\s]?seam(?:ers?|\s+fastballs?)?", ("SI",)),
+    (r"split[-\s]?fingers?(?:\s+fastballs?)?|splitters?", ("FS", "FO")),
+    (r"cutters?|cut\s+fastballs?", ("FC",)),
+    (r"fastballs?|heaters?", ("FF", "SI", "FC")),
+    (r"sweepers?", ("ST",)),
+    (r"sliders?", ("SL", "ST")),
+    (r"curve(?:ball)?s?|knuckle[-\s]?curves?", ("CU", "KC", "CS", "SV")),
+    (r"change[-\s]?ups?", ("CH",)),
+    (r"breaking\s+(?:balls?|pitches|stuff)", ("SL", "ST", "CU", "KC", "CS", "SV")),
+    (r"off[-\s]?speed(?:\s+pitches|\s+stuff)?", ("CH", "FS", "FO", "SC")),
+]
+_SPLIT_PITCH_RE = re.compile(
+    r"(?i)\b(?:against|vs\.?|versus|on|off(?:\s+of)?|with)\s+(?:the\s+)?(?:his\s+)?"
+    r"(?P<pitch>" + "|".join(p for p, _ in _PITCH_GROUPS) + r")\b"
+)
+_SPLIT_BY_PITCH_TYPE_RE = re.compile(r"(?i)\bby\s+pitch\s+(?:type|mix)\b")
+_SPLIT_PITCHER_CUE_RE = re.compile(r"(?i)\b(?:allow(?:ed|s)?|gave\s+up|give\s+up|opponents?|pitch(?:ed|ing)|thr[eo]w|throws)\b")
+_SPLIT_BATTER_CUE_RE = re.compile(r"(?i)\b(?:hit(?:ting)?|batting|bat|slug(?:ging)?|hit\s+\.\d+)\b")
+
+# wOBA / xwOBA denominator as documented in db/statcast_splits.sql
+_SPLIT_WOBA_DEN = "SUM(c.ab) + SUM(c.bb) + SUM(c.sf) + SUM(c.hbp)"
+_SPLIT_SELECT = f"""
+       SUM(c.pitches) AS pitches, SUM(c.pa) AS pa, SUM(c.ab) AS ab, SUM(c.h) AS hits,
+       SUM(c.hr) AS hr, SUM(c.bb) + SUM(c.ibb) AS bb, SUM(c.so) AS so,
+       ROUND(SUM(c.h)::numeric / NULLIF(SUM(c.ab), 0), 3) AS avg,
+       ROUND((SUM(c.h) + SUM(c.bb) + SUM(c.ibb) + SUM(c.hbp))::numeric
+             / NULLIF(SUM(c.ab) + SUM(c.bb) + SUM(c.ibb) + SUM(c.hbp) + SUM(c.sf), 0), 3) AS obp,
+       ROUND((SUM(c.h) + SUM(c.doubles) + 2 * SUM(c.triples) + 3 * SUM(c.hr))::numeric
+             / NULLIF(SUM(c.ab), 0), 3) AS slg,
+       ROUND(SUM(c.woba_sum) / NULLIF({_SPLIT_WOBA_DEN}, 0), 3) AS woba,
+       ROUND(SUM(c.xwoba_sum) / NULLIF({_SPLIT_WOBA_DEN}, 0), 3) AS xwoba,
+       ROUND(100.0 * SUM(c.so) / NULLIF(SUM(c.pa), 0), 1) AS k_pct,
+       ROUND(100.0 * SUM(c.whiffs) / NULLIF(SUM(c.swings), 0), 1) AS whiff_pct,
+       ROUND(SUM(c.ev_sum) / NULLIF(SUM(c.ev_n), 0), 1) AS avg_exit_velo,
+       ROUND(SUM(c.velo_sum) / NULLIF(SUM(c.velo_n), 0), 1) AS avg_pitch_velo""".strip("\n")
+
+
+def _split_filters(q: str, role: Optional[str]):
+    """Question -> (WHERE fragments over the cube CTE, params, extra GROUP BY columns, role)."""
+    where, params, group = [], {}, []
+    if _SPLIT_PLATOON_RE.search(q):
+        group.append("c.vs_hand")
+    m = _SPLIT_HAND_RE.search(q)
+    if m and not group:
+        hand = m.group("hand").lower()
+        params["vs_hand"] = "L" if hand.startswith(("l", "southpaw")) else "R"
+        where.append("c.vs_hand = %(vs_hand)s")
+        opp = (m.group("opp") or "").lower()
+        if hand.endswith(("hp", "hps")) or hand.startswith("southpaw") or opp.startswith(("pitch", "starter", "reliever")):
+            role = "batter"
+        elif hand.endswith(("hb", "hbs")) or opp.startswith(("batter", "hitter")):
+            role = "pitcher"
+    m = _SPLIT_COUNT_RE.search(q)
+    if m:
+        if m.group("balls") is not None:
+            params["balls"], params["strikes"] = int(m.group("balls")), int(m.group("strikes"))
+            where.append("c.balls = %(balls)s AND c.strikes = %(strikes)s")
+        elif m.group("full"):
+            where.append("c.balls = 3 AND c.strikes = 2")
+        elif m.group("two"):
+            where.append("c.strikes = 2")
+        elif m.group("three"):
+            where.append("c.balls = 3")
+        elif m.group("first"):
+            where.append("c.balls = 0 AND c.strikes = 0")
+        else:
+            # Ahead/behind from the player's side of the count
+            lead = "CASE WHEN c.role = 'batter' THEN c.balls - c.strikes ELSE c.strikes - c.balls END"
+            where.append(f"{lead} {'>' if m.group('lead').lower() == 'ahead' else '<'} 0")
+    m = _SPLIT_PITCH_RE.search(q)
+    if m:
+        word = m.group("pitch")
+        for pattern, codes in _PITCH_GROUPS:
+            if re.fullmatch(pattern, word, re.I):
+                # Whitelisted codes, so inlined rather than bound as an array
+                where.append("c.pitch_type IN (" + ", ".join(f"'{code}'" for code in codes) + ")")
+                break
+    if _SPLIT_BY_PITCH_TYPE_RE.search(q):
+        group.append("c.pitch_type")
+    return where, params, group, role
+
+
+def _player_split_sql(m: re.Match) -> Tuple[Optional[str], Optional[Dict]]:
+    q = m.string
+    key = _question_player_key(q)
+    if not key:
+        return None, None
+
+    role = None
+    if _SPLIT_PITCHER_CUE_RE.search(q):
+        role = "pitcher"
+    elif _SPLIT_BATTER_CUE_RE.search(q):
+        role = "batter"
+    where, params, group, role = _split_filters(q, role)
+    if not where and not group:
+        return None, None
+    ok, season = _question_season(q)
+    if not ok or not _split_covers(season, key):
+        return None, None
+
+    params["name_key"] = key
+    season_where = ""
+    if season is not None:
+        params["season"] = season
+        season_where = "\n    WHERE s.season = %(season)s"
+    role_where = ""
+    if role:
+        params["role"] = role
+        role_where = "\n    WHERE role = %(role)s"
+
+    group_cols = ["c.season", "c.role"] + group
+    sql = f"""
 WITH player AS (
-    SELECT peo.playerid
-    FROM people peo
-    WHERE LOWER(peo.namefirst || ' ' || peo.namelast) = LOWER(%(player_name)s)
-    ORDER BY peo.debut DESC
-    LIMIT 1
-),
-fba_by_season AS (
-    -- Frozen FanGraphs archive -- only source for WAR/wOBA/wRC+ (see Rule 4).
-    -- Pre-aggregate to one row per (idfg, season), preferring the TOT row.
-    SELECT idfg, season,
-           COALESCE(MAX(war) FILTER (WHERE team = 'TOT'), MAX(war)) AS war,
-           COALESCE(MAX(wrc_plus) FILTER (WHERE team = 'TOT'), MAX(wrc_plus)) AS wrc_plus,
-           COALESCE(MAX(woba) FILTER (WHERE team = 'TOT'), MAX(woba)) AS woba
-    FROM fangraphs_batting_advanced
-    WHERE team != '---'
-    GROUP BY idfg, season
+    SELECT player_id FROM savant_batting_expected WHERE name_key = %(name_key)s
+    UNION
+    SELECT player_id FROM savant_pitching_expected WHERE name_key = %(name_key)s
 ),
-savant_seasons AS (
-    SELECT s.year AS season, s.team, p.playerid,
-           CASE WHEN position(', ' in s.playername) > 0
-                THEN split_part(s.playername, ', ', 2) || ' ' || split_part(s.playername, ', ', 1)
-                ELSE s.playername END AS name,
-           s.b_game AS g, s.b_total_pa AS pa, s.b_home_run AS hr, s.b_rbi AS rbi, s.b_stolen_base AS sb,
-           r.batting_avg AS avg, r.on_base_percent AS obp, r.slg_percent AS slg, r.on_base_plus_slg AS ops
-    FROM savant_batting_traditional s
-    JOIN lahman_savant_bridge lsb ON lsb.key_mlbam = s.player_id
-    JOIN player p ON p.playerid = lsb.playerid
-    LEFT JOIN savant_batting_ratios r ON r.player_id = s.player_id AND r.year = s.year
+cube AS (
+    SELECT s.*, CASE WHEN s.role = 'batter' THEN s.p_throws ELSE s.stand END AS vs_hand
+    FROM statcast_splits s
+    JOIN player p ON p.player_id = s.player_id{season_where}
 ),
-lahman_seasons AS (
-    SELECT bat.yearid AS season, bat.teamid AS team, p.playerid,
-           peo.namefirst || ' ' || peo.namelast AS name,
-           SUM(bat.g) AS g, SUM(bat.ab) AS pa, SUM(bat.hr) AS hr, SUM(bat.rbi) AS rbi, SUM(bat.sb) AS sb,
-           SUM(bat.h)::numeric / NULLIF(SUM(bat.ab), 0) AS avg,
-           (SUM(bat.h) + SUM(bat.bb) + COALESCE(SUM(bat.hbp), 0))::numeric
-             / NULLIF(SUM(bat.ab) + SUM(bat.bb) + COALESCE(SUM(bat.hbp), 0) + COALESCE(SUM(bat.sf), 0), 0) AS obp,
-           (SUM(bat.h) + SUM(bat."2b") + 2 * SUM(bat."3b") + 3 * SUM(bat.hr))::numeric
-             / NULLIF(SUM(bat.ab), 0) AS slg
-    FROM batting bat
-    JOIN player p ON p.playerid = bat.playerid
-    JOIN people peo ON peo.playerid = bat.playerid
-    WHERE NOT EXISTS (SELECT 1 FROM savant_batting_traditional s2 WHERE s2.year = bat.yearid)
-    GROUP BY bat.yearid, bat.teamid, p.playerid, peo.namefirst, peo.namelast
-),
-combined AS (
-    SELECT season, team, playerid, name, g, pa, hr, rbi, sb, avg, obp, slg, ops FROM savant_seasons
-    UNION ALL
-    SELECT season, team, playerid, name, g, pa, hr, rbi, sb, avg, obp, slg, (obp + slg) AS ops FROM lahman_seasons
+pick AS (
+    -- Same-name players, or a two-way player: keep the one with the most pitches
+    SELECT player_id, role
+    FROM cube{role_where}
+    GROUP BY player_id, role
+    ORDER BY SUM(pitches) DESC
+    LIMIT 1
 )
-SELECT c.season, c.name, c.team, c.g, c.pa, c.hr, c.rbi, c.sb,
-       ROUND(c.avg::numeric, 3) AS avg, ROUND(c.obp::numeric, 3) AS obp,
-       ROUND(c.slg::numeric, 3) AS slg, ROUND(c.ops::numeric, 3) AS ops,
-       fba.war, fba.wrc_plus, fba.woba
-FROM combined c
-LEFT JOIN lahman_fangraphs_bridge lfb ON lfb.playerid = c.playerid
-LEFT JOIN fba_by_season fba ON fba.idfg = lfb.idfg AND fba.season = c.season
-ORDER BY c.season ASC;
+SELECT {", ".join(group_cols)},
+{_SPLIT_SELECT}
+FROM cube c
+JOIN pick k ON k.player_id = c.player_id AND k.role = c.role
+WHERE {" AND ".join(where) if where else "TRUE"}
+GROUP BY {", ".join(group_cols)}
+ORDER BY {", ".join(group_cols)};
 """.strip()
-    return sql, {"player_name": player_name}
+    return sql, params
+
+
+# ------- Game logs: streaks, rolling windows, single games, months -------
+# Read from the tables etl/game_logs.py derives from pitch-level Statcast
+# (db/game_logs.sql): batting_streaks and batting_rolling are precomputed, so a
+# "longest hitting streak" or "OPS over the last 15 days" answer is an index
+# read; batting_game_logs serves single games and monthly lines. Coverage is the
+# pitch-level seasons (nlp/coverage.py), batting only, no runs/RBI/steals; a
+# season or player outside it is left to the LLM, which refuses.
+_STREAK_RE = re.compile(r"(?i)\b(?:(?P<active>active|current|ongoing)\s+)?hitting\s+streaks?\b")
+_ROLLING_RE = re.compile(
+    r"(?i)\b(?:last|past)\s+(?P<span>(?P<n>\d+|seven|fifteen|thirty)\s+days|week|two\s+weeks|month)\b"
+)
+_ROLLING_WINDOWS = {"7": 7, "seven": 7, "week": 7, "15": 15, "fifteen": 15, "two weeks": 15,
+                    "30": 30, "thirty": 30, "month": 30}
+_ROLLING_STATS = [
+    (re.compile(r"(?i)\bops\b"), "ops"),
+    (re.compile(r"(?i)\b(?:batting\s+)?(?:average|avg)\b"), "avg"),
+    (re.compile(r"(?i)\b(?:obp|on[-\s]base)\b"), "obp"),
+    (re.compile(r"(?i)\b(?:slg|slugging)\b"), "slg"),
+    (re.compile(r"(?i)\b(?:hr|home\s*runs?|homers?)\b"), "hr"),
+    (re.compile(r"(?i)\bhits\b"), "h"),
+]
+_ROLLING_RATE_STATS = {"ops", "avg", "obp", "slg"}
+# batting_rolling is batting only: a pitching question ("ERA over the last 30 days",
+# "strikeouts over the past week" by a pitcher) is not a batting leaderboard
+_ROLLING_PITCHING_RE = re.compile(
+    r"(?i)\b(?:pitch(?:er|ers|ing)|era|whip|saves?|innings|strikeouts?\s+(?:thrown|pitched)|allow(?:ed|s)?|gave\s+up)\b"
+)
+_LEADER_CUE_RE = re.compile(r"(?i)\b(?:who|which|best|top\s*\d*|most|highest|leaders?|leading|hottest)\b")
+_TOP_N_RE = re.compile(r"(?i)\btop\s*(?P<n>\d+)\b")
+_MONTHS = ["january", "february", "march", "april", "may", "june", "july", "august", "september",
+           "october", "november", "december"]
+_GAME_DATE_RE = re.compile(
+    r"(?i)\b(?P<month>" + "|".join(_MONTHS) + r")\s+(?P<day>\d{1,2})(?:st|nd|rd|th)?,?\s+(?P<year>(?:19|20)\d{2})\b"
+    r"|\b(?P<iso>(?:19|20)\d{2}-\d{2}-\d{2})\b"
+)
+_MONTH_RE = re.compile(
+    r"(?i)\b(?:in|during)\s+(?:the\s+month\s+of\s+)?(?P<month>" + "|".join(_MONTHS) + r")(?:\s+of)?\s+"
+    r"(?P<year>(?:19|20)\d{2})\b"
+)
+_GAME_LOG_RE = re.compile(r"(?i)\bgame[-\s]?(?:by[-\s]?game|logs?)\b")
+
+_GAME_LOG_PLAYER_CTE = """
+WITH player AS (
+    SELECT DISTINCT player_id FROM savant_batting_expected WHERE name_key = %(name_key)s
+)
+""".strip()
+# Rates over summed batting_game_logs rows (alias g)
+_GAME_LOG_TOTALS = """
+       COUNT(*) AS games, SUM(g.pa) AS pa, SUM(g.ab) AS ab, SUM(g.h) AS hits, SUM(g.doubles) AS doubles,
+       SUM(g.triples) AS triples, SUM(g.hr) AS hr, SUM(g.bb) AS bb, SUM(g.so) AS so,
+       ROUND(SUM(g.h)::numeric / NULLIF(SUM(g.ab), 0), 3) AS avg,
+       ROUND((SUM(g.h) + SUM(g.bb) + SUM(g.hbp))::numeric
+             / NULLIF(SUM(g.ab) + SUM(g.bb) + SUM(g.hbp) + SUM(g.sf), 0), 3) AS obp,
+       ROUND((SUM(g.h) + SUM(g.doubles) + 2 * SUM(g.triples) + 3 * SUM(g.hr))::numeric
+             / NULLIF(SUM(g.ab), 0), 3) AS slg""".strip("\n")
+
+
+def _hitting_streak_sql(m: re.Match) -> Tuple[Optional[str], Optional[Dict]]:
+    q = m.string
+    ok, season = _question_season(q)
+    if not ok:
+        return None, None
+    key = _question_player_key(q)
+    active = bool(m.group("active"))
+    if key and season is None and not active:
+        # A player's longest streak with no season is a career question; the logs
+        # only cover the pitch-level seasons
+        return None, None
+    if not _game_log_covers(season, key):
+        return None, None
+    params, where = {}, []
+    if season is not None:
+        params["season"] = season
+        where.append("s.season = %(season)s")
+    elif not key:
+        # Leaderboard with no season: the latest loaded one
+        where.append("s.season = (SELECT MAX(season) FROM batting_streaks)")
+    if active:
+        where.append("s.active")
+    cte = ""
+    if key:
+        params["name_key"] = key
+        cte = _GAME_LOG_PLAYER_CTE + "\n"
+        where.append("s.player_id IN (SELECT player_id FROM player)")
+    sql = cte + f"""
+SELECT s.season, e.display_name AS player, s.games, s.start_date, s.end_date, s.active
+FROM batting_streaks s
+LEFT JOIN savant_batting_expected e ON e.player_id = s.player_id AND e.year = s.season
+WHERE {" AND ".join(where) if where else "TRUE"}
+ORDER BY s.games DESC, s.start_date
+FETCH FIRST 10 ROWS WITH TIES;
+""".strip()
+    return sql, params
+
+
+def _rolling_window_sql(m: re.Match) -> Tuple[Optional[str], Optional[Dict]]:
+    q = m.string
+    span = re.sub(r"\s+", " ", (m.group("n") or m.group("span")).lower())
+    window = _ROLLING_WINDOWS.get(span)
+    if window is None or _ROLLING_PITCHING_RE.search(q):
+        return None, None
+    ok, season = _question_season(q)
+    if not ok or (season is not None and season != _latest_game_log_season()):
+        # The windows are only kept for the latest loaded season
+        return None, None
+    params = {"window_days": window}
+    key = _question_player_key(q)
+    if not _game_log_covers(season, key):
+        return None, None
+    if key:
+        params["name_key"] = key
+        sql = _GAME_LOG_PLAYER_CTE + "\n" + """
+SELECT e.display_name AS player, r.window_days, r.as_of, r.games, r.pa, r.ab, r.h AS hits, r.doubles,
+       r.triples, r.hr, r.bb, r.so, r.avg, r.obp, r.slg, r.ops
+FROM batting_rolling r
+JOIN player p ON p.player_id = r.player_id
+LEFT JOIN savant_batting_expected e ON e.player_id = r.player_id AND e.year = r.season
+WHERE r.season = (SELECT MAX(season) FROM batting_rolling)
+  AND r.window_days = %(window_days)s;
+""".strip()
+        return sql, params
+    if not _LEADER_CUE_RE.search(q):
+        return None, None
+    stat = next((col for pat, col in _ROLLING_STATS if pat.search(q)), None)
+    if stat is None:
+        # No rolling stat named: don't guess OPS, leave it to the LLM
+        return None, None
+    top_m = _TOP_N_RE.search(q)
+    params["top_n"] = int(top_m.group("n")) if top_m else 10
+    # Rate stats need a floor: ~2.5 PA per calendar day is a regular's share
+    qualifier = "\n  AND r.pa >= 2.5 * r.window_days" if stat in _ROLLING_RATE_STATS else ""
+    sql = f"""
+SELECT e.display_name AS player, r.as_of, r.games, r.pa, r.ab, r.h AS hits, r.hr, r.bb, r.so,
+       r.avg, r.obp, r.slg, r.ops
+FROM batting_rolling r
+LEFT JOIN savant_batting_expected e ON e.player_id = r.player_id AND e.year = r.season
+WHERE r.season = (SELECT MAX(season) FROM batting_rolling)
+  AND r.window_days = %(window_days)s{qualifier}
+ORDER BY r.{stat} DESC NULLS LAST
+FETCH FIRST %(top_n)s ROWS WITH TIES;
+""".strip()
+    return sql, params
+
+
+def _player_game_log_sql(m: re.Match) -> Tuple[Optional[str], Optional[Dict]]:
+    """One date ("on July 4th, 2024") or a season's game-by-game log for a named player."""
+    q = m.string
+    key = _question_player_key(q)
+    if not key:
+        return None, None
+    params = {"name_key": key}
+    day_m = _GAME_DATE_RE.search(q)
+    if day_m:
+        if day_m.group("iso"):
+            params["game_date"] = day_m.group("iso")
+        else:
+            month = _MONTHS.index(day_m.group("month").lower()) + 1
+            params["game_date"] = f"{int(day_m.group('year')):04d}-{month:02d}-{int(day_m.group('day')):02d}"
+        if not _game_log_covers(int(params["game_date"][:4]), key):
+            return None, None
+        where = "g.game_date = CAST(%(game_date)s AS date)"
+    else:
+        ok, season = _question_season(q)
+        if not ok or not _game_log_covers(season, key):
+            return None, None
+        if season is None:
+            where = "g.season = (SELECT MAX(season) FROM batting_game_logs WHERE player_id IN (SELECT player_id FROM player))"
+        else:
+            params["season"] = season
+            where = "g.season = %(season)s"
+    sql = _GAME_LOG_PLAYER_CTE + "\n" + f"""
+SELECT g.game_date, g.team, CASE WHEN g.home THEN 'vs ' ELSE '@ ' END || g.opponent AS opponent,
+       g.pa, g.ab, g.h AS hits, g.doubles, g.triples, g.hr, g.bb, g.hbp, g.so
+FROM batting_game_logs g
+JOIN player p ON p.player_id = g.player_id
+WHERE {where}
+ORDER BY g.game_date, g.game_pk;
+""".strip()
+    return sql, params
+
+
+def _player_month_sql(m: re.Match) -> Tuple[Optional[str], Optional[Dict]]:
+    q = m.string
+    key = _question_player_key(q)
+    if not key or _GAME_DATE_RE.search(q):
+        return None, None
+    month = _MONTHS.index(m.group("month").lower()) + 1
+    year = int(m.group("year"))
+    if not _game_log_covers(year, key):
+        return None, None
+    params = {"name_key": key, "lo": f"{year:04d}-{month:02d}-01",
+              "hi": f"{year + month // 12:04d}-{month % 12 + 1:02d}-01"}
+    sql = _GAME_LOG_PLAYER_CTE + "\n" + f"""
+SELECT
+{_GAME_LOG_TOTALS}
+FROM batting_game_logs g
+JOIN player p ON p.player_id = g.player_id
+WHERE g.game_date >= CAST(%(lo)s AS date) AND g.game_date < CAST(%(hi)s AS date);
+""".strip()
+    return sql, params
 
 
 # -----------------------------------------------------------------------
@@ -276,6 +687,21 @@ DIRECT_PATTERNS = [
         r"\s+(?:team\s+)?batting\s+averages?\s+(?:in|for)\s+(?P<season>\d{4})"
     ), _team_batting_division_sql),
 
+    # Player handedness / count / pitch-type splits (statcast_splits cube).
+    # Ahead of the career patterns, which would otherwise claim
+    # "Aaron Judge's batting vs lefties".
+    (_SPLIT_HAND_RE, _player_split_sql),
+    (_SPLIT_PLATOON_RE, _player_split_sql),
+    (_SPLIT_COUNT_RE, _player_split_sql),
+    (_SPLIT_PITCH_RE, _player_split_sql),
+
+    # Game logs (batting_game_logs / batting_rolling / batting_streaks)
+    (_STREAK_RE, _hitting_streak_sql),
+    (_ROLLING_RE, _rolling_window_sql),
+    (_GAME_DATE_RE, _player_game_log_sql),
+    (_GAME_LOG_RE, _player_game_log_sql),
+    (_MONTH_RE, _player_month_sql),
+
     # Player pitching career by season
     # Captures "Clayton Kershaw" from queries like:
     # "Show me Clayton Kershaw ERA and FIP by season"
@@ -377,7 +803,6 @@ def build_sql_from_templates(
 
     # Stat-based YAML template
     tdef = templates_yaml.get("templates", templates_yaml)[name]
-    from datetime import date
     season = int(gd.get("season")) if gd.get("season") else date.today().year
     top_n = int(gd.get("top_n") or tdef.get("defaults", {}).get("top_n", 10))
     stat_label_nl = (gd.get("stat_label") or tdef.get("defaults", {}).get("stat_label", "stat")).lower()
@@ -0,0 +1,91 @@
+# scripts/apply_indexes.py
+#
+# Applies the managed index set in db/indexes.sql. Every statement there is
+# CREATE INDEX CONCURRENTLY IF NOT EXISTS, so this is safe to re-run against the
+# live database while the app is serving queries -- existing indexes are
+# skipped, new ones are built without locking out readers or the daily ETL.
+#
+# CONCURRENTLY can't run inside a transaction block, so statements run one at a
+# time in autocommit mode. A statement that fails (e.g. a table that doesn't
+# exist in this database) is reported and skipped; the rest still apply.
+#
+# Usage:
+#   .venv/Scripts/python scripts/apply_indexes.py            # apply + ANALYZE
+#   .venv/Scripts/python scripts/apply_indexes.py --dry-run  # list what would be created
+
+import argparse
+import os
+import re
+import time
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+load_dotenv(ROOT / ".env.awsrds")
+
+DB_PARAMS = {
+    "dbname": os.getenv("AWSDATABASE"),
+    "user": os.getenv("AWSUSER"),
+    "password": os.getenv("AWSPASSWORD"),
+    "host": os.getenv("AWSHOST"),
+    "port": os.getenv("AWSPORT"),
+}
+
+SQL_PATH = ROOT / "db" / "indexes.sql"
+
+_INDEX_RE = re.compile(r"CREATE\s+INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)\s+ON\s+(\w+)", re.I)
+
+
+def load_index_statements(path=SQL_PATH):
+    """Returns [(index_name, table_name, statement)] in file order."""
+    text = re.sub(r"--[^\n]*", "", path.read_text(encoding="utf-8"))
+    out = []
+    for stmt in (s.strip() for s in text.split(";")):
+        m = _INDEX_RE.match(stmt)
+        if m:
+            out.append((m.group(1), m.group(2), stmt + ";"))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the managed index set in db/indexes.sql.")
+    parser.add_argument("--dry-run", action="store_true", help="Only list indexes that don't exist yet.")
+    args = parser.parse_args()
+
+    statements = load_index_statements()
+    conn = psycopg2.connect(**DB_PARAMS)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT indexname FROM pg_indexes WHERE schemaname = 'public'")
+            existing = {r[0] for r in cur.fetchall()}
+
+            missing = [(name, table, stmt) for name, table, stmt in statements if name not in existing]
+            print(f"{len(statements)} managed indexes | {len(statements) - len(missing)} present | {len(missing)} missing")
+
+            touched = set()
+            for name, table, stmt in missing:
+                if args.dry_run:
+                    print(f"  [would create] {name} on {table}")
+                    continue
+                t0 = time.time()
+                try:
+                    cur.execute(stmt)
+                    touched.add(table)
+                    print(f"  [created] {name} on {table} ({time.time() - t0:.1f}s)")
+                except Exception as e:
+                    print(f"  [failed]  {name} on {table}: {type(e).__name__}: {e}")
+
+            # Fresh statistics so the planner actually considers the new indexes
+            for table in sorted(touched):
+                cur.execute(f'ANALYZE "{table}"')
+            if touched:
+                print(f"ANALYZEd {len(touched)} tables.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# scripts/backfill_savant_display_names.py
+#
+# One-time migration: adds display_name ("First Last") and name_key (folded
+# search key) to every savant_* table and fills them for rows written before the
+# ETL started populating them. Uses the same nlp/names.py functions as
+# etl/update_savant_awsrds.py, so existing and new rows fold identically -- no
+# Savant re-fetch needed. Safe to re-run: only rows with a NULL display_name
+# are touched.
+#
+# Run scripts/apply_indexes.py afterward for the name_key indexes
+# (db/indexes.sql), then deploy the template/prompt changes that read these
+# columns.
+#
+# Usage:
+#   .venv/Scripts/python scripts/backfill_savant_display_names.py
+
+import os
+import sys
+from pathlib import Path
+
+import psycopg2
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+load_dotenv(ROOT / ".env.awsrds")
+
+from nlp.names import display_name, name_key
+
+DB_PARAMS = {
+    "dbname": os.getenv("AWSDATABASE"),
+    "user": os.getenv("AWSUSER"),
+    "password": os.getenv("AWSPASSWORD"),
+    "host": os.getenv("AWSHOST"),
+    "port": os.getenv("AWSPORT"),
+}
+
+# The wide tables, plus the pre-scripts/migrate_savant_season.py tables (views after it)
+SAVANT_TABLES = [
+    "savant_batting_season", "savant_pitching_season",
+    "savant_batting_traditional", "savant_batting_ratios", "savant_batting_expected",
+    "savant_batting_physics", "savant_batting_discipline",
+    "savant_pitching_traditional", "savant_pitching_ratios", "savant_pitching_expected",
+    "savant_pitching_physics", "savant_pitching_discipline",
+]
+
+
+def main():
+    with psycopg2.connect(**DB_PARAMS) as conn:
+        with conn.cursor() as cur:
+            for table in SAVANT_TABLES:
+                cur.execute(
+                    "SELECT column_name FROM information_schema.columns WHERE table_schema='public' AND table_name=%s",
+                    (table,),
+                )
+                cols = {r[0] for r in cur.fetchall()}
+                if not cols:
+                    print(f"[skip] {table}: table does not exist")
+                    continue
+                cur.execute("SELECT table_type FROM information_schema.tables "
+                            "WHERE table_schema='public' AND table_name=%s", (table,))
+                if cur.fetchone()[0] == "VIEW":
+                    print(f"[skip] {table}: a view over its savant_*_season table")
+                    continue
+                if "playername" not in cols:
+                    print(f"[skip] {table}: no playername column")
+                    continue
+
+                cur.execute(f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS display_name TEXT')
+                cur.execute(f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS name_key TEXT')
+                cur.execute(f'SELECT player_id, year, playername FROM "{table}" WHERE display_name IS NULL')
+                rows = cur.fetchall()
+
+                updates = []
+                for player_id, year, playername in rows:
+                    shown = display_name(playername)
+                    updates.append((player_id, year, shown, name_key(shown)))
+                if updates:
+                    execute_values(
+                        cur,
+                        f'UPDATE "{table}" AS t SET display_name = v.display_name, name_key = v.name_key '
+                        f"FROM (VALUES %s) AS v(player_id, year, display_name, name_key) "
+                        f"WHERE t.player_id = v.player_id AND t.year = v.year",
+                        updates,
+                        page_size=1000,
+                    )
+                conn.commit()
+                print(f"{table}: filled {len(updates)} rows")
+    print("Done. Now run scripts/apply_indexes.py for the name_key indexes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,85 +1,181 @@
 # scripts/backfill_savant_statcast_history.py
 #
-# One-time backfill: populate 2015-2025 into the Statcast-exclusive tables
-# (savant_*_expected / physics / discipline). These six tables are the ONLY
+# One-time backfill: populate 2015-2025 into the Statcast-exclusive columns
+# (savant_*_expected / physics / discipline -- views over the wide
+# savant_batting_season / savant_pitching_season tables, etl/savant_season.py).
+# These six column groups are the ONLY
 # source in this DB for exit velocity, launch angle, barrel%, xwOBA, whiff%,
 # chase%, and sprint speed -- Lahman never had them and the frozen FanGraphs
 # archive doesn't either. The daily incremental job (etl/update_savant_awsrds.py)
 # only ever pulls the current season by design, so every season before 2026
 # was empty for these metrics until this script runs.
 #
-# savant_*_traditional / ratios are intentionally left alone here -- Lahman
+# savant_*_traditional / ratios columns are intentionally left alone here -- Lahman
 # already covers their counting/rate stats for historical seasons, per the
 # three-tier data model documented in AGENTS.md.
 #
 # Usage:
 #   .venv/Scripts/python scripts/backfill_savant_statcast_history.py
+#   .venv/Scripts/python scripts/backfill_savant_statcast_history.py --upsert-method row   # old per-row path, for timing
+#   .venv/Scripts/python scripts/backfill_savant_statcast_history.py --workers 4 --rate 0.5
+#   .venv/Scripts/python scripts/backfill_savant_statcast_history.py --replay            # from data/raw/, no downloads
+#   .venv/Scripts/python scripts/backfill_savant_statcast_history.py --replay 2026-07-04 # payloads as fetched that day
+#   .venv/Scripts/python scripts/backfill_savant_statcast_history.py --resume            # skip units already checkpointed
+#   .venv/Scripts/python scripts/backfill_savant_statcast_history.py --write-workers 4   # years written in parallel
+#
+# All 22 (year, batter/pitcher) downloads go through etl/fetch_scheduler.py:
+# a small worker pool under a shared requests/sec cap, with jittered retries,
+# instead of one year at a time with fixed sleeps. Every download is kept in the
+# raw landing zone (etl/raw_store.py), which --replay re-processes offline.
 #
 # Safe to re-run: upserts on (player_id, year), so a partial/interrupted run
-# can just be re-run and will only overwrite rows it already touched.
+# can just be re-run and will only overwrite rows it already touched (only the
+# three groups' columns -- the daily job's traditional / ratios columns on the
+# same rows are kept). Each finished (year, player_type, table) unit is appended to a checkpoint file
+# (logs/savant_backfill_checkpoint.jsonl); --resume skips those units and any
+# download whose tables are all done. Frames are written by a small pool of
+# writer threads (--write-workers), each with its own connection, and the run
+# ends with a per-unit table of row counts and durations.
+# Like the daily job and etl/load_lahman.py, it ends with etl/publish.py's
+# publish stage over the seasons it wrote (units finished by an interrupted run
+# and skipped by --resume included): the wide tables are ANALYZEd, the
+# player-season views and season_leaders refreshed, and data_versions bumped.
+# Rows written here get display_name / name_key from clean_and_normalize, same
+# as the daily job; scripts/backfill_savant_display_names.py fills them in on
+# existing rows without re-fetching from Savant.
 
+import argparse
+import json
 import socket
 import sys
+import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 
 import pg8000.native
 
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from etl.fetch_scheduler import FetchStats, run_fetch_jobs
+from etl.publish import publish
+from etl.run_metrics import RunMetrics
+from etl.savant_season import SEASON_TABLES, ensure_compat_views, require_migrated, season_frame
 from etl.update_savant_awsrds import (
     DB_CONFIG,
+    FETCH_RATE,
+    FETCH_WORKERS,
+    UPSERT_METHOD,
     clean_and_normalize,
-    fetch_savant_master_csv,
+    print_upsert_summary,
+    savant_fetcher,
     upsert_table_pg8000,
 )
 
 START_YEAR = 2015  # first full Statcast tracking season
 END_YEAR = 2025  # 2026+ stays owned by the daily incremental job
+CHECKPOINT_PATH = ROOT / "logs" / "savant_backfill_checkpoint.jsonl"
 
-BATTING_SCHEMA_MAP = {
-    "savant_batting_expected": ['player_id', 'year', 'playername', 'player_name', 'xwoba', 'xba', 'xslg', 'xobp', 'xiso', 'wobacon_diff', 'sweet_spot_percent', 'barrel_batted_rate', 'hard_hit_percent'],
-    "savant_batting_physics": ['player_id', 'year', 'playername', 'player_name', 'exit_velocity_avg', 'launch_angle_avg', 'sprint_speed', 'hp_to_first'],
-    "savant_batting_discipline": ['player_id', 'year', 'playername', 'player_name', 'zone_swing_percent', 'zone_contact_percent', 'chase_percent', 'whiff_percent', 'meatball_swing_percent', 'meatball_percent'],
+# Column groups written per wide table (the compat view names, etl/savant_season.py)
+BACKFILL_VIEWS = {
+    'batter': ["savant_batting_expected", "savant_batting_physics", "savant_batting_discipline"],
+    'pitcher': ["savant_pitching_expected", "savant_pitching_physics", "savant_pitching_discipline"],
 }
 
-PITCHING_SCHEMA_MAP = {
-    "savant_pitching_expected": ['player_id', 'year', 'playername', 'player_name', 'xwoba', 'xba', 'xslg', 'xobp', 'xiso', 'barrel_batted_rate', 'hard_hit_percent'],
-    "savant_pitching_physics": ['player_id', 'year', 'playername', 'player_name', 'exit_velocity_avg', 'launch_angle_avg', 'fastball_avg_speed', 'fastball_avg_spin', 'breaking_avg_spin', 'release_extension'],
-    "savant_pitching_discipline": ['player_id', 'year', 'playername', 'player_name', 'chase_percent', 'whiff_percent', 'zone_percent', 'putaway_percent'],
-}
+
+class Checkpoint:
+    """Append-only JSONL of finished (year, player_type, table) units. Written
+    from the writer threads as each table upsert commits."""
+
+    def __init__(self, path: Path, resume: bool):
+        self.path = path
+        self.lock = threading.Lock()
+        self.done = set()
+        self.resumed = []  # units an earlier, interrupted run finished (not yet published)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    u = json.loads(line)
+                    self.done.add((u["year"], u["player_type"], u["table"]))
+                    self.resumed.append(u)
+        elif path.exists():
+            path.unlink()  # fresh run
+
+    def pending(self, year, player_type):
+        table = SEASON_TABLES[player_type]
+        return [] if (year, player_type, table) in self.done else [table]
+
+    def record(self, unit: dict):
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(unit) + "\n")
+            self.done.add((unit["year"], unit["player_type"], unit["table"]))
 
 
-def backfill_year(db, year):
-    print(f"\n=== {year} ===")
+def write_frame(db, df, year, player_type, checkpoint: Checkpoint, method=None, metrics: RunMetrics = None):
+    """Upsert one downloaded (year, player_type) CSV into its wide table, unless the
+    checkpoint already has it. Returns one summary dict per table written."""
+    units = []
+    if df.empty:
+        print(f"  No {player_type} data returned for {year}, skipping.")
+        return units
+    df = clean_and_normalize(df)
+    for table in checkpoint.pending(year, player_type):
+        frame, groups = season_frame(df, table, BACKFILL_VIEWS[player_type])
+        if groups:
+            print(f"  Updating {table} ({year}: {', '.join(g.rsplit('_', 1)[1] for g in groups)})...")
+            t0 = time.perf_counter()
+            counts = upsert_table_pg8000(db, frame, table, method=method, metrics=metrics)
+            unit = {"year": year, "player_type": player_type, "table": table,
+                    "inserted": counts["inserted"], "updated": counts["updated"],
+                    "unchanged": counts["unchanged"], "seconds": round(time.perf_counter() - t0, 2),
+                    "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+            checkpoint.record(unit)
+            units.append(unit)
+    return units
 
-    df_bat = fetch_savant_master_csv(year, 'batter')
-    if not df_bat.empty:
-        df_bat = clean_and_normalize(df_bat)
-        for table, cols in BATTING_SCHEMA_MAP.items():
-            valid = [c for c in cols if c in df_bat.columns]
-            if len(valid) >= 3:
-                print(f"  Updating {table} ({year})...")
-                upsert_table_pg8000(db, df_bat[valid], table)
-    else:
-        print(f"  No batting data returned for {year}, skipping.")
 
-    time.sleep(1)  # be polite to Savant between the two CSV pulls
+def touched_tables(units) -> dict:
+    """publish() input: wide table -> rows written and the seasons they landed in."""
+    touched = {}
+    for u in units:
+        t = touched.setdefault(u["table"], {"rows": 0, "seasons": set()})
+        written = u["inserted"] + u["updated"]
+        t["rows"] += written
+        if written:
+            t["seasons"].add(u["year"])
+    return {table: {"rows": t["rows"], "seasons": sorted(t["seasons"])} for table, t in touched.items()}
 
-    df_pit = fetch_savant_master_csv(year, 'pitcher')
-    if not df_pit.empty:
-        df_pit = clean_and_normalize(df_pit)
-        for table, cols in PITCHING_SCHEMA_MAP.items():
-            valid = [c for c in cols if c in df_pit.columns]
-            if len(valid) >= 3:
-                print(f"  Updating {table} ({year})...")
-                upsert_table_pg8000(db, df_pit[valid], table)
-    else:
-        print(f"  No pitching data returned for {year}, skipping.")
 
-    time.sleep(1)  # be polite to Savant between years
+def print_unit_summary(units):
+    print(f"\n{'year':>4s} {'type':7s} {'table':28s} {'inserted':>8s} {'updated':>8s} {'unchanged':>9s} {'secs':>6s}")
+    for u in sorted(units, key=lambda u: (u["year"], u["player_type"], u["table"])):
+        print(f"{u['year']:>4d} {u['player_type']:7s} {u['table']:28s} {u['inserted']:>8d} "
+              f"{u['updated']:>8d} {u['unchanged']:>9d} {u['seconds']:>6.2f}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Backfill 2015-2025 Statcast-exclusive savant_* tables.")
+    parser.add_argument("--upsert-method", choices=["copy", "row"], default=None,
+                        help="copy (default: COPY staging + one merge) or row (old per-row upsert)")
+    parser.add_argument("--workers", type=int, default=FETCH_WORKERS, help="Concurrent downloads (default %(default)s)")
+    parser.add_argument("--write-workers", type=int, default=2,
+                        help="Years written in parallel, one DB connection each (default %(default)s)")
+    parser.add_argument("--rate", type=float, default=FETCH_RATE, help="Max Savant requests/sec (default %(default)s)")
+    parser.add_argument("--replay", nargs="?", const="latest", metavar="AS_OF",
+                        help="Parse landed payloads instead of downloading (latest, or a UTC date)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip (year, type, table) units the checkpoint already records")
+    parser.add_argument("--checkpoint", default=str(CHECKPOINT_PATH), help="Checkpoint file (default %(default)s)")
+    args = parser.parse_args()
+    if args.upsert_method is None and UPSERT_METHOD == "swap":
+        # Parallel writers would each swap the same tables; the daily job's swap mode
+        # doesn't apply here
+        args.upsert_method = "copy"
+
     cfg = dict(DB_CONFIG)
     try:
         # Force IPv4 resolution, same reasoning as the daily job.
@@ -87,13 +183,82 @@ def main():
     except Exception as e:
         print(f"Warning: could not resolve IPv4 for host: {e}")
 
-    db = pg8000.native.Connection(**cfg, timeout=30)
+    checkpoint = Checkpoint(Path(args.checkpoint), args.resume)
+    jobs = [(year, player_type) for year in range(START_YEAR, END_YEAR + 1) for player_type in ('batter', 'pitcher')
+            if checkpoint.pending(year, player_type)]
+    if args.resume:
+        print(f"Resuming: {len(checkpoint.done)} units already done, {len(jobs)} downloads left.")
+    if not jobs:
+        print("Nothing left to backfill.")
+        return
+
+    # pg8000 connections aren't thread-safe: one per writer thread, closed at the end
+    local, connections = threading.local(), []
+
+    def thread_db():
+        if not hasattr(local, "db"):
+            local.db = pg8000.native.Connection(**cfg, timeout=30)
+            connections.append(local.db)
+        return local.db
+
+    units, failed = [], []
+    metrics = RunMetrics("savant_backfill")
+    t_start = time.perf_counter()
+    fetch_stats = FetchStats()
+    fetch, rate, attempts = savant_fetcher(args.replay)
+    if not args.replay:
+        rate = args.rate
     try:
-        for year in range(START_YEAR, END_YEAR + 1):
-            backfill_year(db, year)
+        require_migrated(thread_db().run)
+        with ThreadPoolExecutor(max_workers=max(1, args.write_workers)) as writers:
+            futures = {}
+            # Downloads run concurrently under the token-bucket rate cap; each frame
+            # goes to the writer pool as soon as it arrives
+            for result in run_fetch_jobs(jobs, fetch, workers=args.workers, rate=rate,
+                                         max_attempts=attempts, stats=fetch_stats):
+                year, player_type = result.job
+                attrs = result.value.attrs if result.ok else {}
+                metrics.fetch(f"{player_type}/{year}", result.seconds, attrs.get("source_bytes", 0),
+                              attrs.get("parse_seconds", 0.0), result.attempts, result.ok)
+                if not result.ok:
+                    print(f"  Giving up on {player_type} {year} after {result.attempts} attempts; re-run with --resume.")
+                    failed.append(result.job)
+                    continue
+                fut = writers.submit(lambda r=result: write_frame(thread_db(), r.value, *r.job, checkpoint,
+                                                                  method=args.upsert_method, metrics=metrics))
+                futures[fut] = result.job
+            for fut, job in futures.items():
+                try:
+                    units.extend(fut.result())
+                except Exception as e:
+                    print(f"  Writing {job[1]} {job[0]} failed: {e}; re-run with --resume.")
+                    failed.append(job)
+        # Once the parallel writers are done: views over any column the wide tables just gained
+        for table in sorted({u["table"] for u in units}):
+            ensure_compat_views(thread_db().run, table)
+        # ANALYZE what was written, refresh the views/leaders that read it and bump
+        # data_versions, as the daily job does; a run that changed nothing skips it
+        publish(thread_db().run, touched_tables(checkpoint.resumed + units), "savant_backfill", metrics)
+    except BaseException:
+        metrics.finish("failed")
+        raise
     finally:
-        db.close()
-    print("\nBackfill complete.")
+        for db in connections:
+            db.close()
+    metrics.count("units_written", len(units))
+    metrics.finish("partial" if failed else "ok")
+
+    print_unit_summary(units)
+    totals = Counter()
+    for u in units:
+        totals.update({k: u[k] for k in ("inserted", "updated", "unchanged", "seconds")})
+    print(f"\nBackfill complete in {time.perf_counter() - t_start:.1f}s wall: "
+          f"{fetch_stats.jobs} downloads ({fetch_stats.retries} retries), {len(units)} units written, "
+          f"{len(failed)} (year, type) jobs failed.")
+    print_upsert_summary(totals, label="Backfill")
+    if failed:
+        print(f"Checkpoint: {checkpoint.path} -- re-run with --resume to finish.")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
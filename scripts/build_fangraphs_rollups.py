@@ -0,0 +1,77 @@
+# scripts/build_fangraphs_rollups.py
+#
+# One-time build of fangraphs_batting_by_season / fangraphs_pitching_by_season
+# from db/fangraphs_rollups.sql. The FanGraphs archive is frozen, so this only
+# ever needs to run once per database -- re-running is refused unless you pass
+# --rebuild (e.g. after a manual correction to fangraphs_*_advanced itself).
+#
+# Run this BEFORE scripts/create_player_season_views.py; the player-season
+# views read their WAR/wRC+/FIP columns from these tables.
+#
+# Usage:
+#   .venv/Scripts/python scripts/build_fangraphs_rollups.py
+#   .venv/Scripts/python scripts/build_fangraphs_rollups.py --rebuild
+
+import argparse
+import os
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+load_dotenv(ROOT / ".env.awsrds")
+
+DB_PARAMS = {
+    "dbname": os.getenv("AWSDATABASE"),
+    "user": os.getenv("AWSUSER"),
+    "password": os.getenv("AWSPASSWORD"),
+    "host": os.getenv("AWSHOST"),
+    "port": os.getenv("AWSPORT"),
+}
+
+SQL_PATH = ROOT / "db" / "fangraphs_rollups.sql"
+
+# rollup table -> frozen source table it is built from
+ROLLUPS = {
+    "fangraphs_batting_by_season": "fangraphs_batting_advanced",
+    "fangraphs_pitching_by_season": "fangraphs_pitching_advanced",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="One-time build of the frozen FanGraphs per-season rollups.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Drop and rebuild the rollups even if they already exist.")
+    args = parser.parse_args()
+
+    with psycopg2.connect(**DB_PARAMS) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT table_name FROM information_schema.tables WHERE table_schema='public' AND table_name = ANY(%s)",
+                (list(ROLLUPS),),
+            )
+            existing = {r[0] for r in cur.fetchall()}
+            if existing and not args.rebuild:
+                print(f"Already built: {sorted(existing)} -- the FanGraphs archive is frozen, nothing to do. "
+                      f"Pass --rebuild to force.")
+                return
+
+            # The player-season views depend on these tables; dropping them
+            # would otherwise fail on --rebuild.
+            cur.execute("DROP MATERIALIZED VIEW IF EXISTS player_season_batting, player_season_pitching")
+            cur.execute(SQL_PATH.read_text(encoding="utf-8"))
+
+            for rollup, source in ROLLUPS.items():
+                cur.execute(f"SELECT COUNT(*) FROM {source}")
+                n_source = cur.fetchone()[0]
+                cur.execute(f"SELECT COUNT(*) FROM {rollup}")
+                n_rollup = cur.fetchone()[0]
+                print(f"{rollup}: {n_rollup} (idfg, season) rows from {n_source} rows in {source}")
+        conn.commit()
+
+    print("FanGraphs rollups built. Re-run scripts/create_player_season_views.py if the views were dropped.")
+
+
+if __name__ == "__main__":
+    main()
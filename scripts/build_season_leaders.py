@@ -0,0 +1,58 @@
+# scripts/build_season_leaders.py
+#
+# Creates the season_leaders table (db/season_leaders.sql) and fills it for
+# every season. Run once by hand; after that the daily Savant ETL refreshes the
+# current season and etl/load_lahman.py --commit refreshes everything. Safe to
+# re-run at any time (each refresh replaces the rows it covers).
+#
+# The Streamlit app only switches its fast-path to this table on startup, so
+# restart/redeploy it after the first build.
+#
+# Usage:
+#   .venv/Scripts/python scripts/build_season_leaders.py
+#   .venv/Scripts/python scripts/build_season_leaders.py --season 2024   # one season only
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+load_dotenv(ROOT / ".env.awsrds")
+
+from etl.derived_tables import psycopg2_runner, refresh_season_leaders
+
+DB_PARAMS = {
+    "dbname": os.getenv("AWSDATABASE"),
+    "user": os.getenv("AWSUSER"),
+    "password": os.getenv("AWSPASSWORD"),
+    "host": os.getenv("AWSHOST"),
+    "port": os.getenv("AWSPORT"),
+}
+
+SQL_PATH = ROOT / "db" / "season_leaders.sql"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create and fill the precomputed season_leaders table.")
+    parser.add_argument("--season", type=int, default=None, help="Only rebuild this season (default: all).")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        run = psycopg2_runner(conn)
+        run(SQL_PATH.read_text(encoding="utf-8"))
+        refresh_season_leaders(run, season=args.season)
+        rows = run("SELECT domain, COUNT(DISTINCT season), COUNT(*) FROM season_leaders GROUP BY domain ORDER BY domain")
+        for domain, n_seasons, n_rows in rows:
+            print(f"season_leaders[{domain}]: {n_rows} rows across {n_seasons} seasons")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# scripts/create_player_season_views.py
+#
+# Creates (or re-creates) the player_season_batting / player_season_pitching
+# materialized views from db/player_season_views.sql. Run once by hand, and
+# again whenever that file changes -- the daily ETL only ever REFRESHes the
+# views, it never changes their definition.
+#
+# Usage:
+#   .venv/Scripts/python scripts/create_player_season_views.py
+
+import os
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+load_dotenv(ROOT / ".env.awsrds")
+
+DB_PARAMS = {
+    "dbname": os.getenv("AWSDATABASE"),
+    "user": os.getenv("AWSUSER"),
+    "password": os.getenv("AWSPASSWORD"),
+    "host": os.getenv("AWSHOST"),
+    "port": os.getenv("AWSPORT"),
+}
+
+SQL_PATH = ROOT / "db" / "player_season_views.sql"
+
+
+def main():
+    sql = SQL_PATH.read_text(encoding="utf-8")
+    with psycopg2.connect(**DB_PARAMS) as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql)
+            for view in ("player_season_batting", "player_season_pitching"):
+                cur.execute(f"SELECT COUNT(*) FROM {view}")
+                print(f"{view}: {cur.fetchone()[0]} player-season rows")
+        conn.commit()
+    print("Player-season views created.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# scripts/etl_run_report.py
+#
+# Compares the latest ETL run of each job (logs/etl_runs/history.jsonl, written
+# by etl/run_metrics.py) with the trailing median of the runs before it: wall
+# time, per-stage time, bytes fetched, retries, and per-table rows, write time
+# and rows/sec. Metrics that moved the wrong way by more than --threshold are
+# flagged, so "did today's run get slower, and which table did it" is one
+# command instead of reading two logs side by side.
+#
+# Failed runs are excluded from the baseline (they stop early and look fast).
+#
+# Usage:
+#   .venv/Scripts/python scripts/etl_run_report.py
+#   .venv/Scripts/python scripts/etl_run_report.py --job savant_daily --window 14
+#   .venv/Scripts/python scripts/etl_run_report.py --threshold 0.5 --fail-on-regression
+
+import argparse
+import statistics
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from etl.run_metrics import history_path, load_history
+
+
+def flatten(run):
+    """metric name -> (value, higher_is_worse)"""
+    out = {"wall_seconds": (run["wall_seconds"], True)}
+    for name, st in run.get("stages", {}).items():
+        out[f"stage.{name}.seconds"] = (st["seconds"], True)
+        if "bytes" in st:
+            out[f"stage.{name}.bytes"] = (st["bytes"], None)
+    for name, n in run.get("counters", {}).items():
+        out[f"counter.{name}"] = (n, True if name in ("retries", "failed_fetches", "table_errors") else None)
+    for name, t in run.get("tables", {}).items():
+        out[f"table.{name}.rows"] = (t["rows"], None)
+        out[f"table.{name}.seconds"] = (t["seconds"], True)
+        if t.get("rows_per_sec") is not None:
+            out[f"table.{name}.rows_per_sec"] = (t["rows_per_sec"], False)
+    return out
+
+
+def compare(latest, baseline, threshold, min_seconds=1.0):
+    """Rows of (metric, latest, median, change, flag) for every metric in the latest run.
+    Timings where both sides are under `min_seconds` aren't flagged (noise)."""
+    base = [flatten(r) for r in baseline]
+    rows = []
+    for metric, (value, higher_is_worse) in flatten(latest).items():
+        history = [b[metric][0] for b in base if metric in b and b[metric][0] is not None]
+        if not history:
+            rows.append((metric, value, None, None, "new"))
+            continue
+        median = statistics.median(history)
+        change = (value - median) / median if median else None
+        flag = ""
+        if metric.endswith("seconds") and max(value, median) < min_seconds:
+            pass
+        elif median == 0 and higher_is_worse and value > 0:
+            flag = "REGRESSION"  # e.g. retries where there were none
+        elif change is not None and higher_is_worse is not None:
+            worse = change > threshold if higher_is_worse else change < -threshold
+            better = change < -threshold if higher_is_worse else change > threshold
+            flag = "REGRESSION" if worse else "improved" if better else ""
+        rows.append((metric, value, median, change, flag))
+    return rows
+
+
+def fmt(v):
+    if v is None:
+        return "-"
+    if isinstance(v, float):
+        return f"{v:,.2f}"
+    return f"{v:,}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latest ETL run vs the trailing median of earlier runs.")
+    parser.add_argument("--job", help="savant_daily, savant_backfill, lahman_load (default: every job recorded)")
+    parser.add_argument("--window", type=int, default=10, help="Earlier runs in the baseline (default %(default)s)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative change that counts as a regression (default %(default)s)")
+    parser.add_argument("--min-seconds", type=float, default=1.0,
+                        help="Don't flag timings below this on both sides (default %(default)s)")
+    parser.add_argument("--all", action="store_true", help="Print every metric, not just flagged/top ones")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if anything regressed")
+    args = parser.parse_args()
+
+    runs = load_history(args.job)
+    if not runs:
+        print(f"No runs recorded in {history_path()}" + (f" for {args.job}." if args.job else "."))
+        return
+
+    regressed = False
+    for job in sorted({r["job"] for r in runs}):
+        job_runs = [r for r in runs if r["job"] == job]
+        latest = job_runs[-1]
+        baseline = [r for r in job_runs[:-1] if r.get("status") != "failed"][-args.window:]
+        print(f"== {job}: latest {latest['started_at']} ({latest['status']}, {latest['wall_seconds']:.1f}s wall) "
+              f"vs median of {len(baseline)} earlier run(s)")
+        if not baseline:
+            print("   (no earlier runs to compare against yet)\n")
+            continue
+
+        rows = compare(latest, baseline, args.threshold, args.min_seconds)
+        shown = rows if args.all else [r for r in rows if r[4] or r[0] == "wall_seconds" or r[0].startswith("stage.")]
+        print(f"   {'metric':48s} {'latest':>12s} {'median':>12s} {'change':>8s}")
+        for metric, value, median, change, flag in shown:
+            ch = f"{change:+.0%}" if change is not None else "-"
+            print(f"   {metric:48s} {fmt(value):>12s} {fmt(median):>12s} {ch:>8s}  {flag}")
+
+        # Which table dominates this run's write time
+        tables = sorted(latest.get("tables", {}).items(), key=lambda kv: kv[1]["seconds"], reverse=True)
+        if tables:
+            total = sum(t["seconds"] for _, t in tables) or 1
+            name, t = tables[0]
+            print(f"   slowest table: {name} ({t['seconds']:.2f}s, {t['seconds'] / total:.0%} of write time)")
+        regressed |= any(r[4] == "REGRESSION" for r in rows)
+        print()
+
+    if args.fail_on_regression and regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# scripts/index_advisor.py
+#
+# Index advisor driven by the regression bank. Takes the SQL from a
+# tests/run_regression.py results CSV, runs each statement through
+# EXPLAIN (FORMAT JSON) against the live database, and collects every
+# Seq Scan over a large table (pg_class.reltuples >= --min-rows). For each one
+# it pulls the columns the scan filters on (or, failing that, the join keys
+# it's probed by), checks them against the leading columns of the indexes that
+# already exist, and proposes the missing ones ranked by estimated benefit:
+#
+#   benefit = sum over scans of  scan_cost * (1 - plan_rows / reltuples)
+#
+# i.e. the planner's own cost for reading the whole table, discounted by how
+# much of it the query actually keeps. It's a ranking heuristic, not a promise
+# -- review proposals before adding them to db/indexes.sql (the managed set,
+# applied by scripts/apply_indexes.py). Nothing here creates an index.
+#
+# Fast-path and template rows are re-routed (deterministic, no LLM call) to
+# recover their bind parameters; model rows already have literal SQL.
+#
+# Usage:
+#   .venv/Scripts/python scripts/index_advisor.py                       # latest results CSV
+#   .venv/Scripts/python scripts/index_advisor.py --results tests/results/regression_20260301_101500.csv
+#   .venv/Scripts/python scripts/index_advisor.py --min-rows 20000 --out tests/results/index_advice.csv
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv(ROOT / ".env.awsrds")
+
+from nlp import generate_sql as gsql
+from nlp import template_router as tr
+
+DB_PARAMS = {
+    "dbname": os.getenv("AWSDATABASE"),
+    "user": os.getenv("AWSUSER"),
+    "password": os.getenv("AWSPASSWORD"),
+    "host": os.getenv("AWSHOST"),
+    "port": os.getenv("AWSPORT"),
+}
+
+RESULTS_DIR = ROOT / "tests" / "results"
+
+# Plan keys that carry a join predicate an inner Seq Scan could be probed by
+_JOIN_COND_KEYS = ("Hash Cond", "Merge Cond", "Join Filter")
+
+
+def latest_results_csv():
+    files = sorted(RESULTS_DIR.glob("regression_*.csv"))
+    if not files:
+        sys.exit(f"No regression_*.csv in {RESULTS_DIR} -- run tests/run_regression.py first, or pass --results.")
+    return files[-1]
+
+
+def recover_params(question, source, templates_yaml):
+    """Re-route a fast-path/template question to get its bind params back. Returns dict or None."""
+    norm_q, season = gsql.normalize_query(question)
+    if source == "fastpath":
+        return {"season": season, "top_n": 10}
+    if source.startswith("template:"):
+        _sql, params, _name = tr.build_sql_from_templates(norm_q, templates_yaml)
+        return params or {}
+    return None
+
+
+def explain(cur, sql, params):
+    cur.execute("EXPLAIN (FORMAT JSON) " + sql.rstrip().rstrip(";"), params or None)
+    doc = cur.fetchone()[0]
+    if isinstance(doc, str):
+        doc = json.loads(doc)
+    return doc[0]["Plan"]
+
+
+def walk_seq_scans(node, join_conds=()):
+    """Yields (seq_scan_node, join_conditions_from_ancestors) for every Seq Scan in the plan."""
+    conds = list(join_conds) + [node[k] for k in _JOIN_COND_KEYS if k in node]
+    if node.get("Node Type") == "Seq Scan":
+        yield node, conds
+    for child in node.get("Plans", []):
+        yield from walk_seq_scans(child, conds)
+
+
+def filter_columns(filter_text, table_cols):
+    """Columns of this table referenced in a Seq Scan filter: equality columns first, then the rest."""
+    if not filter_text:
+        return []
+    eq, other = [], []
+    for col in sorted(table_cols):
+        if not re.search(rf"\b{re.escape(col)}\b", filter_text):
+            continue
+        # Plans print casts as "(col)::text = 'x'::text"; ">= / <=" don't count as equality
+        if re.search(rf"\b{re.escape(col)}\b\)?(?:::[\w ]+?)?\s*=\s", filter_text):
+            eq.append(col)
+        else:
+            other.append(col)
+    return eq + other
+
+
+def join_columns(alias, conds, table_cols):
+    cols = []
+    for cond in conds:
+        for a, col in re.findall(r"\b(\w+)\.\"?(\w+)\"?", cond):
+            if a == alias and col in table_cols and col not in cols:
+                cols.append(col)
+    return cols
+
+
+def leading_index_columns(cur):
+    """{table: set of leading columns/expressions of its existing indexes}."""
+    cur.execute("SELECT tablename, indexdef FROM pg_indexes WHERE schemaname = 'public'")
+    out = defaultdict(set)
+    for table, indexdef in cur.fetchall():
+        m = re.search(r"USING \w+ \((.+)\)", indexdef)
+        if m:
+            first = m.group(1).split(",")[0].strip().strip('"')
+            out[table].add(first.lower())
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Propose missing indexes from the regression bank's query plans.")
+    parser.add_argument("--results", default=None, help="Regression results CSV (default: latest in tests/results/)")
+    parser.add_argument("--min-rows", type=int, default=50000,
+                        help="Only report Seq Scans on tables with at least this many rows (default 50000).")
+    parser.add_argument("--out", default=None, help="Optional CSV path for the proposals")
+    args = parser.parse_args()
+
+    results_path = Path(args.results) if args.results else latest_results_csv()
+    df = pd.read_csv(results_path).fillna("")
+    df = df[df["sql"].str.strip() != ""]
+    print(f"[info] {len(df)} statements from {results_path.name}")
+
+    templates_yaml = gsql.load_templates_yaml()
+    conn = psycopg2.connect(**DB_PARAMS)
+    conn.autocommit = True
+    try:
+        cur = conn.cursor()
+        cur.execute("SET statement_timeout = 15000")
+
+        cur.execute("""
+            SELECT c.relname, c.reltuples::bigint
+            FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public' AND c.relkind IN ('r', 'm', 'p')
+        """)
+        reltuples = dict(cur.fetchall())
+        cur.execute("SELECT table_name, column_name FROM information_schema.columns WHERE table_schema = 'public'")
+        columns = defaultdict(set)
+        for table, col in cur.fetchall():
+            columns[table].add(col)
+        indexed = leading_index_columns(cur)
+
+        # (table, cols) -> aggregate
+        proposals = {}
+        n_explained, n_failed = 0, 0
+        for _, row in df.iterrows():
+            source = str(row.get("source", ""))
+            params = None
+            if source == "fastpath" or source.startswith("template:"):
+                try:
+                    params = recover_params(row["question"], source, templates_yaml)
+                except Exception as e:
+                    print(f"[warn] could not re-route {row['question']!r}: {e}", file=sys.stderr)
+                    n_failed += 1
+                    continue
+            try:
+                plan = explain(cur, row["sql"], params)
+                n_explained += 1
+            except Exception as e:
+                print(f"[warn] EXPLAIN failed for {row['question']!r}: {type(e).__name__}: {e}", file=sys.stderr)
+                n_failed += 1
+                continue
+
+            for node, conds in walk_seq_scans(plan):
+                table = node.get("Relation Name")
+                total = reltuples.get(table, 0)
+                if not table or total < args.min_rows:
+                    continue
+                cols = filter_columns(node.get("Filter"), columns[table])
+                kind = "filter"
+                if not cols:
+                    cols = join_columns(node.get("Alias", table), conds, columns[table])
+                    kind = "join"
+                if not cols:
+                    continue
+                key = (table, tuple(cols[:2]))
+                p = proposals.setdefault(key, {
+                    "table": table, "columns": ", ".join(cols[:2]), "kind": kind, "table_rows": total,
+                    "already_indexed": cols[0].lower() in indexed.get(table, set()),
+                    "scans": 0, "questions": set(), "benefit": 0.0, "example_filter": node.get("Filter", ""),
+                })
+                selectivity = min(node.get("Plan Rows", total) / total, 1.0) if total else 1.0
+                p["scans"] += 1
+                p["questions"].add(row["question"])
+                p["benefit"] += node.get("Total Cost", 0.0) * (1.0 - selectivity)
+    finally:
+        conn.close()
+
+    print(f"[info] explained {n_explained} statements ({n_failed} skipped)")
+    if not proposals:
+        print("No sequential scans over large tables -- nothing to propose.")
+        return
+
+    out = pd.DataFrame(proposals.values())
+    out["questions"] = out["questions"].apply(len)
+    out["benefit"] = out["benefit"].round(1)
+    out = out.sort_values("benefit", ascending=False).reset_index(drop=True)
+
+    print("\n=== SEQ SCANS ON LARGE TABLES (ranked by estimated benefit) ===")
+    print(out[["table", "columns", "kind", "table_rows", "scans", "questions", "benefit", "already_indexed"]]
+          .to_string(index=False))
+
+    missing = out[~out["already_indexed"]]
+    if not missing.empty:
+        print("\n=== PROPOSED (review, then add to db/indexes.sql) ===")
+        for _, p in missing.iterrows():
+            cols = [c.strip() for c in p["columns"].split(",")]
+            name = f"{p['table']}_{'_'.join(cols)}_idx"
+            print(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {p['table']} ({', '.join(cols)});"
+                  f"  -- benefit {p['benefit']}, {p['questions']} questions")
+    indexed_rows = out[out["already_indexed"]]
+    if not indexed_rows.empty:
+        print(f"\n{len(indexed_rows)} scan shapes already have a matching index; the planner chose a Seq Scan "
+              f"anyway (low selectivity or stale statistics -- try ANALYZE). Expression filters such as "
+              f"LOWER(...) need an expression index; see example_filter in --out.")
+
+    if args.out:
+        out.to_csv(args.out, index=False)
+        print(f"\nFull advice: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# scripts/migrate_savant_season.py
+#
+# One-time move from the ten per-group savant_* tables to the wide
+# savant_batting_season / savant_pitching_season tables (etl/savant_season.py).
+# In one transaction:
+#   1. drops the player-season materialized views (they read savant_*_traditional
+#      / ratios, which are about to become views);
+#   2. creates each wide table with the old tables' column types, plus an
+#      in_<group> flag per group and row_hash, and copies every old table into
+#      it (a group's rows get its flag; the name columns are kept from whichever
+#      table had them);
+#   3. drops the old tables and creates the compat views under their names;
+#   4. re-creates the player-season views from db/player_season_views.sql;
+#   5. checks every view returns as many rows as its table had.
+# row_hash starts out NULL, so the next daily run re-sends the current season
+# once. Columns on an old table that no loader writes any more are reported and
+# not carried over.
+#
+# Defaults to a dry run: everything above runs and is rolled back. --commit keeps
+# it, then ANALYZEs the wide tables. Run scripts/apply_indexes.py afterwards
+# (db/indexes.sql now indexes the wide tables). The daily job and the backfill
+# refuse to load until this has run.
+#
+# Usage:
+#   .venv/Scripts/python scripts/migrate_savant_season.py            # dry run: report, roll back
+#   .venv/Scripts/python scripts/migrate_savant_season.py --commit
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+load_dotenv(ROOT / ".env.awsrds")
+
+from etl.derived_tables import PLAYER_SEASON_VIEWS, existing_matviews
+from etl.savant_season import GROUPS, IDENTITY, ensure_compat_views, flag_col, unmigrated
+
+DB_PARAMS = {
+    "dbname": os.getenv("AWSDATABASE"),
+    "user": os.getenv("AWSUSER"),
+    "password": os.getenv("AWSPASSWORD"),
+    "host": os.getenv("AWSHOST"),
+    "port": os.getenv("AWSPORT"),
+}
+
+VIEWS_SQL_PATH = ROOT / "db" / "player_season_views.sql"
+
+
+def cursor_runner(cur):
+    """run(sql) -> rows on an open cursor, inside the caller's transaction."""
+    def run(sql):
+        cur.execute(sql)
+        return cur.fetchall() if cur.description else []
+    return run
+
+
+def column_types(run, table) -> dict:
+    """column -> declared type, in column order."""
+    return dict(run(f"""
+        SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+        FROM pg_attribute a
+        WHERE a.attrelid = 'public."{table}"'::regclass AND a.attnum > 0 AND NOT a.attisdropped
+        ORDER BY a.attnum"""))
+
+
+def migrate_domain(run, table, pending) -> dict:
+    """Copies this domain's still-table groups into `table` and drops them. Returns old table -> rows."""
+    olds = [v for v in GROUPS[table] if v in pending]
+    types = {v: column_types(run, v) for v in olds}
+    wide = {}
+    for view in olds:
+        for col in IDENTITY + GROUPS[table][view]:
+            if col in types[view]:
+                wide.setdefault(col, types[view][col])
+        dropped = [c for c in types[view] if c not in IDENTITY + GROUPS[table][view] + ["row_hash"]]
+        if dropped:
+            print(f"  {view}: not carried over (no loader writes them): {', '.join(dropped)}")
+    for view in GROUPS[table]:
+        wide[flag_col(view)] = "boolean"
+    wide["row_hash"] = "bigint"
+
+    run(f'CREATE TABLE IF NOT EXISTS "{table}" ("player_id" {wide["player_id"]}, "year" {wide["year"]}, '
+        f'PRIMARY KEY ("player_id", "year"))')
+    for col, col_type in wide.items():
+        run(f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS "{col}" {col_type}')
+    # Same index names as create_table_if_not_exists() in etl/update_savant_awsrds.py
+    run(f'CREATE INDEX IF NOT EXISTS "{table}_year_idx" ON "{table}" ("year")')
+    run(f'CREATE INDEX IF NOT EXISTS "{table}_name_key_idx" ON "{table}" ("name_key")')
+
+    counts = {}
+    for view in olds:
+        cols = [c for c in IDENTITY + GROUPS[table][view] if c in types[view]]
+        flag = flag_col(view)
+        col_list = ", ".join(f'"{c}"' for c in cols)
+        sets = [f'"{c}" = COALESCE(EXCLUDED."{c}", "{table}"."{c}")' for c in cols if c in IDENTITY[2:]]
+        sets += [f'"{c}" = EXCLUDED."{c}"' for c in cols if c not in IDENTITY]
+        sets.append(f'"{flag}" = true')
+        t0 = time.perf_counter()
+        run(f'INSERT INTO "{table}" ({col_list}, "{flag}") SELECT {col_list}, true FROM "{view}" '
+            f'ON CONFLICT ("player_id", "year") DO UPDATE SET {", ".join(sets)}')
+        counts[view] = run(f'SELECT COUNT(*) FROM "{view}"')[0][0]
+        run(f'DROP TABLE "{view}"')
+        print(f"  {view}: {counts[view]:,} rows -> {table} in {time.perf_counter() - t0:.2f}s")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move the savant_* tables into the wide savant_*_season tables.")
+    parser.add_argument("--commit", action="store_true", help="Keep the migration (default: dry run, rolled back)")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        with conn.cursor() as cur:
+            run = cursor_runner(cur)
+            pending = unmigrated(run)
+            if not pending:
+                print("Nothing to migrate: the savant_* names are already views.")
+                return
+            matviews = sorted(existing_matviews(run) & set(PLAYER_SEASON_VIEWS))
+            for view in matviews:
+                run(f'DROP MATERIALIZED VIEW "{view}"')
+
+            counts = {}
+            for table in GROUPS:
+                print(f" {table}:")
+                counts.update(migrate_domain(run, table, pending))
+                ensure_compat_views(run, table)
+
+            if matviews:
+                cur.execute(VIEWS_SQL_PATH.read_text(encoding="utf-8"))
+                for view in matviews:
+                    print(f" Re-created {view}: {run(f'SELECT COUNT(*) FROM {view}')[0][0]:,} rows")
+
+            mismatched = []
+            for view, n in counts.items():
+                now = run(f'SELECT COUNT(*) FROM "{view}"')[0][0]
+                if now != n:
+                    mismatched.append(f"{view}: {n:,} rows before, {now:,} through the view")
+            if mismatched:
+                raise RuntimeError("row counts changed: " + "; ".join(mismatched))
+
+        if not args.commit:
+            conn.rollback()
+            print("Dry run: rolled back. Re-run with --commit to keep it.")
+            return
+        conn.commit()
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            for table in GROUPS:
+                cur.execute(f'ANALYZE "{table}"')
+        print("Migrated. Run scripts/apply_indexes.py next.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,82 @@
-import requests
-import pandas as pd
+# scripts/scrape_2026_rosters.py
+#
+# Refreshes the 30 teams' rosters (40-man by default) from the MLB Stats API
+# into the mlb_rosters table (db/mlb_rosters.sql) on AWS RDS -- it used to write
+# a loose rosters_2026_bridge.csv in the working directory.
+#
+# The team rosters are fetched concurrently through the shared client in
+# etl/roster_fetcher.py (pooled sessions, request-rate cap, retries, and a
+# conditional-request cache, so a re-run the same day is mostly 304s). The
+# season's snapshot is replaced in one transaction, and not rewritten at all if
+# nothing changed. A team whose roster can't be fetched fails the run before
+# anything is written, so a partial snapshot never replaces a complete one.
+#
+# Usage:
+#   .venv/Scripts/python scripts/scrape_2026_rosters.py
+#   .venv/Scripts/python scripts/scrape_2026_rosters.py --year 2026 --roster-type active
+#   .venv/Scripts/python scripts/scrape_2026_rosters.py --workers 10 --dry-run
 
-# Mapping MLB Stats API abbreviations to our DB standards
-ABBR_MAP = {
-    'AZ': 'ARI', 'TB': 'TBR', 'WSH': 'WSN', 'CWS': 'CHW', 
-    'KC': 'KCR', 'SD': 'SDN', 'SF': 'SFG', 'OAK': 'ATH'
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+load_dotenv(ROOT / ".env.awsrds")
+
+sys.path.insert(0, str(ROOT))
+from etl.derived_tables import psycopg2_runner
+from etl.roster_fetcher import MlbApiClient, fetch_team_rosters, write_rosters
+
+DB_PARAMS = {
+    "dbname": os.environ["AWSDATABASE"],
+    "user": os.environ["AWSUSER"],
+    "password": os.environ["AWSPASSWORD"],
+    "host": os.environ["AWSHOST"],
+    "port": os.environ["AWSPORT"],
 }
 
-def get_rosters():
-    print("Fetching MLB rosters via Stats API...")
-    
-    # 1. Get all teams
-    teams_r = requests.get('https://statsapi.mlb.com/api/v1/teams?sportId=1')
-    teams_data = teams_r.json()['teams']
-    
-    all_rosters = []
-    
-    for team in teams_data:
-        team_id = team['id']
-        raw_abbr = team['abbreviation']
-        # Apply mapping or use raw
-        abbr = ABBR_MAP.get(raw_abbr, raw_abbr)
-        
-        # 2. Get roster
-        roster_url = f'https://statsapi.mlb.com/api/v1/teams/{team_id}/roster?rosterType=40Man'
-        try:
-            roster_r = requests.get(roster_url, timeout=10)
-            players = roster_r.json().get('roster', [])
-            for p in players:
-                all_rosters.append({
-                    'player_id': p['person']['id'],
-                    'name': p['person']['fullName'],
-                    'team': abbr,
-                    'year': 2026
-                })
-            print(f"  {abbr}: Found {len(players)} players")
-        except Exception as e:
-            print(f"  Error fetching {abbr}: {e}")
-            
-    df = pd.DataFrame(all_rosters)
-    df.to_csv('rosters_2026_bridge.csv', index=False)
-    print(f"Saved {len(df)} roster entries to rosters_2026_bridge.csv")
+
+def get_rosters(year: int, roster_type: str = "40Man", workers: int = 8, rate: float = 10.0) -> list:
+    print(f"Fetching MLB {roster_type} rosters via Stats API ({year})...")
+    client = MlbApiClient(workers=workers, rate=rate)
+    t0 = time.perf_counter()
+    rows, failed = fetch_team_rosters(client, year, roster_type)
+    for team, n in sorted(Counter(r["team"] for r in rows).items()):
+        print(f"  {team}: Found {n} players")
+    for team, e in sorted(failed.items()):
+        print(f"  Error fetching {team}: {e}")
+    print(f"Fetched {len(rows)} roster entries in {time.perf_counter() - t0:.1f}s "
+          f"({client.counts['requests']} requests, {client.counts['not_modified']} not modified).")
+    if failed:
+        sys.exit(f"{len(failed)} team roster(s) failed; nothing written.")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh mlb_rosters from the MLB Stats API.")
+    parser.add_argument("--year", type=int, default=2026)
+    parser.add_argument("--roster-type", default="40Man", help="Stats API rosterType (default %(default)s)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests (default %(default)s)")
+    parser.add_argument("--rate", type=float, default=10.0, help="Max requests/sec (default %(default)s)")
+    parser.add_argument("--dry-run", action="store_true", help="Fetch and print, don't write to the database")
+    args = parser.parse_args()
+
+    rows = get_rosters(args.year, args.roster_type, args.workers, args.rate)
+    if args.dry_run:
+        print("DRY RUN: mlb_rosters not written.")
+        return
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        write_rosters(psycopg2_runner(conn), rows, args.year, args.roster_type)
+    finally:
+        conn.close()
+
 
 if __name__ == "__main__":
-    get_rosters()
+    main()
@@ -0,0 +1,132 @@
+# scripts/slow_query_report.py
+#
+# Reads the slow-query log written by streamlit/app.py's run_sql
+# (db/slow_query_log.py, logs/slow_queries.sqlite) and groups it by plan shape
+# -- the tree of node types and relations with costs/filter values stripped --
+# so one expensive pattern hit by many different questions shows up as one row.
+# Entries without a sampled plan are grouped by SQL fingerprint (literals
+# stripped) instead; if that fingerprint has a plan on another entry, they are
+# folded into that shape's group.
+#
+# Groups are ranked by total time spent, the best proxy for "fix this first".
+#
+# Usage:
+#   .venv/Scripts/python scripts/slow_query_report.py
+#   .venv/Scripts/python scripts/slow_query_report.py --since-days 7 --top 10
+#   .venv/Scripts/python scripts/slow_query_report.py --show-plan 3f9a1c0b2e7d   # full EXPLAIN for one shape
+#   .venv/Scripts/python scripts/slow_query_report.py --out tests/results/slow_queries.csv
+
+import argparse
+import json
+import statistics
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+
+from db.slow_query_log import connect_store, db_path
+
+
+def load_entries(since_days=None):
+    store = connect_store()
+    try:
+        sql = "SELECT * FROM slow_queries"
+        args = ()
+        if since_days:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=since_days)
+            sql += " WHERE logged_at >= ?"
+            args = (cutoff.isoformat(timespec="seconds"),)
+        return pd.read_sql_query(sql, store, params=args)
+    finally:
+        store.close()
+
+
+def group_key(df):
+    """plan_shape where known; otherwise the shape seen for the same fingerprint; otherwise the fingerprint."""
+    known = df.dropna(subset=["plan_shape"]).drop_duplicates("sql_fingerprint").set_index("sql_fingerprint")["plan_shape"]
+    return df.apply(
+        lambda r: r["plan_shape"] if isinstance(r["plan_shape"], str)
+        else known.get(r["sql_fingerprint"], "sql:" + r["sql_fingerprint"]),
+        axis=1,
+    )
+
+
+def summarize(df):
+    rows = []
+    for key, g in df.groupby("group"):
+        shape_id, _, shape = key.partition(" ")
+        longest = g.loc[g["duration_ms"].idxmax()]
+        rows.append({
+            "group": shape_id,
+            "count": len(g),
+            "total_ms": round(g["duration_ms"].sum()),
+            "median_ms": round(statistics.median(g["duration_ms"])),
+            "max_ms": round(g["duration_ms"].max()),
+            "timeouts": int((g["status"] == "timeout").sum()),
+            "errors": int((g["status"] == "error").sum()),
+            "routes": ", ".join(f"{k} x{v}" for k, v in Counter(g["route_source"].fillna("?")).most_common(3)),
+            "shape": shape or "(no plan sampled yet)",
+            "example_sql": " ".join(longest["sql"].split()),
+        })
+    return pd.DataFrame(rows).sort_values("total_ms", ascending=False)
+
+
+def show_plan(df, shape_id):
+    hits = df[df["plan_shape"].fillna("").str.startswith(shape_id + " ") & df["plan_json"].notna()]
+    if hits.empty:
+        print(f"No captured plan for {shape_id}.")
+        return
+    slowest = hits.loc[hits["duration_ms"].idxmax()]
+    print(f"-- {slowest['logged_at']}  {slowest['duration_ms']:.0f} ms  {slowest['status']}  {slowest['route_source']}")
+    print(f"-- params: {slowest['params']}")
+    print(slowest["sql"].strip())
+    print()
+    print(json.dumps(json.loads(slowest["plan_json"]), indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Group the slow-query log by plan shape.")
+    parser.add_argument("--since-days", type=float, help="Only entries from the last N days.")
+    parser.add_argument("--top", type=int, default=20, help="Groups to print (default 20).")
+    parser.add_argument("--show-plan", metavar="GROUP", help="Print the slowest captured plan for one group id.")
+    parser.add_argument("--out", help="Also write the full grouped report to this CSV.")
+    args = parser.parse_args()
+
+    if not db_path().exists():
+        print(f"No slow-query log at {db_path()} yet.")
+        return
+    df = load_entries(args.since_days)
+    if df.empty:
+        print("No slow queries logged" + (f" in the last {args.since_days:g} days." if args.since_days else "."))
+        return
+
+    if args.show_plan:
+        show_plan(df, args.show_plan)
+        return
+
+    df["group"] = group_key(df)
+    report = summarize(df)
+    sampled = df["plan_shape"].notna().sum()
+    print(f"{len(df)} slow queries ({sampled} with plans) in {len(report)} groups, "
+          f"{df['duration_ms'].sum() / 1000:.1f}s total.\n")
+
+    for r in report.head(args.top).itertuples():
+        print(f"[{r.group}] {r.count} queries  total {r.total_ms} ms  median {r.median_ms} ms  "
+              f"max {r.max_ms} ms  timeouts {r.timeouts}  errors {r.errors}")
+        print(f"    routes: {r.routes}")
+        print(f"    shape:  {r.shape}")
+        print(f"    e.g.:   {r.example_sql[:200]}")
+        print()
+
+    if args.out:
+        report.to_csv(args.out, index=False)
+        print(f"Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 # app.py
-import os, sys
+import os, sys, time
 from pathlib import Path
 
 import streamlit as st
@@ -196,8 +196,23 @@ def get_stat_catalog(_init_fastpath_fn):
     except Exception:
         return None  # fast-path unavailable, fall through to templates/LLM
 
-def run_sql(sql: str, params: dict | None = None):
-    """Execute SQL and return a DataFrame. No caching — results must always be fresh."""
+@st.cache_resource(show_spinner=False)
+def get_game_log_coverage(_init_coverage_fn):
+    """Which players/seasons batting_game_logs and statcast_splits hold, for the template
+    router. None if the DB is slow -- the router then checks the season range only."""
+    try:
+        conn = psycopg2.connect(**DB_PARAMS, connect_timeout=3, options="-c statement_timeout=3000")
+        try:
+            return _init_coverage_fn(conn)
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
+    except Exception:
+        return None
+
+def _run_sql_postgres(sql: str, params: dict | None = None):
     with psycopg2.connect(
         **DB_PARAMS,
         connect_timeout=5,
@@ -207,6 +222,35 @@ def run_sql(sql: str, params: dict | None = None):
             cur.execute(sql, params or {})
             cols = [desc[0] for desc in cur.description]
             rows = cur.fetchall()
+    return rows, cols
+
+def _connect_for_explain():
+    return psycopg2.connect(**DB_PARAMS, connect_timeout=5)
+
+def run_sql(sql: str, params: dict | None = None, route_source: str | None = None):
+    """Execute SQL and return a DataFrame. No caching — results must always be fresh.
+    Historical reads use the optional local DuckDB backend when DBBALL_LOCAL_ENGINE
+    is set (db/local_engine.py); everything else goes to Postgres. Executions over
+    the slow-query threshold, and every timeout or error, are logged by
+    db/slow_query_log.py."""
+    from db import local_engine, slow_query_log
+    local_engine.get_engine(env("DBBALL_LOCAL_ENGINE", ""))
+    t0 = time.perf_counter()
+    try:
+        rows, cols, backend = local_engine.run_routed(sql, params, _run_sql_postgres)
+    except Exception as e:
+        status = "timeout" if getattr(e, "pgcode", None) == "57014" else "error"  # query_canceled
+        slow_query_log.record(
+            sql, params, (time.perf_counter() - t0) * 1000, status=status, route_source=route_source,
+            backend="postgres", error=f"{type(e).__name__}: {e}", pg_connect=_connect_for_explain,
+        )
+        raise
+    slow_query_log.record(
+        sql, params, (time.perf_counter() - t0) * 1000, route_source=route_source,
+        backend=backend, pg_connect=_connect_for_explain,
+    )
+    if DEBUG_UI:
+        st.caption(f"Executed on: {backend}")
     return pd.DataFrame(rows, columns=cols)
 
 def looks_like_sql(s: str) -> bool:
@@ -229,10 +273,11 @@ try_fastpath = None
 route_template = None
 lint_sql = None
 enforce_leaders_invariants = None
+decorrelate_sql = None
 tr = None
 
 def load_nlp_modules():
-    global _NLP_LOADED, gsql, init_fastpath, try_fastpath, route_template, lint_sql, enforce_leaders_invariants, tr
+    global _NLP_LOADED, gsql, init_fastpath, try_fastpath, route_template, lint_sql, enforce_leaders_invariants, tr, decorrelate_sql
     if _NLP_LOADED:
         return
     import importlib
@@ -245,6 +290,7 @@ def load_nlp_modules():
     route_template = getattr(tr, "route_template")
     lint_sql = getattr(sr, "lint_sql")
     enforce_leaders_invariants = getattr(sr, "enforce_leaders_invariants")
+    decorrelate_sql = getattr(importlib.import_module("nlp.decorrelate"), "decorrelate_sql")
     _NLP_LOADED = True
 
 STAT_CATALOG = None
@@ -298,6 +344,8 @@ def render_home():
             if DEBUG_UI:
                 st.info(f"Fast-path init skipped: {e}")
             STAT_CATALOG = None
+    if not SAFE_START:
+        get_game_log_coverage(tr.init_coverage)
 
     # Load schema/prompt/templates
     try:
@@ -374,14 +422,14 @@ def render_home():
             - Leaderboards (top 10, qualified players)
             - Team stats, comparisons
             - Statcast metrics (any season): xwOBA, exit velo, ISO, hard-hit %
+            - Splits vs LHP/RHP, by count, or by pitch type (recent Statcast seasons)
+            - Hitting streaks, game logs, last 7/15/30 days (recent Statcast seasons)
             - WAR, wOBA, FIP, xFIP: historical seasons only (not current season)
             """)
         with c2:
             st.markdown("""
             **What doesn't work (yet)**
-            - Game-by-game data
-            - Monthly or streak stats
-            - Batter vs pitcher handedness splits
+            - Game-by-game data before the Statcast seasons we load
             - Live / in-progress scores
             """)
         with c3:
@@ -409,12 +457,13 @@ def render_home():
         norm_q, season = gsql.normalize_query(query_to_run)
         sql_query = None
         bound_params = {}
+        route_source = None  # fastpath | template:<name> | model (recorded by the slow-query log)
 
         # Check SQL cache — avoid re-calling Gemini for the same question
         _sql_cache = st.session_state.setdefault("sql_cache", {})
         _cache_key = norm_q.lower().strip()
         if _cache_key in _sql_cache:
-            sql_query, bound_params = _sql_cache[_cache_key]
+            sql_query, bound_params, route_source = _sql_cache[_cache_key]
             if DEBUG_UI:
                 st.info("Using cached SQL (skipping LLM)")
 
@@ -435,6 +484,7 @@ def render_home():
                             fast_sql = lint_sql(fast_sql)
                             sql_query = fast_sql
                             bound_params = {"season": season, "top_n": 10}
+                            route_source = "fastpath"
                             if DEBUG_UI:
                                 st.info("Using fast-path.")
                     except Exception as e:
@@ -451,7 +501,8 @@ def render_home():
                         tmpl_sql = lint_sql(tmpl_sql)
                         sql_query = tmpl_sql
                         bound_params = tmpl_params or {}
-                        _sql_cache[_cache_key] = (sql_query, bound_params)
+                        route_source = f"template:{tmpl_name}"
+                        _sql_cache[_cache_key] = (sql_query, bound_params, route_source)
                         if DEBUG_UI:
                             st.info(f"Using template: {tmpl_name}")
                 except Exception as e:
@@ -487,10 +538,14 @@ def render_home():
                         if DEBUG_UI:
                             st.info(f"Model response: {action}")
                         st.stop()
-                    sql_query = raw_sql
+                    # Correlated per-row subqueries -> pre-aggregated CTE joins (no-op if none)
+                    sql_query = decorrelate_sql(raw_sql)
+                    if DEBUG_UI and sql_query != raw_sql:
+                        st.info("Rewrote correlated subqueries in model SQL.")
                     bound_params = {}  # LLM SQL uses no bound params
+                    route_source = "model"
                     # Cache this SQL so reruns don't re-call Gemini
-                    _sql_cache[_cache_key] = (sql_query, bound_params)
+                    _sql_cache[_cache_key] = (sql_query, bound_params, route_source)
                 except Exception as e:
                     st.error(f"Failed to generate SQL: {type(e).__name__}: {e}")
                     if DEBUG_UI:
@@ -514,7 +569,7 @@ def render_home():
         # Execute & display
         with st.spinner("⚡ Running query against the database..."):
             try:
-                df_result = run_sql(sql_query, bound_params)
+                df_result = run_sql(sql_query, bound_params, route_source=route_source)
                 df_result = title_case_columns(df_result)
             except Exception as e:
                 st.error(f"Query failed: {type(e).__name__}: {e}")
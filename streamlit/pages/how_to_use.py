@@ -3,7 +3,9 @@ import os
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 from render_sidebar import render_sidebar
+from nlp.coverage import PITCH_LEVEL_FIRST_SEASON
 
 st.set_page_config(page_title="How to Use · Databaseball", page_icon="⚾")
 render_sidebar()
@@ -36,13 +38,12 @@ with st.expander("✅ What You Can Ask", expanded=True):
 
 # --- What You Can't Ask (Yet) ---
 with st.expander("❌ What Doesn't Work (Yet)", expanded=False):
-    st.markdown("""
-    The database currently contains season-level stats only — not game-by-game or pitch-level data.
+    st.markdown(f"""
+    Game logs, streaks and handedness/count splits cover only {PITCH_LEVEL_FIRST_SEASON} onward (the seasons loaded pitch by pitch).
     The following types of questions **will not return results**:
 
-    - Game-by-game stats or hitting streaks
-    - Monthly splits (*"most HRs in August since 2018"*)
-    - Batter vs. pitcher handedness splits
+    - Game-by-game stats, streaks or monthly splits before {PITCH_LEVEL_FIRST_SEASON}, or career-long streaks
+    - Runs, RBI or stolen bases for a single game or month
     - Live or in-progress game data
     - Play-by-play or pitch trajectory data
 
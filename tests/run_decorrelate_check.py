@@ -0,0 +1,132 @@
+# tests/run_decorrelate_check.py
+#
+# Replays tests/decorrelate_corpus.csv -- model SQL for the regression
+# questions that timed out on correlated scalar subqueries (qualification
+# thresholds, the `->` team display) -- through nlp/decorrelate.py and, against
+# the live database, runs the original and the rewrite side by side. A case
+# passes when the rewrite fires, returns the same rows (as a multiset; tie
+# order isn't part of the contract) and isn't slower.
+#
+# The original is given a longer statement_timeout than the app's 15 s so the
+# row comparison is possible at all; an original that still times out is
+# reported as ORIG_TIMEOUT with the rewrite's rows/latency.
+#
+# Usage:
+#   .venv/Scripts/python tests/run_decorrelate_check.py
+#   .venv/Scripts/python tests/run_decorrelate_check.py --no-exec          # rewrite only, print the SQL
+#   .venv/Scripts/python tests/run_decorrelate_check.py --orig-timeout-s 300
+# results land in tests/results/decorrelate_<timestamp>.csv
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv(ROOT / ".env.awsrds")
+
+from nlp.decorrelate import rewrite, sqlglot
+
+DB_PARAMS = {
+    "dbname": os.environ["AWSDATABASE"],
+    "user": os.environ["AWSUSER"],
+    "password": os.environ["AWSPASSWORD"],
+    "host": os.environ["AWSHOST"],
+    "port": os.environ["AWSPORT"],
+}
+
+
+def run_timed(sql, timeout_s):
+    """(rows, ms, error) -- error is 'TIMEOUT' on statement_timeout."""
+    conn = psycopg2.connect(**DB_PARAMS, connect_timeout=10,
+                            options=f"-c statement_timeout={int(timeout_s * 1000)}")
+    try:
+        with conn.cursor() as cur:
+            t0 = time.perf_counter()
+            cur.execute(sql, {})
+            rows = cur.fetchall()
+            return rows, round((time.perf_counter() - t0) * 1000, 1), None
+    except Exception as e:
+        if getattr(e, "pgcode", None) == "57014":  # query_canceled
+            return None, None, "TIMEOUT"
+        return None, None, f"{type(e).__name__}: {e}"
+    finally:
+        conn.close()
+
+
+def normalize(rows):
+    def norm(v):
+        if isinstance(v, (float, Decimal)):
+            return round(float(v), 6)
+        return v
+    return sorted((tuple(norm(v) for v in r) for r in rows), key=repr)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default=str(ROOT / "tests" / "decorrelate_corpus.csv"))
+    parser.add_argument("--out", default=str(ROOT / "tests" / "results"))
+    parser.add_argument("--no-exec", action="store_true", help="Rewrite only; print the SQL, skip the database")
+    parser.add_argument("--orig-timeout-s", type=float, default=120, help="statement_timeout for the original SQL")
+    parser.add_argument("--timeout-s", type=float, default=15, help="statement_timeout for the rewrite (app's is 15)")
+    args = parser.parse_args()
+
+    if sqlglot is None:
+        sys.exit("[error] sqlglot is not installed (pip install -r requirements.txt)")
+
+    cases = pd.read_csv(args.corpus)
+    results = []
+    for _, case in cases.iterrows():
+        new_sql, notes = rewrite(case["sql"])
+        rec = {"question": case["question"], "pattern": case["pattern"], "rewritten": bool(notes),
+               "notes": "; ".join(notes), "status": "", "orig_ms": None, "new_ms": None,
+               "orig_rows": None, "new_rows": None, "error": "", "new_sql": new_sql}
+        print(f"\n== {case['question']}")
+        if not notes:
+            rec["status"] = "NOT_REWRITTEN"
+        elif args.no_exec:
+            rec["status"] = "NOT_RUN"
+            print(new_sql)
+        else:
+            new_rows, rec["new_ms"], new_err = run_timed(new_sql, args.timeout_s)
+            orig_rows, rec["orig_ms"], orig_err = run_timed(case["sql"], args.orig_timeout_s)
+            rec["new_rows"] = None if new_rows is None else len(new_rows)
+            rec["orig_rows"] = None if orig_rows is None else len(orig_rows)
+            if new_err:
+                rec["status"], rec["error"] = "REWRITE_ERROR", new_err
+            elif orig_err == "TIMEOUT":
+                rec["status"] = "ORIG_TIMEOUT"
+            elif orig_err:
+                rec["status"], rec["error"] = "ORIG_ERROR", orig_err
+            elif normalize(orig_rows) != normalize(new_rows):
+                rec["status"] = "MISMATCH"
+            else:
+                rec["status"] = "PASS" if rec["new_ms"] <= rec["orig_ms"] else "PASS_SLOWER"
+        print(f"   {rec['status']}  orig {rec['orig_ms']} ms / {rec['orig_rows']} rows  "
+              f"rewrite {rec['new_ms']} ms / {rec['new_rows']} rows  {rec['error']}")
+        results.append(rec)
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / f"decorrelate_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    df = pd.DataFrame(results)
+    df.to_csv(out_path, index=False)
+
+    print("\n=== SUMMARY ===")
+    print(df["status"].value_counts().to_string())
+    print(f"\nResults written to: {out_path}")
+    bad = df["status"].isin(["NOT_REWRITTEN", "REWRITE_ERROR", "MISMATCH"])
+    sys.exit(1 if bad.any() else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+# tests/run_etl_benchmark.py
+#
+# Offline end-to-end ETL benchmark. Runs the three loaders -- the daily Savant
+# job (etl/update_savant_awsrds.py), the Statcast backfill
+# (scripts/backfill_savant_statcast_history.py) and the Lahman load
+# (etl/load_lahman.py --commit) -- against a throwaway database on a local
+# Postgres, with every source served from generated fixture payloads instead
+# of Savant, the MLB Stats API and the Chadwick register. Reports each job's
+# wall time, stage timings and rows written, per run.
+#
+# Sources (--source):
+#   http    (default) a local HTTP stand-in serves the Savant leaderboard CSVs
+#           (SAVANT_BASE_URL) and the MLB roster JSON (MLB_API_BASE_URL); the
+#           Chadwick bridge comes from a pre-built CHADWICK_BRIDGE_CACHE. This
+#           exercises the real download, fetch-scheduler and landing path.
+#   replay  the same payloads are landed in a temporary raw landing zone
+#           (etl/raw_store.py) and the jobs run with SAVANT_REPLAY / --replay,
+#           so only parse/transform/load is timed.
+#
+# Payloads are deterministic (--players rows per season, fixture columns from
+# tests/fixtures/), so run 2 of --runs 2 sees identical data and measures the
+# unchanged path (row-hash skips, no publish). Lahman CSVs cover 2015-2025; the
+# database is seeded with seasons through 2023 so the load inserts 2024-2025
+# and a handful of new players.
+#
+# Postgres: --pg-host/--pg-port/--pg-user/--pg-password (or BENCH_PGHOST etc.)
+# for a server you already run, or --docker to start a throwaway postgres:16
+# container. Either way the jobs write to a fresh database (etl_bench_<pid>),
+# dropped (or the container stopped) at the end unless --keep-db. Each job runs
+# as a subprocess with the AWS* variables pointed at it, so module-level config
+# is read exactly as in production; job output goes to <workdir>/<job>_run<N>.log.
+#
+# Run metrics (etl/run_metrics.py) are written to --metrics-dir (default: a
+# temp dir). Point it at a fixed directory to keep benchmark history, then
+#   ETL_METRICS_DIR=logs/etl_bench .venv/Scripts/python scripts/etl_run_report.py
+# compares the latest benchmark against earlier ones.
+#
+# Usage:
+#   .venv/Scripts/python tests/run_etl_benchmark.py --docker
+#   .venv/Scripts/python tests/run_etl_benchmark.py --pg-host localhost --pg-password postgres
+#   .venv/Scripts/python tests/run_etl_benchmark.py --docker --source replay --players 1500 --runs 2
+#   .venv/Scripts/python tests/run_etl_benchmark.py --docker --jobs savant_daily --metrics-dir logs/etl_bench
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+import psycopg2
+
+from tests.run_savant_parse_benchmark import synthetic_season
+
+BACKFILL_YEARS = range(2015, 2026)  # scripts/backfill_savant_statcast_history.py START_YEAR..END_YEAR
+LAHMAN_YEARS = range(2015, 2026)
+LAHMAN_SEEDED_THROUGH = 2023
+NEW_PEOPLE = 25
+TEAMS = [(108 + i, abbr) for i, abbr in enumerate(
+    "LAA ARI BAL BOS CHC CIN CLE COL DET HOU KC LAD WSH NYM ATH PIT SD SEA SF STL TB TEX TOR MIN PHI ATL CWS MIA NYY MIL".split())]
+JOBS = ["savant_daily", "savant_backfill", "lahman_load"]
+
+
+# ---------------- Fixture payloads ----------------
+class Payloads:
+    """Deterministic source payloads for `players` players per season."""
+
+    def __init__(self, players: int):
+        self.players = players
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def bbref_id(self, i):
+        return f"bench{i:05d}01"
+
+    def savant_csv(self, year: int, player_type: str) -> str:
+        """synthetic_season() rows with the requested season in the year column."""
+        key = (year, player_type)
+        with self._lock:
+            if key not in self._cache:
+                text = synthetic_season(player_type, self.players, seed=year * 10 + (player_type == "pitcher"))
+                rows = list(csv.reader(io.StringIO(text)))
+                year_idx = [h.strip().lower() for h in rows[0]].index("year")
+                buf = io.StringIO()
+                w = csv.writer(buf)
+                w.writerow(rows[0])
+                for row in rows[1:]:
+                    row[year_idx] = str(year)
+                    w.writerow(row)
+                self._cache[key] = buf.getvalue()
+            return self._cache[key]
+
+    def teams_json(self) -> bytes:
+        return json.dumps({"teams": [{"id": tid, "abbreviation": abbr} for tid, abbr in TEAMS]}).encode()
+
+    def players_json(self) -> bytes:
+        people = [{"id": 500000 + i, "currentTeam": {"id": TEAMS[i % len(TEAMS)][0]}} for i in range(self.players)]
+        return json.dumps({"people": people}).encode()
+
+    def register_csv(self) -> str:
+        buf = io.StringIO()
+        w = csv.writer(buf)
+        w.writerow(["key_mlbam", "key_bbref", "name_first", "name_last"])
+        for i in range(self.players):
+            w.writerow([500000 + i, self.bbref_id(i), f"First{i}", f"Last{i}"])
+        return buf.getvalue()
+
+    def lahman_rows(self):
+        """table -> (header, rows) for People/Batting/Pitching across LAHMAN_YEARS."""
+        rng = random.Random(42)
+        people = [[self.bbref_id(i), str(1985 + i % 15), f"First{i}", f"Last{i}", self.bbref_id(i)]
+                  for i in range(self.players + NEW_PEOPLE)]
+        batting, pitching = [], []
+        for year in LAHMAN_YEARS:
+            for i in range(self.players):
+                team = TEAMS[i % len(TEAMS)][1]
+                ab = rng.randint(0, 650)
+                batting.append([self.bbref_id(i), year, 1, team, "AL" if i % 2 else "NL", rng.randint(1, 162), ab,
+                                int(ab * rng.uniform(0.18, 0.33)), rng.randint(0, 50), rng.randint(0, 100),
+                                rng.randint(0, 200)])
+                if i % 2:
+                    pitching.append([self.bbref_id(i), year, 1, team, "AL", rng.randint(0, 18), rng.randint(0, 15),
+                                     rng.randint(1, 70), rng.randint(0, 600), rng.randint(0, 120),
+                                     f"{rng.uniform(1.5, 7.0):.2f}"])
+        return {
+            "people": (["playerID", "birthYear", "nameFirst", "nameLast", "bbrefID"], people),
+            "batting": (["playerID", "yearID", "stint", "teamID", "lgID", "G", "AB", "H", "HR", "BB", "SO"], batting),
+            "pitching": (["playerID", "yearID", "stint", "teamID", "lgID", "W", "L", "G", "IPouts", "SO", "ERA"],
+                         pitching),
+        }
+
+
+# ---------------- HTTP stand-in ----------------
+class SourceStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, payloads: Payloads, latency: float):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.payloads = payloads
+        self.latency = latency
+        self.requests = 0
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        srv = self.server
+        srv.requests += 1
+        time.sleep(srv.latency)
+        url = urlparse(self.path)
+        qs = parse_qs(url.query)
+        if url.path == "/leaderboard/custom":
+            body = srv.payloads.savant_csv(int(qs["year"][0]), qs["type"][0]).encode("utf-8")
+            ctype = "text/csv; charset=utf-8"
+        elif url.path == "/api/v1/teams":
+            body, ctype = srv.payloads.teams_json(), "application/json"
+        elif url.path == "/api/v1/sports/1/players":
+            body, ctype = srv.payloads.players_json(), "application/json"
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# ---------------- Postgres ----------------
+def start_docker_postgres(password):
+    """Starts a throwaway postgres:16 container on a free local port. Returns (container id, port)."""
+    cid = subprocess.check_output(
+        ["docker", "run", "-d", "--rm", "-e", f"POSTGRES_PASSWORD={password}", "-p", "127.0.0.1::5432",
+         "postgres:16"], text=True).strip()
+    port = int(subprocess.check_output(["docker", "port", cid, "5432/tcp"], text=True).strip().rsplit(":", 1)[1])
+    return cid, port
+
+
+def wait_for_postgres(params, timeout=60):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            psycopg2.connect(**params, dbname="postgres").close()
+            return
+        except psycopg2.OperationalError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(1)
+
+
+def admin_run(params, sql):
+    conn = psycopg2.connect(**params, dbname="postgres")
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql)
+    finally:
+        conn.close()
+
+
+def seed_database(params, dbname, lahman):
+    """Lahman schema plus the 'previous release': everyone but the new players, seasons through
+    LAHMAN_SEEDED_THROUGH."""
+    conn = psycopg2.connect(**params, dbname=dbname)
+    try:
+        with conn.cursor() as cur:
+            cur.execute((ROOT / "db" / "schema_lahman.sql").read_text(encoding="utf-8"))
+            for table, (header, rows) in lahman.items():
+                if table == "people":
+                    rows = rows[:-NEW_PEOPLE]
+                else:
+                    rows = [r for r in rows if r[1] <= LAHMAN_SEEDED_THROUGH]
+                buf = io.StringIO()
+                csv.writer(buf).writerows(rows)
+                buf.seek(0)
+                cols = ", ".join(h.lower() for h in header)
+                cur.copy_expert(f"COPY {table} ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# ---------------- Jobs ----------------
+def write_lahman_csvs(csv_dir: Path, lahman):
+    files = {"people": "People.csv", "batting": "Batting.csv", "pitching": "Pitching.csv"}
+    csv_dir.mkdir(parents=True, exist_ok=True)
+    for table, (header, rows) in lahman.items():
+        with open(csv_dir / files[table], "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(header)
+            w.writerows(rows)
+
+
+def job_command(job, source, workdir: Path):
+    py = sys.executable
+    if job == "savant_daily":
+        return [py, str(ROOT / "etl" / "update_savant_awsrds.py")]
+    if job == "savant_backfill":
+        cmd = [py, str(ROOT / "scripts" / "backfill_savant_statcast_history.py"),
+               "--checkpoint", str(workdir / "backfill_checkpoint.jsonl")]
+        return cmd + (["--replay"] if source == "replay" else ["--rate", "50"])
+    return [py, str(ROOT / "etl" / "load_lahman.py"), "--commit", "--only", "people,batting,pitching"]
+
+
+def run_job(job, env, source, workdir: Path, run_no: int):
+    log = workdir / f"{job}_run{run_no}.log"
+    t0 = time.perf_counter()
+    with open(log, "w", encoding="utf-8") as f:
+        rc = subprocess.call(job_command(job, source, workdir), env=env, stdout=f, stderr=subprocess.STDOUT,
+                             cwd=str(ROOT))
+    return rc, time.perf_counter() - t0, log
+
+
+def print_report(records, run_count):
+    """records: job -> list of run_metrics records (one per run)."""
+    for job, runs in records.items():
+        print(f"\n== {job}")
+        header = "".join(f"{'run ' + str(i + 1):>12s}" for i in range(run_count))
+        print(f"   {'metric':36s}{header}")
+        metrics = ["wall_seconds", "rows_written"]
+        stages = []
+        for r in runs:
+            stages += [s for s in r.get("stages", {}) if s not in stages]
+        for metric in metrics + [f"stage.{s}" for s in stages]:
+            cells = []
+            for r in runs:
+                if metric == "wall_seconds":
+                    v = r["wall_seconds"]
+                elif metric == "rows_written":
+                    v = sum(t["rows"] for t in r.get("tables", {}).values())
+                else:
+                    v = r.get("stages", {}).get(metric[len("stage."):], {}).get("seconds")
+                cells.append("-" if v is None else f"{v:,.2f}" if isinstance(v, float) else f"{v:,}")
+            print(f"   {metric:36s}" + "".join(f"{c:>12s}" for c in cells))
+        statuses = ", ".join(r["status"] for r in runs)
+        print(f"   status: {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline ETL benchmark against a local Postgres.")
+    parser.add_argument("--source", choices=["http", "replay"], default="http")
+    parser.add_argument("--jobs", default=",".join(JOBS), help="Comma-separated subset of %(default)s")
+    parser.add_argument("--players", type=int, default=1000, help="Players per season (default %(default)s)")
+    parser.add_argument("--runs", type=int, default=2, help="Runs of each job; run 2+ sees unchanged data")
+    parser.add_argument("--latency", type=float, default=0.0, help="HTTP stand-in response delay (s)")
+    parser.add_argument("--docker", action="store_true", help="Start a throwaway postgres:16 container")
+    parser.add_argument("--pg-host", default=os.getenv("BENCH_PGHOST", "localhost"))
+    parser.add_argument("--pg-port", type=int, default=int(os.getenv("BENCH_PGPORT", "5432")))
+    parser.add_argument("--pg-user", default=os.getenv("BENCH_PGUSER", "postgres"))
+    parser.add_argument("--pg-password", default=os.getenv("BENCH_PGPASSWORD", "postgres"))
+    parser.add_argument("--keep-db", action="store_true", help="Don't drop the benchmark database afterwards")
+    parser.add_argument("--metrics-dir", help="Where run metrics go (default: a temp dir)")
+    args = parser.parse_args()
+
+    jobs = [j for j in args.jobs.split(",") if j]
+    unknown = set(jobs) - set(JOBS)
+    if unknown:
+        parser.error(f"unknown job(s): {', '.join(sorted(unknown))}")
+
+    workdir = Path(tempfile.mkdtemp(prefix="etl_bench_"))
+    metrics_dir = Path(args.metrics_dir) if args.metrics_dir else workdir / "etl_runs"
+    payloads = Payloads(args.players)
+    lahman = payloads.lahman_rows()
+
+    container = None
+    params = {"host": args.pg_host, "port": args.pg_port, "user": args.pg_user, "password": args.pg_password}
+    if args.docker:
+        container, params["port"] = start_docker_postgres(args.pg_password)
+        params["host"] = "127.0.0.1"
+        print(f"Started postgres:16 container {container[:12]} on port {params['port']}.")
+    server = None
+    dbname = f"etl_bench_{os.getpid()}"
+    failed = False
+    try:
+        wait_for_postgres(params)
+        admin_run(params, f'CREATE DATABASE "{dbname}"')
+        seed_database(params, dbname, lahman)
+        write_lahman_csvs(workdir / "lahman_raw", lahman)
+
+        env = dict(os.environ)
+        env.update({
+            "AWSHOST": params["host"], "AWSPORT": str(params["port"]), "AWSUSER": params["user"],
+            "AWSPASSWORD": params["password"], "AWSDATABASE": dbname,
+            "RAW_LANDING_DIR": str(workdir / "raw"), "ETL_METRICS_DIR": str(metrics_dir),
+            "LAHMAN_CSV_DIR": str(workdir / "lahman_raw"),
+            "CHADWICK_BRIDGE_CACHE": str(workdir / "cache" / "chadwick_bridge.parquet"),
+            "SAVANT_FETCH_RATE": "50", "PYTHONUNBUFFERED": "1",
+        })
+        env.pop("SAVANT_REPLAY", None)
+        if args.source == "http":
+            server = SourceStandIn(payloads, args.latency)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            env["SAVANT_BASE_URL"] = env["MLB_API_BASE_URL"] = server.base_url
+            # The register itself comes from pybaseball, not a URL: pre-build the bridge cache
+            os.environ["RAW_LANDING_DIR"] = env["RAW_LANDING_DIR"]
+            from etl.update_savant_awsrds import _compact_bridge
+            cache = Path(env["CHADWICK_BRIDGE_CACHE"])
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            _compact_bridge(pd.read_csv(io.StringIO(payloads.register_csv()))).to_parquet(cache, index=False)
+        else:
+            os.environ["RAW_LANDING_DIR"] = env["RAW_LANDING_DIR"]
+            from etl import raw_store
+            for year in list(BACKFILL_YEARS) + [date.today().year]:
+                for player_type in ("batter", "pitcher"):
+                    raw_store.land("savant", f"{player_type}_{year}", "fixture", payloads.savant_csv(year, player_type))
+            year = date.today().year
+            raw_store.land("mlb_rosters", f"teams_{year}", "fixture", payloads.teams_json())
+            raw_store.land("mlb_rosters", f"players_{year}", "fixture", payloads.players_json())
+            raw_store.land("chadwick", "register", "fixture", payloads.register_csv())
+            env["SAVANT_REPLAY"] = "latest"
+        print(f"Benchmark database {dbname} seeded; sources: {args.source}; workdir {workdir}")
+
+        for run_no in range(1, args.runs + 1):
+            for job in jobs:
+                rc, seconds, log = run_job(job, env, args.source, workdir, run_no)
+                print(f" run {run_no} {job:16s} exit {rc}  {seconds:7.1f}s  ({log.name})")
+                failed |= rc != 0
+
+        from etl.run_metrics import load_history
+        os.environ["ETL_METRICS_DIR"] = str(metrics_dir)
+        records = {}
+        for job in jobs:
+            runs = load_history(job)[-args.runs:]
+            if runs:
+                records[job] = runs
+                failed |= any(r["status"] == "failed" for r in runs)
+        print_report(records, args.runs)
+        if server is not None:
+            print(f"\nHTTP stand-in served {server.requests} requests.")
+        print(f"Logs: {workdir}   Metrics: {metrics_dir}")
+    finally:
+        if server is not None:
+            server.shutdown()
+        if args.keep_db:
+            print(f"Kept database {dbname} on {params['host']}:{params['port']}"
+                  + (f" (container {container[:12]} left running)" if container else "") + ".")
+        elif container:
+            subprocess.call(["docker", "stop", container], stdout=subprocess.DEVNULL)
+        else:
+            try:
+                admin_run(params, f'DROP DATABASE IF EXISTS "{dbname}"')
+            except psycopg2.Error as e:
+                print(f"Could not drop {dbname}: {e}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# tests/run_fetch_scheduler_check.py
+#
+# Offline check for the Savant fetch scheduler (etl/fetch_scheduler.py) and
+# the real download/parse path in etl/update_savant_awsrds.py. Starts a local
+# HTTP stand-in for Savant's /leaderboard/custom endpoint that serves the
+# fixture CSVs in tests/fixtures/ (with latency, and a 503 on the first attempt
+# of some jobs), points SAVANT_BASE_URL at it, and runs a backfill-sized job
+# list through run_fetch_jobs. No database, no network.
+#
+# Checks: every job completes with a parsed frame, each injected failure is
+# retried exactly once, requests never exceed the token-bucket rate, and more
+# than one download is in flight at a time. Prints end-to-end wall time next
+# to the sequential equivalent. Payloads land in a temporary raw landing zone
+# (etl/raw_store.py); the check then replays every job from it offline and
+# expects the same frames.
+#
+# Usage:
+#   .venv/Scripts/python tests/run_fetch_scheduler_check.py
+#   .venv/Scripts/python tests/run_fetch_scheduler_check.py --workers 6 --rate 8 --latency 0.3
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+FIXTURES = ROOT / "tests" / "fixtures"
+
+
+class SavantStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency, fail_first):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency = latency
+        self.fail_first = set(fail_first)  # (year, type) jobs whose first request gets a 503
+        self.lock = threading.Lock()
+        self.request_times = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failed = set()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        srv = self.server
+        url = urlparse(self.path)
+        qs = parse_qs(url.query)
+        job = (int(qs.get("year", ["0"])[0]), qs.get("type", [""])[0])
+        with srv.lock:
+            srv.request_times.append(time.monotonic())
+            srv.in_flight += 1
+            srv.max_in_flight = max(srv.max_in_flight, srv.in_flight)
+            fail = job in srv.fail_first and job not in srv.failed
+            if fail:
+                srv.failed.add(job)
+        try:
+            time.sleep(srv.latency)
+            fixture = FIXTURES / f"savant_{job[1]}.csv"
+            if url.path != "/leaderboard/custom" or not fixture.exists():
+                self.send_response(404)
+                self.end_headers()
+                return
+            if fail:
+                self.send_response(503)
+                self.end_headers()
+                self.wfile.write(b"<html>Service Unavailable</html>")
+                return
+            body = fixture.read_bytes()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with srv.lock:
+                srv.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=10.0, help="token-bucket requests/sec")
+    parser.add_argument("--burst", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.5, help="stand-in response delay (s)")
+    args = parser.parse_args()
+
+    jobs = [(year, t) for year in range(2015, 2026) for t in ("batter", "pitcher")]
+    fail_first = jobs[1::5]
+    server = SavantStandIn(args.latency, fail_first)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["SAVANT_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["RAW_LANDING_DIR"] = tempfile.mkdtemp(prefix="savant_raw_")
+
+    # Imported after SAVANT_BASE_URL is set -- the module reads it at import time
+    from etl import update_savant_awsrds as etl
+    from etl.fetch_scheduler import FetchStats, run_fetch_jobs
+
+    stats = FetchStats()
+    frames = {}
+    t0 = time.perf_counter()
+    for result in run_fetch_jobs(jobs, etl.download_savant_csv, workers=args.workers, rate=args.rate,
+                                 burst=args.burst, max_attempts=3, backoff_base=0.1, stats=stats):
+        if result.ok:
+            frames[result.job] = result.value
+    wall = time.perf_counter() - t0
+    server.shutdown()
+
+    problems = []
+    if set(frames) != set(jobs):
+        problems.append(f"missing jobs: {sorted(set(jobs) - set(frames))}")
+    for job, df in frames.items():
+        if "player_id" not in df.columns or "playername" not in df.columns or df.empty:
+            problems.append(f"{job}: unparsed frame (columns {df.columns.tolist()[:5]})")
+    if stats.retries != len(fail_first):
+        problems.append(f"expected {len(fail_first)} retries, saw {stats.retries}")
+    times = sorted(server.request_times)
+    # Over any window, requests can't exceed burst + rate * window (small slack for timer jitter)
+    for i in range(len(times)):
+        for j in range(i + args.burst, len(times)):
+            window = times[j] - times[i]
+            if j - i + 1 > args.burst + args.rate * window + 1e-6 + 0.05 * args.rate:
+                problems.append(f"rate exceeded: {j - i + 1} requests in {window:.3f}s")
+                break
+        if problems and problems[-1].startswith("rate exceeded"):
+            break
+    if args.workers > 1 and server.max_in_flight < 2:
+        problems.append("downloads never overlapped")
+
+    # Replay from the landing zone: no requests, same frames
+    replay, _, _ = etl.savant_fetcher("latest")
+    n_requests = len(server.request_times)
+    for job, df in frames.items():
+        try:
+            if not replay(*job).equals(df):
+                problems.append(f"{job}: replayed frame differs from the downloaded one")
+        except FileNotFoundError as e:
+            problems.append(f"{job}: {e}")
+    if len(server.request_times) != n_requests:
+        problems.append("replay hit the server")
+
+    sequential = len(times) * args.latency
+    print(f"{len(jobs)} jobs, {len(times)} requests ({stats.retries} retries), "
+          f"max {server.max_in_flight} in flight")
+    print(f"wall {wall:.2f}s vs ~{sequential:.2f}s sequential at {args.latency}s/request")
+    if problems:
+        print("FAIL\n  " + "\n  ".join(problems))
+        sys.exit(1)
+    print("PASS")
+
+
+if __name__ == "__main__":
+    main()
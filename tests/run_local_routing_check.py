@@ -0,0 +1,68 @@
+# tests/run_local_routing_check.py
+#
+# Offline check for db/local_engine.py's routing: which statements may run on
+# the DuckDB export of completed seasons and which must go to Postgres. A
+# statement that reads a live table (savant_*, player_season_*, season_leaders)
+# without closing its season range below the current one -- in every UNION
+# branch, CTE body and subquery -- would silently lose this season's rows
+# locally, so it has to route to Postgres. No database, no duckdb needed.
+#
+# Usage:
+#   .venv/Scripts/python tests/run_local_routing_check.py
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from db.local_engine import route_statement
+
+CURRENT_SEASON = 2026
+EXPORTED = {"people", "batting", "pitching", "savant_batting_traditional", "savant_batting_season",
+            "player_season_batting", "season_leaders"}
+
+# (sql, params, expected local?)
+CASES = [
+    ("SELECT * FROM batting WHERE yearid >= 2000", None, True),
+    ("SELECT * FROM savant_batting_traditional WHERE year = 2024", None, True),
+    ("SELECT * FROM savant_batting_traditional WHERE year = %(season)s", {"season": 2025}, True),
+    ("SELECT * FROM savant_batting_traditional WHERE year = %(season)s", {"season": 2026}, False),
+    ("SELECT * FROM savant_batting_traditional WHERE year BETWEEN 2018 AND 2023", None, True),
+    ("SELECT * FROM savant_batting_traditional WHERE year >= 2015 AND year <= 2025", None, True),
+    ("SELECT * FROM savant_batting_traditional WHERE year >= 2015", None, False),
+    ("SELECT * FROM savant_batting_traditional", None, False),
+    ("SELECT * FROM savant_batting_traditional WHERE year IN (2022, 2023)", None, True),
+    # Every IN-list value counts, not just the first two
+    ("SELECT * FROM savant_batting_traditional WHERE year IN (2022, 2023, 2026)", None, False),
+    ("SELECT * FROM savant_batting_traditional WHERE year IN %(years)s", {"years": (2021, 2026)}, False),
+    ("SELECT * FROM savant_batting_traditional WHERE year IN (SELECT MAX(year) FROM batting)", None, False),
+    # One bounded branch doesn't make the other branch historical
+    ("SELECT * FROM savant_batting_traditional WHERE year = 2024 "
+     "UNION ALL SELECT * FROM savant_batting_traditional", None, False),
+    ("SELECT * FROM savant_batting_traditional WHERE year = 2024 "
+     "UNION ALL SELECT * FROM savant_batting_traditional WHERE year = 2023", None, True),
+    ("SELECT p.namefirst FROM people p WHERE p.playerid IN "
+     "(SELECT s.player_id FROM savant_batting_season s) AND 2024 = 2024", None, False),
+    ("WITH s AS (SELECT * FROM savant_batting_season WHERE year = 2025) "
+     "SELECT * FROM s JOIN people p ON p.playerid = s.player_id", None, True),
+    ("WITH s AS (SELECT * FROM savant_batting_season) "
+     "SELECT * FROM s WHERE s.year = 2024", None, False),
+    ("SELECT * FROM savant_batting_traditional WHERE year = 2024 OR display_name = 'x'", None, False),
+    ("SELECT * FROM season_leaders WHERE season = 2025 AND name ILIKE '%(year = 2020)%'", None, True),
+]
+
+
+def main():
+    failures = 0
+    for sql, params, expected in CASES:
+        ok, reason = route_statement(sql, params, EXPORTED, CURRENT_SEASON)
+        status = "PASS" if ok == expected else "FAIL"
+        failures += status == "FAIL"
+        print(f"{status}  {'local' if ok else 'postgres':8s} {reason:32s} {' '.join(sql.split())[:90]}")
+    print(f"\n{len(CASES) - failures}/{len(CASES)} routed as expected.")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ import sys
 import time
 import traceback
 from datetime import date
+from decimal import Decimal
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -25,6 +26,7 @@ from nlp import router_fastpath as rfp
 from nlp import template_router as tr
 from nlp.sql_render import lint_sql as basic_lint
 from nlp.linter import lint_sql as rule_lint
+from nlp.decorrelate import decorrelate_sql
 
 import os
 
@@ -60,6 +62,31 @@ def format_sample(rows, colnames, limit=5):
     return str(sample) + suffix
 
 
+def _normalize_rows(rows):
+    """Order-insensitive, type-insensitive view of a result set for Postgres vs DuckDB comparison."""
+    def norm(v):
+        if isinstance(v, (float, Decimal)):
+            return round(float(v), 4)
+        return v
+    return sorted((tuple(norm(v) for v in r) for r in rows), key=repr)
+
+
+def compare_local(sql, params, pg_rows, engine):
+    """Re-run a statement on the local DuckDB backend (db/local_engine.py) if it
+    would be routed there. Returns (local_status, route_reason, local_ms)."""
+    ok, reason = engine.route(sql, params)
+    if not ok:
+        return "POSTGRES_ONLY", reason, None
+    t0 = time.time()
+    try:
+        rows, _cols = engine.execute(sql, params)
+    except Exception as e:
+        return "LOCAL_ERROR", f"{reason}: {type(e).__name__}: {e}", None
+    local_ms = round((time.time() - t0) * 1000, 1)
+    status = "MATCH" if _normalize_rows(rows) == _normalize_rows(pg_rows) else "MISMATCH"
+    return status, reason, local_ms
+
+
 def route_question(q_raw, schema_str, prompt_template, templates_yaml, stat_catalog):
     """Mirror app.py's routing order. Returns (sql_or_none, source, bound_params, refusal_status, refusal_text)."""
     norm_q, season = gsql.normalize_query(q_raw)
@@ -89,7 +116,7 @@ def route_question(q_raw, schema_str, prompt_template, templates_yaml, stat_cata
         return None, "model", {}, "REFUSED_REPROMPT", None
     if verdict is not None:
         return None, "model", {}, "REFUSED", verdict
-    return basic_lint(raw_sql), "model", {}, None, None
+    return basic_lint(decorrelate_sql(raw_sql)), "model", {}, None, None
 
 
 def main():
@@ -99,8 +126,19 @@ def main():
     parser.add_argument("--no-fastpath", action="store_true")
     parser.add_argument("--no-exec", action="store_true", help="Generate + lint only, skip DB execution")
     parser.add_argument("--limit", type=int, default=None, help="Only run the first N questions (pilot/smoke runs)")
+    parser.add_argument("--compare-local", action="store_true",
+                        help="Also run each statement on the local DuckDB backend (db/local_engine.py) "
+                             "when it would be routed there; record latency + result match")
     args = parser.parse_args()
 
+    engine = None
+    if args.compare_local:
+        from db import local_engine
+        engine = local_engine.get_engine(os.environ.get("DBBALL_LOCAL_ENGINE") or "1")
+        if engine is None:
+            sys.exit("[error] --compare-local: local engine unavailable (pip install duckdb; run etl/export_parquet.py)")
+        print(f"[info] local engine: {len(engine.tables)} tables, exported {engine.exported_at}")
+
     schema_str = gsql.load_schema()
     prompt_template = gsql.load_prompt_template()
     templates_yaml = gsql.load_templates_yaml()
@@ -114,6 +152,14 @@ def main():
             print(f"[info] fast-path stat catalog loaded ({len(stat_catalog)} stats)")
         except Exception as e:
             print(f"[warn] fastpath catalog init failed, disabling fastpath: {e}", file=sys.stderr)
+    try:
+        conn = get_conn(timeout=8)
+        if tr.init_coverage(conn) is None:
+            print("[warn] game-log/split coverage unavailable; template router checks the season range only",
+                  file=sys.stderr)
+        conn.close()
+    except Exception as e:
+        print(f"[warn] game-log coverage init failed: {e}", file=sys.stderr)
 
     qdf = pd.read_csv(args.questions)
     if args.limit:
@@ -152,10 +198,16 @@ def main():
                     rec["exec_status"] = "NOT_RUN"
                 else:
                     try:
+                        t_exec = time.time()
                         rows, colnames = run_sql(sql, bound_params)
+                        pg_ms = round((time.time() - t_exec) * 1000, 1)
                         rec["rowcount"] = len(rows)
                         rec["sample_output"] = format_sample(rows, colnames)
                         rec["exec_status"] = "PASS" if len(rows) else "PASS_EMPTY"
+                        if engine is not None:
+                            local_status, route_reason, local_ms = compare_local(sql, bound_params, rows, engine)
+                            rec.update(pg_ms=pg_ms, local_status=local_status,
+                                       route_reason=route_reason, local_ms=local_ms)
                     except Exception as e:
                         rec["exec_status"] = "FAIL"
                         rec["exec_error"] = f"{type(e).__name__}: {e}"
@@ -180,6 +232,15 @@ def main():
     print(out_df["exec_status"].value_counts().to_string())
     print("\n=== BY CATEGORY ===")
     print(out_df.groupby("category")["exec_status"].apply(lambda s: s.value_counts().to_dict()).to_string())
+    if engine is not None and "local_status" in out_df.columns:
+        print("\n=== LOCAL ENGINE (DuckDB vs Postgres) ===")
+        print(out_df["local_status"].value_counts().to_string())
+        local = out_df[out_df["local_status"].isin(["MATCH", "MISMATCH"])]
+        if not local.empty:
+            pg_med, local_med = local["pg_ms"].median(), local["local_ms"].median()
+            print(f"routed locally: {len(local)} | median Postgres {pg_med:.1f} ms | "
+                  f"median DuckDB {local_med:.1f} ms | speedup x{pg_med / max(local_med, 0.1):.1f}")
+        print(out_df["route_reason"].value_counts().head(10).to_string())
     print(f"\nFull results: {out_path}")
 
 
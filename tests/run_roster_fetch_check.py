@@ -0,0 +1,170 @@
+# tests/run_roster_fetch_check.py
+#
+# Offline check for the shared MLB Stats API roster client
+# (etl/roster_fetcher.py). Starts a local HTTP/1.1 stand-in for the teams,
+# sports/1/players and teams/{id}/roster endpoints (30 teams, response latency,
+# a 503 on the first attempt of some rosters, ETag / 304 support), points
+# MLB_API_BASE_URL and MLB_API_CACHE_DIR at it and a temp dir, and fetches every
+# team's roster twice. No database, no network.
+#
+# Checks: every team's roster arrives with the right players, each injected
+# failure is retried, more than one request is in flight at a time, sessions
+# are reused (far fewer TCP connections than requests), and the second pass is
+# answered entirely with 304s from the conditional-request cache with identical
+# rows. Prints both passes' wall time next to the sequential equivalent.
+#
+# Usage:
+#   .venv/Scripts/python tests/run_roster_fetch_check.py
+#   .venv/Scripts/python tests/run_roster_fetch_check.py --workers 10 --latency 0.3
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+TEAM_IDS = list(range(108, 138))
+PLAYERS_PER_TEAM = 40
+
+
+def roster_payload(team_id):
+    return {"roster": [{"person": {"id": team_id * 1000 + i, "fullName": f"Player {team_id}-{i}"},
+                        "position": {"abbreviation": "P" if i % 2 else "SS"}, "status": {"code": "A"}}
+                       for i in range(PLAYERS_PER_TEAM)]}
+
+
+class StatsApiStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency, fail_first):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency = latency
+        self.fail_first = set(fail_first)  # team ids whose first roster request gets a 503
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failed = set()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so session reuse is visible as reused connections
+
+    def _send(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for k, v in headers:
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        srv = self.server
+        path = urlparse(self.path).path
+        with srv.lock:
+            srv.requests += 1
+            srv.connections.add(self.client_address)
+            srv.in_flight += 1
+            srv.max_in_flight = max(srv.max_in_flight, srv.in_flight)
+        try:
+            time.sleep(srv.latency)
+            if path == "/api/v1/teams":
+                payload = {"teams": [{"id": t, "abbreviation": f"T{t}"} for t in TEAM_IDS]}
+            elif path.startswith("/api/v1/teams/") and path.endswith("/roster"):
+                team_id = int(path.split("/")[4])
+                with srv.lock:
+                    fail = team_id in srv.fail_first and team_id not in srv.failed
+                    if fail:
+                        srv.failed.add(team_id)
+                if fail:
+                    self._send(503, b"<html>Service Unavailable</html>")
+                    return
+                payload = roster_payload(team_id)
+            else:
+                self._send(404)
+                return
+            body = json.dumps(payload).encode()
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                with srv.lock:
+                    srv.not_modified += 1
+                self._send(304, headers=[("ETag", etag)])
+                return
+            self._send(200, body, [("Content-Type", "application/json"), ("ETag", etag)])
+        finally:
+            with srv.lock:
+                srv.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=50.0, help="requests/sec cap")
+    parser.add_argument("--latency", type=float, default=0.2, help="stand-in response delay (s)")
+    args = parser.parse_args()
+
+    fail_first = TEAM_IDS[::7]
+    server = StatsApiStandIn(args.latency, fail_first)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["MLB_API_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["MLB_API_CACHE_DIR"] = tempfile.mkdtemp(prefix="mlb_api_cache_")
+
+    # Imported after MLB_API_BASE_URL is set -- the module reads it at import time
+    from etl.roster_fetcher import MlbApiClient, fetch_team_rosters
+
+    problems = []
+    passes = []
+    for label in ("cold", "cached"):
+        client = MlbApiClient(workers=args.workers, rate=args.rate)
+        t0 = time.perf_counter()
+        rows, failed = fetch_team_rosters(client, 2026)
+        passes.append((label, time.perf_counter() - t0, client.counts, rows))
+        if failed:
+            problems.append(f"{label}: failed teams {sorted(failed)}")
+        teams = {r["team_id"] for r in rows}
+        if teams != set(TEAM_IDS) or len(rows) != len(TEAM_IDS) * PLAYERS_PER_TEAM:
+            problems.append(f"{label}: got {len(rows)} rows for {len(teams)} teams")
+    server.shutdown()
+
+    (_, cold_s, cold, cold_rows), (_, warm_s, warm, warm_rows) = passes
+    expected_retries = len(fail_first)
+    if cold["requests"] != 1 + len(TEAM_IDS) + expected_retries:
+        problems.append(f"cold pass: expected {1 + len(TEAM_IDS) + expected_retries} requests, saw {cold['requests']}")
+    if warm["not_modified"] != 1 + len(TEAM_IDS):
+        problems.append(f"cached pass: expected {1 + len(TEAM_IDS)} 304s, saw {warm['not_modified']}")
+    if warm_rows != cold_rows:
+        problems.append("cached pass returned different rows")
+    if args.workers > 1 and server.max_in_flight < 2:
+        problems.append("requests never overlapped")
+    if len(server.connections) > 2 * args.workers + 2:
+        problems.append(f"{len(server.connections)} connections for {server.requests} requests: sessions not reused")
+
+    sequential = (1 + len(TEAM_IDS)) * args.latency
+    print(f"Cold pass:   {cold_s:.2f}s, {cold['requests']} requests ({expected_retries} retried), {cold['bytes']:,} bytes")
+    print(f"Cached pass: {warm_s:.2f}s, {warm['requests']} requests, {warm['not_modified']} answered 304")
+    print(f"Sequential equivalent: ~{sequential:.2f}s per pass; max in flight {server.max_in_flight}; "
+          f"{len(server.connections)} connections for {server.requests} requests")
+    if problems:
+        print("\nFAIL")
+        for p in problems:
+            print(f"  - {p}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# tests/run_savant_parse_benchmark.py
+#
+# Time/memory benchmark for parsing a Savant leaderboard CSV: the old path
+# (pd.read_csv with inferred dtypes + the per-column '%' scan and
+# pd.to_numeric(errors='ignore') loop clean_and_normalize used to run) against
+# the declared schema in etl/savant_schema.py (pyarrow engine, dtypes applied at
+# parse time). Reports best-of-N parse time, tracemalloc peak, the resulting
+# frame's deep memory usage, and every column whose SQL type differs between
+# the two (the old types were whatever pandas inferred that day).
+#
+# Without --csv it builds a full-season-sized file (--rows) by repeating the
+# tests/fixtures/ CSV with perturbed values, a blank in some count cells and a
+# '%' suffix on one percent column -- the cases that used to change inferred
+# dtypes. For a real file, save a season's CSV from Savant and pass --csv.
+# Fails if the two paths disagree on any numeric cell, or if any '%' cell
+# didn't come out of the declared parse as its number (a NULL on both sides
+# would otherwise compare equal).
+#
+# Usage:
+#   .venv/Scripts/python tests/run_savant_parse_benchmark.py
+#   .venv/Scripts/python tests/run_savant_parse_benchmark.py --type pitcher --rows 900
+#   .venv/Scripts/python tests/run_savant_parse_benchmark.py --csv data/savant_batter_2024.csv --repeat 20
+
+import argparse
+import csv
+import io
+import random
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+
+from etl.savant_schema import CSV_ENGINE, normalize_column, read_savant_csv, sql_type
+
+
+def legacy_parse(text):
+    """The pre-schema path: inferred read_csv, then the old clean_and_normalize loop."""
+    df = pd.read_csv(io.StringIO(text))
+    df.columns = [normalize_column(c) for c in df.columns]
+    out = df.copy()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)  # errors='ignore' is deprecated
+        for col in out.columns:
+            if out[col].dtype == object:
+                col_str = out[col].astype(str)
+                if col_str.str.contains('%').any():
+                    out[col] = col_str.str.replace('%', '', regex=False).str.strip()
+                try: out[col] = pd.to_numeric(out[col], errors='ignore')
+                except: pass
+    return out
+
+
+def legacy_sql_type(dtype):
+    if dtype == 'int64': return "INT"
+    if dtype == 'float64': return "FLOAT"
+    if dtype == 'bool': return "BOOLEAN"
+    return "TEXT"
+
+
+def synthetic_season(player_type, rows, seed=7):
+    """Repeats the fixture CSV out to `rows` players with perturbed numbers."""
+    rng = random.Random(seed)
+    with open(ROOT / "tests" / "fixtures" / f"savant_{player_type}.csv", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        base = list(reader)
+    norm = [normalize_column(h) for h in header]
+    pct_col = next((i for i, c in enumerate(norm) if c.endswith("_percent")), None)
+    buf = io.StringIO()
+    w = csv.writer(buf, quoting=csv.QUOTE_MINIMAL)
+    w.writerow(header)
+    for i in range(rows):
+        row = list(base[i % len(base)])
+        for j, c in enumerate(norm):
+            if c == "player_id":
+                row[j] = str(500000 + i)
+            elif c in ("year", "team") or j == 0:
+                continue
+            elif "." in row[j]:
+                v = float(row[j]) * rng.uniform(0.7, 1.3)
+                row[j] = f"{v:.3f}".lstrip("0") if v < 1 else f"{v:.1f}"  # Savant writes ".322"
+            elif row[j].isdigit():
+                row[j] = "" if i % 10 == 3 else str(int(int(row[j]) * rng.uniform(0.0, 1.0)))
+        if pct_col is not None and i % 50 == 0:
+            row[pct_col] += "%"
+        w.writerow(row)
+    return buf.getvalue()
+
+
+def percent_cells_lost(text, df):
+    """(row, column, cell) for every '43.9%'-style cell the declared parse didn't turn into that number."""
+    reader = csv.reader(io.StringIO(text))
+    norm = [normalize_column(h) for h in next(reader)]
+    lost = []
+    for i, row in enumerate(reader):
+        for col, cell in zip(norm, row):
+            if cell.strip().endswith("%") and col in df.columns:
+                value = df[col].iloc[i]
+                if pd.isna(value) or not np.isclose(float(value), float(cell.strip().rstrip("%")), rtol=1e-6):
+                    lost.append((i, col, cell))
+    return lost
+
+
+def measure(parse, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        parse(text)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    df = parse(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", help="A saved full-season Savant leaderboard CSV")
+    parser.add_argument("--type", choices=["batter", "pitcher"], default="batter")
+    parser.add_argument("--rows", type=int, default=650, help="Synthetic file size (default ~ a season of batters)")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    text = Path(args.csv).read_text(encoding="utf-8") if args.csv else synthetic_season(args.type, args.rows)
+    print(f"{args.csv or f'synthetic {args.type} season'}: {len(text) / 1024:.0f} KiB, engine={CSV_ENGINE}")
+
+    results = {}
+    for label, parse in (("inferred", legacy_parse), ("declared", read_savant_csv)):
+        df, secs, peak = measure(parse, text, args.repeat)
+        results[label] = df
+        print(f"  {label:9s} {len(df)} rows x {df.shape[1]} cols  parse {secs * 1000:7.1f} ms  "
+              f"peak {peak / 1024:7.0f} KiB  frame {df.memory_usage(deep=True).sum() / 1024:7.0f} KiB")
+
+    old, new = results["inferred"], results["declared"]
+    changed = [(c, legacy_sql_type(old[c].dtype), sql_type(c, new[c].dtype), str(old[c].dtype), str(new[c].dtype))
+               for c in new.columns if c in old.columns and legacy_sql_type(old[c].dtype) != sql_type(c, new[c].dtype)]
+    if changed:
+        print("\nSQL type differences (inferred -> declared):")
+        for c, o, n, od, nd in changed:
+            print(f"  {c:28s} {o:7s} ({od}) -> {n} ({nd})")
+
+    # Same values either way (declared floats are float32, hence the tolerance)
+    num = [c for c in new.columns if c in old.columns and sql_type(c, new[c].dtype) in ("INT", "FLOAT")]
+    a = old[num].apply(pd.to_numeric, errors="coerce").astype("float64").to_numpy()
+    b = new[num].astype("float64").to_numpy()
+    bad = ~np.isclose(a, b, rtol=1e-6, atol=1e-6, equal_nan=True)
+    if bad.any():
+        cols = sorted({num[j] for j in np.nonzero(bad)[1]})
+        print(f"\nFAIL: {int(bad.sum())} numeric cells differ (columns: {', '.join(cols)})")
+        sys.exit(1)
+    # equal_nan hides a '%' cell both paths turned into NULL; those must be numbers
+    lost = percent_cells_lost(text, new)
+    if lost:
+        print(f"\nFAIL: {len(lost)} '%' cells did not parse to a number, e.g. {lost[:3]}")
+        sys.exit(1)
+    print("\nPASS: numeric values match, '%' cells parsed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# tests/run_savant_season_benchmark.py
+#
+# Split vs wide Savant season storage (etl/savant_season.py). Loads the same
+# generated seasons (tests/run_etl_benchmark.py's fixture payloads, --seasons
+# back from the current one, --players rows each) into two throwaway databases
+# on a local (or --docker) Postgres:
+#   split  the old layout: five savant_batting_* and five savant_pitching_*
+#          tables, one upsert per table;
+#   wide   savant_batting_season / savant_pitching_season written once per CSV,
+#          with the savant_* names as views over them.
+# Both go through upsert_table_pg8000() with the production COPY merge, three
+# passes each: insert (empty tables), rewrite (SAVANT_FORCE_UPSERT-style, every
+# row sent again) and unchanged (row-hash skips). Reports wall time and rows
+# written per pass, and each layout's on-disk size.
+#
+# Then times multi-metric reads, --repeat runs each (median / p95):
+#   split  the query as written today, joining the per-group tables;
+#   views  the same SQL in the wide database, i.e. through the compat views
+#          (what unchanged prompt/template SQL gets);
+#   wide   the same question against the wide table, no join.
+#
+# Usage:
+#   .venv/Scripts/python tests/run_savant_season_benchmark.py --docker
+#   .venv/Scripts/python tests/run_savant_season_benchmark.py --pg-host localhost --players 1500 --seasons 11
+
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pg8000.native
+
+from etl.savant_season import GROUPS, IDENTITY, SEASON_TABLES, ensure_compat_views, season_frame
+from etl.update_savant_awsrds import clean_and_normalize, parse_savant_csv, upsert_table_pg8000
+from tests.run_etl_benchmark import Payloads, admin_run, start_docker_postgres, wait_for_postgres
+
+YEAR = date.today().year
+LAYOUTS = ["split", "wide"]
+PASSES = [("insert", False), ("rewrite", False), ("unchanged", True)]  # (name, skip_unchanged)
+
+# name -> (split / compat-view SQL, wide-table SQL); {year} is filled in per run
+QUERIES = {
+    "mixed_leaderboard": (
+        """SELECT t.display_name, r.on_base_plus_slg, e.xwoba, d.chase_percent
+           FROM savant_batting_traditional t
+           JOIN savant_batting_ratios r ON r.player_id = t.player_id AND r.year = t.year
+           JOIN savant_batting_expected e ON e.player_id = t.player_id AND e.year = t.year
+           JOIN savant_batting_discipline d ON d.player_id = t.player_id AND d.year = t.year
+           WHERE t.year = {year} AND t.b_total_pa >= 100
+           ORDER BY e.xwoba DESC NULLS LAST LIMIT 20""",
+        """SELECT display_name, on_base_plus_slg, xwoba, chase_percent
+           FROM savant_batting_season
+           WHERE year = {year} AND in_traditional AND in_ratios AND in_expected AND in_discipline
+             AND b_total_pa >= 100
+           ORDER BY xwoba DESC NULLS LAST LIMIT 20"""),
+    "player_profile": (
+        """SELECT e.year, e.xwoba, p.exit_velocity_avg, p.sprint_speed, d.whiff_percent
+           FROM savant_batting_expected e
+           JOIN savant_batting_physics p ON p.player_id = e.player_id AND p.year = e.year
+           JOIN savant_batting_discipline d ON d.player_id = e.player_id AND d.year = e.year
+           WHERE e.name_key = (SELECT MIN(name_key) FROM savant_batting_expected WHERE year = {year})
+           ORDER BY e.year""",
+        """SELECT year, xwoba, exit_velocity_avg, sprint_speed, whiff_percent
+           FROM savant_batting_season
+           WHERE name_key = (SELECT MIN(name_key) FROM savant_batting_season WHERE year = {year} AND in_expected)
+             AND in_expected AND in_physics AND in_discipline
+           ORDER BY year"""),
+    "history_scan": (
+        """SELECT e.year, AVG(e.xwoba), AVG(p.exit_velocity_avg), AVG(d.chase_percent)
+           FROM savant_pitching_expected e
+           JOIN savant_pitching_physics p ON p.player_id = e.player_id AND p.year = e.year
+           JOIN savant_pitching_discipline d ON d.player_id = e.player_id AND d.year = e.year
+           GROUP BY e.year ORDER BY e.year""",
+        """SELECT year, AVG(xwoba), AVG(exit_velocity_avg), AVG(chase_percent)
+           FROM savant_pitching_season
+           WHERE in_expected AND in_physics AND in_discipline
+           GROUP BY year ORDER BY year"""),
+}
+
+
+def season_frames(payloads, seasons):
+    """(player_type, cleaned frame) per generated season, with bb_k as the daily writers add it."""
+    frames = []
+    for year in seasons:
+        for player_type, walk, so in (("batter", "b_walk", "b_strikeout"), ("pitcher", "p_walk", "p_strikeout")):
+            df = clean_and_normalize(parse_savant_csv(payloads.savant_csv(year, player_type)))
+            if walk in df.columns and so in df.columns:
+                df["bb_k"] = df[walk] / df[so].replace(0, 1)
+            frames.append((player_type, df))
+    return frames
+
+
+def load(db, layout, frames, skip_unchanged) -> int:
+    """One pass of every frame into `layout`. Returns rows written."""
+    written = 0
+    for player_type, df in frames:
+        table = SEASON_TABLES[player_type]
+        if layout == "wide":
+            frame, _ = season_frame(df, table)
+            counts = upsert_table_pg8000(db, frame, table, skip_unchanged=skip_unchanged)
+            ensure_compat_views(db.run, table)
+            written += counts["inserted"] + counts["updated"]
+            continue
+        for view, group_cols in GROUPS[table].items():
+            valid = [c for c in IDENTITY + group_cols if c in df.columns]
+            if len(valid) >= 3:
+                counts = upsert_table_pg8000(db, df[valid], view, skip_unchanged=skip_unchanged)
+                written += counts["inserted"] + counts["updated"]
+    return written
+
+
+def time_query(db, sql, repeat):
+    db.run(sql)  # warm the cache and the plan
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        db.run(sql)
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return statistics.median(times), times[min(len(times) - 1, int(0.95 * (len(times) - 1) + 0.5))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split vs wide Savant season tables: load time and read latency.")
+    parser.add_argument("--players", type=int, default=1000, help="Players per season (default %(default)s)")
+    parser.add_argument("--seasons", type=int, default=12, help="Seasons ending at the current one")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed runs per query (default %(default)s)")
+    parser.add_argument("--docker", action="store_true", help="Start a throwaway postgres:16 container")
+    parser.add_argument("--pg-host", default=os.getenv("BENCH_PGHOST", "localhost"))
+    parser.add_argument("--pg-port", type=int, default=int(os.getenv("BENCH_PGPORT", "5432")))
+    parser.add_argument("--pg-user", default=os.getenv("BENCH_PGUSER", "postgres"))
+    parser.add_argument("--pg-password", default=os.getenv("BENCH_PGPASSWORD", "postgres"))
+    args = parser.parse_args()
+
+    params = {"host": args.pg_host, "port": args.pg_port, "user": args.pg_user, "password": args.pg_password}
+    container = None
+    if args.docker:
+        container, params["port"] = start_docker_postgres(args.pg_password)
+        params["host"] = "127.0.0.1"
+    dbnames = {layout: f"savant_{layout}_{os.getpid()}" for layout in LAYOUTS}
+    seasons = list(range(YEAR - args.seasons + 1, YEAR + 1))
+    conns = {}
+    # upsert_table_pg8000 prints a line per table; keep the report readable
+    quiet = io.StringIO()
+    try:
+        wait_for_postgres(params)
+        frames = season_frames(Payloads(args.players), seasons)
+        print(f"{len(frames)} CSV frames ({args.players} players x {len(seasons)} seasons x batter/pitcher)")
+
+        print(f"\n   {'pass':10s}" + "".join(f"{layout + ' s':>12s}{layout + ' rows':>14s}" for layout in LAYOUTS))
+        for layout in LAYOUTS:
+            admin_run(params, f'CREATE DATABASE "{dbnames[layout]}"')
+            conns[layout] = pg8000.native.Connection(database=dbnames[layout], **params)
+        for name, skip in PASSES:
+            cells = []
+            for layout in LAYOUTS:
+                stdout, sys.stdout = sys.stdout, quiet
+                try:
+                    t0 = time.perf_counter()
+                    rows = load(conns[layout], layout, frames, skip)
+                    seconds = time.perf_counter() - t0
+                finally:
+                    sys.stdout = stdout
+                cells.append(f"{seconds:>12.2f}{rows:>14,d}")
+            print(f"   {name:10s}" + "".join(cells))
+        for layout in LAYOUTS:
+            conns[layout].run("VACUUM ANALYZE")
+            size = conns[layout].run(
+                "SELECT SUM(pg_total_relation_size(c.oid)) FROM pg_class c "
+                "WHERE c.relkind = 'r' AND c.relnamespace = 'public'::regnamespace AND c.relname LIKE 'savant_%'")[0][0]
+            print(f"   {layout} on disk: {int(size or 0) / 1024 / 1024:,.1f} MB")
+
+        print(f"\n   {'query':20s} {'variant':8s} {'median ms':>10s} {'p95 ms':>9s}")
+        for name, (split_sql, wide_sql) in QUERIES.items():
+            for variant, layout, sql in (("split", "split", split_sql), ("views", "wide", split_sql),
+                                         ("wide", "wide", wide_sql)):
+                median, p95 = time_query(conns[layout], sql.format(year=YEAR), args.repeat)
+                print(f"   {name:20s} {variant:8s} {median:>10.2f} {p95:>9.2f}")
+    finally:
+        for db in conns.values():
+            db.close()
+        if container:
+            subprocess.call(["docker", "stop", container], stdout=subprocess.DEVNULL)
+        else:
+            for dbname in dbnames.values():
+                try:
+                    admin_run(params, f'DROP DATABASE IF EXISTS "{dbname}"')
+                except Exception as e:
+                    print(f"Could not drop {dbname}: {e}")
+
+
+if __name__ == "__main__":
+    main()
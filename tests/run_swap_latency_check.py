@@ -0,0 +1,242 @@
+# tests/run_swap_latency_check.py
+#
+# Reader latency while the daily Savant job loads, in-place vs blue/green
+# (SAVANT_UPSERT_METHOD=copy vs swap, etl/table_swap.py). Builds a throwaway
+# database the same way tests/run_etl_benchmark.py does (replayed fixture
+# payloads, local or --docker Postgres), seeds 2015-2025 with the backfill job
+# and the current season with one daily run, and adds a materialized view and
+# a view over savant_batting_traditional / savant_batting_ratios so the swap has
+# dependents to move over. Then, for each --methods entry, a reader connection
+# loops over a few app-style queries (a leaderboard, a name lookup joining two
+# savant_* tables, a multi-season expected-stats scan, the dependent view)
+# while the daily job re-writes every current-season row (SAVANT_FORCE_UPSERT=1).
+#
+# Prints p50 / p95 / max query latency and errors per phase: "idle" (before any
+# load) and "<method>" (during that method's run), plus each run's wall time.
+# Fails if a run exits non-zero, a reader query errors, __old / __shadow
+# relations are left behind, or the dependent view doesn't match the live tables
+# afterwards.
+#
+# Usage:
+#   .venv/Scripts/python tests/run_swap_latency_check.py --docker
+#   .venv/Scripts/python tests/run_swap_latency_check.py --pg-host localhost --players 5000 --rounds 3
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import psycopg2
+
+from tests.run_etl_benchmark import (
+    BACKFILL_YEARS,
+    Payloads,
+    admin_run,
+    run_job,
+    seed_database,
+    start_docker_postgres,
+    wait_for_postgres,
+)
+
+YEAR = date.today().year
+READER_QUERIES = {
+    "hr_leaders": f"""SELECT display_name, team, b_home_run FROM savant_batting_traditional
+                      WHERE year = {YEAR} ORDER BY b_home_run DESC NULLS LAST LIMIT 10""",
+    "name_lookup": f"""SELECT t.display_name, t.b_home_run, r.on_base_plus_slg
+                       FROM savant_batting_traditional t
+                       JOIN savant_batting_ratios r ON r.player_id = t.player_id AND r.year = t.year
+                       WHERE t.year = {YEAR} AND t.name_key = (SELECT MIN(name_key) FROM savant_batting_traditional
+                                                               WHERE year = {YEAR})""",
+    "xwoba_history": """SELECT year, MAX(xwoba), AVG(xwoba) FROM savant_batting_expected
+                        WHERE year BETWEEN 2015 AND 2025 GROUP BY year ORDER BY year""",
+    "dependent_view": f"""SELECT player_id, ops FROM bench_batting_summary
+                          WHERE year = {YEAR} ORDER BY ops DESC NULLS LAST LIMIT 10""",
+}
+DEPENDENTS = [
+    """CREATE MATERIALIZED VIEW bench_batting_summary AS
+        SELECT t.player_id, t.year, t.b_home_run, r.on_base_plus_slg AS ops
+        FROM savant_batting_traditional t
+        JOIN savant_batting_ratios r ON r.player_id = t.player_id AND r.year = t.year""",
+    "CREATE UNIQUE INDEX bench_batting_summary_pk ON bench_batting_summary (player_id, year)",
+    "CREATE VIEW bench_hr_leaders AS SELECT player_id, b_home_run FROM bench_batting_summary WHERE b_home_run >= 30",
+]
+
+
+class Reader(threading.Thread):
+    """Runs READER_QUERIES round-robin on its own connection, tagging each timing with the current phase."""
+
+    def __init__(self, params, dbname):
+        super().__init__(daemon=True)
+        self.conn = psycopg2.connect(**params, dbname=dbname)
+        self.conn.autocommit = True
+        self.phase = None
+        self.samples = []  # (phase, query, seconds, error)
+        self.stopped = threading.Event()
+
+    def run(self):
+        with self.conn.cursor() as cur:
+            while not self.stopped.is_set():
+                for name, sql in READER_QUERIES.items():
+                    phase = self.phase
+                    if phase is None:
+                        time.sleep(0.05)
+                        continue
+                    t0 = time.perf_counter()
+                    error = None
+                    try:
+                        cur.execute(sql)
+                        cur.fetchall()
+                    except psycopg2.Error as e:
+                        error = str(e).strip().splitlines()[0]
+                    self.samples.append((phase, name, time.perf_counter() - t0, error))
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.conn.close()
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def print_report(samples, phases, walls):
+    print(f"\n   {'phase':10s} {'query':16s} {'n':>6s} {'p50 ms':>9s} {'p95 ms':>9s} {'max ms':>9s} {'errors':>7s}")
+    for phase in phases:
+        rows = [s for s in samples if s[0] == phase]
+        for name in list(READER_QUERIES) + ["(all)"]:
+            times = [s[2] * 1000 for s in rows if name == "(all)" or s[1] == name]
+            errors = sum(1 for s in rows if (name == "(all)" or s[1] == name) and s[3])
+            if times:
+                print(f"   {phase:10s} {name:16s} {len(times):>6d} {percentile(times, 50):>9.1f} "
+                      f"{percentile(times, 95):>9.1f} {max(times):>9.1f} {errors:>7d}")
+    for phase, seconds in walls.items():
+        print(f"   {phase} load wall time: {' / '.join(f'{s:.1f}s' for s in seconds)}")
+
+
+def check_tables(params, dbname) -> list:
+    """Problems left after a run: stray __old/__shadow relations, a dependent view out of step."""
+    conn = psycopg2.connect(**params, dbname=dbname)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT relname FROM pg_class WHERE relnamespace = 'public'::regnamespace "
+                        "AND (relname LIKE '%\\_\\_old' OR relname LIKE '%\\_\\_shadow')")
+            problems = [f"left behind: {r[0]}" for r in cur.fetchall()]
+            cur.execute("""SELECT COUNT(*) FROM savant_batting_traditional t
+                           JOIN savant_batting_ratios r ON r.player_id = t.player_id AND r.year = t.year""")
+            live = cur.fetchone()[0]
+            cur.execute("SELECT COUNT(*) FROM bench_batting_summary")
+            if cur.fetchone()[0] != live:
+                problems.append("bench_batting_summary no longer reads the live tables")
+        conn.commit()
+    finally:
+        conn.close()
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reader latency during the daily Savant load, copy vs swap.")
+    parser.add_argument("--methods", default="copy,swap", help="SAVANT_UPSERT_METHOD values to compare")
+    parser.add_argument("--players", type=int, default=2000, help="Players per season (default %(default)s)")
+    parser.add_argument("--rounds", type=int, default=2, help="Measured runs per method (default %(default)s)")
+    parser.add_argument("--idle-seconds", type=float, default=5.0, help="Baseline sampling before any load")
+    parser.add_argument("--docker", action="store_true", help="Start a throwaway postgres:16 container")
+    parser.add_argument("--pg-host", default=os.getenv("BENCH_PGHOST", "localhost"))
+    parser.add_argument("--pg-port", type=int, default=int(os.getenv("BENCH_PGPORT", "5432")))
+    parser.add_argument("--pg-user", default=os.getenv("BENCH_PGUSER", "postgres"))
+    parser.add_argument("--pg-password", default=os.getenv("BENCH_PGPASSWORD", "postgres"))
+    args = parser.parse_args()
+    methods = [m for m in args.methods.split(",") if m]
+
+    workdir = Path(tempfile.mkdtemp(prefix="swap_latency_"))
+    payloads = Payloads(args.players)
+    container = None
+    params = {"host": args.pg_host, "port": args.pg_port, "user": args.pg_user, "password": args.pg_password}
+    if args.docker:
+        container, params["port"] = start_docker_postgres(args.pg_password)
+        params["host"] = "127.0.0.1"
+    dbname = f"swap_latency_{os.getpid()}"
+    failed = False
+    reader = None
+    try:
+        wait_for_postgres(params)
+        admin_run(params, f'CREATE DATABASE "{dbname}"')
+        seed_database(params, dbname, payloads.lahman_rows())
+
+        os.environ["RAW_LANDING_DIR"] = str(workdir / "raw")
+        from etl import raw_store
+        for year in list(BACKFILL_YEARS) + [YEAR]:
+            for player_type in ("batter", "pitcher"):
+                raw_store.land("savant", f"{player_type}_{year}", "fixture", payloads.savant_csv(year, player_type))
+        raw_store.land("mlb_rosters", f"teams_{YEAR}", "fixture", payloads.teams_json())
+        raw_store.land("mlb_rosters", f"players_{YEAR}", "fixture", payloads.players_json())
+        raw_store.land("chadwick", "register", "fixture", payloads.register_csv())
+        env = dict(os.environ)
+        env.update({
+            "AWSHOST": params["host"], "AWSPORT": str(params["port"]), "AWSUSER": params["user"],
+            "AWSPASSWORD": params["password"], "AWSDATABASE": dbname, "SAVANT_REPLAY": "latest",
+            "ETL_METRICS_DIR": str(workdir / "etl_runs"), "SAVANT_UPSERT_METHOD": "copy",
+            "CHADWICK_BRIDGE_CACHE": str(workdir / "cache" / "chadwick_bridge.parquet"), "PYTHONUNBUFFERED": "1",
+        })
+
+        for job in ("savant_backfill", "savant_daily"):
+            rc, seconds, log = run_job(job, env, "replay", workdir, 0)
+            print(f" seed {job:16s} exit {rc}  {seconds:7.1f}s  ({log.name})")
+            if rc != 0:
+                raise SystemExit(f"Seeding failed; see {log}")
+        conn = psycopg2.connect(**params, dbname=dbname)
+        with conn, conn.cursor() as cur:
+            for sql in DEPENDENTS:
+                cur.execute(sql)
+        conn.close()
+
+        reader = Reader(params, dbname)
+        reader.start()
+        reader.phase = "idle"
+        time.sleep(args.idle_seconds)
+        walls = {}
+        env["SAVANT_FORCE_UPSERT"] = "1"
+        for method in methods:
+            env["SAVANT_UPSERT_METHOD"] = method
+            for round_no in range(1, args.rounds + 1):
+                reader.phase = method
+                rc, seconds, log = run_job("savant_daily", env, "replay", workdir, f"{method}{round_no}")
+                reader.phase = None
+                walls.setdefault(method, []).append(seconds)
+                print(f" {method:6s} round {round_no}  exit {rc}  {seconds:7.1f}s  ({log.name})")
+                problems = check_tables(params, dbname)
+                for p in problems:
+                    print(f"  FAIL: {p}")
+                failed |= rc != 0 or bool(problems)
+        reader.stop()
+        errors = [s for s in reader.samples if s[3]]
+        for phase, name, _, error in errors[:10]:
+            print(f"  FAIL: {phase} {name}: {error}")
+        failed |= bool(errors)
+        print_report(reader.samples, ["idle"] + methods, walls)
+        print(f"Logs: {workdir}")
+    finally:
+        if reader is not None and reader.is_alive():
+            reader.stop()
+        if container:
+            subprocess.call(["docker", "stop", container], stdout=subprocess.DEVNULL)
+        else:
+            try:
+                admin_run(params, f'DROP DATABASE IF EXISTS "{dbname}"')
+            except psycopg2.Error as e:
+                print(f"Could not drop {dbname}: {e}")
+    print("FAILED" if failed else "OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()